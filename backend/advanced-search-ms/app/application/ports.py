@@ -15,9 +15,18 @@ Every search method returns:
 
 Shared parameters:
     store_object_id • page • page_size
+    deadline (optional) – per-request time budget; stages size their timeouts from it
+    filters (optional)  – `SearchFilters` applied inside the search stage
+    profile (optional)  – `QueryProfile` of an explain request; adapters append
+                          the pipeline they ran and its `explain` output
 """
 
-from typing import Protocol, List, Dict, Tuple, Optional
+from datetime import datetime
+from typing import Protocol, List, Dict, Tuple, Optional, Any, AsyncIterator, Sequence
+
+from app.domain.search_filters import SearchFilters
+from app.shared.deadline import Deadline
+from app.shared.query_profile import QueryProfile
 
 # Readability alias for return types
 SearchResult = Tuple[List[Dict], int]
@@ -27,10 +36,33 @@ SearchResult = Tuple[List[Dict], int]
 class EmbeddingProvider(Protocol):
     """Interface for embedding generation providers."""
 
-    async def create_embedding(self, text: str) -> List[float]: ...
+    async def create_embedding(self, text: str, *, deadline: Optional[Deadline] = None) -> List[float]: ...
+
+# ───────────────────────── Semantic result cache ───────────────────────
+# Implemented by: app/infrastructure/cache/semantic_cache.py → SemanticResultCache
+class SemanticCache(Protocol):
+    """Reuses ranked results of near-duplicate query embeddings (option 3)."""
+
+    def lookup(
+        self,
+        store_object_id: str,
+        embedding: List[float],
+        page: int,
+        page_size: int,
+    ) -> Optional[SearchResult]: ...
+
+    def store(
+        self,
+        store_object_id: str,
+        embedding: List[float],
+        page: int,
+        page_size: int,
+        result: SearchResult,
+    ) -> None: ...
 
 # ─────────────────────── Product‑search repository ─────────────────────
 # Implemented by: app/infrastructure/mongodb/search_repository.py → MongoSearchRepository
+#   and app/infrastructure/memory/text_index.py → LocalTextSearchRepository (options 1 / 2)
 class SearchRepository(Protocol):
     """Repository interface for product search strategies."""
 
@@ -41,6 +73,11 @@ class SearchRepository(Protocol):
         store_object_id: str,
         page: int,
         page_size: int,
+        *,
+        deadline: Optional[Deadline] = None,
+        filters: Optional[SearchFilters] = None,
+        fields: Optional[Sequence[str]] = None,
+        profile: Optional[QueryProfile] = None,
     ) -> SearchResult: ...
 
     # Option 2 – Atlas text index
@@ -50,6 +87,11 @@ class SearchRepository(Protocol):
         store_object_id: str,
         page: int,
         page_size: int,
+        *,
+        deadline: Optional[Deadline] = None,
+        filters: Optional[SearchFilters] = None,
+        fields: Optional[Sequence[str]] = None,
+        profile: Optional[QueryProfile] = None,
     ) -> SearchResult: ...
 
     # Option 3 – Lucene k‑NN vector search
@@ -59,6 +101,11 @@ class SearchRepository(Protocol):
         store_object_id: str,
         page: int,
         page_size: int,
+        *,
+        deadline: Optional[Deadline] = None,
+        filters: Optional[SearchFilters] = None,
+        fields: Optional[Sequence[str]] = None,
+        profile: Optional[QueryProfile] = None,
     ) -> SearchResult: ...
 
     # Option 4 – Hybrid RRF (text + vector)
@@ -72,4 +119,98 @@ class SearchRepository(Protocol):
         *,
         weight_vector: Optional[float] = None,
         weight_text:   Optional[float] = None,
+        deadline:      Optional[Deadline] = None,
+        filters:       Optional[SearchFilters] = None,
+        fields:        Optional[Sequence[str]] = None,
+        profile:       Optional[QueryProfile] = None,
     ) -> SearchResult: ...
+
+    # Facet counts for options 2 / 4 (category, subCategory, brand, price)
+    async def search_facets(
+        self,
+        query: str,
+        store_object_id: str,
+        *,
+        deadline: Optional[Deadline] = None,
+        filters: Optional[SearchFilters] = None,
+        profile: Optional[QueryProfile] = None,
+    ) -> Dict[str, List[Dict[str, Any]]]: ...
+
+# ───────────────────────────── Suggestions ─────────────────────────────
+# Implemented by: app/infrastructure/memory/prefix_index.py → PrefixIndex
+class SuggestionIndex(Protocol):
+    """In-memory type-ahead lookup; must not perform I/O."""
+
+    def suggest(
+        self,
+        prefix: str,
+        store_object_id: str,
+        limit: int,
+    ) -> List[Dict[str, Any]]: ...
+
+
+# ─────────────────────────────── Stores ────────────────────────────────
+# Implemented by: app/infrastructure/memory/store_index.py → StoreIndex
+class StoreLocator(Protocol):
+    """In-memory nearest-store lookup; must not perform I/O."""
+
+    def get(self, store_id: str) -> Optional[Any]: ...
+
+    def nearest(
+        self,
+        lng: float,
+        lat: float,
+        *,
+        k: int,
+        radius_km: Optional[float] = None,
+    ) -> List[Tuple[float, Any]]: ...
+
+
+# Implemented by: app/infrastructure/memory/store_kpis.py → StoreKpiView
+class StoreKpiReader(Protocol):
+    """Per-store inventory KPIs served from memory; must not perform I/O."""
+
+    updated_at: Optional[datetime]
+
+    def stores(self) -> List[str]: ...
+
+    def get(
+        self,
+        store_object_id: str,
+        *,
+        depletion_horizons: Sequence[int] = (),
+    ) -> Optional[Dict[str, Any]]: ...
+
+
+# Implemented by: app/infrastructure/memory/stock_alerts.py → StockAlertHub
+class StockAlertFeed(Protocol):
+    """
+    Per-store stock alerts fanned out from the inventory change stream.
+    `subscribe()` returns None when the client limit is reached; the
+    subscription carries `queue`, `replay`, `reset_id` and `overflowed`.
+    """
+
+    def subscribe(self, store: str, last_event_id: Optional[str] = None) -> Optional[Any]: ...
+
+    def unsubscribe(self, subscription: Any) -> None: ...
+
+# ───────────────────────────── Inventory ───────────────────────────────
+# Implemented by: app/infrastructure/mongodb/inventory_repository.py
+#   → MongoInventoryRepository (optionally behind CachedInventoryRepository)
+class InventoryRepository(Protocol):
+    """Per-product inventory split into the selected store vs. every other store."""
+
+    async def find_store_split(
+        self,
+        product_ids: List[str],
+        store_object_id: str,
+        *,
+        deadline: Optional[Deadline] = None,
+    ) -> Dict[str, Dict[str, Any]]: ...
+
+
+# Implemented by: app/infrastructure/mongodb/inventory_export.py → MongoInventoryExporter
+class InventoryExporter(Protocol):
+    """Columnar snapshot of one store's inventory (`fmt` = "arrow" | "parquet")."""
+
+    def stream(self, store_object_id: str, fmt: str) -> AsyncIterator[bytes]: ...
@@ -15,10 +15,13 @@ Logs are added for didactic clarity during development and debugging.
 """
 
 import logging
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 
 from app.application.ports import SearchRepository
 from app.application.use_cases.base import SearchUseCase
+from app.domain.search_filters import SearchFilters
+from app.shared.deadline import Deadline
+from app.shared.query_profile import QueryProfile
 from app.shared.exceptions import InfrastructureError
 
 logger = logging.getLogger("advanced-search-ms.usecase.atlas-text")
@@ -27,6 +30,8 @@ logger = logging.getLogger("advanced-search-ms.usecase.atlas-text")
 class AtlasTextSearchUseCase(SearchUseCase):
     """Delegates to `SearchRepository.search_atlas_text()`."""
 
+    supports_facets = True
+
     async def _run_repo_query(
         self,
         *,
@@ -34,6 +39,10 @@ class AtlasTextSearchUseCase(SearchUseCase):
         store_object_id: str,
         page: int,
         page_size: int,
+        deadline: Optional[Deadline] = None,
+        filters: Optional[SearchFilters] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+        profile: Optional[QueryProfile] = None,
     ) -> Tuple[List[Dict], int]:
 
         logger.info("🔍 [USECASE atlas_text] Starting _run_repo_query() in AtlasTextSearchUseCase")
@@ -47,6 +56,10 @@ class AtlasTextSearchUseCase(SearchUseCase):
                 store_object_id=store_object_id,
                 page=page,
                 page_size=page_size,
+                deadline=deadline,
+                filters=filters,
+                fields=fields,
+                profile=profile,
             )
             logger.info("✅ [USECASE atlas_text] Repository call completed successfully")
             return result
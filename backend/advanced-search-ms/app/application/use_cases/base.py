@@ -15,15 +15,32 @@ Educational Logs
 - Logs entry into `execute()` with query and pagination context.
 - Catches and rethrows InfrastructureError as UseCaseError.
 - Allows `**kwargs` for flexibility (e.g., hybrid RRF weights) without impacting other use cases.
+- Carries an optional `Deadline` down to the embedder and repository so
+  every stage's timeout comes from the time the request has left.
+- Reports `degraded=True` when a concrete use-case had to fall back to a
+  cheaper strategy (e.g. text search while the embedder circuit is open).
+- Carries optional `SearchFilters` (stock / category / price) to the
+  repository, which applies them inside the search stage.
+- Optional `fields` (sparse fieldset) narrows the projection; the returned
+  `Product`s then only carry those fields.
+- With `facets=True` (use-cases that set `supports_facets`), facet counts
+  are fetched concurrently with the documents; a failed facet query only
+  drops the facets, never the results.
+- An optional `QueryProfile` (explain mode) is handed to every repository
+  call, facets included, so each records the pipeline it ran.
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from abc import ABC, abstractmethod
-from typing import Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from app.application.ports import EmbeddingProvider, SearchRepository
+from app.domain.search_filters import SearchFilters
+from app.shared.deadline import Deadline
+from app.shared.query_profile import QueryProfile
 from app.domain.product import Product
 from app.shared.exceptions import UseCaseError, InfrastructureError
 
@@ -33,9 +50,12 @@ logger = logging.getLogger("advanced-search-ms.usecase")
 class SearchUseCase(ABC):
     """Template Method base class for search use‑cases."""
 
+    supports_facets = False  # True for strategies backed by the Atlas Search text index
+
     def __init__(self, repo: SearchRepository, embedder: EmbeddingProvider | None = None) -> None:
         self.repo = repo
         self.embedder = embedder  # optional – only needed for vector / hybrid flows
+        self.degraded = False     # set by subclasses that fell back to another strategy
 
     async def execute(
         self,
@@ -44,6 +64,11 @@ class SearchUseCase(ABC):
         store_object_id: str,
         page: int,
         page_size: int,
+        deadline: Optional[Deadline] = None,
+        filters: Optional[SearchFilters] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+        facets: bool = False,
+        profile: Optional[QueryProfile] = None,
         **kwargs,  # Allows optional inputs like weight_vector / weight_text (for hybrid)
     ) -> Dict:
         """
@@ -56,21 +81,55 @@ class SearchUseCase(ABC):
         """
         logger.info("🔍 [USECASE base] execute() | query=%r store=%s page=%d size=%d",
                     query, store_object_id, page, page_size)
+        facet_task = None
+        if facets and self.supports_facets:
+            facet_task = asyncio.create_task(self._facets(query, store_object_id, deadline, filters, profile))
         try:
             raw_docs, total = await self._run_repo_query(
                 query=query,
                 store_object_id=store_object_id,
                 page=page,
                 page_size=page_size,
+                deadline=deadline,
+                filters=filters,
+                fields=fields,
+                profile=profile,
                 **kwargs,
             )
-        except InfrastructureError as exc:
-            logger.error("💥 [USECASE base] Infrastructure error: %s", exc)
-            raise UseCaseError(str(exc)) from exc
+        except BaseException as exc:
+            if facet_task is not None:
+                facet_task.cancel()  # no results – the facets are not needed either
+            if isinstance(exc, InfrastructureError):
+                logger.error("💥 [USECASE base] Infrastructure error: %s", exc)
+                raise UseCaseError(str(exc)) from exc
+            raise
 
-        products: List[Product] = [Product.from_mongo(d) for d in raw_docs]
+        products: List[Product] = [Product.from_mongo(d, fields=fields) for d in raw_docs]
         logger.info("📦 [USECASE base] Parsed %d product(s) from raw documents", len(products))
-        return {"products": products, "total": total}
+        result: Dict[str, Any] = {"products": products, "total": total, "degraded": self.degraded}
+        if facet_task is not None:
+            result["facets"] = await facet_task
+        return result
+
+    async def _facets(
+        self,
+        query: str,
+        store_object_id: str,
+        deadline: Optional[Deadline],
+        filters: Optional[SearchFilters],
+        profile: Optional[QueryProfile] = None,
+    ) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        try:
+            return await self.repo.search_facets(
+                query=query,
+                store_object_id=store_object_id,
+                deadline=deadline,
+                filters=filters,
+                profile=profile,
+            )
+        except Exception as exc:  # noqa: BLE001 – facets are best effort
+            logger.warning("⚠️ [USECASE base] Facets skipped: %s", exc)
+            return None
 
     # ------------------------------------------------------------------ #
     #            Hook to be implemented by concrete subclasses           #
@@ -83,6 +142,10 @@ class SearchUseCase(ABC):
         store_object_id: str,
         page: int,
         page_size: int,
+        deadline: Optional[Deadline] = None,
+        filters: Optional[SearchFilters] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+        profile: Optional[QueryProfile] = None,
         **kwargs,
     ) -> Tuple[List[Dict], int]:
         """
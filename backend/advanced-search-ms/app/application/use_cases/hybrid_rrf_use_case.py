@@ -9,15 +9,23 @@ Flow
 3. Return a list of products (domain objects) plus total hits.
 
 Business rule: if caller omits `weight_vector` / `weight_text`, default to **0.5**.
+Degradation: if the embedder is short-circuited (`EmbeddingUnavailableError`),
+the text half alone is served via `AtlasTextSearchUseCase` and marked degraded.
 """
 
 from __future__ import annotations
 
 import logging
+import time
 from typing import Dict, List, Tuple, Optional
 
 from app.application.ports import EmbeddingProvider, SearchRepository
+from app.application.use_cases.atlas_text_search_use_case import AtlasTextSearchUseCase
 from app.application.use_cases.base import SearchUseCase
+from app.domain.search_filters import SearchFilters
+from app.shared.deadline import Deadline
+from app.shared.query_profile import QueryProfile
+from app.shared.exceptions import EmbeddingUnavailableError
 
 logger = logging.getLogger("advanced-search-ms.usecase.hybrid")
 
@@ -27,6 +35,8 @@ DEFAULT_WEIGHT = 0.5  # business default when caller does not specify weights
 class HybridRRFSearchUseCase(SearchUseCase):
     """Combines semantic (vector) and lexical (text) relevance via RRF."""
 
+    supports_facets = True
+
     async def _run_repo_query(
         self,
         *,
@@ -36,13 +46,36 @@ class HybridRRFSearchUseCase(SearchUseCase):
         page_size: int,
         weight_vector: Optional[float] = None,
         weight_text: Optional[float] = None,
+        deadline: Optional[Deadline] = None,
+        filters: Optional[SearchFilters] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+        profile: Optional[QueryProfile] = None,
     ) -> Tuple[List[Dict], int]:
         # Ensure an embedder is available
         assert self.embedder, "Hybrid search requires an EmbeddingProvider instance"
 
         # 1️⃣  Embed the query
-        embedding: List[float] = await self.embedder.create_embedding(query)
+        started = time.perf_counter()
+        try:
+            embedding: List[float] = await self.embedder.create_embedding(query, deadline=deadline)
+        except EmbeddingUnavailableError:
+            if profile is not None:
+                profile.add("embedding", skipped="embedder unavailable")
+            logger.warning("[HYBRID] ⚠️ Embedder unavailable – degrading to Atlas text search")
+            self.degraded = True
+            return await AtlasTextSearchUseCase(self.repo)._run_repo_query(
+                query=query,
+                store_object_id=store_object_id,
+                page=page,
+                page_size=page_size,
+                deadline=deadline,
+                filters=filters,
+                fields=fields,
+                profile=profile,
+            )
         logger.info("[HYBRID] Generated embedding (length=%d) for query", len(embedding))
+        if profile is not None:
+            profile.add("embedding", elapsedMs=round((time.perf_counter() - started) * 1000, 2), dimensions=len(embedding))
 
         # 2️⃣  Determine weights (apply defaults when missing)
         w_vec = weight_vector if weight_vector is not None else DEFAULT_WEIGHT
@@ -58,5 +91,9 @@ class HybridRRFSearchUseCase(SearchUseCase):
             page_size=page_size,
             weight_vector=w_vec,
             weight_text=w_txt,
+            deadline=deadline,
+            filters=filters,
+            fields=fields,
+            profile=profile,
         )
         return products, total
@@ -1,9 +1,12 @@
 # app/application/use_cases/keyword_search_use_case.py
 
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 
 from app.application.ports import SearchRepository
 from app.application.use_cases.base import SearchUseCase
+from app.domain.search_filters import SearchFilters
+from app.shared.deadline import Deadline
+from app.shared.query_profile import QueryProfile
 import logging
 
 logger = logging.getLogger("advanced-search-ms.usecase.keyword")
@@ -19,6 +22,10 @@ class KeywordSearchUseCase(SearchUseCase):
         store_object_id: str,
         page: int,
         page_size: int,
+        deadline: Optional[Deadline] = None,
+        filters: Optional[SearchFilters] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+        profile: Optional[QueryProfile] = None,
     ) -> Tuple[List[Dict], int]:
         logger.info("🔍 [USECASE keyword] Inside KeywordSearchUseCase._run_repo_query()")
         logger.info("📥 [USECASE keyword] Inputs: query=%r store_object_id=%s page=%d page_size=%d",
@@ -29,6 +36,10 @@ class KeywordSearchUseCase(SearchUseCase):
             store_object_id=store_object_id,
             page=page,
             page_size=page_size,
+            deadline=deadline,
+            filters=filters,
+            fields=fields,
+            profile=profile,
         )
         logger.info("✅ [USECASE keyword] Repository call completed in KeywordSearchUseCase")
         return result
@@ -7,15 +7,27 @@ Flow
 1.  Create an embedding for the user query.
 2.  Call the repository's `search_by_vector()` so the DB does the heavy work.
 3.  Return paged products + total count, same contract as other search modes.
+
+When a `SemanticCache` is injected, step 2 is skipped for queries whose
+embedding is a near-duplicate of one recently served for the same store/page.
+
+If the embedder is short-circuited (`EmbeddingUnavailableError`), the query is
+answered by `AtlasTextSearchUseCase` instead and the response is marked degraded.
 """
 
 from __future__ import annotations
 
 import logging
-from typing import Dict, List, Tuple
+import time
+from typing import Dict, List, Optional, Tuple
 
-from app.application.ports import EmbeddingProvider, SearchRepository
+from app.application.ports import EmbeddingProvider, SearchRepository, SemanticCache
+from app.application.use_cases.atlas_text_search_use_case import AtlasTextSearchUseCase
 from app.application.use_cases.base import SearchUseCase
+from app.domain.search_filters import SearchFilters
+from app.shared.deadline import Deadline
+from app.shared.query_profile import QueryProfile
+from app.shared.exceptions import EmbeddingUnavailableError
 
 logger = logging.getLogger("advanced-search-ms.usecase.vector")
 
@@ -29,6 +41,15 @@ class VectorSearchUseCase(SearchUseCase):
     response shape as the other search options.
     """
 
+    def __init__(
+        self,
+        repo: SearchRepository,
+        embedder: EmbeddingProvider | None = None,
+        semantic_cache: Optional[SemanticCache] = None,
+    ) -> None:
+        super().__init__(repo, embedder)
+        self.semantic_cache = semantic_cache
+
     async def _run_repo_query(
         self,
         *,
@@ -36,6 +57,10 @@ class VectorSearchUseCase(SearchUseCase):
         store_object_id: str,  # ← match parameter name expected downstream
         page: int,
         page_size: int,
+        deadline: Optional[Deadline] = None,
+        filters: Optional[SearchFilters] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+        profile: Optional[QueryProfile] = None,
     ) -> Tuple[List[Dict], int]:
         """
         Parameters
@@ -48,6 +73,14 @@ class VectorSearchUseCase(SearchUseCase):
             1-based page number.
         page_size : int
             Documents per page.
+        deadline : Deadline, optional
+            Remaining request budget shared by the embedding and the aggregation.
+        filters : SearchFilters, optional
+            Stock / category / price constraints applied inside `$vectorSearch`.
+        fields : tuple of str, optional
+            Sparse fieldset forwarded to the projection.
+        profile : QueryProfile, optional
+            Explain mode: receives the embedding step and the repository's profile.
 
         Returns
         -------
@@ -57,7 +90,38 @@ class VectorSearchUseCase(SearchUseCase):
         # -------------------- 1️⃣ Embed the query ------------------------- #
         assert self.embedder, "Vector search requires an EmbeddingProvider"
         logger.info("[USECASE vector] 🔄 Embedding query: %r", query)
-        embedding: List[float] = await self.embedder.create_embedding(query)
+        started = time.perf_counter()
+        try:
+            embedding: List[float] = await self.embedder.create_embedding(query, deadline=deadline)
+        except EmbeddingUnavailableError:
+            if profile is not None:
+                profile.add("embedding", skipped="embedder unavailable")
+            logger.warning("[USECASE vector] ⚠️ Embedder unavailable – degrading to Atlas text search")
+            self.degraded = True
+            return await AtlasTextSearchUseCase(self.repo)._run_repo_query(
+                query=query,
+                store_object_id=store_object_id,
+                page=page,
+                page_size=page_size,
+                deadline=deadline,
+                filters=filters,
+                fields=fields,
+                profile=profile,
+            )
+        if profile is not None:
+            profile.add("embedding", elapsedMs=round((time.perf_counter() - started) * 1000, 2), dimensions=len(embedding))
+
+        # The semantic cache is keyed by store + page only – filtered, sparse and explained searches bypass it
+        cache = (
+            self.semantic_cache
+            if (filters is None or filters.is_empty) and fields is None and profile is None
+            else None
+        )
+        if cache is not None:
+            cached = cache.lookup(store_object_id, embedding, page, page_size)
+            if cached is not None:
+                logger.info("[USECASE vector] ♻️ Reusing cached result of a near-duplicate query")
+                return cached
 
         # -------------------- 2️⃣ Repository call ------------------------- #
         logger.info(
@@ -72,7 +136,13 @@ class VectorSearchUseCase(SearchUseCase):
             store_object_id=store_object_id,
             page=page,
             page_size=page_size,
+            deadline=deadline,
+            filters=filters,
+            fields=fields,
+            profile=profile,
         )
+        if cache is not None:
+            cache.store(store_object_id, embedding, page, page_size, (products, total))
 
         # -------------------- 3️⃣ Return results ------------------------- #
         logger.info(
@@ -0,0 +1,52 @@
+"""
+Domain rules for store inventory.
+
+• `SUMMARY_FIELDS` – the per-store fields copied into `products.inventorySummary`
+  (Extended Reference Pattern; see docs/setup/collections/README.md).
+• `build_inventory_summary()` – condenses an `inventory.storeInventory` array
+  into that summary. Mirrors `docs/setup/atlas-triggers/inventory_sync.js`.
+• `in_stock_store_ids()` – the stores of a summary that have stock, stored as
+  `IN_STOCK_STORES_FIELD` so search indexes can filter "in stock in store X"
+  with one `equals` (a flat `inventorySummary.inStock` match would accept
+  stock in *any* store).
+• `KPI_ROW_FIELDS` – the `storeInventory` fields per-store KPIs are derived
+  from (stock, near-replenishment, predicted depletion date).
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Tuple
+
+SUMMARY_FIELDS: Tuple[str, ...] = (
+    "storeObjectId",
+    "storeId",
+    "sectionId",
+    "aisleId",
+    "shelfId",
+    "inStock",
+    "nearToReplenishmentInShelf",
+)
+
+IN_STOCK_STORES_FIELD = "inStockStoreObjectIds"
+
+KPI_ROW_FIELDS: Tuple[str, ...] = (
+    "storeObjectId",
+    "storeId",
+    "inStock",
+    "nearToReplenishmentInShelf",
+    "predictedStockDepletion",
+)
+
+
+def build_inventory_summary(store_inventory: List[Dict]) -> List[Dict]:
+    """Keep only the summary fields of each store row (order preserved).
+
+    Fields a row does not have stay absent – no explicit nulls – just as the
+    trigger's `undefined` values are dropped on write.
+    """
+    return [{f: row[f] for f in SUMMARY_FIELDS if f in row} for row in store_inventory or []]
+
+
+def in_stock_store_ids(summary: List[Dict]) -> List[Any]:
+    """`storeObjectId`s of the summary rows flagged `inStock`."""
+    return [row["storeObjectId"] for row in summary if row.get("inStock") and row.get("storeObjectId") is not None]
@@ -5,17 +5,66 @@ Domain model for a Product.
 • Only `imageUrlS3` is used for the product image.
 • The `from_mongo` factory validates and assigns fields
   (it fails if `imageUrlS3` is missing, ensuring pipeline consistency).
+• Sparse fieldsets: `from_mongo(doc, fields=…)` builds a partial product
+  holding only the requested `SELECTABLE_FIELDS` (plus `id` / `score`);
+  `imageUrlS3` is then only required when it was requested.
+• `build_embedding_text()` is the single definition of the `embeddingText`
+  composite that product embeddings are computed from.
 """
 
 from __future__ import annotations
 
+import hashlib
 import logging
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Sequence, Tuple
 
 from pydantic import BaseModel, Field
 
 logger = logging.getLogger("advanced-search-ms.domain")
 
+# ---------------------------------------------------------------------------#
+# 🧠  Embedding text
+# ---------------------------------------------------------------------------#
+# Source fields of `embeddingText`, in composition order
+EMBEDDING_TEXT_FIELDS: Tuple[str, ...] = (
+    "productName",
+    "aboutTheProduct",
+    "brand",
+    "category",
+    "subCategory",
+    "quantity",
+)
+
+
+def build_embedding_text(doc: Dict) -> str:
+    """Compose the text a product is embedded from (name, description, brand, category, sub-category, quantity)."""
+    parts = [str(doc[f]).strip() for f in EMBEDDING_TEXT_FIELDS if doc.get(f)]
+    return ". ".join(p for p in parts if p)
+
+
+def embedding_text_hash(text: str, model: str) -> str:
+    """Content hash used to skip re-embedding when neither text nor model changed."""
+    return hashlib.blake2b(f"{model}\x00{text}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+# ---------------------------------------------------------------------------#
+# 🧩  Sparse fieldsets
+# ---------------------------------------------------------------------------#
+# Fields a client may request via `fields`; `_id` (and `score`) always come back
+SELECTABLE_FIELDS: Tuple[str, ...] = (
+    "productName",
+    "brand",
+    "price",
+    "quantity",
+    "category",
+    "subCategory",
+    "absoluteUrl",
+    "aboutTheProduct",
+    "imageUrlS3",
+    "inventorySummary",
+)
+
+
 # ---------------------------------------------------------------------------#
 # 📦  Nested models
 # ---------------------------------------------------------------------------#
@@ -41,7 +90,7 @@ class Product(BaseModel):
     # DB id is exposed as a plain string
     id: str = Field(..., alias="_id")
 
-    productName: str
+    productName: Optional[str] = None
     brand: Optional[str] = None
     price: Optional[Price] = None
     quantity: Optional[str] = None
@@ -51,9 +100,9 @@ class Product(BaseModel):
     aboutTheProduct: Optional[str] = None
 
     # ✅ Only this image field is kept
-    imageUrlS3: str
+    imageUrlS3: Optional[str] = None
 
-    inventorySummary: List[InventoryItem]
+    inventorySummary: Optional[List[InventoryItem]] = None
 
     # Vector similarity (present for vector/hybrid searches)
     score: Optional[float] = None
@@ -62,16 +111,19 @@ class Product(BaseModel):
     # 🏭  Factory: raw Mongo → domain model
     # --------------------------------------------------------------------- #
     @classmethod
-    def from_mongo(cls, doc: Dict) -> "Product":
+    def from_mongo(cls, doc: Dict, fields: Optional[Sequence[str]] = None) -> "Product":
         """
         Converts a MongoDB document (possibly enriched via aggregation)
         into a Product domain object.
+
+        With *fields* (sparse fieldset) only those attributes are set, so
+        `model_dump(exclude_unset=True)` returns exactly what was asked for.
         """
 
         logger.info("🔍 [DOMAIN] Mapping MongoDB document to Product domain model")
 
-        # Validate mandatory S3 image URL
-        if not doc.get("imageUrlS3"):
+        # Validate mandatory S3 image URL (only when the client asked for it)
+        if (fields is None or "imageUrlS3" in fields) and not doc.get("imageUrlS3"):
             logger.error("❌ [DOMAIN] Missing required field: imageUrlS3")
             raise ValueError("Field 'imageUrlS3' missing in product document")
 
@@ -82,9 +134,7 @@ class Product(BaseModel):
                 item["storeObjectId"] = str(item["storeObjectId"])
             inv_items.append(InventoryItem(**item))
 
-
-        return cls(
-            _id=str(doc.get("_id")),
+        values = dict(
             productName=doc.get("productName"),
             brand=doc.get("brand"),
             price=Price(**doc["price"]) if doc.get("price") else None,
@@ -93,10 +143,13 @@ class Product(BaseModel):
             subCategory=doc.get("subCategory"),
             absoluteUrl=doc.get("absoluteUrl"),
             aboutTheProduct=doc.get("aboutTheProduct"),
-            imageUrlS3=doc["imageUrlS3"],
+            imageUrlS3=doc.get("imageUrlS3"),
             inventorySummary=inv_items,
-            score=doc.get("score"),
         )
+        if fields is not None:
+            values = {k: v for k, v in values.items() if k in fields}
+
+        return cls(_id=str(doc.get("_id")), score=doc.get("score"), **values)
 
     class Config:
         allow_population_by_field_name = True
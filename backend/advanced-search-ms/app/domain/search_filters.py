@@ -0,0 +1,30 @@
+"""
+Domain value object for search filters.
+
+• `SearchFilters` – optional stock / category / price-range constraints that
+  every search option applies *inside* its search stage, next to the
+  mandatory store filter.
+• Immutable and hashable, so it can be part of cache keys.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+
+@dataclass(frozen=True)
+class SearchFilters:
+    in_stock: Optional[bool] = None       # stock in the *selected* store
+    categories: Tuple[str, ...] = ()      # any of these categories
+    min_price: Optional[float] = None     # inclusive, on price.amount
+    max_price: Optional[float] = None     # inclusive, on price.amount
+
+    @property
+    def is_empty(self) -> bool:
+        return (
+            self.in_stock is None
+            and not self.categories
+            and self.min_price is None
+            and self.max_price is None
+        )
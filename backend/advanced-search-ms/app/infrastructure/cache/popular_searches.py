@@ -0,0 +1,172 @@
+# app/infrastructure/cache/popular_searches.py
+"""
+Pre-computed first pages for the most frequent searches of each store.
+
+Why
+---
+A handful of queries per store ("milk", "bread", "eggs", …) make up most of
+the search traffic, yet every one of them ran its full pipeline. Their
+first page is now computed in the background and served from memory.
+
+How it works
+------------
+* Every plain first-page search (no filters, sparse fieldset or custom
+  weights) is counted in a `SpaceSaving` sketch keyed by `PopularQuery`
+  (store, option, normalised query, page size, facets). The query as the
+  client last typed it is kept next to the key and is what the warmer
+  runs, so embeddings (options 3 / 4) see the original casing and spacing.
+* Every `refresh_s` the warmer:
+  1. takes the `top_k` keys per store with at least `min_count` hits
+     (the hot set);
+  2. recomputes the hot keys whose cached page is missing or older than
+     `ttl_s - 2 × refresh_s`, so the head of the distribution never
+     expires between two cycles;
+  3. decays the sketch by `decay`, so yesterday's favourites fade.
+* A request for a hot key is answered from the `TTLCache`; a miss on a hot
+  key stores its result immediately. Degraded results (e.g. the text
+  fallback of an open embedder circuit) are never cached.
+* Cached pages may lag writes by up to `ttl_s`, like the other
+  read-through caches.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Set
+
+from app.infrastructure.cache.ttl_cache import TTLCache
+from app.infrastructure.memory.heavy_hitters import SpaceSaving
+from app.shared.metrics import metrics
+
+logger = logging.getLogger("advanced-search-ms.infra.cache.popular")
+
+
+class PopularQuery(NamedTuple):
+    store: str
+    option: int
+    query: str  # normalised: lower-case, single spaces
+    page_size: int
+    facets: bool
+
+    @classmethod
+    def of(cls, store: str, option: int, query: str, page_size: int, facets: bool) -> "PopularQuery":
+        return cls(store.lower(), option, " ".join(query.lower().split()), page_size, facets)
+
+
+class PopularSearchCache:
+    """Heavy-hitters sketch + first-page cache for the hot set."""
+
+    def __init__(
+        self,
+        *,
+        top_k: int = 20,
+        sketch_capacity: int = 4_096,
+        min_count: float = 3.0,
+        ttl_s: float = 60.0,
+    ) -> None:
+        self.top_k = top_k
+        self.min_count = min_count
+        self.sketch: SpaceSaving[PopularQuery] = SpaceSaving(sketch_capacity)
+        self.results: TTLCache[Dict[str, Any]] = TTLCache(
+            name="popular_searches", capacity=sketch_capacity, ttl_s=ttl_s,
+        )
+        self.hot: Set[PopularQuery] = set()
+        self.computed_at: Dict[PopularQuery, float] = {}  # monotonic time of the cached page
+        self.texts: Dict[PopularQuery, str] = {}  # original query text last seen per key
+
+    def record(self, key: PopularQuery, text: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Count one request for *key* (typed as *text*); returns its cached first page, if any."""
+        self.sketch.offer(key)
+        if text is not None:
+            self.texts[key] = text
+            if len(self.texts) > 2 * self.sketch.capacity:
+                self._prune_texts()
+        return self.results.get(key) if key in self.hot else None
+
+    def text_of(self, key: PopularQuery) -> str:
+        """Query text to run for *key*: the original when known, else the normalised form."""
+        return self.texts.get(key, key.query)
+
+    def store(self, key: PopularQuery, result: Dict[str, Any]) -> None:
+        """Cache *result* when *key* is hot and the result is complete."""
+        if key in self.hot and not result.get("degraded"):
+            self.results.set(key, result)
+            self.computed_at[key] = time.monotonic()
+
+    def refresh_hot_set(self) -> Set[PopularQuery]:
+        top = self.sketch.top(self.top_k, group=lambda k: k.store, min_count=self.min_count)
+        self.hot = {key for rows in top.values() for key, _, _ in rows}
+        for key in list(self.computed_at):
+            if key not in self.hot:
+                del self.computed_at[key]
+        self._prune_texts()
+        metrics.set_gauge("popular_searches.hot", len(self.hot))
+        return self.hot
+
+    def _prune_texts(self) -> None:
+        """Forget the text of keys the sketch no longer tracks."""
+        self.texts = {k: t for k, t in self.texts.items() if k in self.sketch}
+
+
+class PopularSearchWarmer:
+    """Background task keeping the hot set's first pages computed."""
+
+    def __init__(
+        self,
+        cache: PopularSearchCache,
+        compute: Callable[[PopularQuery, str], Awaitable[Dict[str, Any]]],
+        *,
+        refresh_s: float = 15.0,
+        decay: float = 0.9,
+    ) -> None:
+        self.cache = cache
+        self.compute = compute
+        self.refresh_s = refresh_s
+        self.decay = decay
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="popular-searches")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_s)
+            try:
+                await self.refresh()
+            except Exception:  # noqa: BLE001 – one bad cycle must not stop warming for good
+                metrics.inc("popular_searches.refresh_failed")
+                logger.exception("[INFRA/cache/popular] 💥 Refresh cycle failed – retrying next cycle")
+
+    async def refresh(self) -> int:
+        """One cycle (hot set → recompute what is due → decay); returns pages computed."""
+        hot = self.cache.refresh_hot_set()
+        refresh_after = max(0.0, self.cache.results.ttl_s - 2 * self.refresh_s)
+        now = time.monotonic()
+        due = [k for k in hot if now - self.cache.computed_at.get(k, float("-inf")) >= refresh_after]
+
+        computed = 0
+        for key in due:  # sequential: background work must not compete with live traffic
+            try:
+                self.cache.store(key, await self.compute(key, self.cache.text_of(key)))
+                computed += 1
+            except Exception as exc:  # noqa: BLE001 – one failing query must not stop the cycle
+                metrics.inc("popular_searches.refresh_failed")
+                logger.warning("[INFRA/cache/popular] ⚠️ Could not precompute %s: %s", key, exc)
+        self.cache.sketch.decay(self.decay)
+
+        metrics.inc("popular_searches.refreshed", computed)
+        if due:
+            logger.info("[INFRA/cache/popular] 🔥 Precomputed %d/%d page(s) | hot=%d", computed, len(due), len(hot))
+        return computed
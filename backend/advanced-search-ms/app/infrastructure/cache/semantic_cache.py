@@ -0,0 +1,124 @@
+# app/infrastructure/cache/semantic_cache.py
+"""
+Per-store semantic result cache for option 3 (vector search).
+
+Why
+---
+Paraphrased queries ("organic onion" vs "onions organic") embed to almost
+the same vector, yet each one used to run its own `$vectorSearch`. When a
+new query embedding is close enough (cosine ≥ threshold) to one served
+recently for the same store and page, the cached ranked result is reused.
+
+How it works
+------------
+* One bucket per store holding a small ring buffer: an `N × dim` float32
+  NumPy matrix of L2-normalised query embeddings plus the matching
+  `(docs, total)` results, their page window and insertion timestamps.
+* A lookup is a single mat-vec product (`M @ q`) – the dot product of unit
+  vectors *is* the cosine similarity. Expired rows and rows for another
+  page window are masked out.
+* Hits, misses, hit rate and the active threshold are published to
+  `app.shared.metrics`.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.application.ports import SearchResult
+from app.shared.metrics import metrics
+
+logger = logging.getLogger("advanced-search-ms.infra.cache.semantic")
+
+
+class _Bucket:
+    """Ring buffer of recent queries for one store."""
+
+    def __init__(self, capacity: int, dim: int) -> None:
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.stamps = np.zeros(capacity, dtype=np.float64)
+        self.pages = np.zeros((capacity, 2), dtype=np.int32)      # (page, page_size)
+        self.results: List[Optional[SearchResult]] = [None] * capacity
+        self.cursor = 0
+        self.filled = 0
+
+
+class SemanticResultCache:
+    """Cosine-similarity lookup over recently served query embeddings."""
+
+    def __init__(self, *, threshold: float = 0.97, capacity_per_store: int = 128, ttl_s: float = 60.0) -> None:
+        self.threshold = threshold
+        self.capacity_per_store = capacity_per_store
+        self.ttl_s = ttl_s
+        self._buckets: Dict[str, _Bucket] = {}
+        metrics.set_gauge("semantic_cache.threshold", threshold)
+
+    # ------------------------------------------------------------------ #
+    # Public API                                                         #
+    # ------------------------------------------------------------------ #
+    def lookup(
+        self,
+        store_object_id: str,
+        embedding: List[float],
+        page: int,
+        page_size: int,
+    ) -> Optional[SearchResult]:
+        bucket = self._buckets.get(store_object_id)
+        query = self._unit(embedding)
+        hit: Optional[SearchResult] = None
+
+        if bucket is not None and bucket.filled and bucket.vectors.shape[1] == query.shape[0]:
+            n = bucket.filled
+            sims = bucket.vectors[:n] @ query
+            stale = bucket.stamps[:n] < time.monotonic() - self.ttl_s
+            other_page = (bucket.pages[:n, 0] != page) | (bucket.pages[:n, 1] != page_size)
+            sims[stale | other_page] = -1.0
+            best = int(np.argmax(sims))
+            if sims[best] >= self.threshold:
+                hit = bucket.results[best]
+                logger.info("[INFRA/cache/semantic] ♻️ Hit | store=%s cosine=%.4f", store_object_id, sims[best])
+
+        metrics.inc("semantic_cache.hits" if hit is not None else "semantic_cache.misses")
+        self._publish_hit_rate()
+        return hit
+
+    def store(
+        self,
+        store_object_id: str,
+        embedding: List[float],
+        page: int,
+        page_size: int,
+        result: SearchResult,
+    ) -> None:
+        query = self._unit(embedding)
+        bucket = self._buckets.get(store_object_id)
+        if bucket is None or bucket.vectors.shape[1] != query.shape[0]:
+            bucket = _Bucket(self.capacity_per_store, query.shape[0])
+            self._buckets[store_object_id] = bucket
+
+        slot = bucket.cursor
+        bucket.vectors[slot] = query
+        bucket.stamps[slot] = time.monotonic()
+        bucket.pages[slot] = (page, page_size)
+        bucket.results[slot] = result
+        bucket.cursor = (slot + 1) % self.capacity_per_store
+        bucket.filled = min(bucket.filled + 1, self.capacity_per_store)
+
+    # ------------------------------------------------------------------ #
+    # Helpers                                                            #
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _unit(embedding: List[float]) -> np.ndarray:
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm else vec
+
+    @staticmethod
+    def _publish_hit_rate() -> None:
+        hits = metrics.counter("semantic_cache.hits")
+        total = hits + metrics.counter("semantic_cache.misses")
+        metrics.set_gauge("semantic_cache.hit_rate", hits / total if total else 0.0)
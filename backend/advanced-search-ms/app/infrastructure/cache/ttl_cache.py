@@ -0,0 +1,121 @@
+# app/infrastructure/cache/ttl_cache.py
+"""
+Small in-process TTL + LRU cache shared by read-through adapters.
+
+Why
+---
+Several hot read paths (product inventory, facet counts, …) return the same
+documents to many requests within seconds. A bounded, expiring map in front
+of MongoDB removes those round-trips without any external cache service.
+
+How it works
+------------
+* An `OrderedDict` in LRU order; each entry stores `(expires_at, value)`.
+* `get()` drops expired entries lazily and moves hits to the MRU end;
+  `set()` evicts from the LRU end once `capacity` is exceeded. `peek()`
+  reads without counting or reordering (read-modify-write by loaders).
+* `invalidate()` / `clear()` are called by change-stream subscribers.
+  Every invalidation bumps a sequence number; a loader that started before
+  it passes the number it saw (`stamp()`) to `set(..., stamp=…)` and its
+  now-stale result is discarded instead of cached.
+* Hits, misses and size are published to `app.shared.metrics` under
+  `<name>.*`.
+
+Single event loop only – no locking.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Dict, Generic, Hashable, Iterable, Optional, Tuple, TypeVar
+
+from app.shared.metrics import metrics
+
+V = TypeVar("V")
+
+_RECENT_INVALIDATIONS = 10_000  # how many invalidated keys are remembered for `stamp` checks
+
+
+class TTLCache(Generic[V]):
+    """Bounded LRU map whose entries expire after `ttl_s` seconds."""
+
+    def __init__(self, *, name: str, capacity: int = 10_000, ttl_s: float = 30.0) -> None:
+        self.name = name
+        self.capacity = capacity
+        self.ttl_s = ttl_s
+        self._data: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self._seq = 0
+        self._invalidated: "OrderedDict[Hashable, int]" = OrderedDict()  # key → seq of last invalidation
+        self._oldest_forgotten = 0  # seq below which invalidations are no longer tracked per key
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    # ------------------------------------------------------------------ #
+    # Reads / writes                                                     #
+    # ------------------------------------------------------------------ #
+    def get(self, key: Hashable) -> Optional[V]:
+        entry = self._data.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._data.move_to_end(key)
+            metrics.inc(f"{self.name}.hits")
+            return entry[1]
+        if entry is not None:
+            del self._data[key]
+        metrics.inc(f"{self.name}.misses")
+        return None
+
+    def peek(self, key: Hashable) -> Optional[V]:
+        """Like `get()` but without counting a hit / miss or refreshing the LRU position."""
+        entry = self._data.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, V]:
+        """Cached values for *keys*; missing or expired keys are left out."""
+        found: Dict[Hashable, V] = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    def stamp(self) -> int:
+        """Sequence number to pass to `set()` for a value loaded from now on."""
+        return self._seq
+
+    def set(self, key: Hashable, value: V, *, stamp: Optional[int] = None) -> None:
+        if stamp is not None and self._invalidated_since(key, stamp):
+            return  # loaded before an invalidation – caching it would resurrect stale data
+        self._data[key] = (time.monotonic() + self.ttl_s, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.capacity:
+            self._data.popitem(last=False)
+        metrics.set_gauge(f"{self.name}.size", len(self._data))
+
+    # ------------------------------------------------------------------ #
+    # Invalidation                                                       #
+    # ------------------------------------------------------------------ #
+    def invalidate(self, key: Hashable) -> None:
+        self._seq += 1
+        self._data.pop(key, None)
+        self._invalidated[key] = self._seq
+        self._invalidated.move_to_end(key)
+        while len(self._invalidated) > _RECENT_INVALIDATIONS:
+            _, seq = self._invalidated.popitem(last=False)
+            self._oldest_forgotten = seq
+        metrics.inc(f"{self.name}.invalidations")
+
+    def clear(self) -> None:
+        self._seq += 1
+        self._data.clear()
+        self._invalidated.clear()
+        self._oldest_forgotten = self._seq  # every in-flight load is now stale
+        metrics.set_gauge(f"{self.name}.size", 0)
+
+    def _invalidated_since(self, key: Hashable, stamp: int) -> bool:
+        if stamp < self._oldest_forgotten:
+            return True  # cannot tell any more – be conservative
+        return self._invalidated.get(key, 0) > stamp
@@ -0,0 +1,105 @@
+# app/infrastructure/memory/heavy_hitters.py
+"""
+Space-Saving heavy-hitters sketch (Metwally et al.).
+
+Why
+---
+Finding the most frequent searches exactly would need one counter per
+distinct query ever seen. Space-Saving keeps `capacity` counters and still
+reports every key whose frequency exceeds `total / capacity`, with a known
+over-estimate (`error`) per key.
+
+How it works
+------------
+* A tracked key increments its counter.
+* An untracked key, once the sketch is full, takes over the smallest
+  counter: count = that minimum + weight, error = that minimum.
+* The minimum is found through a lazy min-heap (stale entries are skipped
+  when popped; the heap is rebuilt once it holds 4 × `capacity` entries),
+  so an update is O(log capacity) amortised.
+* `decay(factor)` scales every counter, so old popularity fades and the
+  sketch follows shifts in traffic.
+
+Single event loop only – no locking.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+from typing import Callable, Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+
+
+class SpaceSaving(Generic[K]):
+    """Top-k frequency sketch with a fixed number of counters."""
+
+    def __init__(self, capacity: int = 4_096) -> None:
+        self.capacity = capacity
+        self._counts: Dict[K, float] = {}
+        self._errors: Dict[K, float] = {}
+        self._heap: List[Tuple[float, int, K]] = []  # (count at push time, tie-breaker, key)
+        self._tie = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._counts
+
+    def offer(self, key: K, weight: float = 1.0) -> float:
+        """Count one occurrence of *key*; returns its estimated count."""
+        count = self._counts.get(key)
+        if count is not None:
+            count += weight
+        elif len(self._counts) < self.capacity:
+            count = weight
+            self._errors[key] = 0.0
+        else:
+            floor = self._evict_min()
+            count = floor + weight
+            self._errors[key] = floor
+        self._counts[key] = count
+        self._push(count, key)
+        return count
+
+    def top(
+        self,
+        k: int,
+        *,
+        group: Optional[Callable[[K], Hashable]] = None,
+        min_count: float = 0.0,
+    ) -> Dict[Hashable, List[Tuple[K, float, float]]]:
+        """`(key, count, error)` of the *k* largest counters per `group(key)` (one group when None)."""
+        groups: Dict[Hashable, List[Tuple[K, float, float]]] = {}
+        for key, count in self._counts.items():
+            if count >= min_count:
+                groups.setdefault(group(key) if group else None, []).append((key, count, self._errors[key]))
+        return {g: heapq.nlargest(k, rows, key=lambda r: r[1]) for g, rows in groups.items()}
+
+    def decay(self, factor: float) -> None:
+        """Scale every counter by *factor* (0 < factor ≤ 1)."""
+        self._counts = {k: c * factor for k, c in self._counts.items()}
+        self._errors = {k: e * factor for k, e in self._errors.items()}
+        self._rebuild()
+
+    # ------------------------------------------------------------------ #
+    # Helpers                                                            #
+    # ------------------------------------------------------------------ #
+    def _push(self, count: float, key: K) -> None:
+        heapq.heappush(self._heap, (count, next(self._tie), key))
+        if len(self._heap) > 4 * self.capacity:
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        self._heap = [(c, next(self._tie), k) for k, c in self._counts.items()]
+        heapq.heapify(self._heap)
+
+    def _evict_min(self) -> float:
+        while True:
+            count, _, key = heapq.heappop(self._heap)
+            if self._counts.get(key) == count:  # skip entries superseded by a later push
+                del self._counts[key]
+                del self._errors[key]
+                return count
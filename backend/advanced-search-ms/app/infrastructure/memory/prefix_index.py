@@ -0,0 +1,258 @@
+# app/infrastructure/memory/prefix_index.py
+"""
+In-process prefix index for type-ahead suggestions.
+
+Why
+---
+Autocomplete fires on every keystroke. Running a `$regex` aggregation per
+key press makes it our highest-QPS database workload, so suggestions are
+served from memory instead and the database is only read to (re)build.
+
+How it works
+------------
+* Every product contributes sorted keys built from its normalised
+  `productName`, `brand` and `category`: the full value plus each word
+  suffix, so "onion" matches "Organic Brown Onion".
+* A lookup is a `bisect` into the sorted key array followed by a forward
+  scan over every key that still starts with the prefix, so the ranking
+  sees all matches.
+* Prefixes of up to `ranked_prefix_len` characters match most of the
+  catalog, so each of them also keeps its products in rank order; those
+  lookups walk that list and stop after *limit* available products.
+* Store awareness comes from per-store availability sets (products that
+  are `inStock` in that store according to `inventorySummary`).
+* Candidates are ranked by popularity; ties prefer shorter names.
+* `begin_reload()` / `finish_reload(docs)` build the index in bulk (keys
+  sorted once) while change events keep arriving: events seen during the
+  scan are queued and replayed on the fresh index.
+"""
+
+from __future__ import annotations
+
+import bisect
+import heapq
+import logging
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger("advanced-search-ms.infra.memory.prefix")
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+# Fields that feed the index, in the order they are reported back
+SUGGEST_FIELDS: Tuple[str, ...] = ("productName", "brand", "category")
+
+# (-popularity, len(productName), productName, id) – ascending = best first
+_Rank = Tuple[float, int, str, str]
+
+
+def normalize(text: Optional[str]) -> str:
+    """Lower-case, strip accents and collapse punctuation/whitespace."""
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text)
+    ascii_text = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _NON_ALNUM.sub(" ", ascii_text.lower()).strip()
+
+
+@dataclass(frozen=True)
+class SuggestEntry:
+    id: str
+    productName: str
+    brand: Optional[str]
+    category: Optional[str]
+    popularity: float
+    keys: Tuple[str, ...]
+
+    @property
+    def rank(self) -> _Rank:
+        return (-self.popularity, len(self.productName), self.productName, self.id)
+
+
+class PrefixIndex:
+    """Sorted-array prefix index with per-store availability sets."""
+
+    def __init__(self, *, popularity_field: str = "popularity", ranked_prefix_len: int = 2) -> None:
+        self.popularity_field = popularity_field
+        self.ranked_prefix_len = ranked_prefix_len
+
+        self._keys: List[Tuple[str, str]] = []          # (normalised key, product id) – sorted
+        self._ranked: Dict[str, List[_Rank]] = {}        # short prefix → ranks of matching products – sorted
+        self._entries: Dict[str, SuggestEntry] = {}
+        self._available: Dict[str, Set[str]] = {}        # storeObjectId → product ids in stock
+        self._stores_of: Dict[str, Set[str]] = {}        # product id → storeObjectIds in stock
+        self._pending: Optional[List[Tuple[str, Any]]] = None  # events queued during a reload
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ------------------------------------------------------------------ #
+    # Maintenance                                                        #
+    # ------------------------------------------------------------------ #
+    def upsert(self, doc: Dict[str, Any]) -> None:
+        """Insert or replace one product document."""
+        if self._pending is not None:
+            self._pending.append(("upsert", doc))
+        product_id = str(doc.get("_id"))
+        self._remove(product_id)
+
+        entry = self._entry(doc)
+        if entry is None:
+            return
+        self._entries[product_id] = entry
+        for key in entry.keys:
+            bisect.insort(self._keys, (key, product_id))
+        for prefix in self._short_prefixes(entry):
+            bisect.insort(self._ranked.setdefault(prefix, []), entry.rank)
+        self._set_stores(product_id, self._in_stock(doc))
+
+    def remove(self, product_id: Any) -> None:
+        """Drop a product (no-op when unknown)."""
+        if self._pending is not None:
+            self._pending.append(("remove", product_id))
+        self._remove(str(product_id))
+
+    def begin_reload(self) -> None:
+        """Start queuing events; call before the scan that feeds `finish_reload()`."""
+        self._pending = []
+
+    def cancel_reload(self) -> None:
+        """Abandon a reload whose scan failed; the live index stays in place."""
+        self._pending = None
+
+    def finish_reload(self, docs: Iterable[Dict[str, Any]]) -> None:
+        """Build the index from *docs* in one pass, then replay events queued since `begin_reload()`."""
+        pending, self._pending = self._pending or [], None
+
+        entries: Dict[str, SuggestEntry] = {}
+        stores_of: Dict[str, Set[str]] = {}
+        for doc in docs:
+            entry = self._entry(doc)
+            if entry is not None:
+                entries[entry.id] = entry
+                stores_of[entry.id] = self._in_stock(doc)
+
+        keys = [(key, entry.id) for entry in entries.values() for key in entry.keys]
+        keys.sort()
+        ranked: Dict[str, List[_Rank]] = {}
+        for entry in entries.values():
+            for prefix in self._short_prefixes(entry):
+                ranked.setdefault(prefix, []).append(entry.rank)
+        for ranks in ranked.values():
+            ranks.sort()
+        available: Dict[str, Set[str]] = {}
+        for product_id, stores in stores_of.items():
+            for store in stores:
+                available.setdefault(store, set()).add(product_id)
+
+        self._keys, self._ranked, self._entries = keys, ranked, entries
+        self._available, self._stores_of = available, stores_of
+        for op, arg in pending:
+            if op == "upsert":
+                self.upsert(arg)
+            else:
+                self.remove(arg)
+        logger.info("[INFRA/memory/prefix] 🔁 Built | products=%d keys=%d replayed=%d",
+                    len(self._entries), len(self._keys), len(pending))
+
+    # ------------------------------------------------------------------ #
+    # Lookup                                                             #
+    # ------------------------------------------------------------------ #
+    def suggest(self, prefix: str, store_object_id: str, limit: int) -> List[Dict[str, Any]]:
+        """Return up to *limit* products available in the store whose keys start with *prefix*."""
+        norm = normalize(prefix)
+        if not norm or limit <= 0:
+            return []
+
+        available = self._available.get(str(store_object_id))
+        if not available:
+            return []
+
+        if len(norm) <= self.ranked_prefix_len:
+            best: List[SuggestEntry] = []
+            for rank in self._ranked.get(norm, ()):
+                if rank[3] in available:
+                    best.append(self._entries[rank[3]])
+                    if len(best) == limit:
+                        break
+        else:
+            matched: Set[str] = set()
+            pos = bisect.bisect_left(self._keys, (norm, ""))
+            while pos < len(self._keys):
+                key, product_id = self._keys[pos]
+                if not key.startswith(norm):
+                    break
+                if product_id in available:
+                    matched.add(product_id)
+                pos += 1
+            best = heapq.nsmallest(limit, (self._entries[pid] for pid in matched), key=lambda e: e.rank)
+
+        return [
+            {
+                "id": e.id,
+                "productName": e.productName,
+                "brand": e.brand,
+                "category": e.category,
+                "popularity": e.popularity,
+            }
+            for e in best
+        ]
+
+    # ------------------------------------------------------------------ #
+    # Helpers                                                            #
+    # ------------------------------------------------------------------ #
+    def _remove(self, product_id: str) -> None:
+        entry = self._entries.pop(product_id, None)
+        if entry is None:
+            return
+        for key in entry.keys:
+            pos = bisect.bisect_left(self._keys, (key, product_id))
+            if pos < len(self._keys) and self._keys[pos] == (key, product_id):
+                del self._keys[pos]
+        rank = entry.rank
+        for prefix in self._short_prefixes(entry):
+            ranks = self._ranked.get(prefix, [])
+            pos = bisect.bisect_left(ranks, rank)
+            if pos < len(ranks) and ranks[pos] == rank:
+                del ranks[pos]
+            if not ranks:
+                self._ranked.pop(prefix, None)
+        self._set_stores(product_id, set())
+
+    def _set_stores(self, product_id: str, stores: Set[str]) -> None:
+        for store in self._stores_of.pop(product_id, set()):
+            self._available.get(store, set()).discard(product_id)
+        if stores:
+            self._stores_of[product_id] = stores
+        for store in stores:
+            self._available.setdefault(store, set()).add(product_id)
+
+    def _short_prefixes(self, entry: SuggestEntry) -> Set[str]:
+        return {key[:n] for key in entry.keys for n in range(1, self.ranked_prefix_len + 1)}
+
+    def _entry(self, doc: Dict[str, Any]) -> Optional[SuggestEntry]:
+        name = doc.get("productName")
+        if not name:
+            return None
+        keys: Set[str] = set()
+        for field in SUGGEST_FIELDS:
+            words = normalize(doc.get(field)).split()
+            keys.update(" ".join(words[i:]) for i in range(len(words)))
+        return SuggestEntry(
+            id=str(doc.get("_id")),
+            productName=name,
+            brand=doc.get("brand"),
+            category=doc.get("category"),
+            popularity=float(doc.get(self.popularity_field) or 0.0),
+            keys=tuple(sorted(keys)),
+        )
+
+    @staticmethod
+    def _in_stock(doc: Dict[str, Any]) -> Set[str]:
+        return {
+            str(item.get("storeObjectId"))
+            for item in doc.get("inventorySummary") or []
+            if item.get("inStock")
+        }
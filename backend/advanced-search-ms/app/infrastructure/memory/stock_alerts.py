@@ -0,0 +1,213 @@
+# app/infrastructure/memory/stock_alerts.py
+"""
+Per-store stock alerts fanned out from the shared inventory change stream.
+
+Why
+---
+The UI learned about `inStock` / `nearToReplenishmentInShelf` changes by
+re-querying, so N open screens meant N pollers hitting MongoDB. One change
+stream now feeds every connected client through this hub.
+
+How it works
+------------
+* `on_change()` is subscribed to the `inventory` `ChangeStreamWatcher`. It
+  compares each store row of the new document with the flags last seen for
+  that document and emits an alert per transition:
+  `stock-out` / `back-in-stock` (inStock) and
+  `replenishment-needed` / `replenished` (nearToReplenishmentInShelf).
+* Previous flags are seeded from one scan at startup (`seed()`); documents
+  already seen through the stream keep their newer state.
+* Every alert gets an id `<epoch>-<seq>`; the last `replay_size` alerts of
+  each store are kept so a reconnecting client (`Last-Event-ID`) receives
+  what it missed. Sequence numbers are shared by all stores, so the hub
+  remembers the highest one each store's buffer has dropped; an id from
+  another process epoch, or one below that mark, yields a `reset` marker
+  (followed by the whole buffer) – the client must refetch its state.
+* Each subscriber has a bounded queue. A client that falls `client_buffer`
+  alerts behind is closed (`overflowed`); its reconnect resumes from the
+  replay buffer, so a slow consumer never holds memory or blocks others.
+
+Single event loop only – no locking.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.shared.metrics import metrics
+
+logger = logging.getLogger("advanced-search-ms.infra.memory.stock-alerts")
+
+_Flags = Tuple[Optional[bool], Optional[bool]]  # (inStock, nearToReplenishmentInShelf)
+_Row = Tuple[_Flags, Optional[str]]  # (flags, storeId)
+
+TRANSITIONS = {
+    ("inStock", False): "stock-out",
+    ("inStock", True): "back-in-stock",
+    ("nearToReplenishmentInShelf", True): "replenishment-needed",
+    ("nearToReplenishmentInShelf", False): "replenished",
+}
+
+
+@dataclass(frozen=True)
+class StockAlert:
+    id: str
+    event: str
+    store: str
+    data: Dict[str, Any]
+
+
+@dataclass(eq=False)
+class AlertSubscription:
+    store: str
+    queue: "asyncio.Queue[StockAlert]"
+    replay: List[StockAlert] = field(default_factory=list)
+    reset_id: Optional[str] = None  # set when the resume point is gone: id for the `reset` event
+    overflowed: bool = False
+
+
+class StockAlertHub:
+    """Detects stock-flag transitions and fans them out per store."""
+
+    def __init__(self, *, client_buffer: int = 100, replay_size: int = 500, max_clients: int = 1_000) -> None:
+        self.client_buffer = client_buffer
+        self.replay_size = replay_size
+        self.max_clients = max_clients
+        self.epoch = format(int(time.time()), "x")  # ids from an earlier process are unknown here
+        self._seq = itertools.count(1)
+        self._flags: Dict[str, Dict[str, _Row]] = {}  # inventory _id → {storeObjectId → flags}
+        self._recent: Dict[str, Deque[StockAlert]] = {}
+        self._evicted: Dict[str, int] = {}  # store → highest seq dropped from its replay buffer
+        self._subscribers: Dict[str, Set[AlertSubscription]] = {}
+
+    @property
+    def client_count(self) -> int:
+        return sum(len(s) for s in self._subscribers.values())
+
+    # ------------------------------------------------------------------ #
+    # Inventory side                                                     #
+    # ------------------------------------------------------------------ #
+    def seed(self, docs: Iterable[Dict[str, Any]]) -> None:
+        """Initial flags from a scan; documents already seen via the stream are kept."""
+        for doc in docs:
+            self._flags.setdefault(str(doc.get("_id")), self._rows(doc))
+        logger.info("[INFRA/memory/stock-alerts] 🌱 Seeded %d inventory document(s)", len(self._flags))
+
+    async def on_change(self, change: Dict[str, Any]) -> None:
+        """`ChangeStreamWatcher` subscriber for the `inventory` collection."""
+        op = change.get("operationType")
+        doc_id = str((change.get("documentKey") or {}).get("_id"))
+        doc = change.get("fullDocument")
+        if op == "delete" or (op in ("update", "replace") and doc is None):
+            self._flags.pop(doc_id, None)
+            return
+        if op not in ("insert", "update", "replace"):
+            return
+
+        new = self._rows(doc)
+        old = self._flags.get(doc_id)
+        self._flags[doc_id] = new
+        if old is None:
+            return  # first sighting – nothing to compare with
+        at = datetime.now(timezone.utc).isoformat()
+        for store, (flags, store_id) in new.items():
+            before = old.get(store)
+            if before is None:
+                continue
+            for idx, name in enumerate(("inStock", "nearToReplenishmentInShelf")):
+                value = flags[idx]
+                if value is None or before[0][idx] is None or value == before[0][idx]:
+                    continue
+                self._publish(store, TRANSITIONS[(name, value)], {
+                    "productId": str(doc.get("productId")),
+                    "storeObjectId": store,
+                    "storeId": store_id,
+                    "inStock": flags[0],
+                    "nearToReplenishmentInShelf": flags[1],
+                    "at": at,
+                })
+
+    # ------------------------------------------------------------------ #
+    # Client side                                                        #
+    # ------------------------------------------------------------------ #
+    def subscribe(self, store: str, last_event_id: Optional[str] = None) -> Optional[AlertSubscription]:
+        """New subscription (None when `max_clients` is reached)."""
+        if self.client_count >= self.max_clients:
+            metrics.inc("stock_alerts.rejected")
+            return None
+        sub = AlertSubscription(store=store, queue=asyncio.Queue(maxsize=self.client_buffer))
+        if last_event_id:
+            sub.replay, reset = self._since(store, last_event_id)
+            if reset:
+                # `replay` is then the whole buffer, i.e. everything after `<epoch>-0`
+                sub.reset_id = f"{self.epoch}-0"
+                metrics.inc("stock_alerts.resets")
+        self._subscribers.setdefault(store, set()).add(sub)
+        metrics.set_gauge("stock_alerts.clients", self.client_count)
+        return sub
+
+    def unsubscribe(self, sub: AlertSubscription) -> None:
+        subs = self._subscribers.get(sub.store)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self._subscribers[sub.store]
+        metrics.set_gauge("stock_alerts.clients", self.client_count)
+
+    # ------------------------------------------------------------------ #
+    # Helpers                                                            #
+    # ------------------------------------------------------------------ #
+    def _publish(self, store: str, event: str, data: Dict[str, Any]) -> None:
+        seq = next(self._seq)
+        alert = StockAlert(id=f"{self.epoch}-{seq}", event=event, store=store, data=data)
+        recent = self._recent.get(store)
+        if recent is None:
+            recent = self._recent[store] = deque(maxlen=self.replay_size)
+        if len(recent) == recent.maxlen:  # the append drops the oldest alert (or this one when maxlen is 0)
+            self._evicted[store] = self._seq_of(recent[0]) if recent else seq
+        recent.append(alert)
+        metrics.inc("stock_alerts.published", event=event)
+
+        for sub in list(self._subscribers.get(store, ())):
+            if sub.overflowed:
+                continue
+            try:
+                sub.queue.put_nowait(alert)
+            except asyncio.QueueFull:
+                sub.overflowed = True  # the stream closes; the reconnect replays from `_recent`
+                metrics.inc("stock_alerts.overflowed_clients")
+
+    def _since(self, store: str, last_event_id: str) -> Tuple[List[StockAlert], bool]:
+        epoch, _, seq = last_event_id.partition("-")
+        recent = list(self._recent.get(store, ()))
+        if epoch != self.epoch or not seq.isdigit():
+            return recent, True
+        last = int(seq)
+        missed = [a for a in recent if self._seq_of(a) > last]
+        # a gap exists only when this store's buffer dropped an alert newer than `last`
+        return missed, self._evicted.get(store, 0) > last
+
+    @staticmethod
+    def _seq_of(alert: StockAlert) -> int:
+        return int(alert.id.partition("-")[2])
+
+    @staticmethod
+    def _rows(doc: Dict[str, Any]) -> Dict[str, _Row]:
+        rows: Dict[str, _Row] = {}
+        for item in doc.get("storeInventory") or []:
+            store = item.get("storeObjectId")
+            if store is None:
+                continue
+            in_stock, near = item.get("inStock"), item.get("nearToReplenishmentInShelf")
+            rows[str(store)] = (
+                (in_stock if isinstance(in_stock, bool) else None, near if isinstance(near, bool) else None),
+                item.get("storeId"),
+            )
+        return rows
@@ -0,0 +1,218 @@
+# app/infrastructure/memory/store_index.py
+"""
+In-process spatial index for nearest-store lookups.
+
+Why
+---
+The product page asks "which other stores are near the selected one?" on
+every load, and used to answer it with an unbounded `$geoNear` over the
+whole `stores` collection. Store locations change rarely, so the stores are
+indexed in memory and the database is only read to (re)build.
+
+How it works
+------------
+* Each store's `[lng, lat]` is mapped to a point on the unit sphere (3-D).
+  Straight-line (chord) distance between such points grows monotonically
+  with great-circle distance, so an ordinary KD-tree over 3-D points gives
+  exact spherical nearest neighbours – no special cases at the poles or
+  the antimeridian.
+* The tree is an implicit, balanced array built by median splits; a query
+  is a depth-first descent with a bounded max-heap (k-nearest) and
+  pruning by the splitting plane (radius).
+* Results carry the haversine distance in km, like `$geoNear` with
+  `spherical: true`.
+* Store changes rebuild the (small) tree and swap it in atomically.
+* `begin_reload()` / `finish_reload(docs)` load the full store list while
+  change events keep arriving: events seen during the scan are queued and
+  replayed on the loaded stores.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("advanced-search-ms.infra.memory.stores")
+
+EARTH_RADIUS_KM = 6371.0088
+
+_Point = Tuple[float, float, float]
+
+
+@dataclass(frozen=True)
+class StoreEntry:
+    id: str
+    storeId: Optional[str]
+    storeName: Optional[str]
+    lng: float
+    lat: float
+
+
+def _to_unit(lng: float, lat: float) -> _Point:
+    lng_r, lat_r = math.radians(lng), math.radians(lat)
+    cos_lat = math.cos(lat_r)
+    return (cos_lat * math.cos(lng_r), cos_lat * math.sin(lng_r), math.sin(lat_r))
+
+
+def _chord_to_km(chord: float) -> float:
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+def _km_to_chord(km: float) -> float:
+    return 2 * math.sin(min(math.pi / 2, km / (2 * EARTH_RADIUS_KM)))
+
+
+class _KDTree:
+    """Immutable 3-D KD-tree stored as (point, entry) pairs in median order."""
+
+    def __init__(self, items: List[Tuple[_Point, StoreEntry]]) -> None:
+        self._nodes: List[Tuple[_Point, StoreEntry]] = []
+        self._left: List[int] = []
+        self._right: List[int] = []
+        self._axis: List[int] = []
+        self.root = self._build(list(items), 0)
+
+    def _build(self, items: List[Tuple[_Point, StoreEntry]], depth: int) -> int:
+        if not items:
+            return -1
+        axis = depth % 3
+        items.sort(key=lambda item: item[0][axis])
+        mid = len(items) // 2
+        idx = len(self._nodes)
+        self._nodes.append(items[mid])
+        self._axis.append(axis)
+        self._left.append(-1)
+        self._right.append(-1)
+        self._left[idx] = self._build(items[:mid], depth + 1)
+        self._right[idx] = self._build(items[mid + 1:], depth + 1)
+        return idx
+
+    def query(self, target: _Point, k: int, max_chord: float) -> List[Tuple[float, StoreEntry]]:
+        heap: List[Tuple[float, int]] = []  # (-dist², node) – worst candidate on top
+        bound = max_chord * max_chord
+        stack = [self.root] if self.root >= 0 else []
+        tx, ty, tz = target
+
+        while stack:
+            node = stack.pop()
+            point = self._nodes[node][0]
+            d2 = (point[0] - tx) ** 2 + (point[1] - ty) ** 2 + (point[2] - tz) ** 2
+            if d2 <= bound:
+                heapq.heappush(heap, (-d2, node))
+                if len(heap) > k:
+                    heapq.heappop(heap)
+                if len(heap) == k:
+                    bound = min(bound, -heap[0][0])
+
+            axis = self._axis[node]
+            diff = target[axis] - point[axis]
+            near, far = (self._left[node], self._right[node]) if diff < 0 else (self._right[node], self._left[node])
+            if far >= 0 and diff * diff <= bound:
+                stack.append(far)
+            if near >= 0:
+                stack.append(near)  # popped first
+
+        hits = [(math.sqrt(-neg), self._nodes[node][1]) for neg, node in heap]
+        return sorted(hits, key=lambda hit: (hit[0], hit[1].id))  # ties (co-located stores) by id
+
+
+class StoreIndex:
+    """KD-tree of store locations with k-nearest and radius queries."""
+
+    def __init__(self) -> None:
+        self._stores: Dict[str, StoreEntry] = {}
+        self._tree = _KDTree([])
+        self._pending: Optional[List[Tuple[str, Any]]] = None  # events queued during a reload
+
+    def __len__(self) -> int:
+        return len(self._stores)
+
+    # ------------------------------------------------------------------ #
+    # Maintenance                                                        #
+    # ------------------------------------------------------------------ #
+    def begin_reload(self) -> None:
+        """Start queuing events; call before the scan that feeds `finish_reload()`."""
+        self._pending = []
+
+    def cancel_reload(self) -> None:
+        """Abandon a reload whose scan failed; the live index stays in place."""
+        self._pending = None
+
+    def finish_reload(self, docs: Iterable[Dict[str, Any]]) -> None:
+        """Replace the whole index with *docs*, then replay events queued since `begin_reload()`."""
+        pending, self._pending = self._pending or [], None
+        stores: Dict[str, StoreEntry] = {}
+        for doc in docs:
+            entry = self._entry(doc)
+            if entry is not None:
+                stores[entry.id] = entry
+        for op, arg in pending:
+            entry = self._entry(arg) if op == "upsert" else None
+            if entry is not None:
+                stores[entry.id] = entry
+            else:
+                stores.pop(str(arg.get("_id") if op == "upsert" else arg), None)
+        self._stores = stores
+        self._rebuild()
+
+    def upsert(self, doc: Dict[str, Any]) -> None:
+        if self._pending is not None:
+            self._pending.append(("upsert", doc))
+        entry = self._entry(doc)
+        if entry is None:
+            self._remove(doc.get("_id"))
+            return
+        self._stores[entry.id] = entry
+        self._rebuild()
+
+    def remove(self, store_id: Any) -> None:
+        if self._pending is not None:
+            self._pending.append(("remove", store_id))
+        self._remove(store_id)
+
+    # ------------------------------------------------------------------ #
+    # Queries                                                            #
+    # ------------------------------------------------------------------ #
+    def get(self, store_id: str) -> Optional[StoreEntry]:
+        return self._stores.get(store_id)
+
+    def nearest(
+        self,
+        lng: float,
+        lat: float,
+        *,
+        k: int,
+        radius_km: Optional[float] = None,
+    ) -> List[Tuple[float, StoreEntry]]:
+        """Up to *k* stores ordered by distance, optionally within *radius_km*."""
+        max_chord = _km_to_chord(radius_km) if radius_km is not None else 2.0
+        hits = self._tree.query(_to_unit(lng, lat), k, max_chord)
+        return [(_chord_to_km(chord), entry) for chord, entry in hits]
+
+    # ------------------------------------------------------------------ #
+    # Helpers                                                            #
+    # ------------------------------------------------------------------ #
+    def _remove(self, store_id: Any) -> None:
+        if self._stores.pop(str(store_id), None) is not None:
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        tree = _KDTree([(_to_unit(e.lng, e.lat), e) for e in self._stores.values()])
+        self._tree = tree  # single assignment – readers never see a half-built tree
+        logger.debug("[INFRA/memory/stores] 🌍 KD-tree rebuilt (%d stores)", len(self._stores))
+
+    @staticmethod
+    def _entry(doc: Dict[str, Any]) -> Optional[StoreEntry]:
+        coords = (doc.get("location") or {}).get("coordinates")
+        if not coords or len(coords) < 2:
+            return None
+        return StoreEntry(
+            id=str(doc.get("_id")),
+            storeId=doc.get("storeId"),
+            storeName=doc.get("storeName"),
+            lng=float(coords[0]),
+            lat=float(coords[1]),
+        )
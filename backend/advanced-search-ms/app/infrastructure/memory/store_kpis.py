@@ -0,0 +1,235 @@
+# app/infrastructure/memory/store_kpis.py
+"""
+In-process per-store inventory KPIs, maintained incrementally.
+
+Why
+---
+Dashboards ask "how many products are out of stock / near replenishment /
+about to deplete in store X?". Answering that by scanning every
+`inventory.storeInventory` row on each request is O(products × stores);
+keeping the counters current costs O(stores of one product) per change.
+
+How it works
+------------
+* For every inventory document the view remembers its contribution per
+  store: `(inStock, nearToReplenishmentInShelf, predictedStockDepletion)`.
+* `upsert(doc)` / `remove(_id)` (fed by the inventory change stream via
+  `document_handler`) subtract the old contribution and add the new one,
+  touching only the stores the document mentions. Changed stores are
+  marked dirty for the next flush to `store_kpis`.
+* Depletion is kept as a per-store histogram by ISO date, so "depleting
+  within N days" is a sum at read time and stays correct as days pass
+  without any event.
+* Every change bumps a sequence number; `changed_since(mark)` names the
+  stores changed after `mark()`, so reconciliation can leave out stores
+  whose counters moved while it was reading `inventory`.
+* `begin_reload()` / `finish_reload(docs)` rebuild from a full scan while
+  events keep arriving: events seen during the scan are queued and
+  replayed on the fresh state (upserts carry full documents, so the
+  replay is idempotent).
+
+Single event loop only – no locking.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger("advanced-search-ms.infra.memory.store-kpis")
+
+# (inStock, nearToReplenishmentInShelf, depletion ISO date, storeId)
+_Row = Tuple[bool, bool, Optional[str], Optional[str]]
+
+
+def depletion_key(value: Any) -> Optional[str]:
+    """`predictedStockDepletion` (ISO string or datetime) → `YYYY-MM-DD`."""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, str) and len(value) >= 10:
+        return value[:10]
+    return None
+
+
+def today_utc() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+@dataclass
+class _Totals:
+    store_id: Optional[str] = None
+    products: int = 0
+    in_stock: int = 0
+    near_replenishment: int = 0
+    depletion: Counter = field(default_factory=Counter)  # ISO date → products
+
+    def apply(self, row: _Row, sign: int) -> None:
+        in_stock, near, depletes, store_id = row
+        self.products += sign
+        self.in_stock += sign * in_stock
+        self.near_replenishment += sign * near
+        if depletes is not None:
+            self.depletion[depletes] += sign
+            if self.depletion[depletes] <= 0:
+                del self.depletion[depletes]
+        if sign > 0 and store_id:
+            self.store_id = store_id
+
+
+class StoreKpiView:
+    """Per-store counters kept current from full inventory documents."""
+
+    def __init__(self) -> None:
+        self._docs: Dict[str, Dict[str, _Row]] = {}  # inventory _id → {storeObjectId → row}
+        self._stores: Dict[str, _Totals] = {}
+        self._dirty: Set[str] = set()
+        self._pending: Optional[List[Tuple[str, Any]]] = None  # events queued during a reload
+        self._seq = 0
+        self._changed: Dict[str, int] = {}  # storeObjectId → seq of its last change
+        self.updated_at: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._stores)
+
+    # ------------------------------------------------------------------ #
+    # Maintenance                                                        #
+    # ------------------------------------------------------------------ #
+    def upsert(self, doc: Dict[str, Any]) -> None:
+        if self._pending is not None:
+            self._pending.append(("upsert", doc))
+        self._apply(str(doc.get("_id")), self._rows(doc))
+
+    def remove(self, doc_id: Any) -> None:
+        if self._pending is not None:
+            self._pending.append(("remove", doc_id))
+        self._apply(str(doc_id), {})
+
+    def begin_reload(self) -> None:
+        """Start queuing events; call before the scan that feeds `finish_reload()`."""
+        self._pending = []
+
+    def cancel_reload(self) -> None:
+        """Abandon a reload whose scan failed; the live state stays in place."""
+        self._pending = None
+
+    def finish_reload(self, docs: Iterable[Dict[str, Any]]) -> None:
+        """Swap in state built from *docs*, then replay events queued since `begin_reload()`."""
+        pending, self._pending = self._pending or [], None
+        live_docs, live_stores = self._docs, self._stores
+        self._docs, self._stores = {}, {}
+        try:
+            for doc in docs:
+                self._apply(str(doc.get("_id")), self._rows(doc))
+            for op, arg in pending:
+                if op == "upsert":
+                    self._apply(str(arg.get("_id")), self._rows(arg))
+                else:
+                    self._apply(str(arg), {})
+        except Exception:
+            self._docs, self._stores = live_docs, live_stores
+            raise
+        self._dirty = set(self._stores) | set(live_stores)  # rewrite everything, incl. vanished stores
+        logger.info("[INFRA/memory/store-kpis] 🔁 Rebuilt | docs=%d stores=%d replayed=%d",
+                    len(self._docs), len(self._stores), len(pending))
+
+    def drain_dirty(self) -> List[str]:
+        dirty, self._dirty = sorted(self._dirty), set()
+        return dirty
+
+    def mark_dirty(self, store_ids: Iterable[str]) -> None:
+        self._dirty.update(store_ids)
+
+    def mark(self) -> int:
+        """Position to pass to `changed_since()` later."""
+        return self._seq
+
+    def changed_since(self, mark: int) -> Set[str]:
+        return {store for store, seq in self._changed.items() if seq > mark}
+
+    # ------------------------------------------------------------------ #
+    # Queries                                                            #
+    # ------------------------------------------------------------------ #
+    def stores(self) -> List[str]:
+        return list(self._stores)
+
+    def get(
+        self,
+        store_object_id: str,
+        *,
+        depletion_horizons: Iterable[int] = (),
+        today: Optional[date] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """KPI document for one store (None if no inventory mentions it)."""
+        totals = self._stores.get(store_object_id)
+        if totals is None:
+            return None
+        today = today or today_utc()
+        return {
+            "storeObjectId": store_object_id,
+            "storeId": totals.store_id,
+            "productCount": totals.products,
+            "inStockCount": totals.in_stock,
+            "outOfStockCount": totals.products - totals.in_stock,
+            "nearReplenishmentCount": totals.near_replenishment,
+            "depletingWithin": {
+                str(days): self.depleting_within(totals, days, today) for days in depletion_horizons
+            },
+            "depletionByDate": dict(sorted(totals.depletion.items())),
+        }
+
+    @staticmethod
+    def depleting_within(totals: _Totals, days: int, today: date) -> int:
+        """Products whose predicted depletion is on or before today + *days* (overdue included)."""
+        cutoff = (today + timedelta(days=days)).isoformat()
+        return sum(n for d, n in totals.depletion.items() if d <= cutoff)
+
+    # ------------------------------------------------------------------ #
+    # Helpers                                                            #
+    # ------------------------------------------------------------------ #
+    def _apply(self, doc_id: str, rows: Dict[str, _Row]) -> None:
+        self._seq += 1
+        old = self._docs.pop(doc_id, {})
+        if rows:
+            self._docs[doc_id] = rows
+        for store, row in old.items():
+            if rows.get(store) != row:
+                self._totals(store).apply(row, -1)
+                self._touch(store)
+        for store, row in rows.items():
+            if old.get(store) != row:
+                self._totals(store).apply(row, +1)
+                self._touch(store)
+        for store in set(old) - set(rows):
+            if self._stores.get(store) is not None and self._stores[store].products <= 0:
+                del self._stores[store]
+        self.updated_at = datetime.now(timezone.utc)
+
+    def _touch(self, store: str) -> None:
+        self._dirty.add(store)
+        self._changed[store] = self._seq
+
+    def _totals(self, store: str) -> _Totals:
+        totals = self._stores.get(store)
+        if totals is None:
+            totals = self._stores[store] = _Totals()
+        return totals
+
+    @staticmethod
+    def _rows(doc: Dict[str, Any]) -> Dict[str, _Row]:
+        rows: Dict[str, _Row] = {}
+        for item in doc.get("storeInventory") or []:
+            store = item.get("storeObjectId")
+            if store is None:
+                continue
+            rows[str(store)] = (
+                item.get("inStock") is True,
+                item.get("nearToReplenishmentInShelf") is True,
+                depletion_key(item.get("predictedStockDepletion")),
+                item.get("storeId"),
+            )
+        return rows
@@ -0,0 +1,524 @@
+# app/infrastructure/memory/text_index.py
+"""
+In-process BM25 text engine for search options 1 (keyword) and 2 (text).
+
+Why
+---
+Every text query needed a live Atlas cluster, including benchmarks, local
+runs and edge deployments that only need keyword / text search. This
+index answers both options from memory with the same `(docs, total)`
+contract as `MongoSearchRepository` (`TEXT_SEARCH_BACKEND=memory`).
+
+How it works
+------------
+* Inverted index over `productName`, `brand`, `category` and `subCategory`.
+  Postings are `array('I')` ordinals sorted ascending, with a parallel
+  `array('H')` of term frequencies, so a term costs a few bytes per product.
+* Option 2 mirrors `text_compound()`: per-field BM25 (Lucene k1=1.2,
+  b=0.75) multiplied by the field boost (0.8 / 0.1 / 0.06 / 0.04) and
+  summed. `productName` terms are fuzzy with `maxEdits=2`: vocabulary
+  terms within 2 edits (50 expansions at most) count with Lucene's fuzzy
+  boost `1 - edits / min(len)`. The vocabulary is bucketed by length and
+  character set, so most buckets are rejected without an edit distance.
+* Option 1 mirrors the keyword pipeline: case-insensitive `productName`
+  prefix, unranked. It is a `bisect` into a sorted name array and results
+  come back in ordinal order.
+* Store, stock, category and price filters are checked per candidate
+  (per-store ordinal sets, the same `SearchFilters` as `filters.py`).
+* `finish_reload()` builds the index in one pass: ordinals are handed out
+  in scan order, so postings are appended already sorted and the name
+  array is sorted once. Changes that arrive during the scan are queued
+  after `begin_reload()` and replayed on top (see `load_view()`).
+* `upsert()` / `remove()` (fed by the products change stream) update the
+  postings in place: the old terms of a document are removed and the
+  new ones inserted. An upsert whose indexed text is unchanged (e.g. an
+  `inventorySummary` sync) only refreshes the stored document and the
+  store sets. Ordinals of deleted products are reused.
+* Tokens are `\\w+` runs, lower-cased, like the `lucene.standard` analyzer.
+  Scores are therefore close to Atlas but not identical, e.g. when the
+  Atlas index uses another analyzer.
+* In explain mode the `QueryProfile` gets one `memory` step per query
+  (elapsed time, total hits, indexed documents); there is no pipeline.
+"""
+
+from __future__ import annotations
+
+import bisect
+import heapq
+import logging
+import math
+import re
+import time
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from bson import ObjectId
+
+from app.application.ports import SearchRepository
+from app.domain.inventory import IN_STOCK_STORES_FIELD
+from app.domain.search_filters import SearchFilters
+from app.infrastructure.mongodb.utils import PRODUCT_FIELDS, filter_inventory_summary, projection_for
+from app.shared.deadline import Deadline
+from app.shared.exceptions import DeadlineExceededError
+from app.shared.query_profile import QueryProfile
+
+logger = logging.getLogger("advanced-search-ms.infra.memory.text")
+
+_TOKEN = re.compile(r"\w+")
+
+# (field, boost, fuzzy) – same clauses as pipelines/text_pipeline.text_compound()
+TEXT_FIELDS: Tuple[Tuple[str, float, bool], ...] = (
+    ("productName", 0.8, True),
+    ("brand", 0.1, False),
+    ("category", 0.06, False),
+    ("subCategory", 0.04, False),
+)
+K1 = 1.2
+B = 0.75
+MAX_EDITS = 2
+MAX_EXPANSIONS = 50
+
+
+def tokenize(text: Any) -> List[str]:
+    return _TOKEN.findall(text.lower()) if isinstance(text, str) else []
+
+
+def char_mask(term: str) -> int:
+    """Set of characters as bits; one edit flips at most two, so `popcount(a ^ b) > 2k` rules a pair out."""
+    mask = 0
+    for ch in term:
+        if "a" <= ch <= "z":
+            mask |= 1 << (ord(ch) - 87)  # bits 10–35
+        elif "0" <= ch <= "9":
+            mask |= 1 << (ord(ch) - 48)  # bits 0–9
+        else:
+            mask |= 1 << (36 + ord(ch) % 27)
+    return mask
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, or `limit + 1` as soon as it must exceed *limit*."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class _Postings:
+    __slots__ = ("docs", "tfs")
+
+    def __init__(self) -> None:
+        self.docs = array("I")  # ordinals, ascending
+        self.tfs = array("H")
+
+    def add(self, ordinal: int, tf: int) -> None:
+        i = bisect.bisect_left(self.docs, ordinal)
+        self.docs.insert(i, ordinal)
+        self.tfs.insert(i, min(tf, 0xFFFF))
+
+    def append(self, ordinal: int, tf: int) -> None:
+        """Bulk-build path: *ordinal* must be greater than every ordinal already present."""
+        self.docs.append(ordinal)
+        self.tfs.append(min(tf, 0xFFFF))
+
+    def discard(self, ordinal: int) -> None:
+        i = bisect.bisect_left(self.docs, ordinal)
+        if i < len(self.docs) and self.docs[i] == ordinal:
+            del self.docs[i]
+            del self.tfs[i]
+
+
+class _Field:
+    """Postings and length statistics of one indexed field."""
+
+    def __init__(self) -> None:
+        self.postings: Dict[str, _Postings] = {}
+        self.lengths = array("H")  # ordinal → token count
+        self.total_length = 0
+        self.doc_count = 0  # documents with at least one token
+
+    def avg_length(self) -> float:
+        return self.total_length / self.doc_count if self.doc_count else 1.0
+
+    def idf(self, term: str) -> float:
+        postings = self.postings.get(term)
+        df = len(postings.docs) if postings else 0
+        return math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+
+
+class BM25TextIndex:
+    """Array-backed inverted index with BM25 scoring and per-store filtering."""
+
+    def __init__(self) -> None:
+        self._fields: Dict[str, _Field] = {name: _Field() for name, _, _ in TEXT_FIELDS}
+        self._docs: List[Optional[Dict[str, Any]]] = []  # ordinal → projected product
+        self._ordinal: Dict[str, int] = {}                # product id → ordinal
+        self._free: List[int] = []
+        self._names: List[Tuple[str, int]] = []           # (lower-cased productName, ordinal) – sorted
+        self._stores: Dict[str, Set[int]] = {}            # storeObjectId → ordinals carried
+        self._in_stock: Dict[str, Set[int]] = {}          # storeObjectId → ordinals in stock
+        self._vocabulary: Dict[int, Dict[int, Set[str]]] = {}  # productName terms by length → char_mask
+        self._fuzzy_cache: Dict[str, List[Tuple[str, float]]] = {}
+        self._pending: Optional[List[Tuple[str, Any]]] = None  # events queued during a reload
+
+    def __len__(self) -> int:
+        return len(self._ordinal)
+
+    # ------------------------------------------------------------------ #
+    # Maintenance                                                        #
+    # ------------------------------------------------------------------ #
+    def upsert(self, doc: Dict[str, Any]) -> None:
+        """Insert or replace one product document."""
+        if self._pending is not None:
+            self._pending.append(("upsert", doc))
+        product_id = str(doc.get("_id"))
+        ordinal = self._ordinal.get(product_id)
+        if ordinal is not None:
+            stored = self._docs[ordinal]
+            if stored is not None and all(stored.get(name) == doc.get(name) for name in self._fields):
+                self._drop_stores(ordinal)
+                self._store(ordinal, doc)
+                return
+            self._unindex(ordinal)
+        elif self._free:
+            ordinal = self._free.pop()
+        else:
+            ordinal = len(self._docs)
+            self._docs.append(None)
+            for field in self._fields.values():
+                field.lengths.append(0)
+        self._ordinal[product_id] = ordinal
+        self._index(ordinal, doc)
+
+    def remove(self, product_id: Any) -> None:
+        if self._pending is not None:
+            self._pending.append(("remove", product_id))
+        ordinal = self._ordinal.pop(str(product_id), None)
+        if ordinal is not None:
+            self._unindex(ordinal)
+            self._free.append(ordinal)
+
+    def begin_reload(self) -> None:
+        """Start queuing events; call before the scan that feeds `finish_reload()`."""
+        self._pending = []
+
+    def cancel_reload(self) -> None:
+        """Abandon a reload whose scan failed; the live index stays in place."""
+        self._pending = None
+
+    def finish_reload(self, docs: Iterable[Dict[str, Any]]) -> None:
+        """Build the index from *docs* in one pass, then replay events queued since `begin_reload()`."""
+        pending, self._pending = self._pending or [], None
+
+        fresh = BM25TextIndex()
+        for doc in docs:
+            product_id = str(doc.get("_id"))
+            if product_id in fresh._ordinal:
+                fresh.upsert(doc)  # duplicate in the scan: regular in-place replace
+                continue
+            ordinal = len(fresh._docs)
+            fresh._ordinal[product_id] = ordinal
+            fresh._docs.append(None)
+            for field in fresh._fields.values():
+                field.lengths.append(0)
+            fresh._index(ordinal, doc, bulk=True)
+        fresh._names.sort()
+
+        self._fields, self._docs, self._ordinal, self._free = fresh._fields, fresh._docs, fresh._ordinal, fresh._free
+        self._names, self._stores, self._in_stock = fresh._names, fresh._stores, fresh._in_stock
+        self._vocabulary, self._fuzzy_cache = fresh._vocabulary, {}
+        for op, arg in pending:
+            if op == "upsert":
+                self.upsert(arg)
+            else:
+                self.remove(arg)
+        logger.info("[INFRA/memory/text] ✅ Indexed %d product(s) | %d productName term(s) | replayed=%d",
+                    len(self), len(self._fields["productName"].postings), len(pending))
+
+    # ------------------------------------------------------------------ #
+    # Queries                                                            #
+    # ------------------------------------------------------------------ #
+    def keyword(
+        self,
+        query: str,
+        store_object_id: str,
+        skip: int,
+        limit: int,
+        *,
+        filters: Optional[SearchFilters] = None,
+    ) -> Tuple[List[Tuple[int, Optional[float]]], int]:
+        """Case-insensitive productName prefix → `([(ordinal, None)], total)` in ordinal order."""
+        prefix = query.lower()
+        i = bisect.bisect_left(self._names, (prefix, -1))
+        hits: List[int] = []
+        while i < len(self._names) and self._names[i][0].startswith(prefix):
+            hits.append(self._names[i][1])
+            i += 1
+        hits = sorted(o for o in hits if self._eligible(o, store_object_id, filters))
+        return [(o, None) for o in hits[skip:skip + limit]], len(hits)
+
+    def text(
+        self,
+        query: str,
+        store_object_id: str,
+        skip: int,
+        limit: int,
+        *,
+        filters: Optional[SearchFilters] = None,
+    ) -> Tuple[List[Tuple[int, Optional[float]]], int]:
+        """BM25 over the boosted fields → `([(ordinal, score)], total)`, best first."""
+        terms = tokenize(query)
+        scores: Dict[int, float] = {}
+        for name, boost, fuzzy in TEXT_FIELDS:
+            field = self._fields[name]
+            avg = field.avg_length()
+            for term in terms:
+                for match, weight in (self._expand(term) if fuzzy else [(term, 1.0)]):
+                    postings = field.postings.get(match)
+                    if postings is None or not postings.docs:
+                        continue
+                    idf = field.idf(match) * boost * weight
+                    lengths = field.lengths
+                    for ordinal, tf in zip(postings.docs, postings.tfs):
+                        norm = K1 * (1 - B + B * lengths[ordinal] / avg)
+                        scores[ordinal] = scores.get(ordinal, 0.0) + idf * tf / (tf + norm)
+
+        eligible = [(s, o) for o, s in scores.items() if self._eligible(o, store_object_id, filters)]
+        top = heapq.nsmallest(skip + limit, eligible, key=lambda so: (-so[0], so[1]))
+        return [(o, s) for s, o in top[skip:]], len(eligible)
+
+    def document(self, ordinal: int) -> Dict[str, Any]:
+        doc = self._docs[ordinal]
+        assert doc is not None
+        return doc
+
+    # ------------------------------------------------------------------ #
+    # Helpers                                                            #
+    # ------------------------------------------------------------------ #
+    def _eligible(self, ordinal: int, store: str, filters: Optional[SearchFilters]) -> bool:
+        if ordinal not in self._stores.get(store, ()):
+            return False
+        if filters is None or filters.is_empty:
+            return True
+        if filters.in_stock is not None and (ordinal in self._in_stock.get(store, ())) != filters.in_stock:
+            return False
+        doc = self._docs[ordinal] or {}
+        if filters.categories and doc.get("category") not in filters.categories:
+            return False
+        if filters.min_price is not None or filters.max_price is not None:
+            amount = (doc.get("price") or {}).get("amount")
+            if not isinstance(amount, (int, float)):
+                return False
+            if filters.min_price is not None and amount < filters.min_price:
+                return False
+            if filters.max_price is not None and amount > filters.max_price:
+                return False
+        return True
+
+    def _expand(self, term: str) -> List[Tuple[str, float]]:
+        """productName vocabulary within `MAX_EDITS` of *term*, with Lucene's fuzzy boost."""
+        cached = self._fuzzy_cache.get(term)
+        if cached is not None:
+            return cached
+        found: List[Tuple[int, str]] = []
+        mask = char_mask(term)
+        for length in range(max(1, len(term) - MAX_EDITS), len(term) + MAX_EDITS + 1):
+            for candidate_mask, candidates in self._vocabulary.get(length, {}).items():
+                if (candidate_mask ^ mask).bit_count() > 2 * MAX_EDITS:
+                    continue  # whole bucket is too far apart
+                for candidate in candidates:
+                    edits = edit_distance(term, candidate, MAX_EDITS)
+                    if edits <= MAX_EDITS and edits < min(len(term), len(candidate)):
+                        found.append((edits, candidate))
+        found.sort()
+        expanded = [(c, 1 - e / min(len(term), len(c))) for e, c in found[:MAX_EXPANSIONS]]
+        if len(self._fuzzy_cache) >= 10_000:
+            self._fuzzy_cache.clear()
+        self._fuzzy_cache[term] = expanded
+        return expanded
+
+    def _index(self, ordinal: int, doc: Dict[str, Any], *, bulk: bool = False) -> None:
+        """Index *doc* under *ordinal*; *bulk* appends (ordinals arrive in ascending order)."""
+        for name, field in self._fields.items():
+            tokens = tokenize(doc.get(name))
+            field.lengths[ordinal] = min(len(tokens), 0xFFFF)
+            if not tokens:
+                continue
+            field.total_length += len(tokens)
+            field.doc_count += 1
+            counts: Dict[str, int] = {}
+            for t in tokens:
+                counts[t] = counts.get(t, 0) + 1
+            for term, tf in counts.items():
+                postings = field.postings.get(term)
+                if postings is None:
+                    postings = field.postings[term] = _Postings()
+                    if name == "productName":
+                        self._vocabulary.setdefault(len(term), {}).setdefault(char_mask(term), set()).add(term)
+                        self._fuzzy_cache.clear()
+                if bulk:
+                    postings.append(ordinal, tf)
+                else:
+                    postings.add(ordinal, tf)
+
+        product_name = doc.get("productName")
+        if isinstance(product_name, str):
+            if bulk:
+                self._names.append((product_name.lower(), ordinal))  # sorted once by finish_reload()
+            else:
+                bisect.insort(self._names, (product_name.lower(), ordinal))
+        self._store(ordinal, doc)
+
+    def _store(self, ordinal: int, doc: Dict[str, Any]) -> None:
+        """Stored projection and store / stock sets – everything but the text postings."""
+        self._docs[ordinal] = {k: doc[k] for k in PRODUCT_FIELDS if k in doc}
+        for row in doc.get("inventorySummary") or []:
+            if row.get("storeObjectId") is not None:
+                self._stores.setdefault(str(row["storeObjectId"]), set()).add(ordinal)
+        for store in doc.get(IN_STOCK_STORES_FIELD) or []:
+            self._in_stock.setdefault(str(store), set()).add(ordinal)
+
+    def _unindex(self, ordinal: int) -> None:
+        doc = self._docs[ordinal]
+        if doc is None:
+            return
+        for name, field in self._fields.items():
+            tokens = tokenize(doc.get(name))
+            field.lengths[ordinal] = 0
+            if not tokens:
+                continue
+            field.total_length -= len(tokens)
+            field.doc_count -= 1
+            for term in set(tokens):
+                postings = field.postings.get(term)
+                if postings is None:
+                    continue
+                postings.discard(ordinal)
+                if not postings.docs:
+                    del field.postings[term]
+                    if name == "productName":
+                        buckets = self._vocabulary.get(len(term), {})
+                        bucket = buckets.get(char_mask(term))
+                        if bucket is not None:
+                            bucket.discard(term)
+                            if not bucket:
+                                del buckets[char_mask(term)]
+                        self._fuzzy_cache.clear()
+
+        product_name = doc.get("productName")
+        if isinstance(product_name, str):
+            key = (product_name.lower(), ordinal)
+            i = bisect.bisect_left(self._names, key)
+            if i < len(self._names) and self._names[i] == key:
+                del self._names[i]
+        self._drop_stores(ordinal)
+        self._docs[ordinal] = None
+
+    def _drop_stores(self, ordinal: int) -> None:
+        for ordinals in (*self._stores.values(), *self._in_stock.values()):
+            ordinals.discard(ordinal)
+
+
+class LocalTextSearchRepository(SearchRepository):
+    """
+    `SearchRepository` serving options 1 and 2 from a `BM25TextIndex`;
+    vector, hybrid and facets are delegated to *inner* (Atlas).
+    """
+
+    def __init__(self, inner: SearchRepository, index: BM25TextIndex) -> None:
+        self.inner = inner
+        self.index = index
+
+    async def search_keyword(
+        self,
+        query: str,
+        store_object_id: str,
+        page: int,
+        page_size: int,
+        *,
+        deadline: Optional[Deadline] = None,
+        filters: Optional[SearchFilters] = None,
+        fields: Optional[Sequence[str]] = None,
+        profile: Optional[QueryProfile] = None,
+    ) -> Tuple[List[Dict], int]:
+        logger.info("[INFRA/memory/text] 🔎 Keyword search | q='%s' | store=%s", query, store_object_id)
+        skip = self._check(store_object_id, page, page_size, deadline)
+        started = time.perf_counter()
+        hits, total = self.index.keyword(query, store_object_id.lower(), skip, page_size, filters=filters)
+        self._profile(profile, "keyword", started, total)
+        return self._shape(hits, store_object_id, fields), total
+
+    async def search_atlas_text(
+        self,
+        query: str,
+        store_object_id: str,
+        page: int,
+        page_size: int,
+        *,
+        deadline: Optional[Deadline] = None,
+        filters: Optional[SearchFilters] = None,
+        fields: Optional[Sequence[str]] = None,
+        profile: Optional[QueryProfile] = None,
+    ) -> Tuple[List[Dict], int]:
+        logger.info("[INFRA/memory/text] 🔎 Text search | q='%s' | store=%s", query, store_object_id)
+        skip = self._check(store_object_id, page, page_size, deadline)
+        started = time.perf_counter()
+        hits, total = self.index.text(query, store_object_id.lower(), skip, page_size, filters=filters)
+        self._profile(profile, "text", started, total)
+        return self._shape(hits, store_object_id, fields), total
+
+    async def search_by_vector(self, *args: Any, **kwargs: Any) -> Tuple[List[Dict], int]:
+        return await self.inner.search_by_vector(*args, **kwargs)
+
+    async def search_hybrid_rrf(self, *args: Any, **kwargs: Any) -> Tuple[List[Dict], int]:
+        return await self.inner.search_hybrid_rrf(*args, **kwargs)
+
+    async def search_facets(self, *args: Any, **kwargs: Any) -> Dict[str, List[Dict[str, Any]]]:
+        return await self.inner.search_facets(*args, **kwargs)
+
+    def _profile(self, profile: Optional[QueryProfile], option: str, started: float, total: int) -> None:
+        if profile is not None:
+            profile.add(
+                "aggregate",
+                option=option,
+                backend="memory",
+                elapsedMs=round((time.perf_counter() - started) * 1000, 2),
+                total=total,
+                documents=len(self.index),
+            )
+
+    @staticmethod
+    def _check(store_object_id: str, page: int, page_size: int, deadline: Optional[Deadline]) -> int:
+        """Same validation as the pipeline builders; returns the skip."""
+        if not ObjectId.is_valid(store_object_id):
+            raise ValueError("store_object_id must be a valid ObjectId")
+        skip = (page - 1) * page_size
+        if skip < 0 or page_size <= 0:
+            raise ValueError("'skip' must be ≥ 0 and 'limit' must be > 0")
+        if deadline is not None and deadline.remaining_ms() <= 0:
+            raise DeadlineExceededError("Request deadline exceeded before the in-memory text search")
+        return skip
+
+    def _shape(
+        self,
+        hits: List[Tuple[int, Optional[float]]],
+        store_object_id: str,
+        fields: Optional[Sequence[str]],
+    ) -> List[Dict]:
+        projection = projection_for(fields)
+        docs = []
+        for ordinal, score in hits:
+            stored = self.index.document(ordinal)
+            doc = {k: stored[k] for k in projection if k in stored}
+            if score is not None:
+                doc["score"] = score
+            docs.append(filter_inventory_summary(doc, store_object_id))
+        logger.info("[INFRA/memory/text] ✅ Returned %d docs", len(docs))
+        return docs
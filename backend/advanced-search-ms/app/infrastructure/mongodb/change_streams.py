@@ -0,0 +1,174 @@
+# app/infrastructure/mongodb/change_streams.py
+"""
+Change-stream helpers shared by every in-process view of MongoDB data.
+
+• `ChangeStreamWatcher` – tails ONE collection and fans each event out to
+  any number of async subscribers (one cursor, many consumers).
+• `document_handler()` – adapts raw change events into simple
+  `upsert(doc)` / `delete(_id)` callbacks for in-memory indexes.
+
+The watcher reconnects with exponential back-off and resumes from the last
+seen resume token, so a transient network error does not drop events.
+In-memory views load with `begin_reload()`, `start()`, `await
+wait_open()`, a full scan, then `finish_reload(docs)`: every write after
+the stream opened is queued during the scan and replayed on top of it.
+Workers that persist their progress pass the stored token as `resume_after`
+and save `change["_id"]` once an event's effects are durable.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import OperationFailure, PyMongoError
+
+logger = logging.getLogger("advanced-search-ms.infra.change-streams")
+
+CHANGE_STREAM_HISTORY_LOST = 286  # resume token fell off the oplog
+
+ChangeHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class ChangeStreamWatcher:
+    """Single change-stream cursor with fan-out to async subscribers."""
+
+    def __init__(
+        self,
+        collection: AsyncIOMotorCollection,
+        *,
+        name: str,
+        pipeline: Optional[List[Dict[str, Any]]] = None,
+        full_document: Optional[str] = "updateLookup",
+        max_backoff_s: float = 30.0,
+        resume_after: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.col = collection
+        self.name = name
+        self.pipeline = pipeline or []
+        self.full_document = full_document
+        self.max_backoff_s = max_backoff_s
+
+        self._handlers: List[ChangeHandler] = []
+        self._resume_token: Optional[Dict[str, Any]] = resume_after
+        self._task: Optional[asyncio.Task] = None
+        self._open = asyncio.Event()
+
+    # ------------------------------------------------------------------ #
+    # Lifecycle                                                          #
+    # ------------------------------------------------------------------ #
+    def subscribe(self, handler: ChangeHandler) -> None:
+        """Register *handler*; it is awaited for every event, in order."""
+        self._handlers.append(handler)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=f"change-stream:{self.name}")
+            logger.info("[INFRA/change-streams] ▶️ Watching '%s' (%d subscriber(s))",
+                        self.name, len(self._handlers))
+
+    async def wait_open(self, timeout_s: float = 30.0) -> bool:
+        """Wait until the cursor is open on the server (later writes are then seen); False on timeout."""
+        try:
+            await asyncio.wait_for(self._open.wait(), timeout_s)
+        except asyncio.TimeoutError:
+            logger.warning("[INFRA/change-streams] ⚠️ '%s' not open after %.0fs – loading anyway", self.name, timeout_s)
+            return False
+        return True
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("[INFRA/change-streams] ⏹️ Stopped '%s'", self.name)
+
+    # ------------------------------------------------------------------ #
+    # Main loop                                                          #
+    # ------------------------------------------------------------------ #
+    async def _run(self) -> None:
+        backoff = 0.5
+        while True:
+            try:
+                async with self.col.watch(
+                    self.pipeline,
+                    full_document=self.full_document,
+                    resume_after=self._resume_token,
+                ) as stream:
+                    self._open.set()
+                    backoff = 0.5
+                    async for change in stream:
+                        await self._dispatch(change)
+                        self._resume_token = stream.resume_token
+            except asyncio.CancelledError:
+                raise
+            except PyMongoError as exc:
+                if isinstance(exc, OperationFailure) and exc.code == CHANGE_STREAM_HISTORY_LOST:
+                    logger.error("[INFRA/change-streams] ❌ '%s' resume token is no longer in the oplog – "
+                                 "restarting from now, changes in between were missed", self.name)
+                    self._resume_token = None
+                    continue
+                # Any other failure (network, auth, stepdown, …) must not kill the shared watcher
+                logger.warning("[INFRA/change-streams] ⚠️ '%s' interrupted: %s – retrying in %.1fs",
+                               self.name, exc, backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff_s)
+
+    async def _dispatch(self, change: Dict[str, Any]) -> None:
+        for handler in self._handlers:
+            try:
+                await handler(change)
+            except Exception:  # noqa: BLE001 – one bad subscriber must not kill the stream
+                logger.exception("[INFRA/change-streams] 💥 Subscriber failed on '%s' event", self.name)
+
+
+def document_handler(
+    upsert: Callable[[Dict[str, Any]], None],
+    delete: Callable[[Any], None],
+) -> ChangeHandler:
+    """
+    Translate change events into `upsert(fullDocument)` / `delete(_id)` calls.
+
+    Requires the watcher to run with `full_document="updateLookup"`; updates
+    whose document vanished before the lookup are treated as deletes.
+    """
+
+    async def _handle(change: Dict[str, Any]) -> None:
+        op = change.get("operationType")
+        doc_id = change.get("documentKey", {}).get("_id")
+        if op in ("insert", "update", "replace"):
+            doc = change.get("fullDocument")
+            if doc is None:
+                delete(doc_id)
+            else:
+                upsert(doc)
+        elif op == "delete":
+            delete(doc_id)
+
+    return _handle
+
+
+async def load_view(view: Any, watcher: ChangeStreamWatcher, cursor: Any) -> None:
+    """
+    Fill an in-memory *view* from *cursor* without losing concurrent writes.
+
+    *view* implements `begin_reload()` / `cancel_reload()` /
+    `finish_reload(docs)` and is already subscribed to *watcher*. Events
+    are queued from before the stream opens until the scan is done, then
+    replayed on the loaded state, so a scanned document never overwrites a
+    newer change.
+    """
+    view.begin_reload()
+    try:
+        watcher.start()
+        await watcher.wait_open()
+        docs = [doc async for doc in cursor]
+    except BaseException:
+        view.cancel_reload()
+        raise
+    view.finish_reload(docs)
@@ -0,0 +1,37 @@
+# app/infrastructure/mongodb/checkpoints.py
+"""
+Progress checkpoints for long-running jobs and workers.
+
+One small document per job in `JOBS_CHECKPOINT_COLLECTION`, keyed by a
+stable job name. Jobs save their low-water mark (backfill) or change-stream
+resume token (workers) here, so a restart continues where the previous run
+stopped instead of starting over.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+logger = logging.getLogger("advanced-search-ms.infra.checkpoints")
+
+
+class CheckpointStore:
+    """`load()` / `save()` / `clear()` of one document per job key."""
+
+    def __init__(self, collection: AsyncIOMotorCollection) -> None:
+        self.col = collection
+
+    async def load(self, key: str) -> Optional[Dict[str, Any]]:
+        return await self.col.find_one({"_id": key})
+
+    async def save(self, key: str, **fields: Any) -> None:
+        fields["updatedAt"] = datetime.now(timezone.utc)
+        await self.col.update_one({"_id": key}, {"$set": fields}, upsert=True)
+
+    async def clear(self, key: str) -> None:
+        await self.col.delete_one({"_id": key})
+        logger.info("[INFRA/checkpoints] 🧹 Cleared checkpoint '%s'", key)
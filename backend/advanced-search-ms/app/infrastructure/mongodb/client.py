@@ -11,7 +11,8 @@ This module wraps the Motor async MongoDB client.
 • Establishes and maintains a connection pool to MongoDB Atlas
 • Exposes the main product collection for search
 • Stores index and embedding configuration metadata
-• Performs early health validation on startup
+• Performs early health validation on startup (`connect()`, awaited)
+• Pre-opens `minPoolSize` connections and warms every search index
 
 🏗️ Clean Architecture Role:
 ---------------------------
@@ -19,11 +20,12 @@ Acts as an **infrastructure adapter**, consumed by repositories
 in the infrastructure layer and injected into application services.
 """
 
+import asyncio
 import logging
-from typing import List, Dict, Tuple
+import time
+from typing import Optional
 
 from motor.motor_asyncio import AsyncIOMotorClient
-from tenacity import retry, stop_after_attempt, wait_exponential, before_log
 
 from app.shared.exceptions import InfrastructureError
 
@@ -42,9 +44,12 @@ class MongoClient:
         collection: str,
         embedding_field: str,
         index_name: str,
+        *,
+        max_pool_size: int = 50,
+        min_pool_size: int = 10,
     ):
         """
-        Initializes the async MongoDB client and verifies connectivity.
+        Initializes the async MongoDB client (no I/O – see `connect()`).
 
         Args:
             uri: MongoDB connection string (with credentials and cluster info)
@@ -52,6 +57,7 @@ class MongoClient:
             collection: Name of the collection containing product documents
             embedding_field: Field used for Atlas Vector Search
             index_name: Atlas Search index used for Lucene k-NN queries
+            max_pool_size / min_pool_size: Motor connection-pool bounds
         """
         logger.info("🔧 [mongo_client] Initializing MongoClient...")
         logger.info("📦 Connecting to MongoDB: db='%s' collection='%s' index='%s'",
@@ -60,8 +66,8 @@ class MongoClient:
         # Create async client with connection pool
         self.client = AsyncIOMotorClient(
             uri,
-            maxPoolSize=50,
-            minPoolSize=10,
+            maxPoolSize=max_pool_size,
+            minPoolSize=min_pool_size,
             serverSelectionTimeoutMS=5000,
             tls=True,
         )
@@ -72,15 +78,75 @@ class MongoClient:
         self.embedding_field = embedding_field
         self.index_name = index_name
 
-        # Health check (fail fast if cluster unreachable)
+        self.min_pool_size = min_pool_size
+
+    # ------------------------------------------------------------------ #
+    # Startup                                                            #
+    # ------------------------------------------------------------------ #
+    async def connect(self) -> None:
+        """
+        Await connectivity (fail fast) and pre-open `minPoolSize` connections.
+
+        Motor opens pool connections lazily; without this the first burst of
+        real traffic pays the TCP + TLS + auth handshake cost.
+        """
+        t0 = time.perf_counter()
         try:
-            self.client.admin.command("ping")
+            await self.client.admin.command("ping")
             logger.info("✅ [mongo_client] Connection to MongoDB verified")
         except Exception as e:
             logger.error("❌ [mongo_client] MongoDB ping failed: %s", e)
             raise InfrastructureError("MongoDB connection failed at startup") from e
 
+        # Concurrent pings force the pool to check out (and create) N sockets
+        await asyncio.gather(
+            *(self.client.admin.command("ping") for _ in range(self.min_pool_size)),
+            return_exceptions=True,
+        )
+        logger.info("🔥 [mongo_client] Pool warmed with %d connection(s) in %.1f ms",
+                    self.min_pool_size, (time.perf_counter() - t0) * 1000)
+
         # Final metadata log
         logger.info("✅ [mongo_client] Ready to perform vector search with:")
         logger.info("   ├─ Embedding field: '%s'", self.embedding_field)
         logger.info("   └─ Search index:    '%s'", self.index_name)
+
+    async def warm_up(self, text_index: Optional[str] = None) -> None:
+        """
+        Run one cheap query per search index so mongot loads index segments
+        before the first user query. Failures are logged, never raised.
+        """
+        if text_index:
+            t0 = time.perf_counter()
+            try:
+                await self.collection.aggregate([
+                    {"$search": {"index": text_index, "exists": {"path": "productName"}}},
+                    {"$limit": 1},
+                    {"$project": {"_id": 1}},
+                ]).to_list(length=1)
+                logger.info("🔥 [mongo_client] Text index '%s' warmed in %.1f ms",
+                            text_index, (time.perf_counter() - t0) * 1000)
+            except Exception as e:  # noqa: BLE001
+                logger.warning("⚠️ [mongo_client] Text index warm-up failed: %s", e)
+
+        t0 = time.perf_counter()
+        try:
+            sample = await self.collection.find_one(
+                {self.embedding_field: {"$exists": True}},
+                {self.embedding_field: 1},
+            )
+            if sample:
+                await self.collection.aggregate([
+                    {"$vectorSearch": {
+                        "index": self.index_name,
+                        "path": self.embedding_field,
+                        "queryVector": sample[self.embedding_field],
+                        "numCandidates": 10,
+                        "limit": 1,
+                    }},
+                    {"$project": {"_id": 1}},
+                ]).to_list(length=1)
+                logger.info("🔥 [mongo_client] Vector index '%s' warmed in %.1f ms",
+                            self.index_name, (time.perf_counter() - t0) * 1000)
+        except Exception as e:  # noqa: BLE001
+            logger.warning("⚠️ [mongo_client] Vector index warm-up failed: %s", e)
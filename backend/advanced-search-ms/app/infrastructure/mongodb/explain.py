@@ -0,0 +1,136 @@
+# app/infrastructure/mongodb/explain.py
+"""
+`explain` for the search aggregations, condensed for API responses.
+
+Why
+---
+Raw `explain` output is large, its shape differs per stage (`$cursor` query
+plans, `$_internalSearchMongotRemote` for `$search`, `$vectorSearch`, …)
+and it is nested per shard on sharded clusters. The explain mode of
+`/api/v1/search` needs the few numbers that answer "where did the time
+go?" for the exact pipeline the repository just ran.
+
+How it works
+------------
+* `explain_aggregate()` runs the `explain` command for the aggregation on
+  the same collection handle (and so the same read preference) as the real
+  query, bounded by `maxTimeMS`.
+* `summarize()` keeps one entry per stage: name, `nReturned`,
+  `executionTimeMillisEstimate`, plus:
+  - `$cursor`: documents / keys examined and the winning plan's stages;
+  - `$search` / `$searchMeta` / `$vectorSearch` (mongot stages): the
+    stage's own `explain` section (Atlas Search timings and collectors);
+  - `$facet`: the sub-pipelines, whose cost is the stage's time.
+  Shards are summarised separately under `shards`.
+* `pipeline_json()` renders BSON values (ObjectId, regex, dates) as
+  relaxed Extended JSON and, by default, replaces query vectors by
+  `<n floats>` so the echoed pipeline stays readable.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List
+
+from bson import json_util
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+# Stage names produced by `$search` / `$searchMeta` / `$vectorSearch` in explain output
+_SEARCH_STAGES = (
+    "$search",
+    "$searchMeta",
+    "$vectorSearch",
+    "$_internalSearchMongotRemote",
+    "$_internalSearchIdLookup",
+)
+
+
+async def explain_aggregate(
+    col: AsyncIOMotorCollection,
+    pipeline: List[Dict[str, Any]],
+    *,
+    verbosity: str,
+    max_time_ms: int,
+) -> Dict[str, Any]:
+    return await col.database.command(
+        {
+            "explain": {"aggregate": col.name, "pipeline": pipeline, "cursor": {}},
+            "verbosity": verbosity,
+            "maxTimeMS": max_time_ms,
+        },
+        read_preference=col.read_preference,
+    )
+
+
+def _plan_stages(plan: Dict[str, Any]) -> List[str]:
+    """Stage names of a winning plan, root first (e.g. FETCH → IXSCAN)."""
+    names: List[str] = []
+    while plan:
+        names.append(plan.get("stage", "?"))
+        plan = plan.get("inputStage") or (plan.get("inputStages") or [None])[0] or {}
+    return names
+
+
+def _stage(entry: Dict[str, Any]) -> Dict[str, Any]:
+    name = next((k for k in entry if k.startswith("$")), "?")
+    body = entry.get(name) or {}
+    out: Dict[str, Any] = {"stage": name}
+    for key in ("nReturned", "executionTimeMillisEstimate"):
+        if key in entry:
+            out[key] = entry[key]
+
+    if name == "$cursor":
+        stats = body.get("executionStats") or {}
+        out.update({
+            "totalDocsExamined": stats.get("totalDocsExamined"),
+            "totalKeysExamined": stats.get("totalKeysExamined"),
+            "executionTimeMillis": stats.get("executionTimeMillis"),
+            "winningPlan": _plan_stages((body.get("queryPlanner") or {}).get("winningPlan") or {}),
+        })
+    elif name in _SEARCH_STAGES and isinstance(body, dict):
+        if "explain" in body:
+            out["searchExplain"] = body["explain"]
+        for key in ("limit", "numCandidates", "index"):
+            if key in body:
+                out[key] = body[key]
+    elif name == "$facet" and isinstance(body, dict):
+        out["subPipelines"] = {k: [next(iter(s), "?") for s in v] for k, v in body.items()}
+    return out
+
+
+def _summarize_one(raw: Dict[str, Any]) -> Dict[str, Any]:
+    if "stages" in raw:
+        return {"stages": [_stage(s) for s in raw["stages"]]}
+    # Whole pipeline pushed down into the query layer → a single find-style plan
+    return {"stages": [_stage({"$cursor": raw})]}
+
+
+def summarize(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact, JSON-friendly view of an aggregation `explain` result."""
+    if "shards" in raw:
+        summary: Dict[str, Any] = {"shards": {name: _summarize_one(s) for name, s in raw["shards"].items()}}
+    else:
+        summary = _summarize_one(raw)
+    server = raw.get("serverInfo") or {}
+    if server:
+        summary["server"] = f"{server.get('host')}:{server.get('port')} (v{server.get('version')})"
+    return _to_json(summary)
+
+
+def pipeline_json(pipeline: List[Dict[str, Any]], *, redact_vectors: bool = True) -> List[Dict[str, Any]]:
+    """Extended-JSON copy of *pipeline*; long float lists (query vectors) become a placeholder."""
+    return _to_json(_redact(pipeline) if redact_vectors else pipeline)
+
+
+def _redact(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _redact(v) for k, v in value.items()}
+    if isinstance(value, list):
+        if len(value) > 16 and all(isinstance(x, float) for x in value):
+            return f"<{len(value)} floats>"
+        return [_redact(v) for v in value]
+    return value
+
+
+def _to_json(value: Any) -> Any:
+    return json.loads(json_util.dumps(value, json_options=json_util.RELAXED_JSON_OPTIONS))
@@ -0,0 +1,76 @@
+# app/infrastructure/mongodb/health.py
+"""
+Cached MongoDB health status for liveness / readiness probes.
+
+Why
+---
+Kubernetes and load balancers probe every few seconds per replica. A fresh
+`ping` per probe adds avoidable load and makes probe latency depend on the
+cluster. `HealthMonitor` pings in the background and probes read the last
+known status from memory.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+logger = logging.getLogger("advanced-search-ms.infra.health")
+
+
+class HealthMonitor:
+    """Background pinger exposing the last observed status."""
+
+    def __init__(self, client: AsyncIOMotorClient, *, interval_s: float = 5.0, timeout_s: float = 2.0) -> None:
+        self.client = client
+        self.interval_s = interval_s
+        self.timeout_s = timeout_s
+
+        self.warmed_up = False
+        self._status: Dict[str, Any] = {"mongodb": "unknown", "checkedAt": None}
+        self._reachable = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.warmed_up and self._reachable
+
+    def status(self) -> Dict[str, Any]:
+        return {"ready": self.ready, "warmedUp": self.warmed_up, **self._status}
+
+    async def check(self) -> None:
+        t0 = time.perf_counter()
+        try:
+            await asyncio.wait_for(self.client.admin.command("ping"), timeout=self.timeout_s)
+            self._reachable = True
+            self._status = {"mongodb": "reachable"}
+        except Exception as exc:  # noqa: BLE001
+            if self._reachable:
+                logger.error("❌ [health] MongoDB became unreachable: %s", exc)
+            self._reachable = False
+            self._status = {"mongodb": "unreachable", "error": str(exc) or type(exc).__name__}
+        self._status["latencyMs"] = round((time.perf_counter() - t0) * 1000, 1)
+        self._status["checkedAt"] = datetime.now(timezone.utc).isoformat()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="health-monitor")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(self.interval_s)
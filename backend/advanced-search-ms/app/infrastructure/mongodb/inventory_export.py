@@ -0,0 +1,286 @@
+# app/infrastructure/mongodb/inventory_export.py
+"""
+Columnar (Arrow IPC / Parquet) export of one store's inventory.
+
+Why
+---
+The `businessIntelligence` views need a per-store inventory snapshot. Paging
+through JSON is slow and large; an Arrow or Parquet file of the same rows
+is an order of magnitude smaller and loads directly into pandas, Polars,
+DuckDB or Spark.
+
+How it works
+------------
+* ONE aggregation over `inventory`: `$match` on the store, `$filter` keeps
+  only that store's `storeInventory` row, and `$lookup` adds the product
+  attributes (name, brand, category, price). The cursor is read in
+  `batch_rows` chunks.
+* Each chunk becomes an Arrow `RecordBatch` with the explicit
+  `INVENTORY_EXPORT_SCHEMA` (one row per product), so memory stays at
+  one batch whatever the store size and column types never depend on
+  the data.
+* Batches go to a streaming writer (`pyarrow.ipc.new_stream` or
+  `pyarrow.parquet.ParquetWriter`, one row group per batch, zstd) whose
+  sink is drained after every batch – `stream()` yields bytes as they
+  are produced, for an HTTP `StreamingResponse` or a file.
+* Building and encoding a batch (zstd for Parquet) is CPU work, so it runs
+  in `asyncio.to_thread()`; other requests keep being served during an
+  export.
+* `pyarrow` is an optional dependency (`poetry install -E analytics`);
+  `available()` tells callers whether export can run.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+try:  # optional – only needed for exports
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depends on the environment
+    pa = None
+    pq = None
+
+logger = logging.getLogger("advanced-search-ms.infra.mongo.inventory-export")
+
+ExportFormat = Literal["arrow", "parquet"]
+
+MEDIA_TYPES: Dict[str, str] = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+FILE_EXTENSIONS: Dict[str, str] = {"arrow": "arrows", "parquet": "parquet"}
+
+# (column, pyarrow type) – column names are the keys produced by `flatten()`
+_COLUMNS = (
+    ("productId", "string"),
+    ("productName", "string"),
+    ("brand", "string"),
+    ("category", "string"),
+    ("subCategory", "string"),
+    ("priceAmount", "float64"),
+    ("priceCurrency", "string"),
+    ("storeObjectId", "string"),
+    ("storeId", "string"),
+    ("sectionId", "string"),
+    ("aisleId", "string"),
+    ("shelfId", "string"),
+    ("shelfQuantity", "int32"),
+    ("backroomQuantity", "int32"),
+    ("shelfLowThreshold", "int32"),
+    ("inStock", "bool_"),
+    ("nearToReplenishmentInShelf", "bool_"),
+    ("predictedConsumptionPerWeek", "int32"),
+    ("restockFrequencyDays", "int32"),
+    ("predictedStockDepletion", "date32"),
+    ("lastRestock", "date32"),
+    ("nextRestock", "date32"),
+    ("updatedAt", "timestamp"),
+)
+
+INVENTORY_EXPORT_SCHEMA = (
+    pa.schema(
+        [
+            pa.field(name, pa.timestamp("ms", tz="UTC") if kind == "timestamp" else getattr(pa, kind)())
+            for name, kind in _COLUMNS
+        ],
+        metadata={"source": "inventory", "grain": "one row per product in the store"},
+    )
+    if pa is not None
+    else None
+)
+
+
+def available() -> bool:
+    return pa is not None
+
+
+# --------------------------------------------------------------------------- #
+# Row flattening                                                              #
+# --------------------------------------------------------------------------- #
+def _int(value: Any) -> Optional[int]:
+    return int(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def _date(value: Any) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        try:
+            return date.fromisoformat(value[:10])
+        except ValueError:
+            return None
+    return None
+
+
+def _str(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def flatten(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """One aggregation result (`productId`, `updatedAt`, `row`, `product`) → one export row."""
+    row = doc.get("row") or {}
+    product = doc.get("product") or {}
+    price = product.get("price") or {}
+    amount = price.get("amount")
+    return {
+        "productId": _str(doc.get("productId")),
+        "productName": product.get("productName"),
+        "brand": product.get("brand"),
+        "category": product.get("category"),
+        "subCategory": product.get("subCategory"),
+        "priceAmount": float(amount) if isinstance(amount, (int, float)) else None,
+        "priceCurrency": price.get("currency"),
+        "storeObjectId": _str(row.get("storeObjectId")),
+        "storeId": row.get("storeId"),
+        "sectionId": row.get("sectionId"),
+        "aisleId": row.get("aisleId"),
+        "shelfId": row.get("shelfId"),
+        "shelfQuantity": _int(row.get("shelfQuantity")),
+        "backroomQuantity": _int(row.get("backroomQuantity")),
+        "shelfLowThreshold": _int(row.get("shelfLowThreshold")),
+        "inStock": row.get("inStock") if isinstance(row.get("inStock"), bool) else None,
+        "nearToReplenishmentInShelf": (
+            row.get("nearToReplenishmentInShelf")
+            if isinstance(row.get("nearToReplenishmentInShelf"), bool)
+            else None
+        ),
+        "predictedConsumptionPerWeek": _int(row.get("predictedConsumptionPerWeek")),
+        "restockFrequencyDays": _int(row.get("restockFrequencyDays")),
+        "predictedStockDepletion": _date(row.get("predictedStockDepletion")),
+        "lastRestock": _date(row.get("lastRestock")),
+        "nextRestock": _date(row.get("nextRestock")),
+        "updatedAt": doc.get("updatedAt") if isinstance(doc.get("updatedAt"), datetime) else None,
+    }
+
+
+def to_record_batch(rows: List[Dict[str, Any]]) -> "pa.RecordBatch":
+    columns = {name: [r[name] for r in rows] for name, _ in _COLUMNS}
+    return pa.RecordBatch.from_pydict(columns, schema=INVENTORY_EXPORT_SCHEMA)
+
+
+class _Chunks:
+    """Write-only file object that keeps written bytes until drained."""
+
+    closed = False
+
+    def __init__(self) -> None:
+        self._parts: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        out = b"".join(self._parts)
+        self._parts.clear()
+        return out
+
+
+# --------------------------------------------------------------------------- #
+# Exporter                                                                    #
+# --------------------------------------------------------------------------- #
+class MongoInventoryExporter:
+    """Streams one store's inventory as Arrow IPC or Parquet bytes."""
+
+    def __init__(
+        self,
+        inventory: AsyncIOMotorCollection,
+        *,
+        products_collection: str,
+        batch_rows: int = 5_000,
+    ) -> None:
+        if pa is None:
+            raise RuntimeError("pyarrow is not installed – install the 'analytics' extra")
+        self.col = inventory
+        self.products_collection = products_collection
+        self.batch_rows = batch_rows
+
+    def pipeline(self, store_oid: ObjectId) -> List[Dict[str, Any]]:
+        return [
+            {"$match": {"storeInventory.storeObjectId": store_oid}},
+            {"$project": {
+                "productId": 1,
+                "updatedAt": 1,
+                "row": {"$first": {"$filter": {
+                    "input": "$storeInventory",
+                    "as": "item",
+                    "cond": {"$eq": ["$$item.storeObjectId", store_oid]},
+                }}},
+            }},
+            {"$lookup": {
+                "from": self.products_collection,
+                "localField": "productId",
+                "foreignField": "_id",
+                "pipeline": [{"$project": {
+                    "_id": 0, "productName": 1, "brand": 1, "category": 1, "subCategory": 1, "price": 1,
+                }}],
+                "as": "product",
+            }},
+            {"$set": {"product": {"$first": "$product"}}},
+        ]
+
+    async def record_batches(self, store_oid: ObjectId) -> AsyncIterator["pa.RecordBatch"]:
+        """Arrow batches of at most `batch_rows` rows, in cursor order."""
+        cursor = self.col.aggregate(self.pipeline(store_oid), batchSize=self.batch_rows, allowDiskUse=False)
+        rows: List[Dict[str, Any]] = []
+        async for doc in cursor:
+            rows.append(flatten(doc))
+            if len(rows) >= self.batch_rows:
+                yield await asyncio.to_thread(to_record_batch, rows)
+                rows = []
+        if rows:
+            yield await asyncio.to_thread(to_record_batch, rows)
+
+    def stream(self, store_object_id: str, fmt: ExportFormat) -> AsyncIterator[bytes]:
+        """
+        Encoded file contents, yielded batch by batch.
+        Arguments are validated eagerly (ValueError) so callers can still
+        answer 422 before any byte is sent.
+        """
+        if fmt not in MEDIA_TYPES:
+            raise ValueError(f"unknown export format {fmt!r}")
+        try:
+            store_oid = ObjectId(store_object_id)
+        except (InvalidId, TypeError) as exc:
+            raise ValueError(f"store must be a valid ObjectId: {store_object_id!r}") from exc
+        return self._encode(store_oid, fmt)
+
+    async def _encode(self, store_oid: ObjectId, fmt: ExportFormat) -> AsyncIterator[bytes]:
+        sink = _Chunks()
+        if fmt == "arrow":
+            writer = pa.ipc.new_stream(sink, INVENTORY_EXPORT_SCHEMA)
+        else:
+            writer = pq.ParquetWriter(sink, INVENTORY_EXPORT_SCHEMA, compression="zstd")
+
+        rows = batches = 0
+        try:
+            async for batch in self.record_batches(store_oid):
+                chunk = await asyncio.to_thread(self._write, writer, sink, batch)
+                rows += batch.num_rows
+                batches += 1
+                if chunk:
+                    yield chunk
+        finally:
+            writer.close()  # footer / end-of-stream marker – small, stays inline
+        tail = sink.drain()
+        if tail:
+            yield tail
+        logger.info("[INFRA/MongoDB/Export] 📤 %s export done | store=%s | rows=%d | batches=%d",
+                    fmt, store_oid, rows, batches)
+
+    @staticmethod
+    def _write(writer: Any, sink: _Chunks, batch: "pa.RecordBatch") -> bytes:
+        """Encode *batch* and return the bytes it produced (runs in a worker thread)."""
+        writer.write_batch(batch)
+        return sink.drain()
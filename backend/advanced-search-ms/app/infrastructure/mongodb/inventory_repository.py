@@ -0,0 +1,163 @@
+# app/infrastructure/mongodb/inventory_repository.py
+"""
+Cross-store inventory reads for the product detail page.
+
+Why
+---
+The detail page used to send a client-built `$filter` projection through the
+generic `findDocuments` passthrough. The same split – rows of the selected
+store vs. every other store – is now built here, typed and validated, and
+runs as ONE `find` whatever the number of requested products.
+
+How it works
+------------
+* `find({productId: {$in: [...]}})` with a projection holding two `$filter`
+  expressions over `storeInventory` (`$eq` / `$ne` on `storeObjectId`), so
+  the split happens inside MongoDB and only the two arrays come back.
+* ObjectIds are rendered as strings for the API layer.
+* `maxTimeMS` is sized from the request `Deadline` like the search pipelines.
+* `CachedInventoryRepository` wraps any `InventoryRepository` with a
+  per-product `TTLCache`; `invalidate_from_change()` is subscribed to the
+  inventory change stream so a cached split never outlives a write.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import ExecutionTimeout, PyMongoError
+
+from app.application.ports import InventoryRepository
+from app.infrastructure.cache.ttl_cache import TTLCache
+from app.shared.deadline import Deadline
+from app.shared.exceptions import DeadlineExceededError, InfrastructureError
+
+logger = logging.getLogger("advanced-search-ms.infra.mongo.inventory")
+
+MAX_TIME_MS = 2_000
+
+
+def _object_id(value: str, field: str) -> ObjectId:
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError) as exc:
+        raise ValueError(f"{field} must be a valid ObjectId: {value!r}") from exc
+
+
+def _stringify(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: str(v) if isinstance(v, ObjectId) else v for k, v in row.items()}
+
+
+class MongoInventoryRepository(InventoryRepository):
+    """Reads `inventory` documents split into selected / other store rows."""
+
+    def __init__(self, collection: AsyncIOMotorCollection) -> None:
+        self.col = collection
+
+    async def find_store_split(
+        self,
+        product_ids: List[str],
+        store_object_id: str,
+        *,
+        deadline: Optional[Deadline] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        store_oid = _object_id(store_object_id, "store")
+        requested = {_object_id(pid, "productId"): pid for pid in product_ids}  # keyed back by the caller's id
+
+        max_time_ms = MAX_TIME_MS
+        if deadline is not None:
+            max_time_ms = min(MAX_TIME_MS, int(deadline.remaining_ms()))
+            if max_time_ms <= 0:
+                raise DeadlineExceededError("no budget left for the inventory lookup")
+
+        projection = {
+            "productId": 1,
+            "updatedAt": 1,
+            "selectedStoreInventory": {
+                "$filter": {
+                    "input": "$storeInventory",
+                    "as": "item",
+                    "cond": {"$eq": ["$$item.storeObjectId", store_oid]},
+                }
+            },
+            "otherStoreInventory": {
+                "$filter": {
+                    "input": "$storeInventory",
+                    "as": "item",
+                    "cond": {"$ne": ["$$item.storeObjectId", store_oid]},
+                }
+            },
+        }
+        try:
+            docs = await (
+                self.col.find({"productId": {"$in": list(requested)}}, projection)
+                .max_time_ms(max_time_ms)
+                .to_list(length=None)
+            )
+        except ExecutionTimeout as exc:
+            if deadline is not None:
+                raise DeadlineExceededError("inventory lookup exceeded the request deadline") from exc
+            raise InfrastructureError(f"Inventory lookup timed out: {exc}") from exc
+        except PyMongoError as exc:
+            raise InfrastructureError(f"Inventory lookup failed: {exc}") from exc
+
+        found: Dict[str, Dict[str, Any]] = {}
+        for doc in docs:
+            pid = requested.get(doc["productId"], str(doc["productId"]))
+            found[pid] = {
+                "productId": str(doc["productId"]),
+                "updatedAt": doc.get("updatedAt"),
+                "selectedStoreInventory": [_stringify(r) for r in doc.get("selectedStoreInventory") or []],
+                "otherStoreInventory": [_stringify(r) for r in doc.get("otherStoreInventory") or []],
+            }
+        logger.debug("[INFRA/MongoDB/Inventory] 📦 %d/%d product(s) found | store=%s",
+                     len(found), len(product_ids), store_object_id)
+        return found
+
+
+class CachedInventoryRepository(InventoryRepository):
+    """Per-product read-through cache in front of another `InventoryRepository`."""
+
+    def __init__(self, inner: InventoryRepository, cache: TTLCache[Dict[str, Dict[str, Any]]]) -> None:
+        self.inner = inner
+        self.cache = cache  # productId → {storeObjectId → split}
+
+    async def find_store_split(
+        self,
+        product_ids: List[str],
+        store_object_id: str,
+        *,
+        deadline: Optional[Deadline] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        found: Dict[str, Dict[str, Any]] = {}
+        missing: List[str] = []
+        for pid in dict.fromkeys(product_ids):  # de-duplicated, order kept
+            per_store = self.cache.get(pid)
+            if per_store is not None and store_object_id in per_store:
+                found[pid] = per_store[store_object_id]
+            else:
+                missing.append(pid)
+        if not missing:
+            return found
+
+        stamp = self.cache.stamp()
+        loaded = await self.inner.find_store_split(missing, store_object_id, deadline=deadline)
+        for pid, split in loaded.items():
+            # Copy: the cached dict must stay untouched if `set()` rejects the stale load
+            per_store = dict(self.cache.peek(pid) or {})
+            per_store[store_object_id] = split
+            self.cache.set(pid, per_store, stamp=stamp)
+        found.update(loaded)
+        return found
+
+    async def invalidate_from_change(self, change: Dict[str, Any]) -> None:
+        """Change-stream subscriber for the `inventory` collection."""
+        product_id = (change.get("fullDocument") or {}).get("productId")
+        if product_id is not None:
+            self.cache.invalidate(str(product_id))
+        elif change.get("operationType") in ("delete", "update", "replace", "drop", "invalidate"):
+            self.cache.clear()  # product unknown (e.g. delete) – rare, so drop everything
@@ -9,3 +9,4 @@ from .keyword_pipeline     import build_keyword_pipeline      # noqa: F401
 from .text_pipeline        import build_text_pipeline         # noqa: F401
 from .vector_pipeline      import build_vector_pipeline       # noqa: F401
 from .hybrid_rrf_pipeline  import build_hybrid_rrf_pipeline   # noqa: F401
+from .facet_pipeline       import build_facet_pipeline        # noqa: F401
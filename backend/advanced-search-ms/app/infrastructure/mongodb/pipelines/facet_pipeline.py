@@ -0,0 +1,91 @@
+# app/infrastructure/mongodb/pipelines/facet_pipeline.py
+"""
+Pipeline builder for facet counts (options 2 and 4, `facets=true`).
+
+Key traits
+----------
+* One `$searchMeta` stage – counts come straight from the Atlas Search
+  index, no documents are fetched and no `$group` runs.
+* The operator is the option‑2 text query (`text_compound`) with the store
+  and `SearchFilters` as non‑scoring filters (`search_compound`), so counts
+  match the lexical result set. For option 4 they describe its text half.
+* String facets: `category`, `subCategory`, `brand` (fields mapped as
+  `token`); number facet: `price.amount` bucketed by `price_boundaries`.
+* Returns a single `{count: {...}, facet: {...}}` document.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+from bson import ObjectId
+
+from app.domain.search_filters import SearchFilters
+from app.infrastructure.mongodb.pipelines.filters import search_compound
+from app.infrastructure.mongodb.pipelines.text_pipeline import text_compound
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+STRING_FACETS = ("category", "subCategory", "brand")
+PRICE_FACET_PATH = "price.amount"
+
+
+def build_facet_pipeline(
+    query: str,
+    store_object_id: str,
+    text_index: str,
+    *,
+    price_boundaries: Sequence[float],
+    num_buckets: int = 20,
+    filters: Optional[SearchFilters] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Build a `$searchMeta` facet pipeline for *query* within one store.
+
+    Parameters
+    ----------
+    query            : Raw search string (same as the document search).
+    store_object_id  : Store filter (hex string or ObjectId).
+    text_index       : Atlas Search index name.
+    price_boundaries : Ascending bucket edges for `price.amount`; prices
+                       outside them land in an `other` bucket.
+    num_buckets      : Max buckets per string facet.
+    filters          : Optional stock / category / price constraints.
+    """
+    try:
+        store_oid = ObjectId(store_object_id)
+    except Exception as exc:
+        raise ValueError("store_object_id must be a valid ObjectId") from exc
+
+    if len(price_boundaries) < 2:
+        raise ValueError("'price_boundaries' needs at least two edges")
+
+    facets: Dict[str, Any] = {
+        name: {"type": "string", "path": name, "numBuckets": num_buckets}
+        for name in STRING_FACETS
+    }
+    facets["price"] = {
+        "type": "number",
+        "path": PRICE_FACET_PATH,
+        "boundaries": list(price_boundaries),
+        "default": "other",
+    }
+
+    pipeline: List[Dict[str, Any]] = [
+        {
+            "$searchMeta": {
+                "index": text_index,
+                "facet": {
+                    # the text query nested in `must` still needs one `should` clause to match
+                    "operator": search_compound({"compound": text_compound(query)}, store_oid, filters),
+                    "facets": facets,
+                },
+            }
+        }
+    ]
+
+    logger.info("[infra/mongodb/pipelines/FACETS] 🧮 $searchMeta facets | q='%s' | store=%s | facets=%s",
+                query, store_oid, list(facets))
+    return pipeline
@@ -0,0 +1,77 @@
+# app/infrastructure/mongodb/pipelines/filters.py
+"""
+Filter builders shared by every search pipeline.
+
+Key traits
+----------
+* The store and the optional `SearchFilters` are applied *inside* the search
+  stage instead of a `$match` afterwards, so the index returns only eligible
+  documents (no short pages, no wasted k-NN candidates).
+* `search_compound()` – Atlas `$search` / `$searchMeta`: non-scoring
+  `compound.filter` clauses (`equals`, `in`, `range`) plus `mustNot`.
+* `mql_filter()` – the same constraints in MQL, for the `$vectorSearch`
+  `filter` clause and for the keyword `$match`.
+* "In stock" means in stock *in the selected store*, via the
+  `IN_STOCK_STORES_FIELD` array maintained with `inventorySummary`.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+
+from app.domain.inventory import IN_STOCK_STORES_FIELD
+from app.domain.search_filters import SearchFilters
+
+STORE_PATH = "inventorySummary.storeObjectId"
+CATEGORY_PATH = "category"
+PRICE_PATH = "price.amount"
+
+
+def search_compound(
+    operator: Dict[str, Any],
+    store_oid: ObjectId,
+    filters: Optional[SearchFilters] = None,
+) -> Dict[str, Any]:
+    """Wrap a scoring *operator* in a compound with the store / filter clauses."""
+    clauses: List[Dict[str, Any]] = [{"equals": {"path": STORE_PATH, "value": store_oid}}]
+    must_not: List[Dict[str, Any]] = []
+    filters = filters or SearchFilters()
+
+    if filters.in_stock is not None:
+        clause = {"equals": {"path": IN_STOCK_STORES_FIELD, "value": store_oid}}
+        (clauses if filters.in_stock else must_not).append(clause)
+    if filters.categories:
+        clauses.append({"in": {"path": CATEGORY_PATH, "value": list(filters.categories)}})
+    if filters.min_price is not None or filters.max_price is not None:
+        bounds: Dict[str, Any] = {"path": PRICE_PATH}
+        if filters.min_price is not None:
+            bounds["gte"] = filters.min_price
+        if filters.max_price is not None:
+            bounds["lte"] = filters.max_price
+        clauses.append({"range": bounds})
+
+    compound: Dict[str, Any] = {"must": [operator], "filter": clauses}
+    if must_not:
+        compound["mustNot"] = must_not
+    return {"compound": compound}
+
+
+def mql_filter(store_oid: ObjectId, filters: Optional[SearchFilters] = None) -> Dict[str, Any]:
+    """Store + filters as MQL (subset accepted by `$vectorSearch.filter`)."""
+    conditions: Dict[str, Any] = {STORE_PATH: store_oid}
+    filters = filters or SearchFilters()
+
+    if filters.in_stock is not None:
+        conditions[IN_STOCK_STORES_FIELD] = store_oid if filters.in_stock else {"$ne": store_oid}
+    if filters.categories:
+        conditions[CATEGORY_PATH] = {"$in": list(filters.categories)}
+    if filters.min_price is not None or filters.max_price is not None:
+        price: Dict[str, Any] = {}
+        if filters.min_price is not None:
+            price["$gte"] = filters.min_price
+        if filters.max_price is not None:
+            price["$lte"] = filters.max_price
+        conditions[PRICE_PATH] = price
+    return conditions
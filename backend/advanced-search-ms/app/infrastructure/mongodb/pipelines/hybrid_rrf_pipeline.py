@@ -4,12 +4,17 @@ Pipeline builder for option 4 – Hybrid Reciprocal-Rank Fusion (RRF).
 
 • Mixes Atlas $search (text) and Lucene $vectorSearch with $rankFusion.
 • Exposes full scoreDetails metadata and the final weighted score via searchScore.
+• Store and `SearchFilters` are applied inside BOTH input pipelines (see
+  `filters.py`), so every fused candidate is eligible and pages are full.
 """
 
 from __future__ import annotations
 import logging
 from typing import Any, Dict, List, Optional
 from bson import ObjectId
+from app.domain.search_filters import SearchFilters
+from app.infrastructure.mongodb.pipelines.filters import mql_filter, search_compound
+from app.infrastructure.mongodb.pipelines.text_pipeline import text_compound
 from app.infrastructure.mongodb.utils import PRODUCT_FIELDS
 
 logger = logging.getLogger(__name__)
@@ -30,6 +35,7 @@ def build_hybrid_rrf_pipeline(
     projection_fields: Optional[Dict[str, int]] = None,
     num_candidates: int = 200,
     knn_limit: int = 200,
+    filters: Optional[SearchFilters] = None,
 ) -> List[Dict[str, Any]]:
     """
     Build an RRF pipeline that mixes text & vector scores, logs details and
@@ -47,6 +53,7 @@ def build_hybrid_rrf_pipeline(
                 vector_index, vector_field, num_candidates, knn_limit)
     logger.info("[infra/mongodb/pipelines/RRF] 🔍 AtlasSearch: index=%s | boosted fields productName/brand/category/subCategory",
                 text_index)
+    logger.info("[infra/mongodb/pipelines/RRF] 🧩 Filters (in both inputs): %s", filters)
 
     # ── Shared projection ─────────────────────────────────────────────
     projection = {
@@ -73,19 +80,13 @@ def build_hybrid_rrf_pipeline(
                                 "queryVector": embedding,
                                 "numCandidates": num_candidates,
                                 "limit": knn_limit,
+                                "filter": mql_filter(store_oid, filters),
                             }}
                         ],
                         "textPipeline": [
                             {"$search": {
                                 "index": text_index,
-                                "compound": {
-                                    "should": [
-                                        {"text": {"query": query, "path": "productName", "score": {"boost": {"value": 0.8}}, "fuzzy": {"maxEdits": 2}}},
-                                        {"text": {"query": query, "path": "brand",       "score": {"boost": {"value": 0.1}},}},
-                                        {"text": {"query": query, "path": "category",    "score": {"boost": {"value": 0.06}},}},
-                                        {"text": {"query": query, "path": "subCategory", "score": {"boost": {"value": 0.04}},}},
-                                    ]
-                                }
+                                **search_compound({"compound": text_compound(query)}, store_oid, filters),
                             }},
                             {"$limit": knn_limit},
                         ],
@@ -96,10 +97,7 @@ def build_hybrid_rrf_pipeline(
             }
         },
 
-        # 2) Filter to our store
-        {"$match": {"inventorySummary.storeObjectId": store_oid}},
-
-        # 3) Facet for pagination + total count
+        # 2) Facet for pagination + total count
         {"$facet": {
             "docs": [
                 {"$project": projection},
@@ -109,7 +107,7 @@ def build_hybrid_rrf_pipeline(
             "count": [{"$count": "total"}],
         }},
 
-        # 4) Unwind + default total to 0
+        # 3) Unwind + default total to 0
         {"$unwind": {"path": "$count", "preserveNullAndEmptyArrays": True}},
         {"$addFields": {"total": {"$ifNull": ["$count.total", 0]}}},
         {"$project": {"count": 0}},
@@ -5,7 +5,8 @@ Pipeline builder for *option 1* – plain **regex / prefix keyword search**.
 Key traits
 ----------
 * Cheap prefix regex on `productName` – no ranking, no fuzziness.
-* Filters by the caller’s `storeObjectId` **after** matching productName.
+* Filters by the caller’s `storeObjectId` (and optional `SearchFilters`)
+  **after** matching productName.
 * Paginates with `$facet` and returns `{ docs: [...], total: N }`.
 * Uses the shared `PRODUCT_FIELDS` projection (overrideable).
 """
@@ -16,6 +17,8 @@ import logging
 from typing import Any, Dict, List, Optional
 from bson import ObjectId
 
+from app.domain.search_filters import SearchFilters
+from app.infrastructure.mongodb.pipelines.filters import mql_filter
 from app.infrastructure.mongodb.utils import PRODUCT_FIELDS
 
 logger = logging.getLogger(__name__)
@@ -32,6 +35,7 @@ def build_keyword_pipeline(
     limit: int,
     *,
     projection_fields: Optional[Dict[str, int]] = None,
+    filters: Optional[SearchFilters] = None,
 ) -> List[Dict[str, Any]]:
     """
     Build an aggregation pipeline for *simple* keyword searches.
@@ -42,6 +46,7 @@ def build_keyword_pipeline(
     store_object_id  : Store to filter inventory by (string or ObjectId hex).
     skip, limit      : Pagination window.
     projection_fields: Custom projection dict; falls back to PRODUCT_FIELDS.
+    filters          : Optional stock / category / price constraints.
 
     Returns
     -------
@@ -73,14 +78,8 @@ def build_keyword_pipeline(
                 "productName": {"$regex": f"^{query}", "$options": "i"},
             }
         },
-        # 2) Filter by storeObjectId inside inventorySummary
-        {
-            "$match": {
-                "inventorySummary": {
-                    "$elemMatch": {"storeObjectId": store_oid}
-                }
-            }
-        },
+        # 2) Filter by storeObjectId inside inventorySummary (+ optional filters)
+        {"$match": mql_filter(store_oid, filters)},
         # 3) Apply unified projection
         {"$project": projection},
         # 4) Facet: paginated docs + total count
@@ -5,6 +5,8 @@ Pipeline builder for *option 2* – Atlas Search **text index**.
 Key traits
 ----------
 * Uses `$search` with a compound query (productName, brand, category…).
+* Store and `SearchFilters` are non-scoring `compound.filter` clauses inside
+  `$search` (see `filters.py`) – no post-search `$match`.
 * Normalises scores – Atlas guarantees max relevance ≤ 1.0.
 * Copies `$meta: "searchScore"` into a real `score` field **before** `$facet`
   (meta‑fields vanish inside sub‑pipelines).
@@ -19,12 +21,54 @@ from typing import Any, Dict, List, Optional
 
 from bson import ObjectId
 
+from app.domain.search_filters import SearchFilters
+from app.infrastructure.mongodb.pipelines.filters import search_compound
 from app.infrastructure.mongodb.utils import PRODUCT_FIELDS
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
 
+# --------------------------------------------------------------------------- #
+# Shared operator                                                             #
+# --------------------------------------------------------------------------- #
+def text_compound(query: str) -> Dict[str, Any]:
+    """Boosted `compound.should` over productName / brand / category / subCategory."""
+    return {
+        "should": [
+            {   # productName – strongest signal
+                "text": {
+                    "query": query,
+                    "path":  "productName",
+                    "score": {"boost": {"value": 0.8}},
+                    "fuzzy": {"maxEdits": 2},
+                }
+            },
+            {   # brand – moderate
+                "text": {
+                    "query": query,
+                    "path":  "brand",
+                    "score": {"boost": {"value": 0.1}},
+                }
+            },
+            {   # category – low weight
+                "text": {
+                    "query": query,
+                    "path":  "category",
+                    "score": {"boost": {"value": 0.06}},
+                }
+            },
+            {   # subCategory – very low
+                "text": {
+                    "query": query,
+                    "path":  "subCategory",
+                    "score": {"boost": {"value": 0.04}},
+                }
+            },
+        ]
+    }
+
+
 # --------------------------------------------------------------------------- #
 # Public builder                                                              #
 # --------------------------------------------------------------------------- #
@@ -36,6 +80,7 @@ def build_text_pipeline(
     limit: int,
     *,
     projection_fields: Optional[Dict[str, int]] = None,
+    filters: Optional[SearchFilters] = None,
 ) -> List[Dict[str, Any]]:
     """
     Build an Atlas‑Search text pipeline with store filtering and pagination.
@@ -47,6 +92,7 @@ def build_text_pipeline(
     text_index       : Atlas Search index name.
     skip, limit      : Pagination window.
     projection_fields: Custom projection dict; defaults to PRODUCT_FIELDS.
+    filters          : Optional stock / category / price constraints.
     """
 
     # ── Validation ─────────────────────────────────────────────────────────
@@ -68,59 +114,18 @@ def build_text_pipeline(
 
     # ── Aggregation pipeline ──────────────────────────────────────────────
     pipeline: List[Dict[str, Any]] = [
-        # 1) Atlas Search compound query (prefix fuzzy boosts)
+        # 1) Atlas Search compound query (prefix fuzzy boosts) + store / filters
         {
             "$search": {
                 "index": text_index,
-                "compound": {
-                    "should": [
-                        {   # productName – strongest signal
-                            "text": {
-                                "query": query,
-                                "path":  "productName",
-                                "score": {"boost": {"value": 0.8}},
-                                "fuzzy": {"maxEdits": 2},
-                            }
-                        },
-                        {   # brand – moderate
-                            "text": {
-                                "query": query,
-                                "path":  "brand",
-                                "score": {"boost": {"value": 0.1}},
-                            }
-                        },
-                        {   # category – low weight
-                            "text": {
-                                "query": query,
-                                "path":  "category",
-                                "score": {"boost": {"value": 0.06}},
-                            }
-                        },
-                        {   # subCategory – very low
-                            "text": {
-                                "query": query,
-                                "path":  "subCategory",
-                                "score": {"boost": {"value": 0.04}},
-                            }
-                        },
-                    ]
-                },
+                **search_compound({"compound": text_compound(query)}, store_oid, filters),
             }
         },
 
         # 2) Promote Atlas relevance into a normal field
         {"$set": {"score": {"$meta": "searchScore"}}},
 
-        # 3) Filter by store (inventorySummary array)
-        {
-            "$match": {
-                "inventorySummary": {
-                    "$elemMatch": {"storeObjectId": store_oid}
-                }
-            }
-        },
-
-        # 4) Facet: paginate & count
+        # 3) Facet: paginate & count
         {
             "$facet": {
                 "docs": [
@@ -132,7 +137,7 @@ def build_text_pipeline(
             }
         },
 
-        # 5) Flatten and default total=0
+        # 4) Flatten and default total=0
         {"$unwind":   {"path": "$count", "preserveNullAndEmptyArrays": True}},
         {"$addFields": {"total": {"$ifNull": ["$count.total", 0]}}},
         {"$project":  {"count": 0}},
@@ -6,7 +6,8 @@ MongoDB aggregation‑pipeline builder for *option 3* – Lucene k‑NN **vecto
 This pipeline:
 • Performs a k‑NN vector search using the Lucene engine ($vectorSearch).
 • Projects only the needed fields via PRODUCT_FIELDS (+ score).
-• Filters products by target store and optionally by stock status.
+• Filters products by target store and the optional `SearchFilters` inside
+  `$vectorSearch` (see `filters.py`), so all k-NN candidates are eligible.
 • Paginates results and returns total count using $facet.
 
 """
@@ -18,6 +19,8 @@ from typing import Any, Dict, List, Optional, Union
 
 from bson import ObjectId
 
+from app.domain.search_filters import SearchFilters
+from app.infrastructure.mongodb.pipelines.filters import mql_filter
 from app.infrastructure.mongodb.utils import PRODUCT_FIELDS
 
 logger = logging.getLogger(__name__)
@@ -36,9 +39,10 @@ def build_vector_pipeline(
     num_candidates: int = 200,
     knn_limit: int = 200,
     projection_fields: Optional[Dict[str, int]] = None,
+    filters: Optional[SearchFilters] = None,
 ) -> List[Dict[str, Any]]:
     """
-    Build aggregation pipeline for Lucene vector search with optional in‑stock filter.
+    Build aggregation pipeline for Lucene vector search with optional filters.
 
     Parameters
     ----------
@@ -48,10 +52,11 @@ def build_vector_pipeline(
     vector_field      : Field name containing the embedding.
     skip              : Pagination offset.
     limit             : Pagination limit.
-    in_stock          : Optional filter to only return in‑stock products.
+    in_stock          : Shorthand for `SearchFilters(in_stock=...)` when `filters` is not given.
     num_candidates    : Number of candidates to retrieve before limiting.
     knn_limit         : Maximum number of k‑NN results.
     projection_fields : Optional projection dict; defaults to PRODUCT_FIELDS.
+    filters           : Optional stock (in this store) / category / price constraints.
     """
 
     # ── Validation ─────────────────────────────────────────────────────────
@@ -66,12 +71,10 @@ def build_vector_pipeline(
         store_object_id, skip, limit, in_stock
     )
 
-    # ── Dynamic filter (store + optional stock) ────────────────────────────
-    filter_conditions: Dict[str, Any] = {
-        "inventorySummary.storeObjectId": store_object_id
-    }
-    if in_stock is not None:
-        filter_conditions["inventorySummary.inStock"] = in_stock
+    # ── Dynamic filter (store + optional stock / category / price) ─────────
+    if filters is None and in_stock is not None:
+        filters = SearchFilters(in_stock=in_stock)
+    filter_conditions = mql_filter(store_object_id, filters)
 
     logger.info("[infra/mongodb/pipelines/VECTOR] 🧩 Filter conditions: %s", filter_conditions)
 
@@ -89,7 +92,7 @@ def build_vector_pipeline(
                 "queryVector": embedding,
                 "numCandidates": num_candidates,
                 "limit": knn_limit,
-                "filter": filter_conditions, # Dynamic filter used inside $vectorSearch to restrict results to a specific store, and optionally limit to in‑stock products if specified.
+                "filter": filter_conditions, # Dynamic filter used inside $vectorSearch to restrict results to a specific store, and optionally to in‑stock / category / price constraints.
 
             }
         },
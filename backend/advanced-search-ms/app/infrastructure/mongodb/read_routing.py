@@ -0,0 +1,100 @@
+# app/infrastructure/mongodb/read_routing.py
+"""
+Per-search-option read routing and hedged aggregations.
+
+• `read_preference_for()` – turns a `ReadRouting` setting into a PyMongo
+  read preference (mode + maxStalenessSeconds + tag sets).
+• `hedge_preference_for()` – the preference used for the duplicate of a
+  hedged read: `secondaryPreferred` (`nearest` when the option reads
+  nearest) with the option's tag sets and staleness bound, so the duplicate
+  stays on the same class of node and the primary only takes hedges when
+  `hedge_mode` says so explicitly.
+• `hedged()` – runs an awaitable factory, and if it has not finished within
+  `hedge_after_ms` starts a duplicate; the first successful result wins and
+  the loser is cancelled.
+
+Search is read-only and tolerates slight staleness, so spreading reads off
+the primary trades a few seconds of freshness for lower and steadier latency.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from pymongo.read_preferences import (
+    Nearest,
+    Primary,
+    PrimaryPreferred,
+    Secondary,
+    SecondaryPreferred,
+)
+
+from app.shared.config import ReadRouting
+from app.shared.metrics import metrics
+
+logger = logging.getLogger("advanced-search-ms.infra.read-routing")
+
+T = TypeVar("T")
+
+_MODES = {
+    "primarypreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondarypreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+
+def read_preference_for(routing: ReadRouting) -> Any:
+    mode = routing.mode.lower()
+    if mode == "primary":
+        return Primary()
+    if mode not in _MODES:
+        raise ValueError(f"Unknown read preference mode: {routing.mode!r}")
+    return _MODES[mode](tag_sets=routing.tag_sets, max_staleness=routing.max_staleness_s)
+
+
+def hedge_preference_for(routing: ReadRouting) -> Any:
+    mode = routing.hedge_mode or ("nearest" if routing.mode.lower() == "nearest" else "secondaryPreferred")
+    return read_preference_for(routing.model_copy(update={"mode": mode}))
+
+
+async def hedged(
+    first: Callable[[], Awaitable[T]],
+    second: Callable[[], Awaitable[T]],
+    *,
+    hedge_after_ms: Optional[int],
+    label: str,
+) -> T:
+    """Await `first()`; past `hedge_after_ms` also start `second()` and keep the first winner."""
+    primary = asyncio.ensure_future(first())
+    if not hedge_after_ms:
+        return await primary
+
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=hedge_after_ms / 1000)
+    except asyncio.CancelledError:
+        primary.cancel()  # the caller gave up (e.g. its deadline): stop the read as well
+        raise
+    if done:
+        return primary.result()
+
+    logger.info("[INFRA/read-routing] 🪃 %s slower than %d ms – hedging to a second node", label, hedge_after_ms)
+    metrics.inc("read_routing.hedged", option=label)
+    duplicate = asyncio.ensure_future(second())
+    pending = {primary, duplicate}
+    error: Optional[BaseException] = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is duplicate:
+                        metrics.inc("read_routing.hedge_wins", option=label)
+                    return task.result()
+                error = task.exception()
+        raise error  # both attempts failed
+    finally:
+        for task in pending:
+            task.cancel()
@@ -11,6 +11,14 @@ Purpose:
 • Delegates the actual pipeline syntax to specialized builders in `pipelines/`.
 • Uses the Motor async client (`AsyncIOMotorCollection`) to execute queries against MongoDB Atlas.
 • Applies lightweight post-processing (e.g., inventory filtering) before returning results to the application layer.
+• Routes each option's reads per `SEARCH_READ_ROUTING` (secondaries / tagged nodes, optional hedged reads).
+• Sizes `maxTimeMS` from the request `Deadline` (capped at 6 s) instead of a fixed limit.
+• Serves facet counts with `$searchMeta`, cached per (query, store) in a `TTLCache`.
+• Narrows the projection to the requested sparse fieldset (`fields`) via `projection_for()`.
+• In explain mode (`profile`), re-runs the exact pipeline through `explain` and records the
+  summarised plan, timings and the pipeline itself (see `explain.py`); facets skip their cache.
+• Writes aggregations slower than `SLOW_QUERY_THRESHOLD_MS` (timeouts included) with their
+  request parameters to the on-disk `SlowQueryLog`, for `jobs/replay_slow_queries.py`.
 
 Architectural Role:
 -----------------------
@@ -21,27 +29,46 @@ This class lives in the **infrastructure layer**. It does NOT contain business l
 
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Dict, List, Optional, Tuple
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import ExecutionTimeout
 
 from app.application.ports import SearchRepository
+from app.domain.search_filters import SearchFilters
+from app.infrastructure.cache.ttl_cache import TTLCache
 from app.infrastructure.mongodb.client import MongoClient
+from app.infrastructure.mongodb.explain import explain_aggregate, pipeline_json, summarize
+from app.infrastructure.mongodb.read_routing import (
+    hedge_preference_for,
+    hedged,
+    read_preference_for,
+)
+from app.infrastructure.mongodb.slow_query_log import SlowQueryLog
 from app.infrastructure.mongodb.utils import (
-    PRODUCT_FIELDS,
     filter_inventory_summary,
+    projection_for,
 )
 from app.infrastructure.mongodb.pipelines import (
     build_keyword_pipeline,
     build_text_pipeline,
     build_vector_pipeline,
     build_hybrid_rrf_pipeline,
+    build_facet_pipeline,
 )
-from app.shared.exceptions import InfrastructureError
+from app.infrastructure.mongodb.pipelines.facet_pipeline import STRING_FACETS
+from app.shared.config import ReadRouting
+from app.shared.deadline import Deadline
+from app.shared.exceptions import DeadlineExceededError, InfrastructureError
+from app.shared.query_profile import QueryProfile
 
 logger = logging.getLogger("advanced-search-ms.mongo-repo")
 
+MAX_TIME_MS = 6_000  # upper bound for any aggregation, with or without a deadline
+
 
 class MongoSearchRepository(SearchRepository):
     """
@@ -57,12 +84,32 @@ class MongoSearchRepository(SearchRepository):
         index_name_text: str,
         index_name_vector: str,
         embedding_field: str,
+        read_routing: Optional[Dict[str, ReadRouting]] = None,
+        facet_cache: Optional[TTLCache[Dict[str, List[Dict[str, Any]]]]] = None,
+        facet_price_boundaries: Sequence[float] = (0, 1, 2, 5, 10, 20, 50, 100),
+        facet_num_buckets: int = 20,
+        slow_query_log: Optional[SlowQueryLog] = None,
     ) -> None:
         self.col = collection
+        self.facet_cache = facet_cache
+        self.slow_query_log = slow_query_log
+        self.facet_price_boundaries = list(facet_price_boundaries)
+        self.facet_num_buckets = facet_num_buckets
         self.text_index = index_name_text
         self.vector_index = index_name_vector
         self.vector_field = embedding_field
 
+        # Per-option collection handles: (main, hedge, hedge_after_ms)
+        self.routes: Dict[str, Tuple[AsyncIOMotorCollection, AsyncIOMotorCollection, Optional[int]]] = {}
+        for option, routing in (read_routing or {}).items():
+            self.routes[option] = (
+                collection.with_options(read_preference=read_preference_for(routing)),
+                collection.with_options(read_preference=hedge_preference_for(routing)),
+                routing.hedge_after_ms,
+            )
+            logger.info("[INFRA/MongoDB/SearchRepo] 🧭 Read routing | %s → %s (hedge after %s ms)",
+                        option, routing.mode, routing.hedge_after_ms)
+
         logger.info(
             "[INFRA/MongoDB/SearchRepo] ✅ Initialised | text_index=%s | vector_index=%s",
             self.text_index,
@@ -75,6 +122,11 @@ class MongoSearchRepository(SearchRepository):
         store_object_id: str,
         page: int,
         page_size: int,
+        *,
+        deadline: Optional[Deadline] = None,
+        filters: Optional[SearchFilters] = None,
+        fields: Optional[Sequence[str]] = None,
+        profile: Optional[QueryProfile] = None,
     ) -> Tuple[List[Dict], int]:
         logger.info("[INFRA/MongoDB/SearchRepo] 🔎 Keyword search | q='%s' | store=%s", query, store_object_id)
 
@@ -84,9 +136,13 @@ class MongoSearchRepository(SearchRepository):
             store_object_id=store_object_id,
             skip=skip,
             limit=page_size,
-            projection_fields=PRODUCT_FIELDS,
+            projection_fields=projection_for(fields),
+            filters=filters,
+        )
+        params = dict(query=query, page=page, page_size=page_size, filters=filters, fields=fields)
+        return await self._run_pipeline(
+            pipeline, store_object_id, option="keyword", deadline=deadline, profile=profile, params=params,
         )
-        return await self._run_pipeline(pipeline, store_object_id)
 
     async def search_atlas_text(
         self,
@@ -94,6 +150,11 @@ class MongoSearchRepository(SearchRepository):
         store_object_id: str,
         page: int,
         page_size: int,
+        *,
+        deadline: Optional[Deadline] = None,
+        filters: Optional[SearchFilters] = None,
+        fields: Optional[Sequence[str]] = None,
+        profile: Optional[QueryProfile] = None,
     ) -> Tuple[List[Dict], int]:
         logger.info("[INFRA/MongoDB/SearchRepo] 🔎 Text search | q='%s' | store=%s", query, store_object_id)
 
@@ -104,9 +165,13 @@ class MongoSearchRepository(SearchRepository):
             text_index=self.text_index,
             skip=skip,
             limit=page_size,
-            projection_fields=PRODUCT_FIELDS,
+            projection_fields=projection_for(fields),
+            filters=filters,
+        )
+        params = dict(query=query, page=page, page_size=page_size, filters=filters, fields=fields)
+        return await self._run_pipeline(
+            pipeline, store_object_id, option="text", deadline=deadline, profile=profile, params=params,
         )
-        return await self._run_pipeline(pipeline, store_object_id)
 
     async def search_by_vector(
         self,
@@ -114,6 +179,11 @@ class MongoSearchRepository(SearchRepository):
         store_object_id: str,
         page: int,
         page_size: int,
+        *,
+        deadline: Optional[Deadline] = None,
+        filters: Optional[SearchFilters] = None,
+        fields: Optional[Sequence[str]] = None,
+        profile: Optional[QueryProfile] = None,
     ) -> Tuple[List[Dict], int]:
         logger.info("[INFRA/MongoDB/SearchRepo] 🔎 Vector search | store=%s", store_object_id)
 
@@ -125,9 +195,13 @@ class MongoSearchRepository(SearchRepository):
             vector_field=self.vector_field,
             skip=skip,
             limit=page_size,
-            projection_fields=PRODUCT_FIELDS,
+            projection_fields=projection_for(fields),
+            filters=filters,
+        )
+        params = dict(page=page, page_size=page_size, filters=filters, fields=fields)  # embedding: in the pipeline
+        return await self._run_pipeline(
+            pipeline, store_object_id, option="vector", deadline=deadline, profile=profile, params=params,
         )
-        return await self._run_pipeline(pipeline, store_object_id)
 
     async def search_hybrid_rrf(
         self,
@@ -138,6 +212,10 @@ class MongoSearchRepository(SearchRepository):
         page_size: int,
         weight_vector: Optional[float] = None,
         weight_text: Optional[float] = None,
+        deadline: Optional[Deadline] = None,
+        filters: Optional[SearchFilters] = None,
+        fields: Optional[Sequence[str]] = None,
+        profile: Optional[QueryProfile] = None,
     ) -> Tuple[List[Dict], int]:
         logger.info("[INFRA/MongoDB/SearchRepo] 🔎 Hybrid RRF | q='%s' | store=%s", query, store_object_id)
 
@@ -157,14 +235,150 @@ class MongoSearchRepository(SearchRepository):
             weights=weights,
             skip=skip,
             limit=page_size,
-            projection_fields=PRODUCT_FIELDS,
+            projection_fields=projection_for(fields),
+            filters=filters,
+        )
+        params = dict(query=query, page=page, page_size=page_size, weight_vector=weight_vector,
+                      weight_text=weight_text, filters=filters, fields=fields)
+        return await self._run_pipeline(
+            pipeline, store_object_id, option="hybrid", deadline=deadline, profile=profile, params=params,
         )
-        return await self._run_pipeline(pipeline, store_object_id)
+
+    async def search_facets(
+        self,
+        query: str,
+        store_object_id: str,
+        *,
+        deadline: Optional[Deadline] = None,
+        filters: Optional[SearchFilters] = None,
+        profile: Optional[QueryProfile] = None,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        key = (" ".join(query.lower().split()), store_object_id, filters)
+        cache = self.facet_cache if profile is None else None  # explain must run the query
+        if cache is not None and (cached := cache.get(key)) is not None:
+            return cached
+
+        pipeline = build_facet_pipeline(
+            query=query,
+            store_object_id=store_object_id,
+            text_index=self.text_index,
+            price_boundaries=self.facet_price_boundaries,
+            num_buckets=self.facet_num_buckets,
+            filters=filters,
+        )
+        max_time_ms = MAX_TIME_MS
+        if deadline is not None:
+            max_time_ms = min(MAX_TIME_MS, deadline.remaining_ms())
+            if max_time_ms <= 0:
+                raise DeadlineExceededError("Request deadline exceeded before the facet query")
+
+        main, _, _ = self.routes.get("text", (self.col, self.col, None))
+        params = dict(query=query, store_object_id=store_object_id, filters=filters)
+        started = time.perf_counter()
+        try:
+            rows = await asyncio.wait_for(
+                self._aggregate(main, pipeline, max_time_ms),
+                timeout=deadline.remaining_s() if deadline else None,
+            )
+        except (ExecutionTimeout, asyncio.TimeoutError) as exc:
+            self._record_slow("facets", main, pipeline, params, started, max_time_ms, error="timeout")
+            if deadline is None:
+                raise InfrastructureError(str(exc) or "Facet query timed out") from exc
+            raise DeadlineExceededError("Request deadline exceeded during the facet query") from exc
+        except Exception as exc:
+            logger.error("[INFRA/MongoDB/SearchRepo] 💥 Facet query failed: %s", exc)
+            self._record_slow("facets", main, pipeline, params, started, max_time_ms, error=str(exc))
+            raise InfrastructureError(str(exc)) from exc
+
+        self._record_slow("facets", main, pipeline, params, started, max_time_ms)
+        if profile is not None:
+            await self._explain(profile, "facets", "text", main, pipeline, started, deadline)
+        facets = self._shape_facets((rows[0] if rows else {}).get("facet", {}))
+        if cache is not None:
+            cache.set(key, facets)
+        logger.info("[INFRA/MongoDB/SearchRepo] 🧮 Facets | q='%s' | store=%s | %s",
+                    query, store_object_id, {k: len(v) for k, v in facets.items()})
+        return facets
+
+    def _shape_facets(self, raw: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+        """`$searchMeta` buckets → `{value, count}` / `{min, max, count}` lists."""
+        shaped: Dict[str, List[Dict[str, Any]]] = {
+            name: [
+                {"value": str(b["_id"]), "count": int(b["count"])}
+                for b in raw.get(name, {}).get("buckets", [])
+            ]
+            for name in STRING_FACETS
+        }
+        edges = self.facet_price_boundaries
+        upper = dict(zip(edges, edges[1:]))
+        shaped["price"] = [
+            # `other` = outside the boundaries; with a 0 lower edge that means ≥ the last one
+            {"min": float(edges[-1]), "max": None, "count": int(b["count"])} if b["_id"] == "other"
+            else {"min": float(b["_id"]), "max": float(upper[b["_id"]]), "count": int(b["count"])}
+            for b in raw.get("price", {}).get("buckets", [])
+            if b["count"]
+        ]
+        return shaped
+
+    async def _explain(
+        self,
+        profile: QueryProfile,
+        step: str,
+        option: str,
+        col: AsyncIOMotorCollection,
+        pipeline: List[Dict],
+        started: float,
+        deadline: Optional[Deadline],
+    ) -> None:
+        """Records *pipeline* and its `explain` output; explain failures never fail the search."""
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+        details: Dict[str, Any] = {"option": option, "backend": "atlas", "elapsedMs": elapsed_ms,
+                                   "pipeline": pipeline_json(pipeline)}
+        max_time_ms = min(MAX_TIME_MS, deadline.remaining_ms()) if deadline else MAX_TIME_MS
+        if max_time_ms <= 0:
+            details["explainError"] = "request deadline exceeded"
+        else:
+            try:
+                raw = await explain_aggregate(col, pipeline, verbosity=profile.verbosity, max_time_ms=max_time_ms)
+                details["explain"] = summarize(raw)
+            except Exception as exc:  # noqa: BLE001 – the results are already computed
+                logger.warning("[INFRA/MongoDB/SearchRepo] ⚠️ explain of %s failed: %s", option, exc)
+                details["explainError"] = str(exc)
+        profile.add(step, **details)
+
+    def _record_slow(
+        self,
+        option: str,
+        col: AsyncIOMotorCollection,
+        pipeline: List[Dict],
+        params: Dict[str, Any],
+        started: float,
+        max_time_ms: int,
+        **outcome: Any,
+    ) -> None:
+        if self.slow_query_log is not None:
+            self.slow_query_log.record(
+                option=option,
+                collection=col,
+                pipeline=pipeline,
+                params=params,
+                elapsed_ms=(time.perf_counter() - started) * 1000,
+                max_time_ms=max_time_ms,
+                **outcome,
+            )
+
+    async def _aggregate(self, col: AsyncIOMotorCollection, pipeline: List[Dict], max_time_ms: int) -> List[Dict]:
+        cursor = col.aggregate(pipeline, maxTimeMS=max_time_ms)
+        return await cursor.to_list(length=1)
 
     async def _run_pipeline(
         self,
         pipeline: List[Dict],
         store_object_id: str,
+        option: str,
+        deadline: Optional[Deadline] = None,
+        profile: Optional[QueryProfile] = None,
+        params: Optional[Dict[str, Any]] = None,
     ) -> Tuple[List[Dict], int]:
         """
     Executes the aggregation pipeline, filters inventory rows, and
@@ -184,11 +398,34 @@ class MongoSearchRepository(SearchRepository):
     Revisit once MongoDB improves $rankFusion metadata projection
     (e.g., allow accessing `.value` reliably or setting an alias).  
     """
+        max_time_ms = MAX_TIME_MS
+        if deadline is not None:
+            max_time_ms = min(MAX_TIME_MS, deadline.remaining_ms())
+            if max_time_ms <= 0:
+                raise DeadlineExceededError(f"Request deadline exceeded before the {option} aggregation")
+
+        main, hedge, hedge_after_ms = self.routes.get(option, (self.col, self.col, None))
+        params = {"store_object_id": store_object_id, **(params or {})}
+        started = time.perf_counter()
+
+        async def attempt(col: AsyncIOMotorCollection) -> Tuple[AsyncIOMotorCollection, float, List[Dict]]:
+            attempt_started = time.perf_counter()
+            return col, attempt_started, await self._aggregate(col, pipeline, max_time_ms)
 
         try:
-            logger.debug("[INFRA/MongoDB/SearchRepo] ▶️ Executing aggregation…")
-            cursor = self.col.aggregate(pipeline, maxTimeMS=6_000)
-            root = (await cursor.to_list(length=1))[0] if cursor else {}
+            logger.debug("[INFRA/MongoDB/SearchRepo] ▶️ Executing aggregation (maxTimeMS=%d)…", max_time_ms)
+            # maxTimeMS only bounds server-side execution; the client-side timeout
+            # also covers pool checkout and network time.
+            served, served_started, rows = await asyncio.wait_for(
+                hedged(
+                    lambda: attempt(main),
+                    lambda: attempt(hedge),
+                    hedge_after_ms=hedge_after_ms,
+                    label=option,
+                ),
+                timeout=deadline.remaining_s() if deadline else None,
+            )
+            root = rows[0] if rows else {}
 
             docs = [
                 filter_inventory_summary(doc, store_object_id)
@@ -197,6 +434,11 @@ class MongoSearchRepository(SearchRepository):
             total = int(root.get("total", 0))
 
             logger.info("[INFRA/MongoDB/SearchRepo] ✅ Returned %d docs | total=%d", len(docs), total)
+            # The read that produced the rows: the hedge when it won, timed from its own start
+            self._record_slow(option, served, pipeline, params, served_started, max_time_ms,
+                              n_returned=len(docs), total=total)
+            if profile is not None:
+                await self._explain(profile, "aggregate", option, served, pipeline, started, deadline)
 
             # If available, set score = scoreDetails.value (fallback if score is null/zero)
             for doc in docs:
@@ -215,6 +457,13 @@ class MongoSearchRepository(SearchRepository):
 
             return docs, total
 
+        except (ExecutionTimeout, asyncio.TimeoutError) as exc:
+            self._record_slow(option, main, pipeline, params, started, max_time_ms, error="timeout")
+            if deadline is None:
+                raise InfrastructureError(str(exc) or "Aggregation timed out") from exc
+            logger.warning("[INFRA/MongoDB/SearchRepo] ⏱️ %s aggregation hit the request deadline", option)
+            raise DeadlineExceededError(f"Request deadline exceeded during the {option} aggregation") from exc
         except Exception as exc:
             logger.error("[INFRA/MongoDB/SearchRepo] 💥 Aggregation failed: %s", exc)
+            self._record_slow(option, main, pipeline, params, started, max_time_ms, error=str(exc))
             raise InfrastructureError(str(exc)) from exc
@@ -0,0 +1,187 @@
+# app/infrastructure/mongodb/slow_query_log.py
+"""
+Bounded on-disk log of slow search aggregations.
+
+Why
+---
+A slow production search could only be reproduced by guessing its request
+and rebuilding the pipeline by hand. Every aggregation over
+`SLOW_QUERY_THRESHOLD_MS` is now written down exactly as it ran, so
+`app/jobs/replay_slow_queries.py` can run it again against any cluster.
+
+On-disk layout
+--------------
+    <root>/slow-queries.jsonl     → active segment, one Extended JSON entry per line
+    <root>/slow-queries.1.jsonl   → previous segment
+    <root>/lock                   → flock() target serialising writers
+
+* An append that would grow the active segment past `max_bytes / 2` first
+  renames it over the previous one, so the log is a ring buffer of at most
+  `max_bytes` that always holds the newest entries.
+* All Uvicorn workers of the host may share one directory: appends and
+  rotation happen under the lock.
+* An entry holds the pipeline (query vectors replaced by `<n floats>`
+  unless `keep_vectors`), the request parameters it was built from, the
+  timing, the result size and the error, if any. `id` is a digest of
+  option + parameters + pipeline, stable across runs and rotations.
+* `record()` only shapes the entry on the event loop; the flock, the
+  rotation and the write happen on one writer thread fed by a bounded
+  queue (`queue_size`). When the queue is full the entry is dropped and
+  counted (`slow_queries.dropped`) rather than slowing the search down.
+  `flush()` waits for the queue to drain (tests, shutdown).
+* Recording is best effort: a failure is logged and counted, never
+  raised to the search.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from bson import json_util
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from app.infrastructure.mongodb.explain import pipeline_json
+from app.shared.metrics import metrics
+
+logger = logging.getLogger("advanced-search-ms.infra.mongodb.slow-queries")
+
+ACTIVE = "slow-queries.jsonl"
+PREVIOUS = "slow-queries.1.jsonl"
+
+
+def entry_id(option: str, params: Dict[str, Any], pipeline: Any) -> str:
+    payload = json.dumps([option, params, pipeline], sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class SlowQueryLog:
+    """Appends slow aggregations to a size-bounded pair of JSON Lines files."""
+
+    def __init__(
+        self,
+        root: str,
+        *,
+        threshold_ms: float = 500.0,
+        max_bytes: int = 64 * 1024 * 1024,
+        keep_vectors: bool = False,
+        queue_size: int = 1_000,
+    ) -> None:
+        self.root = root
+        self.threshold_ms = threshold_ms
+        self.segment_bytes = max(1, max_bytes // 2)
+        self.keep_vectors = keep_vectors
+        self._queue: "queue.Queue[Tuple[str, str, float, bytes]]" = queue.Queue(maxsize=queue_size)
+        self._writer: Optional[threading.Thread] = None
+        os.makedirs(root, exist_ok=True)
+
+    def record(
+        self,
+        *,
+        option: str,
+        collection: AsyncIOMotorCollection,
+        pipeline: List[Dict[str, Any]],
+        params: Dict[str, Any],
+        elapsed_ms: float,
+        max_time_ms: int,
+        n_returned: Optional[int] = None,
+        total: Optional[int] = None,
+        error: Optional[str] = None,
+    ) -> bool:
+        """Queue one entry when *elapsed_ms* reaches the threshold; returns whether it did."""
+        if elapsed_ms < self.threshold_ms:
+            return False
+        try:
+            shaped = pipeline_json(pipeline, redact_vectors=not self.keep_vectors)
+            params = json.loads(json_util.dumps({
+                k: dataclasses.asdict(v) if dataclasses.is_dataclass(v) else v
+                for k, v in params.items()
+                if v is not None
+            }))
+            entry = {
+                "id": entry_id(option, params, shaped),
+                "at": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+                "option": option,
+                "database": collection.database.name,
+                "collection": collection.name,
+                "elapsedMs": round(elapsed_ms, 1),
+                "maxTimeMS": max_time_ms,
+                "nReturned": n_returned,
+                "total": total,
+                "error": error,
+                "vectorsRedacted": not self.keep_vectors,
+                "params": params,
+                "pipeline": shaped,
+            }
+            line = (json.dumps(entry, separators=(",", ":")) + "\n").encode("utf-8")
+        except Exception as exc:  # noqa: BLE001 – recording must never fail the search
+            metrics.inc("slow_queries.write_failed")
+            logger.warning("[INFRA/MongoDB/slow-queries] ⚠️ Could not record slow %s query: %s", option, exc)
+            return False
+        try:
+            self._queue.put_nowait((option, entry["id"], elapsed_ms, line))
+        except queue.Full:
+            metrics.inc("slow_queries.dropped")
+            logger.warning("[INFRA/MongoDB/slow-queries] ⚠️ Writer backlog full – dropped slow %s query", option)
+            return False
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._drain, name="slow-query-log", daemon=True)
+            self._writer.start()
+        return True
+
+    def flush(self) -> None:
+        """Block until every queued entry has been written (or has failed)."""
+        self._queue.join()
+
+    def entries(self) -> Iterator[Dict[str, Any]]:
+        """Every recorded entry, oldest first (BSON types restored); torn lines are skipped."""
+        for name in (PREVIOUS, ACTIVE):
+            try:
+                fh = open(os.path.join(self.root, name), "rb")
+            except FileNotFoundError:
+                continue
+            with fh:
+                for line in fh:
+                    try:
+                        yield json_util.loads(line)
+                    except ValueError:
+                        continue  # partial last line of a crashed writer
+
+    # ------------------------------------------------------------------ #
+    # Helpers                                                            #
+    # ------------------------------------------------------------------ #
+    def _drain(self) -> None:
+        while True:
+            option, entry_id, elapsed_ms, line = self._queue.get()
+            try:
+                self._append(line)
+            except Exception as exc:  # noqa: BLE001 – keep the writer alive
+                metrics.inc("slow_queries.write_failed")
+                logger.warning("[INFRA/MongoDB/slow-queries] ⚠️ Could not record slow %s query: %s", option, exc)
+            else:
+                metrics.inc("slow_queries.recorded")
+                logger.info("[INFRA/MongoDB/slow-queries] 🐢 Recorded %s query %s | %.0f ms",
+                            option, entry_id, elapsed_ms)
+            finally:
+                self._queue.task_done()
+
+    def _append(self, line: bytes) -> None:
+        active = os.path.join(self.root, ACTIVE)
+        with open(os.path.join(self.root, "lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                size = os.path.getsize(active) if os.path.exists(active) else 0
+                if size and size + len(line) > self.segment_bytes:
+                    os.replace(active, os.path.join(self.root, PREVIOUS))
+                with open(active, "ab") as fh:
+                    fh.write(line)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
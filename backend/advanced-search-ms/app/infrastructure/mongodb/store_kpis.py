@@ -0,0 +1,252 @@
+# app/infrastructure/mongodb/store_kpis.py
+"""
+Materialized per-store inventory KPIs (`store_kpis` collection).
+
+Why
+---
+Store dashboards used to recompute near-replenishment, out-of-stock and
+depletion counts from the whole `inventory` collection. The counts are now
+kept in memory by `StoreKpiView`, served from there, and persisted as one
+small document per store for anything reading MongoDB directly.
+
+How it works
+------------
+* **Incremental** – the shared inventory change stream feeds the view;
+  every `flush_interval_s` the stores it marked dirty are written with one
+  unordered `bulk_write` of upserts (stores left without inventory are
+  deleted).
+* **Reconciliation** – every `reconcile_interval_s` a server-side
+  aggregation recomputes every store from `inventory` (authoritative,
+  whatever happened to the stream). Stores whose counters changed while it
+  ran are left out – the aggregation and the view saw them at different
+  moments, and their next flush writes them anyway. The others are
+  compared with the view (on any drift the view is rebuilt from a fresh
+  scan and `store_kpis.drift_stores` is incremented), replaced in the
+  collection, and documents of stores that no longer have inventory are
+  deleted.
+* Startup performs one reconciliation so the view and the collection begin
+  identical.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import DeleteMany, DeleteOne, ReplaceOne, UpdateOne
+from pymongo.errors import PyMongoError
+
+from app.domain.inventory import KPI_ROW_FIELDS
+from app.infrastructure.memory.store_kpis import StoreKpiView, today_utc
+from app.shared.metrics import metrics
+
+logger = logging.getLogger("advanced-search-ms.infra.mongo.store-kpis")
+
+# Fields compared between the recomputed documents and the in-memory view
+_COMPARED = ("productCount", "inStockCount", "nearReplenishmentCount", "depletionByDate")
+
+
+def _store_key(value: str) -> Any:
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        return value
+
+
+class StoreKpiMaterializer:
+    """Flushes `StoreKpiView` changes and reconciles it against `inventory`."""
+
+    def __init__(
+        self,
+        view: StoreKpiView,
+        inventory: AsyncIOMotorCollection,
+        kpis: AsyncIOMotorCollection,
+        *,
+        depletion_horizons: Sequence[int] = (3, 7, 14),
+        flush_interval_s: float = 5.0,
+        reconcile_interval_s: float = 900.0,
+    ) -> None:
+        self.view = view
+        self.inventory = inventory
+        self.kpis = kpis
+        self.depletion_horizons = list(depletion_horizons)
+        self.flush_interval_s = flush_interval_s
+        self.reconcile_interval_s = reconcile_interval_s
+        self._task: Optional[asyncio.Task] = None
+
+    # ------------------------------------------------------------------ #
+    # Lifecycle                                                          #
+    # ------------------------------------------------------------------ #
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="store-kpis")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()  # persist the last increments
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_reconcile = loop.time() + self.reconcile_interval_s
+        while True:
+            await asyncio.sleep(self.flush_interval_s)
+            try:
+                if loop.time() >= next_reconcile:
+                    next_reconcile = loop.time() + self.reconcile_interval_s  # a failed round waits too
+                    await self.reconcile()
+                await self.flush()
+            except PyMongoError as exc:
+                logger.warning("[INFRA/MongoDB/StoreKpis] ⚠️ KPI maintenance failed: %s – retrying next cycle", exc)
+            except Exception:  # noqa: BLE001 – a bad document must not stop maintenance for good
+                logger.exception("[INFRA/MongoDB/StoreKpis] 💥 KPI maintenance failed – retrying next cycle")
+
+    # ------------------------------------------------------------------ #
+    # Incremental writes                                                 #
+    # ------------------------------------------------------------------ #
+    async def flush(self) -> int:
+        """Write the stores changed since the last flush; returns how many."""
+        dirty = self.view.drain_dirty()
+        if not dirty:
+            return 0
+        ops: List[Any] = []
+        for store in dirty:
+            doc = self.view.get(store, depletion_horizons=self.depletion_horizons)
+            if doc is None:
+                ops.append(DeleteOne({"_id": _store_key(store)}))
+                continue
+            doc.pop("storeObjectId")
+            ops.append(UpdateOne(
+                {"_id": _store_key(store)},
+                {"$set": {**doc, "updatedAt": self.view.updated_at, "source": "incremental"}},
+                upsert=True,
+            ))
+        try:
+            await self.kpis.bulk_write(ops, ordered=False)
+        except PyMongoError:
+            self.view.mark_dirty(dirty)  # try again next cycle
+            raise
+        metrics.inc("store_kpis.flushed_stores", len(ops))
+        logger.debug("[INFRA/MongoDB/StoreKpis] 💾 Flushed %d store(s)", len(ops))
+        return len(ops)
+
+    # ------------------------------------------------------------------ #
+    # Reconciliation                                                     #
+    # ------------------------------------------------------------------ #
+    def reconcile_pipeline(self) -> List[Dict[str, Any]]:
+        today = today_utc()
+        depletion = "$storeInventory.predictedStockDepletion"
+        depletion_day = {
+            "$cond": [
+                {"$eq": [{"$type": depletion}, "date"]},
+                {"$dateToString": {"format": "%Y-%m-%d", "date": depletion}},
+                {"$substrCP": [{"$toString": {"$ifNull": [depletion, ""]}}, 0, 10]},
+            ]
+        }
+        depleting_within = {
+            str(days): {"$sum": {"$map": {
+                "input": "$depletion",
+                "in": {"$cond": [
+                    {"$and": [
+                        {"$ne": ["$$this.k", ""]},
+                        {"$lte": ["$$this.k", (today + timedelta(days=days)).isoformat()]},
+                    ]},
+                    "$$this.v",
+                    0,
+                ]},
+            }}}
+            for days in self.depletion_horizons
+        }
+        return [
+            {"$project": {f"storeInventory.{f}": 1 for f in KPI_ROW_FIELDS}},
+            {"$unwind": "$storeInventory"},
+            {"$match": {"storeInventory.storeObjectId": {"$ne": None}}},  # the view skips such rows too
+            {"$group": {
+                "_id": {"store": "$storeInventory.storeObjectId", "day": depletion_day},
+                "storeId": {"$first": "$storeInventory.storeId"},
+                "products": {"$sum": 1},
+                "inStock": {"$sum": {"$cond": [{"$eq": ["$storeInventory.inStock", True]}, 1, 0]}},
+                "near": {"$sum": {"$cond": [{"$eq": ["$storeInventory.nearToReplenishmentInShelf", True]}, 1, 0]}},
+            }},
+            {"$group": {
+                "_id": "$_id.store",
+                "storeId": {"$first": "$storeId"},
+                "productCount": {"$sum": "$products"},
+                "inStockCount": {"$sum": "$inStock"},
+                "nearReplenishmentCount": {"$sum": "$near"},
+                "depletion": {"$push": {"k": "$_id.day", "v": "$products"}},
+            }},
+            {"$project": {
+                "storeId": 1,
+                "productCount": 1,
+                "inStockCount": 1,
+                "outOfStockCount": {"$subtract": ["$productCount", "$inStockCount"]},
+                "nearReplenishmentCount": 1,
+                "depletingWithin": depleting_within,
+                "depletionByDate": {"$arrayToObject": {
+                    "$filter": {"input": "$depletion", "cond": {"$ne": ["$$this.k", ""]}},
+                }},
+                "updatedAt": "$$NOW",
+                "source": "reconcile",
+            }},
+        ]
+
+    async def reconcile(self) -> int:
+        """Recompute every store, rebuild the view if it drifted and rewrite the collection; returns drifting stores."""
+        mark = self.view.mark()
+        computed = {str(d["_id"]): d async for d in self.inventory.aggregate(self.reconcile_pipeline())}
+        moving = self.view.changed_since(mark)  # compared at different moments – judged next time
+
+        drift = [
+            store
+            for store in (set(computed) | set(self.view.stores())) - moving
+            if self._differs(computed.get(store), self.view.get(store))
+        ]
+
+        ops: List[Any] = [
+            ReplaceOne({"_id": doc["_id"]}, doc, upsert=True)
+            for store, doc in computed.items()
+            if store not in moving
+        ]
+        keep = {store: doc["_id"] for store, doc in computed.items()}
+        keep.update({store: _store_key(store) for store in moving})
+        ops.append(DeleteMany({"_id": {"$nin": list(keep.values())}}))  # stores left without inventory
+        await self.kpis.bulk_write(ops, ordered=False)
+
+        metrics.set_gauge("store_kpis.stores", len(computed))
+        if drift:
+            metrics.inc("store_kpis.drift_stores", len(drift))
+            logger.warning("[INFRA/MongoDB/StoreKpis] ⚠️ %d store(s) drifted from inventory – rebuilding view",
+                           len(drift))
+            await self.reload()
+        else:
+            logger.info("[INFRA/MongoDB/StoreKpis] ✅ Reconciled %d store(s), no drift (%d changing, skipped)",
+                        len(computed), len(moving))
+        return len(drift)
+
+    async def reload(self) -> None:
+        """Rebuild the view from a full `inventory` scan (events during the scan are replayed)."""
+        self.view.begin_reload()
+        try:
+            projection = {f"storeInventory.{f}": 1 for f in KPI_ROW_FIELDS}
+            docs = await self.inventory.find({}, projection).to_list(length=None)
+        except BaseException:
+            self.view.cancel_reload()  # keep the live state, stop queuing
+            raise
+        self.view.finish_reload(docs)
+
+    @staticmethod
+    def _differs(persisted: Optional[Dict[str, Any]], live: Optional[Dict[str, Any]]) -> bool:
+        if persisted is None or live is None:
+            return persisted is not live
+        return any(persisted.get(f, {} if f == "depletionByDate" else 0) != live[f] for f in _COMPARED)
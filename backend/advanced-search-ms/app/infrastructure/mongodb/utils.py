@@ -3,13 +3,14 @@
 Shared MongoDB‑infrastructure helpers.
 
 • PRODUCT_FIELDS – single source of truth for projection
+• projection_for() – PRODUCT_FIELDS narrowed to a sparse fieldset
 • filter_inventory_summary() – keeps only the inventory row of the target store
 """
 
 from __future__ import annotations
 
 import logging
-from typing import Dict
+from typing import Dict, Optional, Sequence
 
 logger = logging.getLogger("advanced-search-ms.mongo.utils")
 
@@ -28,6 +29,18 @@ PRODUCT_FIELDS: Dict = {
     "inventorySummary": 1,
 }
 
+
+def projection_for(fields: Optional[Sequence[str]] = None) -> Dict:
+    """
+    Projection for a sparse fieldset: `_id` plus the requested fields.
+    `None` means the full `PRODUCT_FIELDS`; unknown names are ignored
+    (they are rejected at the API boundary).
+    """
+    if fields is None:
+        return PRODUCT_FIELDS
+    return {"_id": 1, **{f: 1 for f in fields if f in PRODUCT_FIELDS}}
+
+
 def filter_inventory_summary(doc: Dict, store_object_id: str) -> Dict:
     """
     Replace the `inventorySummary` array with ONLY the item
@@ -0,0 +1,160 @@
+# app/infrastructure/voyage_ai/circuit_breaker.py
+"""
+Circuit breaker around any `EmbeddingProvider`.
+
+Why
+---
+When Voyage AI slows down or fails, each embedding call can wait through
+three 5 s attempts, so options 3 and 4 stall for 15 s+ before a 502. The
+breaker notices the trend and fails fast instead, which lets the vector and
+hybrid use-cases degrade to Atlas text search.
+
+States
+------
+* **closed**    – calls pass through; outcomes land in a rolling window.
+                  A call counts as *bad* if it raised or took longer than
+                  `slow_call_ms`. Once `min_calls` are recorded and the bad
+                  ratio reaches `error_rate_threshold`, the breaker opens.
+* **open**      – calls raise `EmbeddingUnavailableError` immediately for
+                  `open_seconds`.
+* **half_open** – a single probe call is let through; a good outcome closes
+                  the breaker, a bad one re-opens it. A cancelled probe
+                  gives the slot to the next call.
+
+A request `Deadline` caps the call timeout. Requests that arrive with no
+budget left are rejected before reaching the provider, and calls the
+deadline cut short (rather than `call_timeout_s`) are not recorded: a
+short client budget says nothing about the provider's health.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Deque, List, Optional
+
+from app.application.ports import EmbeddingProvider
+from app.shared.deadline import Deadline
+from app.shared.exceptions import (
+    DeadlineExceededError,
+    EmbeddingUnavailableError,
+    InfrastructureError,
+)
+from app.shared.metrics import metrics
+
+logger = logging.getLogger("advanced-search-ms.infra.voyage.breaker")
+
+_STATE_GAUGE = {"closed": 0, "half_open": 1, "open": 2}
+
+
+class CircuitBreakerEmbedder:
+    """`EmbeddingProvider` decorator that trips on error rate or latency."""
+
+    def __init__(
+        self,
+        inner: EmbeddingProvider,
+        *,
+        window: int = 20,
+        min_calls: int = 5,
+        error_rate_threshold: float = 0.5,
+        slow_call_ms: float = 2_000,
+        open_seconds: float = 30.0,
+        call_timeout_s: float | None = None,
+    ) -> None:
+        self.inner = inner
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate_threshold
+        self.slow_call_ms = slow_call_ms
+        self.open_seconds = open_seconds
+        self.call_timeout_s = call_timeout_s
+
+        self.state = "closed"
+        self._outcomes: Deque[bool] = deque(maxlen=window)  # True = bad call
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._set_state("closed")
+
+    async def create_embedding(self, text: str, *, deadline: Optional[Deadline] = None) -> List[float]:
+        if deadline is not None:
+            deadline.check("embedding")
+        probe = self._before_call()
+        timeout = self.call_timeout_s or None
+        cut_by_deadline = False  # the request budget, not the provider timeout, bounds this call
+        if deadline is not None:
+            timeout = deadline.cap(timeout)
+            cut_by_deadline = self.call_timeout_s is None or timeout < self.call_timeout_s
+        t0 = time.perf_counter()
+        try:
+            if timeout is not None:
+                embedding = await asyncio.wait_for(
+                    self.inner.create_embedding(text, deadline=deadline), timeout
+                )
+            else:
+                embedding = await self.inner.create_embedding(text, deadline=deadline)
+        except asyncio.TimeoutError as exc:
+            if cut_by_deadline or (deadline is not None and deadline.expired):
+                # Says nothing about the provider's health – no outcome recorded
+                raise DeadlineExceededError("Request deadline exceeded while embedding") from exc
+            self._record(bad=True, probe=probe)
+            raise InfrastructureError(f"Embedding timed out after {self.call_timeout_s}s") from exc
+        except DeadlineExceededError:
+            raise  # the provider gave up on the request budget – not recorded either
+        except Exception:
+            self._record(bad=True, probe=probe)
+            raise
+        finally:
+            if probe:
+                self._probe_in_flight = False  # also when the probe was cancelled – let the next call probe
+        self._record(bad=(time.perf_counter() - t0) * 1000 > self.slow_call_ms, probe=probe)
+        return embedding
+
+    # ------------------------------------------------------------------ #
+    # State machine                                                      #
+    # ------------------------------------------------------------------ #
+    def _before_call(self) -> bool:
+        """Admit or reject a call; True when the admitted call is the half-open probe."""
+        if self.state == "open":
+            if time.monotonic() - self._opened_at < self.open_seconds:
+                metrics.inc("embedding_breaker.rejected")
+                raise EmbeddingUnavailableError("Embedding provider circuit is open")
+            self._set_state("half_open")
+
+        if self.state == "half_open":
+            if self._probe_in_flight:
+                metrics.inc("embedding_breaker.rejected")
+                raise EmbeddingUnavailableError("Embedding provider circuit is half-open (probe in flight)")
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def _record(self, *, bad: bool, probe: bool) -> None:
+        if self.state == "half_open":
+            if not probe:
+                return  # a call admitted before the breaker opened – only the probe decides
+            if bad:
+                self._trip()
+            else:
+                self._outcomes.clear()
+                self._set_state("closed")
+                logger.info("[INFRA/voyage_ai/breaker] ✅ Probe succeeded – circuit closed")
+            return
+
+        self._outcomes.append(bad)
+        if len(self._outcomes) >= self.min_calls:
+            rate = sum(self._outcomes) / len(self._outcomes)
+            if rate >= self.error_rate_threshold:
+                self._trip()
+
+    def _trip(self) -> None:
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self._set_state("open")
+        metrics.inc("embedding_breaker.trips")
+        logger.error("[INFRA/voyage_ai/breaker] 🔌 Circuit OPEN for %.0fs – degrading to text search",
+                     self.open_seconds)
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        metrics.set_gauge("embedding_breaker.state", _STATE_GAUGE[state])
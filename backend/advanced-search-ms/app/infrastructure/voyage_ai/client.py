@@ -16,23 +16,47 @@ Key points
 
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 import httpx
-from tenacity import before_log, retry, stop_after_attempt, wait_exponential
-
-from app.shared.exceptions import InfrastructureError
+from tenacity import (
+    AsyncRetrying,
+    RetryCallState,
+    before_log,
+    retry,
+    retry_if_exception_type,
+    retry_if_not_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
+
+from app.infrastructure.voyage_ai.embedding_store import EmbeddingStore
+from app.shared.deadline import Deadline
+from app.shared.exceptions import DeadlineExceededError, InfrastructureError
 
 logger = logging.getLogger("advanced-search-ms.infra.voyage")
 
+MAX_ATTEMPTS = 3
+ATTEMPT_TIMEOUT_S = 5.0
+MAX_BATCH_SIZE = 128        # Voyage limit on inputs per request
+BATCH_TIMEOUT_S = 60.0
+
 
 class VoyageClient:
     """Thin async wrapper around the Voyage AI `/embeddings` endpoint."""
 
-    def __init__(self, api_key: str, base_url: str, model: str) -> None:
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str,
+        model: str,
+        store: Optional[EmbeddingStore] = None,
+    ) -> None:
         self.base_url = base_url.rstrip("/")  # avoid double "//"
         self.model = model
+        self.store = store
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json",
@@ -42,26 +66,68 @@ class VoyageClient:
     # Embeddings                                                         #
     # ------------------------------------------------------------------ #
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(min=0.1, max=1),
-        before=before_log(logger, logging.WARNING),
-    )
-    async def create_embedding(self, text: str) -> List[float]:
-        """Return a dense vector for *text* using Voyage AI.
+    async def create_embedding(self, text: str, *, deadline: Optional[Deadline] = None) -> List[float]:
+        """Return a dense vector for *text* using Voyage AI.
 
         This method is called by the **Application layer** (use‑case) and is the
-        only outward HTTP hop in the semantic‑search flow.
+        only outward HTTP hop in the semantic‑search flow. The persistent store
+        (when configured) is checked first and filled on the way back.
 
         Raises
         ------
         InfrastructureError
-            On network issues, HTTP 4xx/5xx, or malformed response bodies.
+            On network issues, HTTP 4xx/5xx, or malformed response bodies.
+        DeadlineExceededError
+            When *deadline* runs out before a usable response arrived.
         """
+        if self.store is not None:
+            cached = await asyncio.to_thread(self.store.get, self.model, text)
+            if cached is not None:
+                logger.info("[INFRA/voyage_ai] 💾 Embedding store hit: %r", text[:80])
+                return cached
+
+        embedding = await self._request_embedding(text, deadline)
+
+        if self.store is not None:
+            try:
+                await asyncio.to_thread(self.store.put, self.model, text, embedding)
+            except OSError as exc:  # a full disk must never fail the search
+                logger.warning("[INFRA/voyage_ai] ⚠️ Could not persist embedding: %s", exc)
+        return embedding
+
+    async def _request_embedding(self, text: str, deadline: Optional[Deadline]) -> List[float]:
+        """`/embeddings` call retried by Tenacity within the request budget."""
+
+        def out_of_budget(state: RetryCallState) -> bool:
+            # No point in another attempt if the back-off alone would eat the budget
+            return deadline is not None and deadline.remaining_s() <= (state.upcoming_sleep or 0)
+
+        retrying = AsyncRetrying(
+            stop=stop_after_attempt(MAX_ATTEMPTS) | out_of_budget,
+            wait=wait_exponential(min=0.1, max=1),
+            retry=retry_if_not_exception_type(DeadlineExceededError),
+            before=before_log(logger, logging.WARNING),
+            reraise=True,
+        )
+        try:
+            async for attempt in retrying:
+                with attempt:
+                    if deadline is not None:
+                        deadline.check("embedding request")
+                    timeout = deadline.cap(ATTEMPT_TIMEOUT_S) if deadline else ATTEMPT_TIMEOUT_S
+                    return await self._post_embedding(text, timeout)
+        except InfrastructureError as exc:
+            if deadline is not None and deadline.expired:
+                raise DeadlineExceededError(f"Embedding did not complete within the request deadline: {exc}") from exc
+            raise
+        raise InfrastructureError("Embedding retries exhausted")  # unreachable with reraise=True
+
+    async def _post_embedding(self, text: str, timeout: float) -> List[float]:
+        """Single `/embeddings` HTTP call."""
         logger.info("[INFRA/voyage_ai] ↗️  Embedding request: %r", text[:80])
 
         try:
-            async with httpx.AsyncClient(timeout=5) as client:
+            async with httpx.AsyncClient(timeout=timeout) as client:
                 resp = await client.post(
                     f"{self.base_url}/embeddings",
                     json={"input": text, "model": self.model},
@@ -82,3 +148,46 @@ class VoyageClient:
         except Exception as exc:  # noqa: BLE001
             logger.error("[INFRA/voyage_ai] ❌ Embedding API error: %s", exc)
             raise InfrastructureError(f"Embedding API failed: {exc}") from exc
+
+    @retry(
+        stop=stop_after_attempt(5),
+        wait=wait_exponential(min=1, max=30),
+        retry=retry_if_exception_type(InfrastructureError),
+        before=before_log(logger, logging.WARNING),
+        reraise=True,
+    )
+    async def create_embeddings(
+        self,
+        texts: List[str],
+        *,
+        input_type: Optional[str] = "document",
+    ) -> List[List[float]]:
+        """Embed up to `MAX_BATCH_SIZE` texts in one call (offline jobs only).
+
+        The result is in the same order as *texts*. Batch calls bypass the
+        query-embedding store: documents are embedded once and written to
+        MongoDB, so caching them here would only evict useful query vectors.
+        """
+        if not texts:
+            return []
+        if len(texts) > MAX_BATCH_SIZE:
+            raise ValueError(f"At most {MAX_BATCH_SIZE} texts per Voyage request (got {len(texts)})")
+
+        payload: Dict = {"input": texts, "model": self.model}
+        if input_type:
+            payload["input_type"] = input_type
+
+        try:
+            async with httpx.AsyncClient(timeout=BATCH_TIMEOUT_S) as client:
+                resp = await client.post(f"{self.base_url}/embeddings", json=payload, headers=self.headers)
+                resp.raise_for_status()
+                rows = sorted(resp.json().get("data", []), key=lambda row: row.get("index", 0))
+        except Exception as exc:  # noqa: BLE001
+            logger.error("[INFRA/voyage_ai] ❌ Batch embedding API error: %s", exc)
+            raise InfrastructureError(f"Batch embedding API failed: {exc}") from exc
+
+        embeddings = [row.get("embedding") for row in rows]
+        if len(embeddings) != len(texts) or not all(embeddings):
+            raise InfrastructureError(f"Voyage returned {len(embeddings)} embedding(s) for {len(texts)} input(s)")
+        logger.info("[INFRA/voyage_ai] ✅ Batch of %d embedding(s)", len(embeddings))
+        return embeddings
@@ -0,0 +1,331 @@
+# app/infrastructure/voyage_ai/embedding_store.py
+"""
+Persistent, memory-mapped embedding store.
+
+Why
+---
+A fresh pod has no cached embeddings, so the first minutes after a deploy
+send every query to Voyage AI (latency + rate limits + spend). This store
+survives restarts and is shared by all Uvicorn workers on the host.
+
+On-disk layout (one *generation* directory at a time)
+-----------------------------------------------------
+    <root>/CURRENT             → name of the live generation, e.g. "gen-000003"
+    <root>/gen-000003/vectors  → fixed-width float32 rows (little endian)
+    <root>/gen-000003/index    → 16-byte header + append-only 20-byte records
+                                 (16-byte key, uint32 row number)
+    <root>/lock                → flock() target serialising writers
+    <root>/compact.lock        → flock() target electing the single compactor
+
+* Keys are `blake2b(model + "\\0" + normalised text)` so a model change never
+  returns vectors from the previous model.
+* Readers map `vectors` read-only and, on a miss, tail `index` (at most
+  every `refresh_interval_s`) to pick up rows appended by sibling workers.
+* Every method does blocking file I/O – async callers use
+  `asyncio.to_thread`. In-process state is guarded by a mutex.
+* A `put()` that takes the store over `max_entries` starts compaction on a
+  background thread (`compact()` can also run from an offline job). It
+  streams the newest rows into a new generation without blocking writers,
+  then, under the writer lock, copies the rows appended meanwhile and flips
+  `CURRENT` atomically; readers notice the flip on their next refresh.
+  Files of a generation are never rewritten in place, only appended to.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import unicodedata
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("advanced-search-ms.infra.voyage.store")
+
+_MAGIC = b"EMBIDX01"
+_HEADER = struct.Struct("<8sI4x")      # magic, dim, padding → 16 bytes
+_RECORD = struct.Struct("<16sI")       # key, row          → 20 bytes
+_KEY_BYTES = 16
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for keys: NFKC, case-folded, single spaces."""
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+def make_key(model: str, text: str) -> bytes:
+    payload = f"{model}\0{normalize_text(text)}".encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=_KEY_BYTES).digest()
+
+
+class EmbeddingStore:
+    """Append-only float32 embedding store backed by `mmap`."""
+
+    def __init__(
+        self,
+        root: str,
+        *,
+        max_entries: int = 200_000,
+        read_only: bool = False,
+        refresh_interval_s: float = 1.0,
+    ) -> None:
+        self.root = root
+        self.max_entries = max_entries
+        self.read_only = read_only
+        self.refresh_interval_s = refresh_interval_s
+
+        self._mutex = threading.RLock()
+        self._generation: Optional[str] = None
+        self._dim = 0
+        self._index: Dict[bytes, int] = {}
+        self._index_offset = 0
+        self._refreshed_at = 0.0
+        self._mm: Optional[mmap.mmap] = None
+        self._compactor: Optional[threading.Thread] = None
+
+        os.makedirs(root, exist_ok=True)
+        self._refresh()
+        logger.info("[INFRA/voyage_ai/store] 💾 Embedding store at %s | entries=%d dim=%d read_only=%s",
+                    root, len(self._index), self._dim, read_only)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    # ------------------------------------------------------------------ #
+    # Public API                                                         #
+    # ------------------------------------------------------------------ #
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        key = make_key(model, text)
+        with self._mutex:
+            row = self._index.get(key)
+            if row is None:
+                if time.monotonic() - self._refreshed_at < self.refresh_interval_s:
+                    return None
+                self._refresh()  # another worker may have appended it
+                row = self._index.get(key)
+                if row is None:
+                    return None
+            try:
+                return self._read_row(row)
+            except FileNotFoundError:
+                # Our generation was compacted away – reload and look again once
+                self._generation = None
+                self._refresh()
+                row = self._index.get(key)
+                return self._read_row(row) if row is not None else None
+
+    def put(self, model: str, text: str, vector: List[float]) -> None:
+        if self.read_only:
+            return
+        key = make_key(model, text)
+        with self._mutex, self._locked():
+            self._refresh()
+            if key in self._index:
+                return
+            if self._dim and len(vector) != self._dim:
+                logger.warning("[INFRA/voyage_ai/store] ⚠️ Dimension mismatch (%d ≠ %d) – not stored",
+                               len(vector), self._dim)
+                return
+            if self._generation is None:
+                self._start_generation(1, len(vector))
+
+            gen_dir = self._gen_dir(self._generation)
+            with open(os.path.join(gen_dir, "vectors"), "ab") as fh:
+                row = fh.tell() // (self._dim * 4)
+                fh.write(struct.pack(f"<{self._dim}f", *vector))
+            with open(os.path.join(gen_dir, "index"), "ab") as fh:
+                fh.write(_RECORD.pack(key, row))
+            self._index[key] = row
+            self._index_offset += _RECORD.size
+
+            if len(self._index) > self.max_entries:
+                self._schedule_compaction()
+
+    def compact(self) -> bool:
+        """Rewrite the store keeping only the newest entries under the size cap.
+
+        Returns False when another thread or worker is already compacting.
+        """
+        if self.read_only:
+            return False
+        with open(os.path.join(self.root, "compact.lock"), "a+b") as election:
+            try:
+                fcntl.flock(election, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            try:
+                self._compact()
+            finally:
+                fcntl.flock(election, fcntl.LOCK_UN)
+        return True
+
+    # ------------------------------------------------------------------ #
+    # Internals                                                          #
+    # ------------------------------------------------------------------ #
+    def _gen_dir(self, generation: str) -> str:
+        return os.path.join(self.root, generation)
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with open(os.path.join(self.root, "lock"), "a+b") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _current_generation(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.root, "CURRENT"), "r", encoding="ascii") as fh:
+                return fh.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _refresh(self) -> None:
+        """Follow generation flips and tail newly appended index records."""
+        self._refreshed_at = time.monotonic()
+        generation = self._current_generation()
+        if generation is None:
+            return
+        if generation != self._generation:
+            self._generation = generation
+            self._index = {}
+            self._index_offset = 0
+            self._dim = 0
+            self._close_map()
+
+        try:
+            with open(os.path.join(self._gen_dir(generation), "index"), "rb") as fh:
+                if self._index_offset == 0:
+                    magic, dim = _HEADER.unpack(fh.read(_HEADER.size))
+                    if magic != _MAGIC:
+                        raise ValueError(f"Unrecognised embedding index in {generation}")
+                    self._dim = dim
+                    self._index_offset = _HEADER.size
+                if os.fstat(fh.fileno()).st_size <= self._index_offset:
+                    return  # nothing appended since the last refresh
+                fh.seek(self._index_offset)
+                data = fh.read()
+        except FileNotFoundError:
+            # Generation was compacted away between reading CURRENT and opening it
+            self._generation = None
+            return
+
+        usable = len(data) - len(data) % _RECORD.size  # ignore a torn trailing record
+        for key, row in _RECORD.iter_unpack(data[:usable]):
+            self._index[key] = row
+        self._index_offset += usable
+
+    def _read_row(self, row: int) -> Optional[List[float]]:
+        row_bytes = self._dim * 4
+        end = (row + 1) * row_bytes
+        if self._mm is None or len(self._mm) < end:
+            self._close_map()
+            path = os.path.join(self._gen_dir(self._generation), "vectors")
+            with open(path, "rb") as fh:
+                if os.fstat(fh.fileno()).st_size < end:
+                    return None
+                self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        return list(struct.unpack_from(f"<{self._dim}f", self._mm, row * row_bytes))
+
+    def _close_map(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    def _start_generation(self, number: int, dim: int) -> str:
+        generation = f"gen-{number:06d}"
+        gen_dir = self._gen_dir(generation)
+        os.makedirs(gen_dir, exist_ok=True)
+        with open(os.path.join(gen_dir, "index"), "wb") as fh:
+            fh.write(_HEADER.pack(_MAGIC, dim))
+        open(os.path.join(gen_dir, "vectors"), "wb").close()
+        self._flip_current(generation)
+        self._generation, self._dim = generation, dim
+        self._index, self._index_offset = {}, _HEADER.size
+        self._close_map()
+        return generation
+
+    def _flip_current(self, generation: str) -> None:
+        tmp = os.path.join(self.root, "CURRENT.tmp")
+        with open(tmp, "w", encoding="ascii") as fh:
+            fh.write(generation)
+        os.replace(tmp, os.path.join(self.root, "CURRENT"))
+
+    def _schedule_compaction(self) -> None:
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(target=self._compact_quietly, name="embedding-store-compact", daemon=True)
+        self._compactor.start()
+
+    def _compact_quietly(self) -> None:
+        try:
+            self.compact()
+        except Exception:  # noqa: BLE001 – a failed compaction leaves the live generation in place
+            logger.exception("[INFRA/voyage_ai/store] 💥 Compaction failed")
+
+    def _compact(self) -> None:
+        # 1. Snapshot what to keep (short, under the writer lock)
+        with self._mutex, self._locked():
+            self._refresh()
+            if self._generation is None:
+                return
+            old_generation, dim, snapshot_offset = self._generation, self._dim, self._index_offset
+            keep = int(self.max_entries * 0.8)
+            newest = sorted(self._index.items(), key=lambda kv: kv[1])[-keep:] if keep else []
+
+        number = int(old_generation.split("-")[1]) + 1
+        new_generation = f"gen-{number:06d}"
+        old_dir, new_dir = self._gen_dir(old_generation), self._gen_dir(new_generation)
+        os.makedirs(new_dir, exist_ok=True)
+        row_bytes = dim * 4
+
+        with open(os.path.join(old_dir, "vectors"), "rb") as src, \
+                open(os.path.join(new_dir, "vectors"), "wb") as vec_fh, \
+                open(os.path.join(new_dir, "index"), "wb") as idx_fh:
+            idx_fh.write(_HEADER.pack(_MAGIC, dim))
+
+            def copy(rows: List[Tuple[bytes, int]], start: int) -> int:
+                for key, row in rows:
+                    data = os.pread(src.fileno(), row_bytes, row * row_bytes)
+                    if len(data) < row_bytes:
+                        continue  # torn trailing row
+                    vec_fh.write(data)
+                    idx_fh.write(_RECORD.pack(key, start))
+                    start += 1
+                return start
+
+            # 2. Stream the kept rows while writers keep appending to the old generation
+            copied = copy(newest, 0)
+
+            # 3. Carry over the rows appended meanwhile and flip (short, under the writer lock)
+            with self._mutex, self._locked():
+                with open(os.path.join(old_dir, "index"), "rb") as fh:
+                    fh.seek(snapshot_offset)
+                    data = fh.read()
+                usable = len(data) - len(data) % _RECORD.size
+                copied = copy(list(_RECORD.iter_unpack(data[:usable])), copied)
+                vec_fh.flush()
+                idx_fh.flush()
+                self._flip_current(new_generation)
+
+                for name in ("vectors", "index"):
+                    try:
+                        os.remove(os.path.join(old_dir, name))
+                    except FileNotFoundError:
+                        pass
+                try:
+                    os.rmdir(old_dir)
+                except OSError:
+                    pass
+
+                self._generation = None  # force a full reload of the new generation
+                self._refresh()
+
+        logger.info("[INFRA/voyage_ai/store] 🧹 Compacted %s → %s (%d entries)",
+                    old_generation, new_generation, copied)
@@ -0,0 +1,175 @@
+# app/interfaces/compression.py
+"""
+Response compression negotiated from `Accept-Encoding`.
+
+Why
+---
+A 50-product search page is tens of kilobytes of JSON. Store associates on
+poor in-store Wi-Fi pay for every byte, and JSON compresses 5–10×.
+
+How it works
+------------
+* Pure ASGI middleware: the (single-chunk) response body is buffered and,
+  when it is at least `RESPONSE_COMPRESSION_MIN_BYTES` long, compressed with the best coding
+  the client accepts – `zstd` > `br` > `gzip`. `zstd` / `br` are used only
+  when `zstandard` / `brotli` are installed; gzip is always available.
+* The middleware is mounted at import time; `RESPONSE_COMPRESSION_ENABLED`
+  and the threshold are read from `dependencies` (set at startup).
+* `q=0` in `Accept-Encoding` refuses a coding; `*` is honoured.
+* Streaming responses (`more_body=True`, e.g. server-sent events), bodies
+  that are already encoded, and 204 / 304 pass through untouched.
+* A strong `ETag` gets the coding appended (`"<tag>-gzip"`) because the
+  compressed bytes are a different representation; `etag.py` strips the
+  suffix again when comparing `If-None-Match`.
+* Compressed responses carry `Vary: Accept-Encoding` so shared caches keep
+  one copy per coding.
+* `compression.responses{coding=…}` / `compression.bytes_saved` in `/metrics`.
+"""
+
+from __future__ import annotations
+
+import gzip
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.shared import dependencies
+from app.shared.metrics import metrics
+
+try:  # optional codecs
+    import brotli  # type: ignore
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+try:
+    import zstandard  # type: ignore
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+logger = logging.getLogger("advanced-search-ms.compression")
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # 4–6 is the usual sweet spot for dynamic responses
+ZSTD_LEVEL = 3
+
+
+def _compressors() -> Dict[str, Callable[[bytes], bytes]]:
+    """Available codings in preference order."""
+    codecs: Dict[str, Callable[[bytes], bytes]] = {}
+    if zstandard is not None:
+        codecs["zstd"] = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress
+    if brotli is not None:
+        codecs["br"] = lambda data: brotli.compress(data, quality=BROTLI_QUALITY)
+    codecs["gzip"] = lambda data: gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    return codecs
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """`"gzip, br;q=0.8, *;q=0"` → `{"gzip": 1.0, "br": 0.8, "*": 0.0}`."""
+    accepted: Dict[str, float] = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def negotiate(header: str, available: List[str]) -> Optional[str]:
+    """Best coding from *available* (already in server preference order) or `None`."""
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    best: Optional[str] = None
+    best_q = 0.0
+    for coding in available:
+        q = accepted.get(coding, wildcard)
+        if q > best_q:  # ties keep the server's preference
+            best, best_q = coding, q
+    return best
+
+
+class CompressionMiddleware:
+    """Compresses buffered responses above the configured size threshold."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+        self.codecs = _compressors()
+        logger.info("🗜️ [INTERFACES/compression] available codings=%s", list(self.codecs))
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not dependencies.response_compression_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        coding = negotiate(headers.get(b"accept-encoding", b"").decode("latin-1"), list(self.codecs))
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[dict] = None
+        passthrough = False
+
+        async def wrapped_send(message) -> None:
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            if start is None:  # pragma: no cover - protocol violation
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False) or not self._compressible(start, body):
+                passthrough = True  # streaming or not worth it – forward as is
+                await send(start)
+                await send(message)
+                return
+
+            compressed = self.codecs[coding](body)
+            metrics.inc("compression.responses", coding=coding)
+            metrics.inc("compression.bytes_saved", len(body) - len(compressed))
+            start["headers"] = self._headers(start["headers"], coding, len(compressed))
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, wrapped_send)
+
+    # ------------------------------------------------------------------ #
+    # Helpers                                                            #
+    # ------------------------------------------------------------------ #
+    def _compressible(self, start: dict, body: bytes) -> bool:
+        if start["status"] in (204, 304) or len(body) < dependencies.response_compression_min_bytes:
+            return False
+        names = {k.lower() for k, _ in start.get("headers", [])}
+        return b"content-encoding" not in names
+
+    @staticmethod
+    def _headers(raw: List[Tuple[bytes, bytes]], coding: str, length: int) -> List[Tuple[bytes, bytes]]:
+        out: List[Tuple[bytes, bytes]] = []
+        vary: List[bytes] = []
+        for key, value in raw:
+            name = key.lower()
+            if name == b"content-length":
+                continue
+            if name == b"vary":
+                vary.append(value)
+                continue
+            if name == b"etag" and not value.startswith(b"W/") and value.endswith(b'"'):
+                value = value[:-1] + b"-" + coding.encode() + b'"'  # strong tag per representation
+            out.append((key, value))
+        vary.append(b"Accept-Encoding")
+        out.append((b"vary", b", ".join(vary)))
+        out.append((b"content-encoding", coding.encode()))
+        out.append((b"content-length", str(length).encode()))
+        return out
@@ -0,0 +1,56 @@
+# app/interfaces/etag.py
+"""
+Strong ETags and `If-None-Match` for search responses.
+
+Why
+---
+Associates re-run the same search (refresh, back navigation) and receive an
+identical page every time. With an ETag the client revalidates and gets a
+bodiless 304 when nothing changed.
+
+How it works
+------------
+* The tag is a 128-bit BLAKE2b digest of the rendered JSON body, so it
+  changes whenever a result id, score or stock flag does – and also on
+  any other visible change (price, name, facets, `degraded`).
+* `match()` follows RFC 9110 weak comparison for `If-None-Match`: `W/`
+  prefixes and the `-<coding>` suffix added by `CompressionMiddleware`
+  are ignored, `*` matches anything. It returns the client's tag so the
+  304 echoes exactly what the client holds.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Optional
+
+CODING_SUFFIXES = ("-gzip", "-br", "-zstd")
+
+
+def strong_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    for suffix in CODING_SUFFIXES:
+        if tag.endswith(suffix):
+            return tag[: -len(suffix)]
+    return tag
+
+
+def match(if_none_match: Optional[str], etag: str) -> Optional[str]:
+    """The entry of *if_none_match* that matches *etag*, else `None`."""
+    if not if_none_match:
+        return None
+    current = _opaque(etag)
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return etag
+        if candidate and _opaque(candidate) == current:
+            return candidate
+    return None
@@ -7,41 +7,173 @@ Why
 * Validates the HTTP payload (Pydantic).
 * Chooses the correct search use-case and executes it.
 * Maps domain objects to JSON, sets HTTP status codes.
+* Starts the per-request `Deadline` (header `X-Request-Deadline-Ms` or the
+  configured default) and answers 504 once it is exceeded.
+* Serves the first page of each store's most frequent searches from the
+  background-precomputed popular-search cache.
+* Admits each search through its option's concurrency gate; a full queue
+  is answered with 429 + `Retry-After` before any work is done.
+* Tags search responses with a strong `ETag` and answers a matching
+  `If-None-Match` with 304 (no body).
+* Explain mode (`explain` + `X-Explain-Token`): runs the search without
+  any result cache and returns each executed pipeline with its summarised
+  `explain` output next to the results.
+* Serves the product page's cross-store inventory (single or batch).
+* Streams per-store inventory snapshots as Arrow IPC / Parquet for BI.
+* Serves per-store inventory KPIs from memory.
+* Streams per-store stock-out / replenishment alerts as Server-Sent Events.
+* Answers nearest-store lookups from the in-memory spatial index.
 * Adds structured logging for observability.
 """
 
 from __future__ import annotations
 
+import hmac
 import logging
 import time
+from contextlib import nullcontext
 from math import ceil
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
 
 # ── Application use-cases ──────────────────────────────────────────────────────────
 from app.application.use_cases.keyword_search_use_case import KeywordSearchUseCase
 from app.application.use_cases.atlas_text_search_use_case import AtlasTextSearchUseCase
 from app.application.use_cases.vector_search_use_case import VectorSearchUseCase
 from app.application.use_cases.hybrid_rrf_use_case import HybridRRFSearchUseCase
+from app.application.use_cases.base import SearchUseCase
 
 # ── Ports helpers injected via FastAPI DI ────────────────────────────────────────────
-from app.infrastructure.mongodb.search_repository import MongoSearchRepository
-from app.infrastructure.voyage_ai.client import VoyageClient
+from app.application.ports import (
+    EmbeddingProvider,
+    InventoryExporter,
+    InventoryRepository,
+    SearchRepository,
+    SemanticCache,
+    StockAlertFeed,
+    StoreKpiReader,
+    StoreLocator,
+    SuggestionIndex,
+)
+from app.infrastructure.cache.popular_searches import PopularQuery
+from app.infrastructure.mongodb.inventory_export import FILE_EXTENSIONS, MEDIA_TYPES
+
+# ── Domain value objects ────────────────────────────────────────────────────────────
+from app.domain.search_filters import SearchFilters
+
+# ── HTTP helpers ───────────────────────────────────────────────────────────────────
+from app.interfaces import etag, sse
 
 # ── Pydantic schemas ────────────────────────────────────────────────────────────────
-from app.interfaces.schemas import SearchRequest, SearchResponse, ProductOut
+from app.interfaces.schemas import (
+    SearchRequest,
+    SearchResponse,
+    ProductOut,
+    SuggestResponse,
+    SuggestionOut,
+    GeoPointOut,
+    NearbyStoreOut,
+    NearestStoresResponse,
+    StoreKpisOut,
+    StoreKpisResponse,
+    ProductInventoryOut,
+    ProductInventoryBatchResponse,
+)
 from app.shared import dependencies
+from app.shared.admission import AdmissionController
+from app.shared.deadline import Deadline
+from app.shared.exceptions import DeadlineExceededError, InfrastructureError, OverloadedError
+from app.shared.query_profile import QueryProfile
 
 logger = logging.getLogger("advanced-search-ms.api")
 router = APIRouter()
 
+# Option number → name used by per-option settings (read routing, admission)
+OPTION_NAMES = {1: "keyword", 2: "text", 3: "vector", 4: "hybrid"}
+
+# ───────────────────────────────  Deadline  ──────────────────────────────
+def request_deadline(
+    x_request_deadline_ms: int | None = Header(
+        None,
+        ge=1,
+        description="End-to-end budget for this request in milliseconds",
+    ),
+) -> Deadline | None:
+    """Starts the request clock; the header may shorten or extend the default up to the configured max.
+
+    Without the header and without a configured default the request has no deadline.
+    """
+    budget = x_request_deadline_ms or dependencies.request_deadline_ms
+    if budget is None:
+        return None
+    return Deadline(min(budget, dependencies.request_deadline_max_ms))
+
+
+# ───────────────────────────────  Use-cases  ─────────────────────────────
+def _select_use_case(
+    option: int,
+    repo: SearchRepository,
+    voyage: EmbeddingProvider,
+    semantic_cache: SemanticCache | None,
+) -> SearchUseCase:
+    logger.info("📌 [INTERFACES/routes] Selecting use-case based on option=%d", option)
+
+    match option:
+        case 1:
+            use_case = KeywordSearchUseCase(repo)
+            logger.info("✅ [INTERFACES/routes] KeywordSearchUseCase initialized")
+        case 2:
+            use_case = AtlasTextSearchUseCase(repo)
+            logger.info("✅ [INTERFACES/routes] AtlasTextSearchUseCase initialized")
+        case 3:
+            use_case = VectorSearchUseCase(repo, voyage, semantic_cache=semantic_cache)
+            logger.info("✅ [INTERFACES/routes] VectorSearchUseCase initialized")
+        case 4:
+            use_case = HybridRRFSearchUseCase(repo, voyage)
+            logger.info("✅ [INTERFACES/routes] HybridRRFSearchUseCase initialized")
+        case _:
+            logger.error("❌ [INTERFACES/routes] Invalid option received, raising HTTPException")
+            raise HTTPException(status_code=400, detail="Invalid option")
+
+    return use_case
+
+
+async def precompute_search(key: PopularQuery, query: str) -> dict:
+    """First page of a popular search typed as *query*, for `PopularSearchWarmer` (same gates as live traffic)."""
+    use_case = _select_use_case(
+        key.option, dependencies.get_repo(), dependencies.get_embedder(), dependencies.get_semantic_cache(),
+    )
+    deadline = Deadline(dependencies.request_deadline_max_ms)
+    admission = dependencies.admission
+    async with admission.admit(OPTION_NAMES[key.option], deadline) if admission else nullcontext():
+        return await use_case.execute(
+            query=query,
+            store_object_id=key.store,
+            page=1,
+            page_size=key.page_size,
+            deadline=deadline,
+            facets=key.facets,
+        )
+
+
 # ────────────────────────────────  Route  ────────────────────────────────
-@router.post("/search", response_model=SearchResponse, summary="Product search (4 strategies)")
+@router.post(
+    "/search",
+    response_model=SearchResponse,
+    response_model_exclude_unset=True,  # sparse fieldsets: fields that were not requested are left out
+    summary="Product search (4 strategies)",
+)
 async def search(
     req: SearchRequest,
-    repo: MongoSearchRepository = Depends(dependencies.get_repo),
-    voyage: VoyageClient = Depends(dependencies.get_embedder),
-) -> SearchResponse:
+    repo: SearchRepository = Depends(dependencies.get_repo),
+    voyage: EmbeddingProvider = Depends(dependencies.get_embedder),
+    semantic_cache: SemanticCache | None = Depends(dependencies.get_semantic_cache),
+    deadline: Deadline | None = Depends(request_deadline),
+    admission: AdmissionController | None = Depends(dependencies.get_admission),
+    if_none_match: str | None = Header(None, description="ETag of a previous identical search"),
+    x_explain_token: str | None = Header(None, description="Shared secret required with `explain`"),
+) -> SearchResponse | Response:
     """
     Executes one of four search strategies, controlled by `option`.
 
@@ -61,55 +193,112 @@ async def search(
         req.page_size,
     )
 
-    logger.info("📌 [INTERFACES/routes] Selecting use-case based on option=%d", req.option)
+    profile = None
+    if req.explain is not None:
+        token = dependencies.search_explain_token
+        if not token or not hmac.compare_digest((x_explain_token or "").encode(), token.encode()):
+            logger.warning("🚫 [INTERFACES/routes] Explain request rejected (missing / wrong token or disabled)")
+            raise HTTPException(status_code=403, detail="explain is not allowed for this client")
+        profile = QueryProfile(req.explain)
+        semantic_cache = None  # explain always runs the pipelines
 
-    match req.option:
-        case 1:
-            use_case = KeywordSearchUseCase(repo)
-            logger.info("✅ [INTERFACES/routes] KeywordSearchUseCase initialized")
-        case 2:
-            use_case = AtlasTextSearchUseCase(repo)
-            logger.info("✅ [INTERFACES/routes] AtlasTextSearchUseCase initialized")
-        case 3:
-            use_case = VectorSearchUseCase(repo, voyage)
-            logger.info("✅ [INTERFACES/routes] VectorSearchUseCase initialized")
-        case 4:
-            use_case = HybridRRFSearchUseCase(repo, voyage)
-            logger.info("✅ [INTERFACES/routes] HybridRRFSearchUseCase initialized")
-        case _:
-            logger.error("❌ [INTERFACES/routes] Invalid option received, raising HTTPException")
-            raise HTTPException(status_code=400, detail="Invalid option")
+    use_case = _select_use_case(req.option, repo, voyage, semantic_cache)
+
+    filters = SearchFilters(
+        in_stock=req.inStock,
+        categories=tuple(req.category or ()),
+        min_price=req.minPrice,
+        max_price=req.maxPrice,
+    )
+    fields = tuple(req.fields) if req.fields else None
+
+    # Plain first pages are counted per store; the hot ones are served precomputed
+    popular = dependencies.popular_searches
+    popular_key = None
+    if (
+        popular is not None and profile is None and req.page == 1 and filters.is_empty and fields is None
+        and req.weightVector is None and req.weightText is None
+    ):
+        popular_key = PopularQuery.of(req.storeObjectId, req.option, req.query, req.page_size, req.facets)
 
     status = 500
     try:
         logger.info("▶️ [INTERFACES/routes] Calling use-case.execute() to enter application layer")
 
-        match req.option:
-            case 4:
-                result = await use_case.execute(
-                    query=req.query,
-                    store_object_id=req.storeObjectId,
-                    page=req.page,
-                    page_size=req.page_size,
-                    weight_vector=req.weightVector,
-                    weight_text=req.weightText,
-                )
-            case _:
-                result = await use_case.execute(
-                    query=req.query,
-                    store_object_id=req.storeObjectId,
-                    page=req.page,
-                    page_size=req.page_size,
-                )
+        result = popular.record(popular_key, req.query) if popular_key is not None else None
+        if result is not None:
+            logger.info("🔥 [INTERFACES/routes] Served precomputed first page of a popular search")
+        else:
+            async with admission.admit(OPTION_NAMES[req.option], deadline) if admission else nullcontext():
+                match req.option:
+                    case 4:
+                        result = await use_case.execute(
+                            query=req.query,
+                            store_object_id=req.storeObjectId,
+                            page=req.page,
+                            page_size=req.page_size,
+                            weight_vector=req.weightVector,
+                            weight_text=req.weightText,
+                            deadline=deadline,
+                            filters=filters,
+                            fields=fields,
+                            facets=req.facets,
+                            profile=profile,
+                        )
+                    case _:
+                        result = await use_case.execute(
+                            query=req.query,
+                            store_object_id=req.storeObjectId,
+                            page=req.page,
+                            page_size=req.page_size,
+                            deadline=deadline,
+                            filters=filters,
+                            fields=fields,
+                            facets=req.facets,  # ignored by options without facet support
+                            profile=profile,
+                        )
+            if popular_key is not None:
+                popular.store(popular_key, result)
 
         logger.info("✅ [INTERFACES/routes] Use-case execution completed, returned to route handler")
 
-        status = 200
-        return SearchResponse(
+        response = SearchResponse(
             total_results=result["total"],
             total_pages=ceil(result["total"] / req.page_size) if result["total"] else 0,
-            products=[ProductOut(**p.dict()) for p in result["products"]],
+            products=[ProductOut(**p.model_dump(exclude_unset=fields is not None)) for p in result["products"]],
+            degraded=result.get("degraded", False),
+            facets=result.get("facets"),
         )
+        if profile is not None:
+            response.explain = profile.steps  # never cached or tagged: the timings differ per run
+            status = 200
+            return response
+        if not dependencies.search_etag_enabled:
+            status = 200
+            return response
+
+        # Rendered here (once) so the ETag is computed over the exact bytes sent
+        body = response.model_dump_json(exclude_unset=True).encode()
+        tag = etag.strong_etag(body)
+        matched = etag.match(if_none_match, tag)
+        if matched is not None:
+            status = 304
+            return Response(status_code=304, headers={"ETag": matched})
+        status = 200
+        return Response(body, media_type="application/json", headers={"ETag": tag})
+
+    except OverloadedError as exc:
+        status = 429
+        raise HTTPException(
+            status_code=429,
+            detail=str(exc),
+            headers={"Retry-After": str(exc.retry_after_s)},
+        ) from exc
+
+    except DeadlineExceededError as exc:
+        status = 504
+        logger.warning("⏱️ [INTERFACES/routes] Deadline exceeded: %s", exc)
+        raise HTTPException(status_code=504, detail=str(exc)) from exc
 
     except Exception as exc:
         logger.exception("💥 [INTERFACES/routes] Search failed with exception: %s", exc)
@@ -117,4 +306,251 @@ async def search(
 
     finally:
         elapsed = (time.perf_counter() - t0) * 1000
-        logger.info("🌟 [INTERFACES/routes] Search completed | status=%d latency=%.1f ms", status, elapsed)
\ No newline at end of file
+        logger.info("🌟 [INTERFACES/routes] Search completed | status=%d latency=%.1f ms", status, elapsed)
+
+
+# ────────────────────────────────  Suggest  ──────────────────────────────
+@router.get("/suggest", response_model=SuggestResponse, summary="Type-ahead suggestions (in-memory)")
+async def suggest(
+    q: str = Query(..., min_length=1, max_length=100, description="Prefix typed so far"),
+    storeObjectId: str = Query(..., description="MongoDB ObjectId of the target store"),
+    limit: int = Query(10, ge=1, le=20),
+    index: SuggestionIndex = Depends(dependencies.get_suggest_index),
+) -> SuggestResponse:
+    """
+    Returns the most popular products available in the store whose name,
+    brand or category starts with `q`. Served entirely from memory – no
+    database round-trip per keystroke.
+    """
+    t0 = time.perf_counter()
+    suggestions = index.suggest(q, storeObjectId, limit)
+    logger.debug("⌨️ [INTERFACES/routes] Suggest q=%r store=%s → %d hit(s) in %.2f ms",
+                 q, storeObjectId, len(suggestions), (time.perf_counter() - t0) * 1000)
+    return SuggestResponse(query=q, suggestions=[SuggestionOut(**s) for s in suggestions])
+
+
+# ─────────────────────────────  Nearest stores  ──────────────────────────
+@router.get("/stores/nearest", response_model=NearestStoresResponse, summary="Nearest stores (in-memory)")
+async def nearest_stores(
+    storeObjectId: str | None = Query(None, description="Reference store; alternative to lng/lat"),
+    lng: float | None = Query(None, ge=-180, le=180),
+    lat: float | None = Query(None, ge=-90, le=90),
+    k: int = Query(10, ge=1, description="Maximum number of stores returned"),
+    radiusKm: float | None = Query(None, gt=0, description="Only stores within this distance"),
+    excludeSelf: bool = Query(False, description="Drop the reference store from the result"),
+    index: StoreLocator = Depends(dependencies.get_store_index),
+) -> NearestStoresResponse:
+    """
+    Stores ordered by great-circle distance from a reference store or point,
+    in the shape of the frontend's `$geoNear` route (`distanceInKM`,
+    `isNearby`). `k` and `radiusKm` are capped per request; served from
+    memory – no database round-trip.
+    """
+    if k > dependencies.nearest_stores_max_k:
+        raise HTTPException(status_code=422, detail=f"k must be ≤ {dependencies.nearest_stores_max_k}")
+    if radiusKm is not None and radiusKm > dependencies.nearest_stores_max_radius_km:
+        raise HTTPException(
+            status_code=422,
+            detail=f"radiusKm must be ≤ {dependencies.nearest_stores_max_radius_km:g}",
+        )
+
+    if storeObjectId is not None:
+        storeObjectId = storeObjectId.lower()
+        origin = index.get(storeObjectId)
+        if origin is None:
+            raise HTTPException(status_code=404, detail="Store not found")
+        lng, lat = origin.lng, origin.lat
+    elif lng is None or lat is None:
+        raise HTTPException(status_code=422, detail="Provide storeObjectId or both lng and lat")
+
+    t0 = time.perf_counter()
+    hits = index.nearest(lng, lat, k=k + 1 if excludeSelf else k, radius_km=radiusKm)
+    if excludeSelf:
+        hits = [(d, s) for d, s in hits if s.id != storeObjectId][:k]
+    logger.debug("🌍 [INTERFACES/routes] Nearest stores k=%d radius=%s → %d hit(s) in %.3f ms",
+                 k, radiusKm, len(hits), (time.perf_counter() - t0) * 1000)
+
+    return NearestStoresResponse(
+        origin=GeoPointOut(coordinates=[lng, lat]),
+        stores=[
+            NearbyStoreOut(
+                id=store.id,
+                storeId=store.storeId,
+                storeName=store.storeName,
+                location=GeoPointOut(coordinates=[store.lng, store.lat]),
+                distanceInKM=round(distance, 3),
+                isNearby=distance < dependencies.nearby_radius_km,
+            )
+            for distance, store in hits
+        ],
+    )
+
+
+# ─────────────────────────────  Store KPIs  ──────────────────────────────
+def _kpi_horizons(depletionDays: list[int] | None) -> list[int]:
+    days = depletionDays or dependencies.kpi_depletion_horizons
+    if any(d < 0 or d > 365 for d in days):
+        raise HTTPException(status_code=422, detail="depletionDays must be between 0 and 365")
+    return sorted(set(days))
+
+
+@router.get("/stores/kpis", response_model=StoreKpisResponse, summary="Inventory KPIs of every store (in-memory)")
+async def all_store_kpis(
+    depletionDays: list[int] | None = Query(None, description="Horizons for depletingWithin (default from settings)"),
+    kpis: StoreKpiReader = Depends(dependencies.get_store_kpis),
+) -> StoreKpisResponse:
+    """Out-of-stock, near-replenishment and depletion counts per store, without the date histogram."""
+    horizons = _kpi_horizons(depletionDays)
+    stores = [kpis.get(store, depletion_horizons=horizons) for store in kpis.stores()]
+    return StoreKpisResponse(
+        asOf=kpis.updated_at,
+        stores=[StoreKpisOut(**{**doc, "depletionByDate": None}) for doc in stores if doc is not None],
+    )
+
+
+@router.get(
+    "/stores/{store_object_id}/kpis",
+    response_model=StoreKpisResponse,
+    summary="Inventory KPIs of one store (in-memory)",
+)
+async def store_kpis(
+    store_object_id: str,
+    depletionDays: list[int] | None = Query(None, description="Horizons for depletingWithin (default from settings)"),
+    kpis: StoreKpiReader = Depends(dependencies.get_store_kpis),
+) -> StoreKpisResponse:
+    """
+    Counters maintained incrementally from inventory change events and
+    reconciled periodically against the `inventory` collection; served
+    from memory – no database round-trip.
+    """
+    doc = kpis.get(store_object_id.lower(), depletion_horizons=_kpi_horizons(depletionDays))
+    if doc is None:
+        raise HTTPException(status_code=404, detail="No inventory for store")
+    return StoreKpisResponse(asOf=kpis.updated_at, stores=[StoreKpisOut(**doc)])
+
+
+# ─────────────────────────────  Stock alerts  ────────────────────────────
+@router.get(
+    "/stores/{store_object_id}/alerts",
+    response_class=StreamingResponse,
+    summary="Stock-out / replenishment alerts of one store (Server-Sent Events)",
+)
+async def store_alerts(
+    store_object_id: str,
+    last_event_id: str | None = Header(None, description="Resume after this alert id (sent by EventSource)"),
+    feed: StockAlertFeed = Depends(dependencies.get_stock_alerts),
+) -> StreamingResponse:
+    """
+    `text/event-stream` of `stock-out`, `back-in-stock`,
+    `replenishment-needed` and `replenished` events for the store, fed by
+    the shared inventory change stream. Reconnects with `Last-Event-ID`
+    receive the alerts they missed, or a `reset` event when those are gone.
+    """
+    subscription = feed.subscribe(store_object_id.lower(), last_event_id)
+    if subscription is None:
+        raise HTTPException(status_code=503, detail="Too many alert subscribers", headers={"Retry-After": "5"})
+    logger.info("🔔 [INTERFACES/routes] Alert stream opened | store=%s resume=%s", store_object_id, last_event_id)
+    return StreamingResponse(
+        sse.alert_stream(feed, subscription, heartbeat_s=dependencies.stock_alerts_heartbeat_s),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ───────────────────────────  Product inventory  ─────────────────────────
+async def _store_split(
+    repo: InventoryRepository,
+    product_ids: list[str],
+    store: str,
+    deadline: Deadline | None,
+) -> dict:
+    try:
+        return await repo.find_store_split(product_ids, store, deadline=deadline)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    except DeadlineExceededError as exc:
+        raise HTTPException(status_code=504, detail=str(exc)) from exc
+    except InfrastructureError as exc:
+        logger.error("💥 [INTERFACES/routes] Inventory lookup failed: %s", exc)
+        raise HTTPException(status_code=502, detail=str(exc)) from exc
+
+
+@router.get(
+    "/products/inventory",
+    response_model=ProductInventoryBatchResponse,
+    summary="Cross-store inventory for many products",
+)
+async def products_inventory(
+    ids: str = Query(..., min_length=1, description="Comma-separated product ObjectIds"),
+    store: str = Query(..., description="storeObjectId of the selected store"),
+    repo: InventoryRepository = Depends(dependencies.get_inventory_repo),
+    deadline: Deadline | None = Depends(request_deadline),
+) -> ProductInventoryBatchResponse:
+    """Batch form of `/products/{id}/inventory` – one database round-trip for every uncached id."""
+    # ObjectId hex is case-insensitive; lower-case keeps cache keys aligned with change events
+    product_ids = list(dict.fromkeys(i.strip().lower() for i in ids.split(",") if i.strip()))
+    if len(product_ids) > dependencies.product_inventory_batch_max:
+        raise HTTPException(
+            status_code=422,
+            detail=f"at most {dependencies.product_inventory_batch_max} ids per request",
+        )
+    found = await _store_split(repo, product_ids, store.lower(), deadline)
+    return ProductInventoryBatchResponse(
+        store=store,
+        products=[ProductInventoryOut(**found[pid]) for pid in product_ids if pid in found],
+        missing=[pid for pid in product_ids if pid not in found],
+    )
+
+
+@router.get(
+    "/products/{product_id}/inventory",
+    response_model=ProductInventoryOut,
+    summary="Selected-store vs. other-store inventory for one product",
+)
+async def product_inventory(
+    product_id: str,
+    store: str = Query(..., description="storeObjectId of the selected store"),
+    repo: InventoryRepository = Depends(dependencies.get_inventory_repo),
+    deadline: Deadline | None = Depends(request_deadline),
+) -> ProductInventoryOut:
+    """
+    The product's `storeInventory` split server-side into
+    `selectedStoreInventory` (rows of `store`) and `otherStoreInventory`.
+    Cached per product and invalidated by inventory change events.
+    """
+    product_id = product_id.lower()
+    found = await _store_split(repo, [product_id], store.lower(), deadline)
+    if product_id not in found:
+        raise HTTPException(status_code=404, detail="Inventory not found for product")
+    return ProductInventoryOut(**found[product_id])
+
+
+# ───────────────────────────  Inventory export  ──────────────────────────
+@router.get(
+    "/stores/{store_object_id}/inventory/export",
+    response_class=StreamingResponse,
+    summary="Store inventory snapshot as Arrow IPC stream or Parquet",
+)
+async def export_store_inventory(
+    store_object_id: str,
+    format: str = Query("parquet", pattern="^(arrow|parquet)$", description="`arrow` (IPC stream) or `parquet`"),
+    exporter: InventoryExporter | None = Depends(dependencies.get_inventory_exporter),
+) -> StreamingResponse:
+    """
+    One row per product stocked in the store (product attributes + that
+    store's inventory row), streamed batch by batch with a fixed schema.
+    """
+    if exporter is None:
+        raise HTTPException(status_code=501, detail="Inventory export is not enabled (pyarrow missing?)")
+    try:
+        chunks = exporter.stream(store_object_id.lower(), format)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+
+    filename = f"inventory-{store_object_id.lower()}.{FILE_EXTENSIONS[format]}"
+    logger.info("📤 [INTERFACES/routes] Inventory export | store=%s format=%s", store_object_id, format)
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
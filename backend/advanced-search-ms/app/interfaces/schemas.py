@@ -13,9 +13,12 @@ All classes inherit from `pydantic.BaseModel`, which provides:
 """
 
 import logging
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, Dict, List, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from app.domain.product import SELECTABLE_FIELDS
 
 logger = logging.getLogger("advanced-search-ms.schemas")
 
@@ -48,11 +51,55 @@ class SearchRequest(BaseModel):
         description="(Only used if option=4) Weight for text ranking in hybrid RRF fusion",
         example=0.3,
     )
+    facets: bool = Field(
+        False,
+        description="(Only used if option=2 or 4) Return category / subCategory / brand / price counts",
+    )
+    inStock: Optional[bool] = Field(
+        None,
+        description="true = only products in stock in the selected store; false = only out of stock",
+    )
+    category: Optional[List[str]] = Field(
+        None,
+        max_length=20,
+        description="Only products in any of these categories",
+        example=["Fruits & Vegetables"],
+    )
+    minPrice: Optional[float] = Field(None, ge=0, description="Inclusive lower bound on price.amount")
+    maxPrice: Optional[float] = Field(None, ge=0, description="Inclusive upper bound on price.amount")
+    fields: Optional[List[str]] = Field(
+        None,
+        min_length=1,
+        description=f"Sparse fieldset – only these product fields are returned (`id` and `score` always are). "
+                    f"Allowed: {', '.join(SELECTABLE_FIELDS)}",
+        example=["productName", "price", "imageUrlS3"],
+    )
+    explain: Optional[Literal["queryPlanner", "executionStats", "allPlansExecution"]] = Field(
+        None,
+        description="Also return the executed pipelines with their `explain` output at this verbosity "
+                    "(requires the `X-Explain-Token` header; bypasses every result cache)",
+    )
 
     def __init__(self, **data):
         logger.info("📥 [INTERFACES/schemas] Incoming SearchRequest: %s", data)
         super().__init__(**data)
 
+    @model_validator(mode="after")
+    def _check_price_range(self) -> "SearchRequest":
+        if self.minPrice is not None and self.maxPrice is not None and self.minPrice > self.maxPrice:
+            raise ValueError("minPrice must be ≤ maxPrice")
+        return self
+
+    @field_validator("fields")
+    @classmethod
+    def _check_fields(cls, value: Optional[List[str]]) -> Optional[List[str]]:
+        if value is None:
+            return value
+        unknown = [f for f in value if f not in SELECTABLE_FIELDS]
+        if unknown:
+            raise ValueError(f"unknown field(s) {unknown}; allowed: {list(SELECTABLE_FIELDS)}")
+        return list(dict.fromkeys(value))  # de-duplicated, order kept
+
 
 # ──────────────────────────────── Response Schema ────────────────────────────────
 class InventoryItemOut(BaseModel):
@@ -71,8 +118,9 @@ class PriceOut(BaseModel):
 
 
 class ProductOut(BaseModel):
+    # Everything but `id` is optional so sparse-fieldset responses validate
     id: str
-    productName: str
+    productName: Optional[str] = None
     brand: Optional[str] = None
     price: Optional[PriceOut] = None
     quantity: Optional[str] = None
@@ -80,8 +128,8 @@ class ProductOut(BaseModel):
     subCategory: Optional[str] = None
     absoluteUrl: Optional[str] = None
     aboutTheProduct: Optional[str] = None
-    imageUrlS3: str
-    inventorySummary: List[InventoryItemOut]
+    imageUrlS3: Optional[str] = None
+    inventorySummary: Optional[List[InventoryItemOut]] = None
     score: Optional[float] = None
 
     def __init__(self, **data):
@@ -89,13 +137,131 @@ class ProductOut(BaseModel):
         super().__init__(**data)
 
 
+class FacetBucketOut(BaseModel):
+    value: str
+    count: int
+
+
+class PriceBucketOut(BaseModel):
+    min: float
+    max: Optional[float] = None  # None → open-ended top bucket
+    count: int
+
+
+class FacetsOut(BaseModel):
+    category: List[FacetBucketOut]
+    subCategory: List[FacetBucketOut]
+    brand: List[FacetBucketOut]
+    price: List[PriceBucketOut]
+
+
 class SearchResponse(BaseModel):
     total_results: int
     total_pages: int
     products: List[ProductOut]
+    degraded: bool = Field(
+        False,
+        description="True when a cheaper strategy answered (e.g. text search while embeddings are unavailable)",
+    )
+    facets: Optional[FacetsOut] = Field(
+        None,
+        description="Facet counts when requested with `facets=true` (options 2 and 4)",
+    )
+    explain: Optional[List[Dict[str, Any]]] = Field(
+        None,
+        description="Explain requests only: one entry per step (embedding, aggregate, facets) "
+                    "with its time, pipeline and summarised `explain` output",
+    )
 
     def __init__(self, **data):
         logger.info("📤 [INTERFACES/schemas] Outgoing SearchResponse: %d products | total_results=%d",
                     len(data.get("products", [])),
                     data.get("total_results", 0))
         super().__init__(**data)
+
+
+# ──────────────────────────────── Suggest Schema ────────────────────────────────
+class SuggestionOut(BaseModel):
+    id: str
+    productName: str
+    brand: Optional[str] = None
+    category: Optional[str] = None
+    popularity: float = 0.0
+
+
+class SuggestResponse(BaseModel):
+    query: str
+    suggestions: List[SuggestionOut]
+
+
+# ──────────────────────────────── Stores Schema ─────────────────────────────────
+class GeoPointOut(BaseModel):
+    type: str = "Point"
+    coordinates: List[float]  # [longitude, latitude]
+
+
+class NearbyStoreOut(BaseModel):
+    id: str
+    storeId: Optional[str] = None
+    storeName: Optional[str] = None
+    location: GeoPointOut
+    distanceInKM: float
+    isNearby: bool
+
+
+class NearestStoresResponse(BaseModel):
+    origin: GeoPointOut
+    stores: List[NearbyStoreOut]
+
+
+# ────────────────────────────── Store KPI Schema ──────────────────────────────────
+class StoreKpisOut(BaseModel):
+    storeObjectId: str
+    storeId: Optional[str] = None
+    productCount: int
+    inStockCount: int
+    outOfStockCount: int
+    nearReplenishmentCount: int
+    depletingWithin: Dict[str, int] = Field(
+        ..., description="Days → products whose predictedStockDepletion is on or before today + days"
+    )
+    depletionByDate: Optional[Dict[str, int]] = None
+
+
+class StoreKpisResponse(BaseModel):
+    asOf: Optional[datetime] = Field(None, description="Time of the last inventory change applied")
+    stores: List[StoreKpisOut]
+
+
+# ──────────────────────────── Product Inventory Schema ───────────────────────────
+class StoreInventoryOut(BaseModel):
+    storeObjectId: str
+    storeId: Optional[str] = None
+    storeName: Optional[str] = None
+    location: Optional[GeoPointOut] = None
+    sectionId: Optional[str] = None
+    aisleId: Optional[str] = None
+    shelfId: Optional[str] = None
+    shelfQuantity: Optional[int] = None
+    backroomQuantity: Optional[int] = None
+    shelfLowThreshold: Optional[int] = None
+    inStock: Optional[bool] = None
+    nearToReplenishmentInShelf: Optional[bool] = None
+    predictedConsumptionPerWeek: Optional[int] = None
+    restockFrequencyDays: Optional[int] = None
+    predictedStockDepletion: Optional[str] = None
+    lastRestock: Optional[str] = None
+    nextRestock: Optional[str] = None
+
+
+class ProductInventoryOut(BaseModel):
+    productId: str
+    updatedAt: Optional[datetime] = None
+    selectedStoreInventory: List[StoreInventoryOut]
+    otherStoreInventory: List[StoreInventoryOut]
+
+
+class ProductInventoryBatchResponse(BaseModel):
+    store: str
+    products: List[ProductInventoryOut]
+    missing: List[str] = Field(default_factory=list, description="Requested ids without an inventory document")
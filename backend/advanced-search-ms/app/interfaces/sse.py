@@ -0,0 +1,66 @@
+# app/interfaces/sse.py
+"""
+Server-Sent Events framing for the per-store stock alert stream.
+
+Why
+---
+Store dashboards keep one long-lived `text/event-stream` connection instead
+of polling inventory; browsers reconnect automatically and send the last
+id they saw in `Last-Event-ID`.
+
+How it works
+------------
+* The stream starts with `retry:` (client reconnect delay) and, on resume,
+  an optional `reset` event followed by the alerts the client missed.
+* Alerts are `id:` / `event:` / `data:` (JSON) frames taken from the
+  subscription's bounded queue.
+* Without traffic a `: ping` comment is sent every `heartbeat_s` seconds so
+  proxies keep the connection open and dead clients are detected.
+* An overflowed subscription ends the stream; the browser reconnects with
+  its last id and is served from the hub's replay buffer.
+* The subscription is always released (`finally`), also when the client
+  disconnects and the response task is cancelled.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, Optional
+
+from app.application.ports import StockAlertFeed
+
+RETRY_MS = 3_000
+
+
+def frame(data: Dict[str, Any], *, event: Optional[str] = None, id: Optional[str] = None) -> bytes:
+    lines = []
+    if id is not None:
+        lines.append(f"id: {id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    lines.append("data: " + json.dumps(data, separators=(",", ":"), default=str))
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+async def alert_stream(feed: StockAlertFeed, subscription: Any, *, heartbeat_s: float) -> AsyncIterator[bytes]:
+    try:
+        yield f"retry: {RETRY_MS}\n\n".encode()
+        if subscription.reset_id is not None:
+            yield frame({"reason": "resume point unavailable – refetch store state"},
+                        event="reset", id=subscription.reset_id)
+        for alert in subscription.replay:
+            yield frame(alert.data, event=alert.event, id=alert.id)
+        subscription.replay = []
+
+        while not subscription.overflowed:
+            try:
+                alert = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat_s)
+            except asyncio.TimeoutError:
+                yield b": ping\n\n"
+                continue
+            if subscription.overflowed:
+                break  # the client resumes from the replay buffer
+            yield frame(alert.data, event=alert.event, id=alert.id)
+    finally:
+        feed.unsubscribe(subscription)
@@ -0,0 +1,304 @@
+# app/jobs/backfill_embeddings.py
+"""
+Bulk embedding backfill for the products collection.
+
+Why
+---
+After a model change or a catalog import every product's vector in
+`EMBEDDING_FIELD_NAME` has to be regenerated from its `embeddingText`.
+Doing that one product per request takes hours; this job does it in
+minutes by batching, overlapping calls and writing in bulk.
+
+How it works
+------------
+1. Streams `products` sorted by `_id` (only `_id`, `embeddingText` and the
+   `EMBEDDING_TEXT_FIELDS` are read) starting after the last checkpoint.
+   The text is rebuilt with `build_embedding_text()`, exactly as the
+   re-embed worker does, falling back to the stored `embeddingText`.
+2. Groups documents into batches of up to `MAX_BATCH_SIZE` texts and hands
+   them to `--concurrency` workers through a bounded queue (back-pressure
+   keeps memory flat however large the catalog is).
+3. Each worker waits on two token buckets (requests/min, tokens/min), calls
+   `VoyageClient.create_embeddings()` and writes the text, the vector and
+   its `embedding_text_hash()` with one unordered `bulk_write`, so the
+   re-embed worker skips the product until its text really changes.
+4. Batches finish out of order, so the checkpoint is the last `_id` of the
+   highest *contiguous* finished batch – a restart never skips a product.
+   It is kept when a run fails, is interrupted or stops at `--limit`, and
+   cleared once a run gets through the whole collection.
+5. Throughput (docs/s) and an ETA are logged every `--report-every` seconds.
+
+Usage
+-----
+    python -m app.jobs.backfill_embeddings                 # resume or start
+    python -m app.jobs.backfill_embeddings --only-missing  # fill gaps only
+    python -m app.jobs.backfill_embeddings --restart       # ignore checkpoint
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import UpdateOne
+
+from app.domain.product import EMBEDDING_TEXT_FIELDS, build_embedding_text, embedding_text_hash
+from app.infrastructure.mongodb.checkpoints import CheckpointStore
+from app.infrastructure.mongodb.client import MongoClient
+from app.infrastructure.voyage_ai.client import MAX_BATCH_SIZE, VoyageClient
+from app.shared.config import get_settings
+from app.shared.rate_limiter import TokenBucket
+
+logger = logging.getLogger("advanced-search-ms.jobs.backfill")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap upper-ish estimate (~4 chars per token) used for TPM pacing."""
+    return len(text) // 4 + 1
+
+
+@dataclass
+class _Batch:
+    seq: int
+    ids: List[Any]
+    texts: List[str]
+    digests: List[str]
+
+
+class EmbeddingBackfill:
+    """Streams, embeds and writes back product vectors with a resumable checkpoint."""
+
+    def __init__(
+        self,
+        collection: AsyncIOMotorCollection,
+        voyage: VoyageClient,
+        checkpoints: CheckpointStore,
+        *,
+        source_field: str,
+        target_field: str,
+        hash_field: str,
+        batch_size: int = MAX_BATCH_SIZE,
+        concurrency: int = 4,
+        requests: Optional[TokenBucket] = None,
+        tokens: Optional[TokenBucket] = None,
+        only_missing: bool = False,
+        limit: Optional[int] = None,
+        checkpoint_every_s: float = 5.0,
+        report_every_s: float = 10.0,
+    ) -> None:
+        self.col = collection
+        self.voyage = voyage
+        self.checkpoints = checkpoints
+        self.source_field = source_field
+        self.target_field = target_field
+        self.hash_field = hash_field
+        self.batch_size = min(batch_size, MAX_BATCH_SIZE)
+        self.concurrency = concurrency
+        self.requests = requests
+        self.tokens = tokens
+        self.only_missing = only_missing
+        self.limit = limit
+        self.checkpoint_every_s = checkpoint_every_s
+        self.report_every_s = report_every_s
+        self.key = f"backfill_embeddings:{voyage.model}:{target_field}"
+
+        self.processed = 0
+        self._finished: Dict[int, Any] = {}   # seq → last _id, waiting for earlier batches
+        self._next_seq = 0
+        self._low_water: Any = None
+        self._exhausted = False  # the cursor ran out before --limit
+        self._saved_low_water: Any = None
+        self._save_lock = asyncio.Lock()
+        self._last_save = 0.0
+
+    # ------------------------------------------------------------------ #
+    # Entry point                                                        #
+    # ------------------------------------------------------------------ #
+    async def run(self, *, restart: bool = False) -> int:
+        if restart:
+            await self.checkpoints.clear(self.key)
+        checkpoint = await self.checkpoints.load(self.key)
+        self._low_water = self._saved_low_water = checkpoint.get("lastId") if checkpoint else None
+
+        query = self._query()
+        total = await self.col.count_documents(query)
+        if self.limit is not None:
+            total = min(total, self.limit)
+        logger.info("🚚 [JOB backfill] Starting | model=%s field=%s docs=%d resumeAfter=%s",
+                    self.voyage.model, self.target_field, total, self._low_water)
+
+        queue: asyncio.Queue[Optional[_Batch]] = asyncio.Queue(maxsize=self.concurrency * 2)
+        t0 = time.perf_counter()
+        reporter = asyncio.create_task(self._report(t0, total))
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(self._produce(query, queue))
+                for _ in range(self.concurrency):
+                    tg.create_task(self._work(queue))
+        except BaseException:
+            await self._save_checkpoint(force=True)  # failed or interrupted – resume from here
+            raise
+        finally:
+            reporter.cancel()
+
+        if self._exhausted:
+            await self.checkpoints.clear(self.key)  # complete – the next run starts over
+        else:
+            await self._save_checkpoint(force=True)  # stopped at --limit
+
+        elapsed = time.perf_counter() - t0
+        logger.info("🏁 [JOB backfill] Done | %d docs in %.1fs (%.1f docs/s)",
+                    self.processed, elapsed, self.processed / elapsed if elapsed else 0.0)
+        return self.processed
+
+    # ------------------------------------------------------------------ #
+    # Pipeline stages                                                    #
+    # ------------------------------------------------------------------ #
+    def _query(self) -> Dict[str, Any]:
+        query: Dict[str, Any] = {self.source_field: {"$type": "string", "$ne": ""}}
+        if self._low_water is not None:
+            query["_id"] = {"$gt": self._low_water}
+        if self.only_missing:
+            query[self.target_field] = {"$exists": False}
+        return query
+
+    async def _produce(self, query: Dict[str, Any], queue: asyncio.Queue) -> None:
+        projection = {f: 1 for f in (self.source_field, *EMBEDDING_TEXT_FIELDS)}
+        cursor = self.col.find(query, projection).sort("_id", 1).batch_size(1_000)
+        if self.limit is not None:
+            cursor = cursor.limit(self.limit)
+
+        seq, ids, texts, digests, read = 0, [], [], [], 0
+        async for doc in cursor:
+            read += 1
+            text = build_embedding_text(doc) or doc[self.source_field]
+            ids.append(doc["_id"])
+            texts.append(text)
+            digests.append(embedding_text_hash(text, self.voyage.model))
+            if len(ids) == self.batch_size:
+                await queue.put(_Batch(seq, ids, texts, digests))
+                seq, ids, texts, digests = seq + 1, [], [], []
+        if ids:
+            await queue.put(_Batch(seq, ids, texts, digests))
+        self._exhausted = self.limit is None or read < self.limit
+        for _ in range(self.concurrency):
+            await queue.put(None)  # one stop signal per worker
+
+    async def _work(self, queue: asyncio.Queue) -> None:
+        while (batch := await queue.get()) is not None:
+            if self.requests is not None:
+                await self.requests.acquire()
+            if self.tokens is not None:
+                await self.tokens.acquire(sum(estimate_tokens(t) for t in batch.texts))
+
+            vectors = await self.voyage.create_embeddings(batch.texts)
+            await self.col.bulk_write(
+                [
+                    UpdateOne({"_id": _id}, {"$set": {
+                        self.source_field: text,
+                        self.target_field: vec,
+                        self.hash_field: digest,
+                    }})
+                    for _id, text, vec, digest in zip(batch.ids, batch.texts, vectors, batch.digests)
+                ],
+                ordered=False,
+            )
+            self.processed += len(batch.ids)
+            await self._finish(batch)
+
+    # ------------------------------------------------------------------ #
+    # Checkpointing & reporting                                          #
+    # ------------------------------------------------------------------ #
+    async def _finish(self, batch: _Batch) -> None:
+        self._finished[batch.seq] = batch.ids[-1]
+        while self._next_seq in self._finished:
+            self._low_water = self._finished.pop(self._next_seq)
+            self._next_seq += 1
+        if time.monotonic() - self._last_save >= self.checkpoint_every_s:
+            await self._save_checkpoint()
+
+    async def _save_checkpoint(self, *, force: bool = False) -> None:
+        async with self._save_lock:  # keeps saves in order; always writes the latest mark
+            if self._low_water is None or (self._low_water == self._saved_low_water and not force):
+                return
+            await self.checkpoints.save(self.key, lastId=self._low_water, model=self.voyage.model)
+            self._saved_low_water = self._low_water
+            self._last_save = time.monotonic()
+
+    async def _report(self, t0: float, total: int) -> None:
+        while True:
+            await asyncio.sleep(self.report_every_s)
+            elapsed = time.perf_counter() - t0
+            rate = self.processed / elapsed if elapsed else 0.0
+            eta = (total - self.processed) / rate if rate else float("inf")
+            logger.info("📈 [JOB backfill] %d/%d docs | %.1f docs/s | ETA %.0fs",
+                        self.processed, total, rate, eta)
+
+
+# --------------------------------------------------------------------------- #
+# CLI                                                                         #
+# --------------------------------------------------------------------------- #
+def _parse_args() -> argparse.Namespace:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Re-embed products in bulk with Voyage AI.")
+    parser.add_argument("--batch-size", type=int, default=settings.EMBEDDING_BATCH_SIZE,
+                        help=f"texts per Voyage call (max {MAX_BATCH_SIZE})")
+    parser.add_argument("--concurrency", type=int, default=4, help="Voyage calls in flight")
+    parser.add_argument("--rpm", type=int, default=settings.VOYAGE_REQUESTS_PER_MINUTE, help="requests per minute")
+    parser.add_argument("--tpm", type=int, default=settings.VOYAGE_TOKENS_PER_MINUTE, help="tokens per minute")
+    parser.add_argument("--only-missing", action="store_true", help="skip products that already have a vector")
+    parser.add_argument("--restart", action="store_true", help="ignore the stored checkpoint")
+    parser.add_argument("--limit", type=int, default=None, help="stop after N products")
+    parser.add_argument("--report-every", type=float, default=10.0, help="seconds between progress logs")
+    return parser.parse_args()
+
+
+async def _main(args: argparse.Namespace) -> None:
+    settings = get_settings()
+    mongo = MongoClient(
+        uri=settings.MONGODB_URI,
+        database=settings.MONGODB_DATABASE,
+        collection=settings.PRODUCTS_COLLECTION,
+        index_name=settings.SEARCH_VECTOR_INDEX,
+        embedding_field=settings.EMBEDDING_FIELD_NAME,
+        max_pool_size=args.concurrency + 2,
+        min_pool_size=0,
+    )
+    await mongo.connect()
+    try:
+        job = EmbeddingBackfill(
+            mongo.collection,
+            VoyageClient(
+                api_key=settings.VOYAGE_API_KEY,
+                base_url=settings.VOYAGE_API_URL,
+                model=settings.VOYAGE_MODEL,
+            ),
+            CheckpointStore(mongo.database[settings.JOBS_CHECKPOINT_COLLECTION]),
+            source_field=settings.EMBEDDING_SOURCE_FIELD,
+            target_field=settings.EMBEDDING_FIELD_NAME,
+            hash_field=settings.EMBEDDING_HASH_FIELD,
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+            requests=TokenBucket.per_minute(args.rpm),
+            tokens=TokenBucket.per_minute(args.tpm),
+            only_missing=args.only_missing,
+            limit=args.limit,
+            report_every_s=args.report_every,
+        )
+        await job.run(restart=args.restart)
+    finally:
+        mongo.client.close()
+
+
+def main() -> None:
+    logging.basicConfig(format="%(asctime)s %(levelname)s %(name)s – %(message)s", level=logging.INFO)
+    asyncio.run(_main(_parse_args()))
+
+
+if __name__ == "__main__":
+    main()
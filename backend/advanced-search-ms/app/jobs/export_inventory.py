@@ -0,0 +1,110 @@
+# app/jobs/export_inventory.py
+"""
+Per-store inventory snapshot to an Arrow IPC or Parquet file.
+
+Why
+---
+BI notebooks and scheduled loads want the same columnar snapshot as
+`GET /api/v1/stores/{id}/inventory/export` without going through the API
+(e.g. nightly, for every store, straight into a data lake folder).
+
+How it works
+------------
+* Same `MongoInventoryExporter` as the endpoint: one aggregation cursor,
+  `--batch-rows` rows per Arrow record batch, explicit schema.
+* Bytes are appended to `<out>.part` as they are produced and renamed on
+  success, so a crashed run never leaves a truncated file behind.
+* `--store` may be repeated; `--all-stores` exports every store in
+  `STORES_COLLECTION`, one file each.
+* Needs `pyarrow` (`poetry install -E analytics`).
+
+Usage
+-----
+    python -m app.jobs.export_inventory --store 684aa28064ff7c785a568ae9 --format parquet --out-dir ./exports
+    python -m app.jobs.export_inventory --all-stores --format arrow --out-dir ./exports
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+from pathlib import Path
+from typing import List
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.infrastructure.mongodb import inventory_export
+from app.shared.config import get_settings
+
+logger = logging.getLogger("advanced-search-ms.jobs.export-inventory")
+
+
+async def export_store(
+    exporter: inventory_export.MongoInventoryExporter,
+    store_object_id: str,
+    fmt: str,
+    out_dir: Path,
+) -> Path:
+    """Write one store's snapshot atomically; returns the final path."""
+    target = out_dir / f"inventory-{store_object_id}.{inventory_export.FILE_EXTENSIONS[fmt]}"
+    partial = target.with_name(target.name + ".part")
+    t0 = time.perf_counter()
+    size = 0
+    with open(partial, "wb") as fh:
+        async for chunk in exporter.stream(store_object_id, fmt):
+            fh.write(chunk)
+            size += len(chunk)
+    os.replace(partial, target)
+    logger.info("📦 %s → %s (%.1f KiB in %.1fs)", store_object_id, target, size / 1024, time.perf_counter() - t0)
+    return target
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Export store inventory as Arrow IPC / Parquet.")
+    parser.add_argument("--uri", default=None, help="MongoDB URI (defaults to MONGODB_URI)")
+    parser.add_argument("--store", action="append", default=[], help="storeObjectId (repeatable)")
+    parser.add_argument("--all-stores", action="store_true", help="export every store in STORES_COLLECTION")
+    parser.add_argument("--format", choices=sorted(inventory_export.MEDIA_TYPES), default="parquet")
+    parser.add_argument("--out-dir", type=Path, default=Path("."))
+    parser.add_argument("--batch-rows", type=int, default=None, help="rows per record batch (defaults to INVENTORY_EXPORT_BATCH_ROWS)")
+    args = parser.parse_args()
+    if not args.store and not args.all_stores:
+        parser.error("give --store at least once or --all-stores")
+    return args
+
+
+async def _main(args: argparse.Namespace) -> None:
+    if not inventory_export.available():
+        raise SystemExit("pyarrow is not installed – run `poetry install -E analytics`")
+
+    settings = get_settings()
+    mongo = AsyncIOMotorClient(args.uri or settings.MONGODB_URI)
+    db = mongo[settings.MONGODB_DATABASE]
+    exporter = inventory_export.MongoInventoryExporter(
+        db[settings.INVENTORY_COLLECTION],
+        products_collection=settings.PRODUCTS_COLLECTION,
+        batch_rows=args.batch_rows or settings.INVENTORY_EXPORT_BATCH_ROWS,
+    )
+
+    stores: List[str] = [s.lower() for s in args.store]
+    if args.all_stores:
+        stores += [str(d["_id"]) for d in await db[settings.STORES_COLLECTION].find({}, {"_id": 1}).to_list(length=None)]
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+
+    try:
+        for store in dict.fromkeys(stores):
+            await export_store(exporter, store, args.format, args.out_dir)
+    finally:
+        mongo.close()
+
+
+def main() -> None:
+    logging.basicConfig(format="%(asctime)s %(levelname)s %(name)s – %(message)s", level=logging.INFO)
+    asyncio.run(_main(_parse_args()))
+
+
+if __name__ == "__main__":
+    main()
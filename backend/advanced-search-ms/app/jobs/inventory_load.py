@@ -0,0 +1,258 @@
+# app/jobs/inventory_load.py
+"""
+Inventory write-load generator + search latency probe.
+
+Why
+---
+Our worst search latency shows up when inventory updates and search traffic
+overlap. The only write simulator is the Atlas scheduled trigger
+`docs/setup/atlas-triggers/daily_inventory_simulation.js`, which cannot run
+against a local MongoDB. This job reproduces it from Python so the
+"search under write pressure" curve can be measured anywhere.
+
+How it works
+------------
+* Loads the `inventory` documents once (`_id` + `storeInventory`) so the
+  writer itself issues no reads.
+* For every write rate in `--rates` (docs/s) it runs for `--step-seconds`:
+  - **writer** – random docs, regenerated exactly like the JS trigger
+    (shelf 0-50, backroom 0-60, threshold 5-12, coherent `inStock` /
+    `nearToReplenishmentInShelf`, consumption & restock dates), applied in
+    unordered `bulk_write`s of `--batch` docs paced by a token bucket;
+  - **probe** (unless `--no-search`) – `--search-concurrency` clients calling
+    `POST /api/v1/search` back-to-back and recording latency.
+* Prints one line per step: achieved write rate, search p50 / p95 / p99 and
+  errors, so the p99 degradation against write rate is visible at a glance.
+  `--json` also writes the results to a file.
+
+Usage
+-----
+    python -m app.jobs.inventory_load --rates 0,100,500,1000 --step-seconds 30 \\
+        --search-url http://localhost:8000 --option 4
+    python -m app.jobs.inventory_load --rates 200 --step-seconds 600 --no-search   # writes only
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import httpx
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
+from pymongo import UpdateOne
+
+from app.shared.config import get_settings
+from app.shared.rate_limiter import TokenBucket
+
+logger = logging.getLogger("advanced-search-ms.jobs.inventory-load")
+
+DEFAULT_QUERIES = ["milk", "organic onion", "basmati rice", "shampoo", "green tea", "chocolate", "olive oil"]
+
+
+# --------------------------------------------------------------------------- #
+# Write side – mirrors daily_inventory_simulation.js                          #
+# --------------------------------------------------------------------------- #
+def simulate_store_row(row: Dict[str, Any], today: Optional[date] = None) -> Dict[str, Any]:
+    """New quantities and coherent flags for one `storeInventory` entry."""
+    today = today or date.today()
+    shelf_qty = random.randint(0, 50)
+    back_qty = random.randint(0, 60)
+    low_thr = random.randint(5, 12)
+    total = shelf_qty + back_qty
+    weekly = random.randint(20, 120)
+    days_out = max(1, int(total / (weekly / 7)))
+    return {
+        **row,
+        "shelfQuantity": shelf_qty,
+        "backroomQuantity": back_qty,
+        "shelfLowThreshold": low_thr,
+        "inStock": total > 0,
+        "nearToReplenishmentInShelf": shelf_qty < low_thr,
+        "predictedConsumptionPerWeek": weekly,
+        "predictedStockDepletion": (today + timedelta(days=days_out)).isoformat(),
+        "lastRestock": (today - timedelta(days=random.randint(1, 10))).isoformat(),
+        "nextRestock": (today + timedelta(days=random.randint(1, 15))).isoformat(),
+    }
+
+
+async def write_load(
+    inventory: AsyncIOMotorCollection,
+    docs: List[Dict[str, Any]],
+    *,
+    rate_per_s: float,
+    batch: int,
+    stop_at: float,
+) -> int:
+    """Bulk-update random inventory docs at `rate_per_s` until `stop_at`; returns docs written."""
+    if rate_per_s <= 0:
+        await asyncio.sleep(max(0.0, stop_at - time.monotonic()))
+        return 0
+
+    bucket = TokenBucket(rate_per_s, max(batch, rate_per_s))
+    written = 0
+    while time.monotonic() < stop_at:
+        await bucket.acquire(batch)
+        now = datetime.now(timezone.utc)
+        ops = [
+            UpdateOne(
+                {"_id": doc["_id"]},
+                {"$set": {
+                    "storeInventory": [simulate_store_row(r) for r in doc.get("storeInventory", [])],
+                    "updatedAt": now,
+                }},
+            )
+            for doc in random.sample(docs, min(batch, len(docs)))
+        ]
+        await inventory.bulk_write(ops, ordered=False)
+        written += len(ops)
+    return written
+
+
+# --------------------------------------------------------------------------- #
+# Read side – search latency probe                                            #
+# --------------------------------------------------------------------------- #
+async def search_probe(
+    client: httpx.AsyncClient,
+    *,
+    store_object_id: str,
+    option: int,
+    queries: List[str],
+    stop_at: float,
+    latencies: List[float],
+    errors: List[int],
+) -> None:
+    while time.monotonic() < stop_at:
+        body = {
+            "query": random.choice(queries),
+            "storeObjectId": store_object_id,
+            "option": option,
+            "page": 1,
+            "page_size": 20,
+        }
+        t0 = time.perf_counter()
+        try:
+            resp = await client.post("/api/v1/search", json=body)
+            if resp.status_code != 200:
+                errors.append(resp.status_code)
+        except httpx.HTTPError:
+            errors.append(0)
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile (`q` in 0–100); 0.0 for an empty sample."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+# --------------------------------------------------------------------------- #
+# Driver                                                                      #
+# --------------------------------------------------------------------------- #
+async def run_step(
+    inventory: AsyncIOMotorCollection,
+    docs: List[Dict[str, Any]],
+    search: Optional[httpx.AsyncClient],
+    args: argparse.Namespace,
+    store_object_id: str,
+    rate: float,
+) -> Dict[str, Any]:
+    stop_at = time.monotonic() + args.step_seconds
+    latencies: List[float] = []
+    errors: List[int] = []
+
+    writer = write_load(inventory, docs, rate_per_s=rate, batch=args.batch, stop_at=stop_at)
+    probes = [
+        search_probe(
+            search,
+            store_object_id=store_object_id,
+            option=args.option,
+            queries=args.queries,
+            stop_at=stop_at,
+            latencies=latencies,
+            errors=errors,
+        )
+        for _ in range(args.search_concurrency if search else 0)
+    ]
+    written, *_ = await asyncio.gather(writer, *probes)
+    return {
+        "targetWritesPerSec": rate,
+        "writesPerSec": round(written / args.step_seconds, 1),
+        "searches": len(latencies),
+        "errors": len(errors),
+        "p50Ms": round(percentile(latencies, 50), 1),
+        "p95Ms": round(percentile(latencies, 95), 1),
+        "p99Ms": round(percentile(latencies, 99), 1),
+    }
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Inventory write load + search p99 probe.")
+    parser.add_argument("--uri", default=None, help="MongoDB URI (defaults to MONGODB_URI)")
+    parser.add_argument("--rates", default="0,100,500", help="comma-separated write rates in docs/s, one step each")
+    parser.add_argument("--step-seconds", type=float, default=30.0)
+    parser.add_argument("--batch", type=int, default=100, help="docs per bulk_write")
+    parser.add_argument("--search-url", default="http://localhost:8000")
+    parser.add_argument("--search-concurrency", type=int, default=8)
+    parser.add_argument("--option", type=int, default=2, choices=[1, 2, 3, 4])
+    parser.add_argument("--store", default=None, help="storeObjectId to search (defaults to the first one found)")
+    parser.add_argument("--queries", type=lambda s: s.split(","), default=DEFAULT_QUERIES)
+    parser.add_argument("--no-search", action="store_true", help="generate writes only")
+    parser.add_argument("--json", default=None, help="write step results to this file")
+    return parser.parse_args()
+
+
+async def _main(args: argparse.Namespace) -> None:
+    settings = get_settings()
+    mongo = AsyncIOMotorClient(args.uri or settings.MONGODB_URI)
+    inventory = mongo[settings.MONGODB_DATABASE][settings.INVENTORY_COLLECTION]
+
+    docs = await inventory.find({}, {"storeInventory": 1}).to_list(length=None)
+    if not docs:
+        raise SystemExit(f"No documents in '{settings.INVENTORY_COLLECTION}' – import the demo data first")
+    store_object_id = args.store or next(
+        (str(r["storeObjectId"]) for d in docs for r in d.get("storeInventory", []) if r.get("storeObjectId")),
+        "",
+    )
+    logger.info("📦 [JOB inventory-load] %d inventory docs loaded | store=%s", len(docs), store_object_id)
+
+    results = []
+    search = None if args.no_search else httpx.AsyncClient(base_url=args.search_url, timeout=30)
+    try:
+        for rate in (float(r) for r in args.rates.split(",")):
+            logger.info("▶️ [JOB inventory-load] Step: %.0f writes/s for %.0fs", rate, args.step_seconds)
+            step = await run_step(inventory, docs, search, args, store_object_id, rate)
+            results.append(step)
+            logger.info("📈 [JOB inventory-load] writes/s=%.1f | searches=%d errors=%d | p50=%.1f p95=%.1f p99=%.1f ms",
+                        step["writesPerSec"], step["searches"], step["errors"],
+                        step["p50Ms"], step["p95Ms"], step["p99Ms"])
+    finally:
+        if search is not None:
+            await search.aclose()
+        mongo.close()
+
+    print(f"{'writes/s':>10} {'searches':>9} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for r in results:
+        print(f"{r['writesPerSec']:>10.1f} {r['searches']:>9d} {r['errors']:>7d} "
+              f"{r['p50Ms']:>8.1f} {r['p95Ms']:>8.1f} {r['p99Ms']:>8.1f}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+
+
+def main() -> None:
+    logging.basicConfig(format="%(asctime)s %(levelname)s %(name)s – %(message)s", level=logging.INFO)
+    asyncio.run(_main(_parse_args()))
+
+
+if __name__ == "__main__":
+    main()
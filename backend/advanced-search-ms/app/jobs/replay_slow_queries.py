@@ -0,0 +1,288 @@
+# app/jobs/replay_slow_queries.py
+"""
+Replay recorded slow search aggregations against any cluster.
+
+Why
+---
+`SlowQueryLog` keeps the exact pipelines that were slow in production.
+This job runs them again – on the same cluster, a staging copy or a local
+MongoDB – so an index or pipeline-builder change can be measured on the
+queries that actually hurt instead of on guessed ones.
+
+How it works
+------------
+* Reads the log (`--log`, default `SLOW_QUERY_LOG_PATH`), keeps the most
+  recent entry per `id` (with how often and how slow it was seen) and
+  filters by `--option` / `--min-ms` / `--last`.
+* Runs each pipeline `--warmup` times untimed, then `--repeat` times and
+  reports min / p50 / max latency and the rows returned.
+* `--rebuild` regenerates each pipeline from its recorded parameters with
+  the *current* builders (the repository's own code path, nothing is
+  executed while building), so a builder change can be compared with the
+  recorded one. Entries whose pipeline changed are flagged.
+* Entries recorded with redacted query vectors (options 3 / 4 without
+  `SLOW_QUERY_KEEP_VECTORS`) cannot be replayed and are listed as skipped.
+* `--json` writes the results; `--baseline` reads a previous `--json` file
+  and adds the p50 change per entry – the before / after comparison.
+
+Usage
+-----
+    python -m app.jobs.replay_slow_queries --list
+    python -m app.jobs.replay_slow_queries --repeat 10 --json before.json
+    # … create the index / change the builder …
+    python -m app.jobs.replay_slow_queries --repeat 10 --rebuild --baseline before.json
+    python -m app.jobs.replay_slow_queries --uri mongodb://localhost:27017 --database retail --option text
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import time
+from typing import Any, Dict, List, Optional
+
+from bson import json_util
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
+
+from app.domain.search_filters import SearchFilters
+from app.infrastructure.mongodb.search_repository import MongoSearchRepository
+from app.infrastructure.mongodb.slow_query_log import SlowQueryLog
+from app.shared.config import get_settings
+
+logger = logging.getLogger("advanced-search-ms.jobs.replay-slow-queries")
+
+OPTIONS = ("keyword", "text", "vector", "hybrid", "facets")
+
+
+# --------------------------------------------------------------------------- #
+# Selection                                                                   #
+# --------------------------------------------------------------------------- #
+def select_entries(
+    entries: List[Dict[str, Any]],
+    *,
+    options: Optional[List[str]] = None,
+    min_ms: float = 0.0,
+    last: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Most recent entry per id, with `seen` / `worstMs`, newest first."""
+    latest: Dict[str, Dict[str, Any]] = {}
+    for entry in entries:  # oldest first
+        previous = latest.get(entry["id"])
+        entry["seen"] = (previous["seen"] if previous else 0) + 1
+        entry["worstMs"] = max(entry["elapsedMs"], previous["worstMs"] if previous else 0.0)
+        latest[entry["id"]] = entry
+    picked = [
+        e for e in latest.values()
+        if (not options or e["option"] in options) and e["worstMs"] >= min_ms
+    ]
+    picked.sort(key=lambda e: e["at"], reverse=True)
+    return picked[:last] if last else picked
+
+
+# --------------------------------------------------------------------------- #
+# Rebuild with the current builders                                           #
+# --------------------------------------------------------------------------- #
+class _PipelineCapture(MongoSearchRepository):
+    """Runs the repository's search methods but only keeps the pipeline they would send."""
+
+    captured: List[Dict[str, Any]]
+
+    async def _aggregate(self, col: AsyncIOMotorCollection, pipeline: List[Dict], max_time_ms: int) -> List[Dict]:
+        self.captured = pipeline
+        return []
+
+
+def _query_vector(node: Any) -> Optional[List[float]]:
+    if isinstance(node, dict):
+        if isinstance(node.get("queryVector"), list):
+            return node["queryVector"]
+        node = list(node.values())
+    if isinstance(node, list):
+        for child in node:
+            if (found := _query_vector(child)) is not None:
+                return found
+    return None
+
+
+def _canonical(pipeline: List[Dict[str, Any]]) -> str:
+    # Round-trip first: the log stores `{"$regex": …}` operators, which read back as BSON regexes
+    return json_util.dumps(json_util.loads(json_util.dumps(pipeline)))
+
+
+async def rebuild_pipeline(capture: _PipelineCapture, entry: Dict[str, Any]) -> List[Dict[str, Any]]:
+    params = dict(entry["params"])
+    if params.get("filters"):
+        params["filters"] = SearchFilters(**{**params["filters"], "categories": tuple(params["filters"]["categories"])})
+    option = entry["option"]
+    if option in ("vector", "hybrid"):
+        params["embedding"] = _query_vector(entry["pipeline"])
+    method = {
+        "keyword": capture.search_keyword,
+        "text": capture.search_atlas_text,
+        "vector": capture.search_by_vector,
+        "hybrid": capture.search_hybrid_rrf,
+        "facets": capture.search_facets,
+    }[option]
+    await method(**params)
+    return capture.captured
+
+
+# --------------------------------------------------------------------------- #
+# Replay                                                                      #
+# --------------------------------------------------------------------------- #
+async def replay(
+    col: AsyncIOMotorCollection,
+    pipeline: List[Dict[str, Any]],
+    *,
+    repeat: int,
+    warmup: int,
+    max_time_ms: int,
+) -> Dict[str, Any]:
+    """Latency of *pipeline* over `repeat` timed runs (after `warmup` untimed ones)."""
+    latencies: List[float] = []
+    rows = 0
+    for i in range(warmup + repeat):
+        t0 = time.perf_counter()
+        result = await col.aggregate(pipeline, maxTimeMS=max_time_ms).to_list(length=None)
+        if i >= warmup:
+            latencies.append((time.perf_counter() - t0) * 1000)
+        root = result[0] if result else {}
+        rows = len(root["docs"]) if "docs" in root else len(result)  # search pipelines wrap their page in `docs`
+    return {
+        "minMs": round(min(latencies), 1),
+        "p50Ms": round(statistics.median(latencies), 1),
+        "maxMs": round(max(latencies), 1),
+        "rows": rows,
+    }
+
+
+async def run_entry(
+    client: AsyncIOMotorClient,
+    capture: Optional[_PipelineCapture],
+    entry: Dict[str, Any],
+    args: argparse.Namespace,
+) -> Dict[str, Any]:
+    result: Dict[str, Any] = {
+        "id": entry["id"],
+        "option": entry["option"],
+        "query": entry["params"].get("query"),
+        "seen": entry["seen"],
+        "recordedMs": entry["worstMs"],
+    }
+    if entry.get("vectorsRedacted") and entry["option"] in ("vector", "hybrid"):
+        result["skipped"] = "query vector was redacted (SLOW_QUERY_KEEP_VECTORS=false)"
+        return result
+
+    pipeline = entry["pipeline"]
+    if capture is not None:
+        rebuilt = await rebuild_pipeline(capture, entry)
+        result["pipelineChanged"] = _canonical(rebuilt) != _canonical(pipeline)
+        pipeline = rebuilt
+
+    col = client[args.database or entry["database"]][args.collection or entry["collection"]]
+    try:
+        result.update(await replay(col, pipeline, repeat=args.repeat, warmup=args.warmup,
+                                   max_time_ms=args.max_time_ms))
+    except Exception as exc:  # noqa: BLE001 – report and continue with the next entry
+        result["error"] = str(exc)
+    return result
+
+
+def _print(results: List[Dict[str, Any]], baseline: Dict[str, Dict[str, Any]]) -> None:
+    print(f"{'id':<16} {'option':<8} {'seen':>5} {'rec ms':>8} {'min ms':>8} {'p50 ms':>8} {'max ms':>8} "
+          f"{'rows':>5} {'base p50':>9} {'Δ p50':>7}  query")
+    for r in results:
+        query = (r.get("query") or "")[:30] + (" *rebuilt" if r.get("pipelineChanged") else "")
+        if "p50Ms" not in r:
+            print(f"{r['id']:<16} {r['option']:<8} {r['seen']:>5} {r['recordedMs']:>8.1f}  "
+                  f"{r.get('skipped') or r.get('error')}  {query}")
+            continue
+        before = baseline.get(r["id"], {}).get("p50Ms")
+        delta = f"{(r['p50Ms'] - before) / before * 100:+6.0f}%" if before else f"{'–':>7}"
+        base = f"{before:>9.1f}" if before is not None else f"{'–':>9}"
+        print(f"{r['id']:<16} {r['option']:<8} {r['seen']:>5} {r['recordedMs']:>8.1f} {r['minMs']:>8.1f} "
+              f"{r['p50Ms']:>8.1f} {r['maxMs']:>8.1f} {r['rows']:>5d} {base} {delta}  {query}")
+
+
+# --------------------------------------------------------------------------- #
+# Driver                                                                      #
+# --------------------------------------------------------------------------- #
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay recorded slow search aggregations.")
+    parser.add_argument("--log", default=None, help="slow-query log directory (defaults to SLOW_QUERY_LOG_PATH)")
+    parser.add_argument("--uri", default=None, help="MongoDB URI to replay against (defaults to MONGODB_URI)")
+    parser.add_argument("--database", default=None, help="override the recorded database")
+    parser.add_argument("--collection", default=None, help="override the recorded collection")
+    parser.add_argument("--option", action="append", choices=OPTIONS, help="only these options (repeatable)")
+    parser.add_argument("--min-ms", type=float, default=0.0, help="only entries recorded at least this slow")
+    parser.add_argument("--last", type=int, default=None, help="only the N most recent distinct queries")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per query")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed runs per query first")
+    parser.add_argument("--max-time-ms", type=int, default=60_000)
+    parser.add_argument("--rebuild", action="store_true", help="rebuild pipelines with the current builders")
+    parser.add_argument("--list", action="store_true", help="list the selected entries without running them")
+    parser.add_argument("--json", default=None, help="write the results to this file")
+    parser.add_argument("--baseline", default=None, help="results of a previous --json run to compare with")
+    return parser.parse_args()
+
+
+async def _main(args: argparse.Namespace) -> None:
+    settings = get_settings()
+    root = args.log or settings.SLOW_QUERY_LOG_PATH
+    if not root or not os.path.isdir(root):
+        raise SystemExit(f"No slow-query log at {root!r} – pass --log or set SLOW_QUERY_LOG_PATH")
+    entries = select_entries(
+        list(SlowQueryLog(root).entries()), options=args.option, min_ms=args.min_ms, last=args.last,
+    )
+    logger.info("📼 [JOB replay-slow-queries] %d distinct slow queries selected from %s", len(entries), root)
+
+    if args.list:
+        for e in entries:
+            print(f"{e['id']}  {e['at']}  {e['option']:<8} {e['worstMs']:>8.1f} ms  ×{e['seen']:<4} "
+                  f"{e['params'].get('query', '')!r}{'  (error: ' + e['error'] + ')' if e.get('error') else ''}")
+        return
+
+    baseline: Dict[str, Dict[str, Any]] = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = {r["id"]: r for r in json.load(fh)}
+
+    client = AsyncIOMotorClient(args.uri or settings.MONGODB_URI)
+    capture = None
+    if args.rebuild:
+        capture = _PipelineCapture(
+            collection=client[settings.MONGODB_DATABASE][settings.PRODUCTS_COLLECTION],
+            index_name_text=settings.SEARCH_TEXT_INDEX,
+            index_name_vector=settings.SEARCH_VECTOR_INDEX,
+            embedding_field=settings.EMBEDDING_FIELD_NAME,
+            facet_price_boundaries=settings.SEARCH_FACET_PRICE_BOUNDARIES,
+            facet_num_buckets=settings.SEARCH_FACET_NUM_BUCKETS,
+        )
+
+    results = []
+    try:
+        for entry in entries:
+            result = await run_entry(client, capture, entry, args)
+            results.append(result)
+            logger.info("▶️ [JOB replay-slow-queries] %s (%s) → %s", entry["id"], entry["option"],
+                        f"p50 {result['p50Ms']} ms" if "p50Ms" in result else result.get("skipped") or result.get("error"))
+    finally:
+        client.close()
+
+    _print(results, baseline)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+
+
+def main() -> None:
+    logging.basicConfig(format="%(asctime)s %(levelname)s %(name)s – %(message)s", level=logging.INFO)
+    asyncio.run(_main(_parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# app/shared/admission.py
+"""
+Per-search-option admission control and load shedding.
+
+Purpose: Keep a flood of expensive queries (hybrid `$rankFusion`, vector)
+         from starving cheap ones (keyword) of Motor pool connections.
+Why: Without limits every request queues for the shared pool; once it is
+     exhausted, the tail latency of *all* options grows without bound.
+How: Each option gets a concurrency limit and a bounded wait queue.
+     • slot free            → run immediately
+     • slot busy, queue ok  → wait (never longer than the request `Deadline`)
+     • queue full           → `OverloadedError` right away (API → 429 + Retry-After)
+     In-flight and queue-depth gauges plus shed / timed-out counters are
+     published to `app.shared.metrics` with an `option` label.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+from app.shared.config import AdmissionLimit
+from app.shared.deadline import Deadline
+from app.shared.exceptions import DeadlineExceededError, OverloadedError
+from app.shared.metrics import metrics
+
+logger = logging.getLogger("advanced-search-ms.admission")
+
+
+class _Gate:
+    """Concurrency limit + bounded queue for one option."""
+
+    def __init__(self, option: str, limit: AdmissionLimit) -> None:
+        self.option = option
+        self.max_queue = limit.max_queue
+        self.semaphore = asyncio.Semaphore(limit.max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+
+    def publish(self) -> None:
+        metrics.set_gauge("admission.in_flight", self.in_flight, option=self.option)
+        metrics.set_gauge("admission.queue_depth", self.waiting, option=self.option)
+
+
+class AdmissionController:
+    """Gates use-case execution per option; unknown options pass through."""
+
+    def __init__(self, limits: Dict[str, AdmissionLimit], *, retry_after_s: int = 1) -> None:
+        self.retry_after_s = retry_after_s
+        self._gates = {option: _Gate(option, limit) for option, limit in limits.items()}
+        for gate in self._gates.values():
+            gate.publish()
+
+    @asynccontextmanager
+    async def admit(self, option: str, deadline: Optional[Deadline] = None) -> AsyncIterator[None]:
+        gate = self._gates.get(option)
+        if gate is None:
+            yield
+            return
+
+        await self._acquire(gate, deadline)
+        gate.in_flight += 1
+        gate.publish()
+        try:
+            yield
+        finally:
+            gate.in_flight -= 1
+            gate.semaphore.release()
+            gate.publish()
+
+    async def _acquire(self, gate: _Gate, deadline: Optional[Deadline]) -> None:
+        if not gate.semaphore.locked():
+            await gate.semaphore.acquire()  # returns without suspending
+            return
+
+        if gate.waiting >= gate.max_queue:
+            metrics.inc("admission.shed", option=gate.option)
+            logger.warning("🚦 [admission] %s queue full (%d waiting) – shedding", gate.option, gate.waiting)
+            raise OverloadedError(f"Too many concurrent {gate.option} searches", retry_after_s=self.retry_after_s)
+
+        gate.waiting += 1
+        gate.publish()
+        try:
+            timeout = deadline.remaining_s() if deadline else None
+            await asyncio.wait_for(gate.semaphore.acquire(), timeout=timeout)
+        except asyncio.TimeoutError as exc:
+            metrics.inc("admission.timed_out", option=gate.option)
+            raise DeadlineExceededError(f"Request deadline exceeded while queued for a {gate.option} slot") from exc
+        finally:
+            gate.waiting -= 1
+            gate.publish()
@@ -7,8 +7,42 @@ Why: Ensures secure, type-checked config and support for .env files.
 How: Defines a Settings class and `get_settings` to instantiate it.
 """
 
+from typing import Dict, List, Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, field_validator
 from pydantic_settings import BaseSettings
 
+# Search options that can be routed (keys of SEARCH_READ_ROUTING)
+SEARCH_OPTIONS = ("keyword", "text", "vector", "hybrid")
+READ_MODES = ("primary", "primaryPreferred", "secondary", "secondaryPreferred", "nearest")
+
+
+class ReadRouting(BaseModel):
+    """Where one search option sends its aggregations (see SEARCH_READ_ROUTING)."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    mode: str = "primary"  # primary | primaryPreferred | secondary | secondaryPreferred | nearest
+    max_staleness_s: int = -1  # -1 = no limit (≥ 90 when set)
+    tag_sets: Optional[List[Dict[str, str]]] = None
+    hedge_after_ms: Optional[int] = None  # start a duplicate read after N ms
+    hedge_mode: Optional[str] = None  # duplicate's mode; default secondaryPreferred (nearest if mode is nearest)
+
+    @field_validator("mode", "hedge_mode")
+    @classmethod
+    def _check_mode(cls, value: Optional[str]) -> Optional[str]:
+        if value is not None and value.lower() not in {m.lower() for m in READ_MODES}:
+            raise ValueError(f"unknown read preference mode {value!r}; allowed: {list(READ_MODES)}")
+        return value
+
+
+class AdmissionLimit(BaseModel):
+    """Concurrency cap and wait-queue size for one search option (see SEARCH_ADMISSION)."""
+
+    max_concurrency: int
+    max_queue: int
+
+
 class Settings(BaseSettings):
     # MongoDB
     MONGODB_URI: str
@@ -17,12 +51,148 @@ class Settings(BaseSettings):
     SEARCH_TEXT_INDEX: str
     SEARCH_VECTOR_INDEX: str
     EMBEDDING_FIELD_NAME: str
+    MONGODB_MAX_POOL_SIZE: int = 50
+    MONGODB_MIN_POOL_SIZE: int = 10
+
+    INVENTORY_COLLECTION: str = "inventory"
+    STORES_COLLECTION: str = "stores"
+
+    # Inventory → product summary sync worker (replaces the Atlas trigger)
+    INVENTORY_SYNC_WINDOW_MS: int = 500
+    INVENTORY_SYNC_MAX_BATCH: int = 1_000
+
+    # Read routing per search option: keys keyword | text | vector | hybrid.
+    # JSON, e.g. {"vector": {"mode": "nearest", "tag_sets": [{"nodeType": "ANALYTICS"}], "hedge_after_ms": 150}}
+    SEARCH_READ_ROUTING: Dict[str, ReadRouting] = {}
+
+    @field_validator("SEARCH_READ_ROUTING")
+    @classmethod
+    def _check_routed_options(cls, value: Dict[str, ReadRouting]) -> Dict[str, ReadRouting]:
+        unknown = sorted(set(value) - set(SEARCH_OPTIONS))
+        if unknown:
+            raise ValueError(f"unknown search option(s) {unknown}; allowed: {list(SEARCH_OPTIONS)}")
+        return value
+
+    # Engine behind options 1 / 2: Atlas, or the in-process BM25 index (memory)
+    TEXT_SEARCH_BACKEND: Literal["atlas", "memory"] = "atlas"
+
+    # End-to-end request budget (overridable per request via X-Request-Deadline-Ms).
+    # None = no default budget: only requests sending the header get a deadline.
+    REQUEST_DEADLINE_MS: Optional[int] = None
+    REQUEST_DEADLINE_MAX_MS: int = 10_000
+
+    # Admission control per search option (keys keyword | text | vector | hybrid).
+    # Concurrency caps should add up to no more than MONGODB_MAX_POOL_SIZE.
+    ADMISSION_CONTROL_ENABLED: bool = True
+    SEARCH_ADMISSION: Dict[str, AdmissionLimit] = {
+        "keyword": AdmissionLimit(max_concurrency=20, max_queue=40),
+        "text": AdmissionLimit(max_concurrency=12, max_queue=24),
+        "vector": AdmissionLimit(max_concurrency=10, max_queue=20),
+        "hybrid": AdmissionLimit(max_concurrency=6, max_queue=12),
+    }
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+
+    # Startup warm-up & cached probes
+    WARM_UP_SEARCH_INDEXES: bool = True
+    HEALTH_CHECK_INTERVAL_SECONDS: float = 5.0
 
     # Voyage AI
     VOYAGE_API_URL: str
     VOYAGE_API_KEY: str
     VOYAGE_MODEL: str
 
+    # Offline embedding jobs (backfill CLI, re-embed worker)
+    EMBEDDING_SOURCE_FIELD: str = "embeddingText"
+    EMBEDDING_BATCH_SIZE: int = 128
+    VOYAGE_REQUESTS_PER_MINUTE: int = 300
+    VOYAGE_TOKENS_PER_MINUTE: int = 1_000_000
+    JOBS_CHECKPOINT_COLLECTION: str = "jobCheckpoints"
+    EMBEDDING_HASH_FIELD: str = "embeddingTextHash"
+    REEMBED_MAX_LAG_MS: int = 2_000
+
+    # Circuit breaker around the embedder (vector / hybrid degrade to text)
+    EMBEDDING_BREAKER_ENABLED: bool = True
+    EMBEDDING_BREAKER_ERROR_RATE: float = 0.5
+    EMBEDDING_BREAKER_SLOW_CALL_MS: float = 2_000
+    EMBEDDING_BREAKER_MIN_CALLS: int = 5
+    EMBEDDING_BREAKER_WINDOW: int = 20
+    EMBEDDING_BREAKER_OPEN_SECONDS: float = 30.0
+    EMBEDDING_CALL_TIMEOUT_SECONDS: float = 3.0
+
+    # Persistent embedding store (disabled when no path is set)
+    EMBEDDING_STORE_PATH: Optional[str] = None
+    EMBEDDING_STORE_MAX_ENTRIES: int = 200_000
+    EMBEDDING_STORE_READ_ONLY: bool = False
+
+    # Semantic result cache for option 3 (near-duplicate query reuse)
+    SEMANTIC_CACHE_ENABLED: bool = True
+    SEMANTIC_CACHE_THRESHOLD: float = 0.97
+    SEMANTIC_CACHE_CAPACITY_PER_STORE: int = 128
+    SEMANTIC_CACHE_TTL_SECONDS: float = 60.0
+
+    # Popular searches: heavy-hitters sketch + background-precomputed first pages
+    POPULAR_SEARCH_ENABLED: bool = True
+    POPULAR_SEARCH_TOP_K: int = 20  # per store
+    POPULAR_SEARCH_MIN_COUNT: float = 3.0
+    POPULAR_SEARCH_SKETCH_CAPACITY: int = 4_096
+    POPULAR_SEARCH_TTL_SECONDS: float = 60.0
+    POPULAR_SEARCH_REFRESH_SECONDS: float = 15.0
+    POPULAR_SEARCH_DECAY: float = 0.9  # applied to the sketch after every refresh
+
+    # Type-ahead suggestions (served from memory, refreshed by change stream)
+    SUGGEST_ENABLED: bool = True
+    SUGGEST_POPULARITY_FIELD: str = "popularity"
+
+    # Nearest-store lookups (in-memory KD-tree, refreshed by change stream)
+    NEAREST_STORES_ENABLED: bool = True
+    NEARBY_RADIUS_KM: float = 15.0
+    NEAREST_STORES_MAX_K: int = 50
+    NEAREST_STORES_MAX_RADIUS_KM: float = 2_000.0
+
+    # Product detail / cross-store inventory endpoint
+    PRODUCT_INVENTORY_CACHE_ENABLED: bool = True
+    PRODUCT_INVENTORY_CACHE_TTL_SECONDS: float = 30.0
+    PRODUCT_INVENTORY_CACHE_CAPACITY: int = 20_000
+    PRODUCT_INVENTORY_BATCH_MAX: int = 100
+
+    # Facet counts for options 2 / 4 (`$searchMeta`, cached per query + store)
+    SEARCH_FACET_NUM_BUCKETS: int = 20
+    SEARCH_FACET_PRICE_BOUNDARIES: List[float] = [0, 1, 2, 5, 10, 20, 50, 100]
+    SEARCH_FACETS_CACHE_TTL_SECONDS: float = 60.0
+    SEARCH_FACETS_CACHE_CAPACITY: int = 5_000
+
+    # Per-store inventory KPIs (in memory + materialized collection)
+    STORE_KPIS_ENABLED: bool = True
+    STORE_KPIS_COLLECTION: str = "store_kpis"
+    STORE_KPIS_DEPLETION_HORIZONS_DAYS: List[int] = [3, 7, 14]
+    STORE_KPIS_FLUSH_INTERVAL_SECONDS: float = 5.0
+    STORE_KPIS_RECONCILE_INTERVAL_SECONDS: float = 900.0
+
+    # Per-store stock alerts over Server-Sent Events (fed by the inventory change stream)
+    STOCK_ALERTS_ENABLED: bool = True
+    STOCK_ALERTS_HEARTBEAT_SECONDS: float = 15.0
+    STOCK_ALERTS_CLIENT_BUFFER: int = 100
+    STOCK_ALERTS_REPLAY_SIZE: int = 500
+    STOCK_ALERTS_MAX_CLIENTS: int = 1_000
+
+    # Columnar inventory export (needs the `analytics` extra → pyarrow)
+    INVENTORY_EXPORT_ENABLED: bool = True
+    INVENTORY_EXPORT_BATCH_ROWS: int = 5_000
+
+    # Response compression (gzip; br / zstd when `brotli` / `zstandard` are installed) & ETags
+    RESPONSE_COMPRESSION_ENABLED: bool = True
+    RESPONSE_COMPRESSION_MIN_BYTES: int = 1_024
+    SEARCH_ETAG_ENABLED: bool = True
+
+    # Slow-query log (on-disk ring buffer, replayed by app/jobs/replay_slow_queries.py); unset path = disabled
+    SLOW_QUERY_LOG_PATH: Optional[str] = None
+    SLOW_QUERY_THRESHOLD_MS: float = 500.0
+    SLOW_QUERY_LOG_MAX_MB: float = 64.0
+    SLOW_QUERY_KEEP_VECTORS: bool = False  # needed to replay options 3 / 4; ~20 KB per entry
+
+    # Explain mode of POST /search (`explain` + `X-Explain-Token`); empty token = disabled
+    SEARCH_EXPLAIN_TOKEN: str = ""
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,47 @@
+# app/shared/deadline.py
+"""
+Per-request time budget.
+
+Purpose: Bound the end-to-end latency of a search instead of stacking
+         independent stage timeouts (embedding attempts, `maxTimeMS`, …).
+Why: A 5 s embedding timeout × 3 attempts plus a 6 s aggregation limit
+     allowed a single request to run for ~20 s against a 1 s frontend budget.
+How: The API layer creates one `Deadline` per request (header or default)
+     and passes it down; every stage sizes its own timeout from
+     `remaining_s()` / `remaining_ms()` and calls `check()` before starting.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Optional
+
+from app.shared.exceptions import DeadlineExceededError
+
+
+class Deadline:
+    """Monotonic point in time after which the request is no longer useful."""
+
+    def __init__(self, budget_ms: float) -> None:
+        self.budget_ms = budget_ms
+        self._expires_at = time.monotonic() + budget_ms / 1000
+
+    def remaining_s(self) -> float:
+        return max(0.0, self._expires_at - time.monotonic())
+
+    def remaining_ms(self) -> int:
+        return int(self.remaining_s() * 1000)
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self._expires_at
+
+    def check(self, stage: str) -> None:
+        """Raise `DeadlineExceededError` if no budget is left for *stage*."""
+        if self.expired:
+            raise DeadlineExceededError(f"Request deadline ({self.budget_ms:.0f} ms) exceeded before {stage}")
+
+    def cap(self, timeout_s: Optional[float]) -> float:
+        """Stage timeout limited to the remaining budget (`None` → remaining)."""
+        remaining = self.remaining_s()
+        return remaining if timeout_s is None else min(timeout_s, remaining)
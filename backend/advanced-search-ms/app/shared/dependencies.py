@@ -8,26 +8,119 @@ Expose singleton clients (MongoDB, Voyage AI, SearchRepository) as FastAPI depen
 decoupling app logic from instantiation details.
 """
 
+from app.infrastructure.cache.popular_searches import PopularSearchCache, PopularSearchWarmer
+from app.infrastructure.cache.semantic_cache import SemanticResultCache
+from app.infrastructure.memory.prefix_index import PrefixIndex
+from app.infrastructure.memory.stock_alerts import StockAlertHub
+from app.infrastructure.memory.store_index import StoreIndex
+from app.infrastructure.memory.store_kpis import StoreKpiView
+from app.infrastructure.mongodb.change_streams import ChangeStreamWatcher
+from app.application.ports import EmbeddingProvider, InventoryExporter, InventoryRepository, SearchRepository
 from app.infrastructure.mongodb.client import MongoClient
-from app.infrastructure.mongodb.search_repository import MongoSearchRepository
+from app.infrastructure.mongodb.health import HealthMonitor
+from app.infrastructure.mongodb.slow_query_log import SlowQueryLog
+from app.infrastructure.mongodb.store_kpis import StoreKpiMaterializer
 from app.infrastructure.voyage_ai.client import VoyageClient
+from app.shared.admission import AdmissionController
 
 # Singletons instantiated in main.py
 mongo_client: MongoClient | None = None
-search_repo: MongoSearchRepository | None = None
+health_monitor: HealthMonitor | None = None
+search_repo: SearchRepository | None = None  # MongoSearchRepository, possibly behind LocalTextSearchRepository
+slow_query_log: SlowQueryLog | None = None
 voyage_client: VoyageClient | None = None
+embedder: EmbeddingProvider | None = None  # voyage_client, possibly behind a circuit breaker
+suggest_index: PrefixIndex | None = None
+semantic_cache: SemanticResultCache | None = None
+popular_searches: PopularSearchCache | None = None
+popular_search_warmer: PopularSearchWarmer | None = None
+products_watcher: ChangeStreamWatcher | None = None
+store_index: StoreIndex | None = None
+stores_watcher: ChangeStreamWatcher | None = None
+inventory_repo: InventoryRepository | None = None
+inventory_watcher: ChangeStreamWatcher | None = None
+store_kpis: StoreKpiView | None = None
+store_kpi_materializer: StoreKpiMaterializer | None = None
+stock_alerts: StockAlertHub | None = None
+inventory_exporter: InventoryExporter | None = None  # None when pyarrow is missing or export is disabled
+admission: AdmissionController | None = None
+
+# Request deadline defaults (overwritten from Settings in main.py)
+request_deadline_ms: int | None = None  # None = no default budget
+request_deadline_max_ms: int = 10_000
+
+# Nearest-store limits (overwritten from Settings in main.py)
+nearby_radius_km: float = 15.0
+nearest_stores_max_k: int = 50
+nearest_stores_max_radius_km: float = 2_000.0
+
+# Product inventory batch limit (overwritten from Settings in main.py)
+product_inventory_batch_max: int = 100
+
+# Store KPI depletion horizons in days (overwritten from Settings in main.py)
+kpi_depletion_horizons: list[int] = [3, 7, 14]
+
+# SSE heartbeat interval for stock alerts (overwritten from Settings in main.py)
+stock_alerts_heartbeat_s: float = 15.0
+
+# Strong ETag / If-None-Match on POST /search
+search_etag_enabled: bool = True
+
+# Shared secret for explain requests on POST /search ("" = explain disabled)
+search_explain_token: str = ""
+
+# Response compression (read per request by CompressionMiddleware)
+response_compression_enabled: bool = True
+response_compression_min_bytes: int = 1_024
 
 def get_mongo() -> MongoClient:
     if not mongo_client:
         raise RuntimeError("MongoClient not initialized")
     return mongo_client
 
-def get_repo() -> MongoSearchRepository:
+def get_repo() -> SearchRepository:
     if not search_repo:
         raise RuntimeError("SearchRepository not initialized")
     return search_repo
 
-def get_embedder() -> VoyageClient:
+def get_embedder() -> EmbeddingProvider:
     if not voyage_client:
         raise RuntimeError("VoyageClient not initialized")
-    return voyage_client
+    return embedder or voyage_client
+
+def get_suggest_index() -> PrefixIndex:
+    if suggest_index is None:
+        raise RuntimeError("Suggestion index not initialized")
+    return suggest_index
+
+def get_store_index() -> StoreIndex:
+    if store_index is None:
+        raise RuntimeError("Store index not initialized")
+    return store_index
+
+def get_store_kpis() -> StoreKpiView:
+    if store_kpis is None:
+        raise RuntimeError("Store KPIs not initialized")
+    return store_kpis
+
+def get_stock_alerts() -> StockAlertHub:
+    if stock_alerts is None:
+        raise RuntimeError("Stock alerts not initialized")
+    return stock_alerts
+
+def get_inventory_repo() -> InventoryRepository:
+    if inventory_repo is None:
+        raise RuntimeError("Inventory repository not initialized")
+    return inventory_repo
+
+def get_inventory_exporter() -> InventoryExporter | None:
+    # Optional: None → the export route answers 501
+    return inventory_exporter
+
+def get_semantic_cache() -> SemanticResultCache | None:
+    # Optional: None simply disables near-duplicate reuse
+    return semantic_cache
+
+def get_admission() -> AdmissionController | None:
+    # Optional: None disables per-option limits
+    return admission
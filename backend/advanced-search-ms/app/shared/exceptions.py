@@ -11,4 +11,17 @@ class InfrastructureError(Exception):
     "Raised when an external service call fails unexpectedly." 
 
 class UseCaseError(Exception):
-    "Raised when a business use case encounters an error." 
\ No newline at end of file
+    "Raised when a business use case encounters an error."
+
+class EmbeddingUnavailableError(InfrastructureError):
+    "Raised when the embedding provider is short-circuited (breaker open)."
+
+class DeadlineExceededError(Exception):
+    "Raised when a request runs out of its end-to-end time budget."
+
+class OverloadedError(Exception):
+    "Raised when admission control sheds a request (API maps it to 429)."
+
+    def __init__(self, message: str, retry_after_s: int = 1) -> None:
+        super().__init__(message)
+        self.retry_after_s = retry_after_s
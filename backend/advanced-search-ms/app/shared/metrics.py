@@ -0,0 +1,70 @@
+# app/shared/metrics.py
+"""
+Minimal in-process metrics registry.
+
+Purpose: Give every layer a single place to publish counters and gauges.
+Why: Operational signals (cache hit rates, queue depths…) must be visible
+     without adding an APM dependency; `GET /metrics` exposes a JSON snapshot
+     that any scraper or dashboard can poll.
+How: Module-level `metrics` singleton; names are dotted, labels are optional
+     keyword arguments rendered as `key=value` pairs. A lock makes updates
+     from worker threads (e.g. the slow-query writer) safe against the
+     event loop and `snapshot()`.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from typing import Dict, Tuple
+
+_LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, object]) -> _LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _render(key: _LabelKey) -> str:
+    return ",".join(f"{k}={v}" for k, v in key)
+
+
+class MetricsRegistry:
+    """Counters only go up; gauges hold the last value set."""
+
+    def __init__(self) -> None:
+        self._counters: Dict[str, Dict[_LabelKey, float]] = defaultdict(lambda: defaultdict(float))
+        self._gauges: Dict[str, Dict[_LabelKey, float]] = defaultdict(dict)
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1.0, **labels: object) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._counters[name][key] += value
+
+    def set_gauge(self, name: str, value: float, **labels: object) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._gauges[name][key] = float(value)
+
+    def counter(self, name: str, **labels: object) -> float:
+        key = _label_key(labels)
+        with self._lock:
+            return self._counters.get(name, {}).get(key, 0.0)
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        with self._lock:
+            return {
+                "counters": {
+                    name: {_render(k): v for k, v in series.items()}
+                    for name, series in self._counters.items()
+                },
+                "gauges": {
+                    name: {_render(k): v for k, v in series.items()}
+                    for name, series in self._gauges.items()
+                },
+            }
+
+
+# Process-wide registry
+metrics = MetricsRegistry()
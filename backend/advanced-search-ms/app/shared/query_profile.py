@@ -0,0 +1,33 @@
+# app/shared/query_profile.py
+"""
+Per-request query profile (`explain` mode of `/api/v1/search`).
+
+Purpose: Show why one search is slow without copying its pipeline out of the logs.
+Why: The pipeline is built from the request at run time, so reproducing it
+     by hand meant reading debug logs and re-running it in a shell.
+How: The API layer creates one `QueryProfile` for an authorised explain
+     request and passes it down like the `Deadline`. Each stage that does
+     I/O appends one step: the embedding call, or the exact aggregation it
+     ran together with the server's `explain` output (see
+     `infrastructure/mongodb/explain.py`). The steps are returned next to
+     the results.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+VERBOSITIES = ("queryPlanner", "executionStats", "allPlansExecution")
+
+
+class QueryProfile:
+    """Ordered list of profiled steps for one request."""
+
+    def __init__(self, verbosity: str = "executionStats") -> None:
+        if verbosity not in VERBOSITIES:
+            raise ValueError(f"explain must be one of {', '.join(VERBOSITIES)}")
+        self.verbosity = verbosity
+        self.steps: List[Dict[str, Any]] = []
+
+    def add(self, step: str, **details: Any) -> None:
+        self.steps.append({"step": step, **details})
@@ -0,0 +1,49 @@
+# app/shared/rate_limiter.py
+"""
+Async token-bucket rate limiter.
+
+Purpose: Keep batch jobs and workers under external API quotas (Voyage AI
+         requests-per-minute / tokens-per-minute) on the client side.
+Why: Hitting the provider's limit turns into 429s and retry storms that are
+     slower than simply pacing the calls.
+How: `TokenBucket(rate_per_s, capacity)`; `await bucket.acquire(n)` sleeps
+     until `n` tokens are available. Requests larger than the capacity are
+     admitted once the bucket is full so they can never dead-lock.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+
+class TokenBucket:
+    """Refills continuously at `rate_per_s`, holds at most `capacity` tokens."""
+
+    def __init__(self, rate_per_s: float, capacity: float) -> None:
+        self.rate_per_s = rate_per_s
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()  # FIFO: callers are served in arrival order
+
+    @classmethod
+    def per_minute(cls, limit: float) -> "TokenBucket":
+        """Bucket for a per-minute quota, allowing bursts of up to one second's worth."""
+        rate = limit / 60
+        return cls(rate, max(1.0, rate))
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        async with self._lock:
+            needed = min(tokens, self.capacity)
+            while True:
+                self._refill()
+                if self._tokens >= needed:
+                    self._tokens -= tokens  # may go negative for oversize requests
+                    return
+                await asyncio.sleep((needed - self._tokens) / self.rate_per_s)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_s)
+        self._updated = now
@@ -0,0 +1,231 @@
+# app/workers/inventory_sync_worker.py
+"""
+Inventory → product summary sync worker with write coalescing.
+
+Why
+---
+The Atlas trigger `inventory_sync.js` rewrites a product's `inventorySummary`
+once per inventory event. A bulk update of 500 inventory documents becomes
+500 product writes – each one also re-indexed by Atlas Search – even when
+the summary (location + stock flags) did not change at all.
+
+How it works
+------------
+1. Watches `inventory` (insert / update / replace), projecting events down to
+   `productId` and the summary fields of `storeInventory`.
+2. Coalesces events per product for `INVENTORY_SYNC_WINDOW_MS`: only the
+   latest summary of each product is kept.
+3. Skips no-op updates twice: against the last summary this worker wrote
+   (no round-trip) and with an `inventorySummary: {$ne: …}` guard in the
+   update filter (no write when the product already matches).
+4. Applies the batch with unordered `bulk_write` (summary plus the derived
+   `inStockStoreObjectIds` used by the search filters), then saves the
+   resume token of the last event in `JOBS_CHECKPOINT_COLLECTION`.
+5. Publishes lag (event cluster time → write), pending and write/skip
+   counters to `app.shared.metrics`, and logs them per flush.
+
+Run this worker *instead of* the Atlas trigger, not alongside it.
+
+Usage
+-----
+    python -m app.workers.inventory_sync_worker
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import UpdateOne
+
+from app.domain.inventory import IN_STOCK_STORES_FIELD, SUMMARY_FIELDS, build_inventory_summary, in_stock_store_ids
+from app.infrastructure.mongodb.change_streams import ChangeStreamWatcher
+from app.infrastructure.mongodb.checkpoints import CheckpointStore
+from app.infrastructure.mongodb.client import MongoClient
+from app.shared.config import get_settings
+from app.shared.metrics import metrics
+
+logger = logging.getLogger("advanced-search-ms.workers.inventory-sync")
+
+CHECKPOINT_KEY = "inventory_sync_worker"
+WRITTEN_CACHE_SIZE = 100_000  # products whose last written summary is remembered
+
+
+def watch_pipeline() -> List[Dict[str, Any]]:
+    """Only the fields the summary is built from travel over the wire."""
+    projection: Dict[str, Any] = {
+        "operationType": 1,
+        "documentKey": 1,
+        "clusterTime": 1,
+        "fullDocument.productId": 1,
+    }
+    projection.update({f"fullDocument.storeInventory.{f}": 1 for f in SUMMARY_FIELDS})
+    return [
+        {"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}},
+        {"$project": projection},
+    ]
+
+
+class InventorySyncWorker:
+    """Coalesces inventory events per product and bulk-writes summaries."""
+
+    def __init__(
+        self,
+        products: AsyncIOMotorCollection,
+        checkpoints: CheckpointStore,
+        *,
+        window_ms: int = 500,
+        max_batch: int = 1_000,
+    ) -> None:
+        self.products = products
+        self.checkpoints = checkpoints
+        self.window_s = window_ms / 1000
+        self.max_batch = max_batch
+
+        self._pending: Dict[Any, Tuple[List[Dict], float]] = {}  # productId → (summary, first cluster time)
+        self._window_started: Optional[float] = None
+        self._last_token: Optional[Dict[str, Any]] = None
+        self._written: "OrderedDict[Any, List[Dict]]" = OrderedDict()
+        self._flush_lock = asyncio.Lock()
+
+    # ------------------------------------------------------------------ #
+    # Change handling                                                    #
+    # ------------------------------------------------------------------ #
+    async def handle(self, change: Dict[str, Any]) -> None:
+        self._last_token = change["_id"]
+        doc = change.get("fullDocument")
+        if not doc or doc.get("productId") is None:
+            return  # deleted before the lookup, or orphan inventory row
+
+        metrics.inc("inventory_sync.events")
+        product_id = doc["productId"]
+        cluster_time = change["clusterTime"].time if change.get("clusterTime") else time.time()
+        first_seen = self._pending[product_id][1] if product_id in self._pending else cluster_time
+        if product_id in self._pending:
+            metrics.inc("inventory_sync.coalesced")
+        self._pending[product_id] = (build_inventory_summary(doc.get("storeInventory")), first_seen)
+
+        if self._window_started is None:
+            self._window_started = time.monotonic()
+        if len(self._pending) >= self.max_batch:
+            await self.flush()
+
+    async def run_flusher(self) -> None:
+        """Closes each coalescing window after `window_ms`."""
+        while True:
+            await asyncio.sleep(self.window_s / 2)
+            if self._window_started is not None and time.monotonic() - self._window_started >= self.window_s:
+                await self.flush()
+            elif not self._pending and self._last_token is not None:
+                await self.flush()  # only skipped events since the last save – persist the token
+            metrics.set_gauge("inventory_sync.pending", len(self._pending))
+
+    # ------------------------------------------------------------------ #
+    # Flush                                                              #
+    # ------------------------------------------------------------------ #
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            batch, self._pending = self._pending, {}
+            token, self._window_started = self._last_token, None
+
+            ops, skipped, oldest = [], 0, None
+            for product_id, (summary, first_seen) in batch.items():
+                oldest = first_seen if oldest is None else min(oldest, first_seen)
+                if self._written.get(product_id) == summary:
+                    skipped += 1
+                    continue
+                ops.append(UpdateOne(
+                    {"_id": product_id, "inventorySummary": {"$ne": summary}},
+                    {"$set": {"inventorySummary": summary, IN_STOCK_STORES_FIELD: in_stock_store_ids(summary)}},
+                ))
+
+            modified = 0
+            if ops:
+                try:
+                    result = await self.products.bulk_write(ops, ordered=False)
+                    modified = result.modified_count
+                except Exception as exc:  # noqa: BLE001 – put the batch back, retry next window
+                    metrics.inc("inventory_sync.flush_failures")
+                    logger.error("❌ [WORKER inventory-sync] Bulk write of %d product(s) failed: %s", len(ops), exc)
+                    for product_id, entry in batch.items():
+                        self._pending.setdefault(product_id, entry)
+                    self._window_started = time.monotonic()
+                    return
+
+            for product_id, (summary, _) in batch.items():
+                self._remember(product_id, summary)
+            if token is not None:
+                await self.checkpoints.save(CHECKPOINT_KEY, resumeToken=token)
+                if self._last_token is token:
+                    self._last_token = None
+            if not batch:
+                return
+
+            lag_s = max(0.0, time.time() - oldest) if oldest is not None else 0.0
+            metrics.set_gauge("inventory_sync.lag_s", lag_s)
+            metrics.inc("inventory_sync.written", modified)
+            metrics.inc("inventory_sync.skipped_noop", len(batch) - modified)
+            logger.info("✅ [WORKER inventory-sync] %d product(s) | written=%d no-op=%d (cached %d) | lag=%.2fs",
+                        len(batch), modified, len(batch) - modified, skipped, lag_s)
+
+    def _remember(self, product_id: Any, summary: List[Dict]) -> None:
+        self._written[product_id] = summary
+        self._written.move_to_end(product_id)
+        if len(self._written) > WRITTEN_CACHE_SIZE:
+            self._written.popitem(last=False)
+
+
+# --------------------------------------------------------------------------- #
+# Entry point                                                                 #
+# --------------------------------------------------------------------------- #
+async def _main() -> None:
+    settings = get_settings()
+    mongo = MongoClient(
+        uri=settings.MONGODB_URI,
+        database=settings.MONGODB_DATABASE,
+        collection=settings.PRODUCTS_COLLECTION,
+        index_name=settings.SEARCH_VECTOR_INDEX,
+        embedding_field=settings.EMBEDDING_FIELD_NAME,
+        max_pool_size=4,
+        min_pool_size=0,
+    )
+    await mongo.connect()
+
+    checkpoints = CheckpointStore(mongo.database[settings.JOBS_CHECKPOINT_COLLECTION])
+    saved = await checkpoints.load(CHECKPOINT_KEY)
+    worker = InventorySyncWorker(
+        mongo.collection,
+        checkpoints,
+        window_ms=settings.INVENTORY_SYNC_WINDOW_MS,
+        max_batch=settings.INVENTORY_SYNC_MAX_BATCH,
+    )
+    watcher = ChangeStreamWatcher(
+        mongo.database[settings.INVENTORY_COLLECTION],
+        name="inventory-sync",
+        pipeline=watch_pipeline(),
+        resume_after=saved.get("resumeToken") if saved else None,
+    )
+    watcher.subscribe(worker.handle)
+    logger.info("🚀 [WORKER inventory-sync] Starting (resume=%s, window %d ms)",
+                "stored token" if saved else "now", settings.INVENTORY_SYNC_WINDOW_MS)
+
+    watcher.start()
+    try:
+        await worker.run_flusher()
+    finally:
+        await watcher.stop()
+        await worker.flush()
+        mongo.client.close()
+
+
+def main() -> None:
+    logging.basicConfig(format="%(asctime)s %(levelname)s %(name)s – %(message)s", level=logging.INFO)
+    asyncio.run(_main())
+
+
+if __name__ == "__main__":
+    main()
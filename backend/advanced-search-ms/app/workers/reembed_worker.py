@@ -0,0 +1,247 @@
+# app/workers/reembed_worker.py
+"""
+Change-stream driven incremental re-embedding worker.
+
+Why
+---
+Editing a product's name, description, brand, category, sub-category or
+quantity changes what its `embeddingText` should say, but the stored vector
+stayed stale until someone ran a full backfill. This worker keeps vectors
+fresh continuously and only touches products that actually changed.
+
+How it works
+------------
+1. Watches `products` for inserts / replaces and for updates that touch one
+   of `EMBEDDING_TEXT_FIELDS` (the worker's own writes never match, so it
+   cannot trigger itself).
+2. Rebuilds `embeddingText` and compares its content hash (text + model)
+   with the one stored on the product – unchanged content is skipped.
+3. Pending products are de-duplicated by `_id` and flushed as ONE batched
+   Voyage call + ONE unordered `bulk_write` when the batch is full or the
+   oldest pending change is `REEMBED_MAX_LAG_MS` old.
+4. After each successful flush the resume token of the last handled event
+   is saved in `JOBS_CHECKPOINT_COLLECTION`; a restart resumes from there,
+   so nothing is missed and no full-catalog pass is needed.
+   A failed flush keeps its items and is retried on the next tick.
+
+Usage
+-----
+    python -m app.workers.reembed_worker
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import UpdateOne
+
+from app.domain.product import EMBEDDING_TEXT_FIELDS, build_embedding_text, embedding_text_hash
+from app.infrastructure.mongodb.change_streams import ChangeStreamWatcher
+from app.infrastructure.mongodb.checkpoints import CheckpointStore
+from app.infrastructure.mongodb.client import MongoClient
+from app.infrastructure.voyage_ai.client import MAX_BATCH_SIZE, VoyageClient
+from app.shared.config import get_settings
+from app.shared.metrics import metrics
+from app.shared.rate_limiter import TokenBucket
+
+logger = logging.getLogger("advanced-search-ms.workers.reembed")
+
+CHECKPOINT_KEY = "reembed_worker"
+MAX_PENDING_BATCHES = 4  # stop reading the stream while this many batches are waiting
+
+
+def watch_pipeline(embedding_field: str) -> List[Dict[str, Any]]:
+    """Only events that can change `embeddingText`; the vector itself is projected out."""
+    touched = [{f"updateDescription.updatedFields.{f}": {"$exists": True}} for f in EMBEDDING_TEXT_FIELDS]
+    return [
+        {"$match": {"$or": [{"operationType": {"$in": ["insert", "replace"]}}, *touched]}},
+        {"$project": {f"fullDocument.{embedding_field}": 0}},
+    ]
+
+
+class ReembedWorker:
+    """Batches changed products into Voyage calls and bulk writes."""
+
+    def __init__(
+        self,
+        collection: AsyncIOMotorCollection,
+        voyage: VoyageClient,
+        checkpoints: CheckpointStore,
+        *,
+        source_field: str,
+        target_field: str,
+        hash_field: str,
+        batch_size: int = MAX_BATCH_SIZE,
+        max_lag_ms: int = 2_000,
+        requests: Optional[TokenBucket] = None,
+    ) -> None:
+        self.col = collection
+        self.voyage = voyage
+        self.checkpoints = checkpoints
+        self.source_field = source_field
+        self.target_field = target_field
+        self.hash_field = hash_field
+        self.batch_size = min(batch_size, MAX_BATCH_SIZE)
+        self.max_lag_s = max_lag_ms / 1000
+        self.requests = requests
+
+        self._pending: Dict[Any, Tuple[str, str]] = {}  # _id → (text, hash)
+        self._oldest_pending: Optional[float] = None
+        self._last_token: Optional[Dict[str, Any]] = None
+        self._flush_lock = asyncio.Lock()
+
+    # ------------------------------------------------------------------ #
+    # Change handling                                                    #
+    # ------------------------------------------------------------------ #
+    async def handle(self, change: Dict[str, Any]) -> None:
+        doc = change.get("fullDocument")
+        doc_id = change.get("documentKey", {}).get("_id")
+        self._last_token = change["_id"]
+        if cluster_time := change.get("clusterTime"):
+            metrics.set_gauge("reembed.lag_s", max(0.0, time.time() - cluster_time.time))
+
+        if doc is None:  # deleted before the lookup
+            self._pending.pop(doc_id, None)
+            return
+
+        text = build_embedding_text(doc)
+        digest = embedding_text_hash(text, self.voyage.model)
+        if not text or doc.get(self.hash_field) == digest:
+            self._pending.pop(doc_id, None)  # an earlier queued edit was reverted
+            metrics.inc("reembed.skipped_unchanged")
+            return
+
+        self._pending[doc_id] = (text, digest)
+        if self._oldest_pending is None:
+            self._oldest_pending = time.monotonic()
+        if len(self._pending) >= self.batch_size:
+            await self.flush()
+        while len(self._pending) >= self.batch_size * MAX_PENDING_BATCHES:
+            await asyncio.sleep(self.max_lag_s)  # provider is failing – apply back-pressure
+            await self.flush()
+
+    async def run_flusher(self) -> None:
+        """Flushes partially filled batches so lag stays below `max_lag_ms`."""
+        while True:
+            await asyncio.sleep(self.max_lag_s / 4)
+            if self._oldest_pending is not None and time.monotonic() - self._oldest_pending >= self.max_lag_s:
+                await self.flush()
+            elif not self._pending and self._last_token is not None:
+                await self.flush()  # only skipped events since the last save – persist the token
+
+    # ------------------------------------------------------------------ #
+    # Flush                                                              #
+    # ------------------------------------------------------------------ #
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            # Snapshot: events arriving during the awaits below go to a fresh batch
+            items = list(self._pending.items())[: self.batch_size]
+            token = self._last_token if len(items) == len(self._pending) else None
+            if not items and token is None:
+                return
+
+            if items:
+                t0 = time.perf_counter()
+                try:
+                    if self.requests is not None:
+                        await self.requests.acquire()
+                    vectors = await self.voyage.create_embeddings([text for _, (text, _) in items])
+                    now = datetime.now(timezone.utc)
+                    await self.col.bulk_write(
+                        [
+                            UpdateOne(
+                                {"_id": doc_id},
+                                {"$set": {
+                                    self.source_field: text,
+                                    self.target_field: vec,
+                                    self.hash_field: digest,
+                                    "embeddingUpdatedAt": now,
+                                }},
+                            )
+                            for (doc_id, (text, digest)), vec in zip(items, vectors)
+                        ],
+                        ordered=False,
+                    )
+                except Exception as exc:  # noqa: BLE001 – keep items, retry on the next tick
+                    metrics.inc("reembed.flush_failures")
+                    logger.error("❌ [WORKER reembed] Flush of %d product(s) failed: %s", len(items), exc)
+                    return
+
+                for doc_id, entry in items:
+                    if self._pending.get(doc_id) == entry:  # not edited again meanwhile
+                        del self._pending[doc_id]
+                self._oldest_pending = time.monotonic() if self._pending else None
+                metrics.inc("reembed.embedded", len(items))
+                logger.info("✅ [WORKER reembed] Re-embedded %d product(s) in %.0f ms",
+                            len(items), (time.perf_counter() - t0) * 1000)
+
+            if token is not None:
+                await self.checkpoints.save(CHECKPOINT_KEY, resumeToken=token)
+                if self._last_token is token:
+                    self._last_token = None
+
+
+# --------------------------------------------------------------------------- #
+# Entry point                                                                 #
+# --------------------------------------------------------------------------- #
+async def _main() -> None:
+    settings = get_settings()
+    mongo = MongoClient(
+        uri=settings.MONGODB_URI,
+        database=settings.MONGODB_DATABASE,
+        collection=settings.PRODUCTS_COLLECTION,
+        index_name=settings.SEARCH_VECTOR_INDEX,
+        embedding_field=settings.EMBEDDING_FIELD_NAME,
+        max_pool_size=4,
+        min_pool_size=0,
+    )
+    await mongo.connect()
+
+    checkpoints = CheckpointStore(mongo.database[settings.JOBS_CHECKPOINT_COLLECTION])
+    saved = await checkpoints.load(CHECKPOINT_KEY)
+    worker = ReembedWorker(
+        mongo.collection,
+        VoyageClient(
+            api_key=settings.VOYAGE_API_KEY,
+            base_url=settings.VOYAGE_API_URL,
+            model=settings.VOYAGE_MODEL,
+        ),
+        checkpoints,
+        source_field=settings.EMBEDDING_SOURCE_FIELD,
+        target_field=settings.EMBEDDING_FIELD_NAME,
+        hash_field=settings.EMBEDDING_HASH_FIELD,
+        batch_size=settings.EMBEDDING_BATCH_SIZE,
+        max_lag_ms=settings.REEMBED_MAX_LAG_MS,
+        requests=TokenBucket.per_minute(settings.VOYAGE_REQUESTS_PER_MINUTE),
+    )
+    watcher = ChangeStreamWatcher(
+        mongo.collection,
+        name="products-reembed",
+        pipeline=watch_pipeline(settings.EMBEDDING_FIELD_NAME),
+        resume_after=saved.get("resumeToken") if saved else None,
+    )
+    watcher.subscribe(worker.handle)
+    logger.info("🚀 [WORKER reembed] Starting (resume=%s, max lag %d ms)",
+                "stored token" if saved else "now", settings.REEMBED_MAX_LAG_MS)
+
+    watcher.start()
+    try:
+        await worker.run_flusher()
+    finally:
+        await watcher.stop()
+        await worker.flush()
+        mongo.client.close()
+
+
+def main() -> None:
+    logging.basicConfig(format="%(asctime)s %(levelname)s %(name)s – %(message)s", level=logging.INFO)
+    asyncio.run(_main())
+
+
+if __name__ == "__main__":
+    main()
@@ -17,19 +17,55 @@ This script wires together the core infrastructure of the app.
 • MongoClient – MongoDB Atlas connection
 • MongoSearchRepository – delegates to different search pipelines
 • VoyageClient – generates semantic embeddings
+• PrefixIndex – in-memory type-ahead index kept fresh by a change stream
+• BM25TextIndex / LocalTextSearchRepository – optional in-memory engine for options 1 / 2
+• MongoInventoryRepository – cross-store inventory split, cached per product
+• MongoInventoryExporter – per-store Arrow / Parquet snapshots (optional pyarrow)
+• StoreKpiView / StoreKpiMaterializer – per-store inventory KPIs, incremental + periodic reconciliation
+• StockAlertHub – per-store stock-out / replenishment alerts streamed over SSE
+• StoreIndex – in-memory KD-tree of store locations for nearest-store lookups
 • CORSMiddleware – allows frontend calls
-• Health check – verifies DB availability
+• CompressionMiddleware – zstd / br / gzip negotiated from Accept-Encoding
+• PopularSearchCache / PopularSearchWarmer – heavy-hitter searches, first page precomputed per store
+• HealthMonitor – cached DB status for /health and /ready probes
+• AdmissionController – per-option concurrency limits / load shedding
 """
 
+import asyncio
 import logging
 from fastapi import FastAPI, Depends, HTTPException
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.interfaces.compression import CompressionMiddleware
+from app.domain.inventory import IN_STOCK_STORES_FIELD, KPI_ROW_FIELDS
 from app.shared.config import get_settings
+from app.infrastructure.cache.popular_searches import PopularSearchCache, PopularSearchWarmer
+from app.infrastructure.cache.semantic_cache import SemanticResultCache
+from app.infrastructure.cache.ttl_cache import TTLCache
+from app.infrastructure.memory.prefix_index import PrefixIndex
+from app.infrastructure.memory.stock_alerts import StockAlertHub
+from app.infrastructure.memory.text_index import BM25TextIndex, LocalTextSearchRepository
+from app.infrastructure.memory.store_index import StoreIndex
+from app.infrastructure.memory.store_kpis import StoreKpiView
+from app.infrastructure.mongodb.change_streams import ChangeStreamWatcher, document_handler, load_view
 from app.infrastructure.mongodb.client import MongoClient
+from app.infrastructure.mongodb.health import HealthMonitor
+from app.infrastructure.mongodb import inventory_export
+from app.infrastructure.mongodb.inventory_repository import (
+    CachedInventoryRepository,
+    MongoInventoryRepository,
+)
 from app.infrastructure.mongodb.search_repository import MongoSearchRepository
+from app.infrastructure.mongodb.slow_query_log import SlowQueryLog
+from app.infrastructure.mongodb.store_kpis import StoreKpiMaterializer
+from app.infrastructure.mongodb.utils import PRODUCT_FIELDS
+from app.infrastructure.voyage_ai.circuit_breaker import CircuitBreakerEmbedder
 from app.infrastructure.voyage_ai.client import VoyageClient
+from app.infrastructure.voyage_ai.embedding_store import EmbeddingStore
 from app.shared import dependencies
+from app.shared.admission import AdmissionController
+from app.shared.metrics import metrics
 
 # ───── Logging setup ────────────────────────────────────────────────────────
 logging.basicConfig(
@@ -38,8 +74,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger("advanced-search-ms")
 
-# ───── FastAPI instance + CORS ──────────────────────────────────────────────
+# ───── FastAPI instance + CORS + compression ────────────────────────────────
 app = FastAPI()
+app.add_middleware(CompressionMiddleware)  # enabled / threshold come from settings at startup
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Allow all origins or restrict to frontend
@@ -49,7 +86,7 @@ app.add_middleware(
 )
 
 # ───── Router import (after resources exist) ────────────────────────────────
-from app.interfaces.routes import router as search_router  # noqa: E402
+from app.interfaces.routes import precompute_search, router as search_router  # noqa: E402
 
 # ───── Startup – Dependency injection ───────────────────────────────────────
 @app.on_event("startup")
@@ -67,6 +104,21 @@ async def startup_resources() -> None:
                 settings.SEARCH_VECTOR_INDEX)
     logger.info("🧠 Voyage model: %s", settings.VOYAGE_MODEL)
 
+    # Request deadline defaults
+    dependencies.request_deadline_ms = settings.REQUEST_DEADLINE_MS
+    dependencies.request_deadline_max_ms = settings.REQUEST_DEADLINE_MAX_MS
+    dependencies.search_etag_enabled = settings.SEARCH_ETAG_ENABLED
+    dependencies.search_explain_token = settings.SEARCH_EXPLAIN_TOKEN
+    dependencies.response_compression_enabled = settings.RESPONSE_COMPRESSION_ENABLED
+    dependencies.response_compression_min_bytes = settings.RESPONSE_COMPRESSION_MIN_BYTES
+
+    # Admission control (per-option concurrency + bounded queues)
+    if settings.ADMISSION_CONTROL_ENABLED:
+        dependencies.admission = AdmissionController(
+            settings.SEARCH_ADMISSION,
+            retry_after_s=settings.ADMISSION_RETRY_AFTER_SECONDS,
+        )
+
     # MongoDB Client
     logger.info("🔌 Connecting to MongoDB...")
     dependencies.mongo_client = MongoClient(
@@ -75,18 +127,53 @@ async def startup_resources() -> None:
         collection=settings.PRODUCTS_COLLECTION,
         index_name=settings.SEARCH_VECTOR_INDEX,
         embedding_field=settings.EMBEDDING_FIELD_NAME,
+        max_pool_size=settings.MONGODB_MAX_POOL_SIZE,
+        min_pool_size=settings.MONGODB_MIN_POOL_SIZE,
+    )
+    await dependencies.mongo_client.connect()  # fail fast + pre-open the pool
+    dependencies.health_monitor = HealthMonitor(
+        dependencies.mongo_client.client,
+        interval_s=settings.HEALTH_CHECK_INTERVAL_SECONDS,
     )
+    dependencies.health_monitor.start()
     logger.info("✅ MongoDB client ready")
 
     # Search Repository
     logger.info("⚙️ Initializing SearchRepository...")
+    if settings.SLOW_QUERY_LOG_PATH:
+        dependencies.slow_query_log = SlowQueryLog(
+            settings.SLOW_QUERY_LOG_PATH,
+            threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+            max_bytes=int(settings.SLOW_QUERY_LOG_MAX_MB * 1024 * 1024),
+            keep_vectors=settings.SLOW_QUERY_KEEP_VECTORS,
+        )
     dependencies.search_repo = MongoSearchRepository(
         collection=dependencies.mongo_client.collection,
         index_name_text=settings.SEARCH_TEXT_INDEX,
         index_name_vector=settings.SEARCH_VECTOR_INDEX,
         embedding_field=settings.EMBEDDING_FIELD_NAME,
+        read_routing=settings.SEARCH_READ_ROUTING,
+        facet_cache=TTLCache(
+            name="facet_cache",
+            capacity=settings.SEARCH_FACETS_CACHE_CAPACITY,
+            ttl_s=settings.SEARCH_FACETS_CACHE_TTL_SECONDS,
+        ),
+        facet_price_boundaries=settings.SEARCH_FACET_PRICE_BOUNDARIES,
+        facet_num_buckets=settings.SEARCH_FACET_NUM_BUCKETS,
+        slow_query_log=dependencies.slow_query_log,
     )
     logger.info("✅ SearchRepository ready")
+    if dependencies.slow_query_log:
+        logger.info("🐢 Slow-query log at %s (≥ %.0f ms)", settings.SLOW_QUERY_LOG_PATH, settings.SLOW_QUERY_THRESHOLD_MS)
+
+    # Persistent embedding store (shared read-mostly by all workers)
+    store = None
+    if settings.EMBEDDING_STORE_PATH:
+        store = EmbeddingStore(
+            settings.EMBEDDING_STORE_PATH,
+            max_entries=settings.EMBEDDING_STORE_MAX_ENTRIES,
+            read_only=settings.EMBEDDING_STORE_READ_ONLY,
+        )
 
     # Voyage Client
     logger.info("🌐 Connecting to VoyageAI...")
@@ -94,15 +181,218 @@ async def startup_resources() -> None:
         api_key=settings.VOYAGE_API_KEY,
         base_url=settings.VOYAGE_API_URL,
         model=settings.VOYAGE_MODEL,
+        store=store,
     )
+    dependencies.embedder = dependencies.voyage_client
+    if settings.EMBEDDING_BREAKER_ENABLED:
+        dependencies.embedder = CircuitBreakerEmbedder(
+            dependencies.voyage_client,
+            window=settings.EMBEDDING_BREAKER_WINDOW,
+            min_calls=settings.EMBEDDING_BREAKER_MIN_CALLS,
+            error_rate_threshold=settings.EMBEDDING_BREAKER_ERROR_RATE,
+            slow_call_ms=settings.EMBEDDING_BREAKER_SLOW_CALL_MS,
+            open_seconds=settings.EMBEDDING_BREAKER_OPEN_SECONDS,
+            call_timeout_s=settings.EMBEDDING_CALL_TIMEOUT_SECONDS,
+        )
     logger.info("✅ VoyageAI client ready")
 
+    # Semantic result cache (option 3)
+    if settings.SEMANTIC_CACHE_ENABLED:
+        dependencies.semantic_cache = SemanticResultCache(
+            threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+            capacity_per_store=settings.SEMANTIC_CACHE_CAPACITY_PER_STORE,
+            ttl_s=settings.SEMANTIC_CACHE_TTL_SECONDS,
+        )
+        logger.info("✅ Semantic cache ready (threshold=%.3f)", settings.SEMANTIC_CACHE_THRESHOLD)
+
+    # Popular searches (sketch fed by live traffic, pages precomputed in the background)
+    if settings.POPULAR_SEARCH_ENABLED:
+        dependencies.popular_searches = PopularSearchCache(
+            top_k=settings.POPULAR_SEARCH_TOP_K,
+            sketch_capacity=settings.POPULAR_SEARCH_SKETCH_CAPACITY,
+            min_count=settings.POPULAR_SEARCH_MIN_COUNT,
+            ttl_s=settings.POPULAR_SEARCH_TTL_SECONDS,
+        )
+        dependencies.popular_search_warmer = PopularSearchWarmer(
+            dependencies.popular_searches,
+            precompute_search,
+            refresh_s=settings.POPULAR_SEARCH_REFRESH_SECONDS,
+            decay=settings.POPULAR_SEARCH_DECAY,
+        )
+
+    # Cross-store inventory (product detail page)
+    dependencies.product_inventory_batch_max = settings.PRODUCT_INVENTORY_BATCH_MAX
+    inventory = dependencies.mongo_client.database[settings.INVENTORY_COLLECTION]
+    dependencies.inventory_repo = MongoInventoryRepository(inventory)
+
+    # Inventory change stream (shared by every in-memory view of stock levels)
+    if settings.PRODUCT_INVENTORY_CACHE_ENABLED or settings.STORE_KPIS_ENABLED or settings.STOCK_ALERTS_ENABLED:
+        dependencies.inventory_watcher = ChangeStreamWatcher(
+            inventory,
+            name="inventory",
+            pipeline=[{"$project": {
+                "operationType": 1,
+                "documentKey": 1,
+                "fullDocument._id": 1,
+                "fullDocument.productId": 1,
+                **{f"fullDocument.storeInventory.{f}": 1 for f in KPI_ROW_FIELDS},
+            }}],
+        )
+
+    if settings.PRODUCT_INVENTORY_CACHE_ENABLED:
+        cached = CachedInventoryRepository(
+            dependencies.inventory_repo,
+            TTLCache(
+                name="inventory_cache",
+                capacity=settings.PRODUCT_INVENTORY_CACHE_CAPACITY,
+                ttl_s=settings.PRODUCT_INVENTORY_CACHE_TTL_SECONDS,
+            ),
+        )
+        dependencies.inventory_watcher.subscribe(cached.invalidate_from_change)
+        dependencies.inventory_repo = cached
+        logger.info("✅ Inventory cache ready (ttl=%.0fs)", settings.PRODUCT_INVENTORY_CACHE_TTL_SECONDS)
+
+    # Per-store inventory KPIs (in memory, materialized to STORE_KPIS_COLLECTION)
+    kpi_view: StoreKpiView | None = None
+    if settings.STORE_KPIS_ENABLED:
+        kpi_view = StoreKpiView()
+        dependencies.inventory_watcher.subscribe(document_handler(kpi_view.upsert, kpi_view.remove))
+        dependencies.kpi_depletion_horizons = settings.STORE_KPIS_DEPLETION_HORIZONS_DAYS
+        dependencies.store_kpi_materializer = StoreKpiMaterializer(
+            kpi_view,
+            inventory,
+            dependencies.mongo_client.database[settings.STORE_KPIS_COLLECTION],
+            depletion_horizons=settings.STORE_KPIS_DEPLETION_HORIZONS_DAYS,
+            flush_interval_s=settings.STORE_KPIS_FLUSH_INTERVAL_SECONDS,
+            reconcile_interval_s=settings.STORE_KPIS_RECONCILE_INTERVAL_SECONDS,
+        )
+
+    # Per-store stock alerts (SSE)
+    alert_hub: StockAlertHub | None = None
+    if settings.STOCK_ALERTS_ENABLED:
+        alert_hub = StockAlertHub(
+            client_buffer=settings.STOCK_ALERTS_CLIENT_BUFFER,
+            replay_size=settings.STOCK_ALERTS_REPLAY_SIZE,
+            max_clients=settings.STOCK_ALERTS_MAX_CLIENTS,
+        )
+        dependencies.inventory_watcher.subscribe(alert_hub.on_change)
+        dependencies.stock_alerts_heartbeat_s = settings.STOCK_ALERTS_HEARTBEAT_SECONDS
+
+    if dependencies.inventory_watcher:
+        dependencies.inventory_watcher.start()
+        await dependencies.inventory_watcher.wait_open()  # the loads below must not miss a change
+
+    if alert_hub is not None:
+        logger.info("🔔 Seeding stock alert state...")
+        projection = {f"storeInventory.{f}": 1 for f in KPI_ROW_FIELDS}
+        alert_hub.seed(await inventory.find({}, projection).to_list(length=None))
+        dependencies.stock_alerts = alert_hub
+        logger.info("✅ Stock alerts ready (heartbeat=%.0fs)", settings.STOCK_ALERTS_HEARTBEAT_SECONDS)
+
+    if kpi_view is not None:
+        logger.info("📊 Building store KPIs...")
+        await dependencies.store_kpi_materializer.reload()
+        await dependencies.store_kpi_materializer.reconcile()
+        dependencies.store_kpi_materializer.start()
+        dependencies.store_kpis = kpi_view
+        logger.info("✅ Store KPIs ready (%d stores)", len(kpi_view))
+
+    # Columnar inventory export (BI snapshots)
+    if settings.INVENTORY_EXPORT_ENABLED and inventory_export.available():
+        dependencies.inventory_exporter = inventory_export.MongoInventoryExporter(
+            inventory,
+            products_collection=settings.PRODUCTS_COLLECTION,
+            batch_rows=settings.INVENTORY_EXPORT_BATCH_ROWS,
+        )
+        logger.info("✅ Inventory export ready (batch=%d rows)", settings.INVENTORY_EXPORT_BATCH_ROWS)
+    elif settings.INVENTORY_EXPORT_ENABLED:
+        logger.warning("⚠️ pyarrow not installed – inventory export disabled (install the 'analytics' extra)")
+
+    # Products change stream (shared by every in-memory view of the catalog)
+    dependencies.products_watcher = ChangeStreamWatcher(
+        dependencies.mongo_client.collection,
+        name="products",
+        # Embedding vectors are never needed by in-memory views – keep events small
+        pipeline=[{"$project": {f"fullDocument.{settings.EMBEDDING_FIELD_NAME}": 0}}],
+    )
+
+    # Type-ahead index
+    if settings.SUGGEST_ENABLED:
+        logger.info("⌨️ Building suggestion index...")
+        index = PrefixIndex(popularity_field=settings.SUGGEST_POPULARITY_FIELD)
+        dependencies.products_watcher.subscribe(document_handler(index.upsert, index.remove))
+        cursor = dependencies.mongo_client.collection.find(
+            {},
+            {
+                "productName": 1,
+                "brand": 1,
+                "category": 1,
+                "inventorySummary.storeObjectId": 1,
+                "inventorySummary.inStock": 1,
+                settings.SUGGEST_POPULARITY_FIELD: 1,
+            },
+        )
+        await load_view(index, dependencies.products_watcher, cursor)  # changes during the scan are replayed
+        dependencies.suggest_index = index
+        logger.info("✅ Suggestion index ready (%d products)", len(index))
+
+    # In-memory text engine for options 1 / 2 (vector, hybrid and facets stay on Atlas)
+    if settings.TEXT_SEARCH_BACKEND == "memory":
+        logger.info("📚 Building in-memory text index...")
+        text_index = BM25TextIndex()
+        dependencies.products_watcher.subscribe(document_handler(text_index.upsert, text_index.remove))
+        cursor = dependencies.mongo_client.collection.find({}, {**PRODUCT_FIELDS, IN_STOCK_STORES_FIELD: 1})
+        await load_view(text_index, dependencies.products_watcher, cursor)  # changes during the scan are replayed
+        dependencies.search_repo = LocalTextSearchRepository(dependencies.search_repo, text_index)
+        logger.info("✅ In-memory text index ready (%d products)", len(text_index))
+
+    # Nearest-store index (stores change rarely – rebuilt on every change)
+    if settings.NEAREST_STORES_ENABLED:
+        logger.info("🌍 Building store location index...")
+        dependencies.nearby_radius_km = settings.NEARBY_RADIUS_KM
+        dependencies.nearest_stores_max_k = settings.NEAREST_STORES_MAX_K
+        dependencies.nearest_stores_max_radius_km = settings.NEAREST_STORES_MAX_RADIUS_KM
+
+        stores = dependencies.mongo_client.database[settings.STORES_COLLECTION]
+        store_index = StoreIndex()
+        dependencies.stores_watcher = ChangeStreamWatcher(stores, name="stores")
+        dependencies.stores_watcher.subscribe(document_handler(store_index.upsert, store_index.remove))
+        cursor = stores.find({}, {"storeId": 1, "storeName": 1, "location": 1})
+        await load_view(store_index, dependencies.stores_watcher, cursor)  # changes during the scan are replayed
+        dependencies.store_index = store_index
+        logger.info("✅ Store index ready (%d stores)", len(store_index))
+
+    # Warm search indexes before declaring readiness
+    if settings.WARM_UP_SEARCH_INDEXES:
+        await dependencies.mongo_client.warm_up(text_index=settings.SEARCH_TEXT_INDEX)
+    dependencies.health_monitor.warmed_up = True
+
+    if dependencies.popular_search_warmer:
+        dependencies.popular_search_warmer.start()  # last: precomputed pages need every index above
+        logger.info("✅ Popular search warmer running (top %d per store, every %.0fs)",
+                    settings.POPULAR_SEARCH_TOP_K, settings.POPULAR_SEARCH_REFRESH_SECONDS)
+
     logger.info("🏁 Startup complete – ready to accept requests")
 
 # ───── Shutdown hook ────────────────────────────────────────────────────────
 @app.on_event("shutdown")
 async def shutdown_resources() -> None:
     """Close connections gracefully."""
+    if dependencies.health_monitor:
+        await dependencies.health_monitor.stop()
+    if dependencies.products_watcher:
+        await dependencies.products_watcher.stop()
+    if dependencies.stores_watcher:
+        await dependencies.stores_watcher.stop()
+    if dependencies.inventory_watcher:
+        await dependencies.inventory_watcher.stop()
+    if dependencies.store_kpi_materializer:
+        await dependencies.store_kpi_materializer.stop()
+    if dependencies.popular_search_warmer:
+        await dependencies.popular_search_warmer.stop()
+    if dependencies.slow_query_log:
+        await asyncio.to_thread(dependencies.slow_query_log.flush)  # queued entries reach the disk
+
     if dependencies.mongo_client:
         logger.info("🛑 Closing MongoDB connection...")
         dependencies.mongo_client.client.close()
@@ -118,23 +408,42 @@ app.include_router(
     ],
 )
 
-# ───── Health Check endpoint ────────────────────────────────────────────────
+# ───── Health Check endpoints ───────────────────────────────────────────────
 @app.get("/health", tags=["health"])
 async def health_check():
     """
-    Health check endpoint for liveness/readiness probes.
+    Liveness probe – served from the cached status, no DB round-trip.
 
-    - Verifies MongoDB is reachable
+    - Reports the last background MongoDB check
     - Confirms core dependencies are initialized
     """
-    try:
-        dependencies.mongo_client.client.admin.command("ping")
-        return {
-            "status": "ok",
-            "mongodb": "reachable",
-            "voyage": "configured",
-            "version": "1.0.0",  # Optional: extract from settings or env
-        }
-    except Exception:
-        logger.exception("❌ Health check failed – cannot reach MongoDB")
+    monitor = dependencies.health_monitor
+    if monitor is None or monitor.status()["mongodb"] == "unreachable":
+        logger.error("❌ Health check failed – cannot reach MongoDB")
         raise HTTPException(status_code=503, detail="DB connection failed")
+    return {
+        "status": "ok",
+        "mongodb": monitor.status()["mongodb"],
+        "voyage": "configured",
+        "version": "1.0.0",  # Optional: extract from settings or env
+    }
+
+
+@app.get("/ready", tags=["health"])
+async def readiness_check():
+    """
+    Readiness probe – 200 only once the pool and search indexes are warm and
+    the last background ping succeeded. Served from memory.
+    """
+    monitor = dependencies.health_monitor
+    if monitor is None or not monitor.ready:
+        status = monitor.status() if monitor else {"ready": False}
+        return JSONResponse(status_code=503, content=status)
+    return monitor.status()
+
+
+# ───── Metrics endpoint ─────────────────────────────────────────────────────
+@app.get("/metrics", tags=["health"])
+async def metrics_snapshot():
+    """JSON snapshot of in-process counters and gauges (cache hit rates, …)."""
+    return metrics.snapshot()
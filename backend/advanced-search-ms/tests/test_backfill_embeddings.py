@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+
+from app.domain.product import build_embedding_text, embedding_text_hash
+from app.jobs.backfill_embeddings import EmbeddingBackfill
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, *_):
+        return self
+
+    def batch_size(self, *_):
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    def __aiter__(self):
+        return self._gen()
+
+    async def _gen(self):
+        for doc in self.docs:
+            yield doc
+
+
+class FakeProducts:
+    def __init__(self, n):
+        self.docs = [{"_id": i, "embeddingText": f"product {i}"} for i in range(n)]
+        self.written = {}
+
+    def _matching(self, query):
+        after = query.get("_id", {}).get("$gt", -1)
+        return [d for d in self.docs if d["_id"] > after]
+
+    async def count_documents(self, query):
+        return len(self._matching(query))
+
+    def find(self, query, projection):
+        return FakeCursor(self._matching(query))
+
+    async def bulk_write(self, ops, ordered):
+        for op in ops:
+            self.written[op._filter["_id"]] = op._doc["$set"]
+
+
+class FakeVoyage:
+    model = "voyage-test"
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+
+    async def create_embeddings(self, texts):
+        if self.fail_on in texts:
+            raise RuntimeError("voyage down")
+        return [[float(len(t))] for t in texts]
+
+
+class FakeCheckpoints:
+    def __init__(self):
+        self.saved = {}
+
+    async def load(self, key):
+        return self.saved.get(key)
+
+    async def save(self, key, **fields):
+        self.saved[key] = fields
+
+    async def clear(self, key):
+        self.saved.pop(key, None)
+
+
+def backfill(products, voyage, checkpoints, **kwargs):
+    return EmbeddingBackfill(
+        products, voyage, checkpoints,
+        source_field="embeddingText", target_field="embedding", hash_field="embeddingTextHash",
+        batch_size=2, concurrency=1, report_every_s=60, **kwargs,
+    )
+
+
+def test_complete_run_clears_the_checkpoint():
+    products, checkpoints = FakeProducts(5), FakeCheckpoints()
+    assert asyncio.run(backfill(products, FakeVoyage(), checkpoints).run()) == 5
+    assert checkpoints.saved == {}
+    assert len(products.written) == 5
+
+
+def test_failed_run_keeps_its_checkpoint_and_resumes_after_it():
+    products, checkpoints = FakeProducts(6), FakeCheckpoints()
+    with pytest.raises(ExceptionGroup):
+        asyncio.run(backfill(products, FakeVoyage(fail_on="product 4"), checkpoints).run())
+    assert list(checkpoints.saved.values()) == [{"lastId": 3, "model": "voyage-test"}]
+
+    assert asyncio.run(backfill(products, FakeVoyage(), checkpoints).run()) == 2
+    assert checkpoints.saved == {}
+
+
+def test_run_stopped_by_limit_keeps_its_checkpoint():
+    products, checkpoints = FakeProducts(5), FakeCheckpoints()
+    asyncio.run(backfill(products, FakeVoyage(), checkpoints, limit=3).run())
+    assert list(checkpoints.saved.values()) == [{"lastId": 2, "model": "voyage-test"}]
+
+
+def test_backfill_writes_the_hash_the_reembed_worker_checks():
+    products, checkpoints = FakeProducts(2), FakeCheckpoints()
+    products.docs[1].update(productName="Oat Milk", brand="Oatly")
+    asyncio.run(backfill(products, FakeVoyage(), checkpoints).run())
+
+    plain, built = products.written[0], products.written[1]
+    assert plain["embeddingText"] == "product 0"  # no source fields: stored text kept
+    assert plain["embeddingTextHash"] == embedding_text_hash("product 0", "voyage-test")
+    text = build_embedding_text(products.docs[1])
+    assert built == {"embeddingText": text, "embedding": [float(len(text))],
+                     "embeddingTextHash": embedding_text_hash(text, "voyage-test")}
@@ -0,0 +1,83 @@
+import asyncio
+
+from pymongo.errors import AutoReconnect, OperationFailure
+
+from app.infrastructure.mongodb.change_streams import ChangeStreamWatcher, document_handler
+
+
+class FakeStream:
+    def __init__(self, events):
+        self.events = events
+        self.resume_token = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __aiter__(self):
+        return self._gen()
+
+    async def _gen(self):
+        for event in self.events:
+            self.resume_token = {"_data": event["_id"]}
+            yield event
+        await asyncio.Event().wait()  # idle, like a live stream
+
+
+class FlakyCollection:
+    """`watch()` fails per *script* entry (an exception) before yielding the events."""
+
+    def __init__(self, script, events):
+        self.script = list(script)
+        self.events = events
+        self.resume_after = []
+
+    def watch(self, pipeline, *, full_document, resume_after):
+        self.resume_after.append(resume_after)
+        if self.script:
+            raise self.script.pop(0)
+        return FakeStream(self.events)
+
+
+def event(n, op="insert"):
+    return {"_id": str(n), "operationType": op, "documentKey": {"_id": n}, "fullDocument": {"_id": n}}
+
+
+def run_watcher(col, *, resume_after=None, expected=1):
+    seen = []
+
+    async def main():
+        watcher = ChangeStreamWatcher(col, name="test", resume_after=resume_after, max_backoff_s=0.01)
+        watcher.subscribe(document_handler(lambda doc: seen.append(doc["_id"]), lambda _id: seen.append(-_id)))
+        watcher.start()
+        assert await watcher.wait_open(timeout_s=5)
+        for _ in range(100):
+            if len(seen) >= expected:
+                break
+            await asyncio.sleep(0.01)
+        await watcher.stop()
+
+    asyncio.run(main())
+    return seen
+
+
+def test_operation_failures_other_than_history_lost_are_retried(monkeypatch):
+    real_sleep = asyncio.sleep
+    monkeypatch.setattr(asyncio, "sleep", lambda s: real_sleep(min(s, 0.01)))
+    col = FlakyCollection(
+        [OperationFailure("not primary", code=10107), AutoReconnect("reset")],
+        [event(1), event(2, "delete")],
+    )
+    token = {"_data": "saved"}
+
+    assert run_watcher(col, resume_after=token, expected=2) == [1, -2]
+    assert col.resume_after == [token, token, token]  # same position on every retry
+
+
+def test_history_lost_restarts_from_now():
+    col = FlakyCollection([OperationFailure("history lost", code=286)], [event(3)])
+
+    assert run_watcher(col, resume_after={"_data": "gone"}) == [3]
+    assert col.resume_after == [{"_data": "gone"}, None]
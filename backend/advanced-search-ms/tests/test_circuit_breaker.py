@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+from app.infrastructure.voyage_ai.circuit_breaker import CircuitBreakerEmbedder
+from app.shared.exceptions import EmbeddingUnavailableError, InfrastructureError
+
+
+class FakeEmbedder:
+    def __init__(self):
+        self.fail = False
+        self.delay = 0.0
+        self.calls = 0
+
+    async def create_embedding(self, text, *, deadline=None):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail:
+            raise InfrastructureError("voyage down")
+        return [1.0]
+
+
+def breaker(inner, **kwargs):
+    options = dict(window=4, min_calls=2, error_rate_threshold=0.5, slow_call_ms=10_000, open_seconds=0)
+    options.update(kwargs)
+    return CircuitBreakerEmbedder(inner, **options)
+
+
+def trip(cb, inner):
+    inner.fail = True
+    for _ in range(2):
+        with pytest.raises(InfrastructureError):
+            asyncio.run(cb.create_embedding("q"))
+    inner.fail = False
+    assert cb.state == "open"
+
+
+def test_opens_on_error_rate_and_rejects_while_open():
+    inner = FakeEmbedder()
+    cb = breaker(inner, open_seconds=60)
+    trip(cb, inner)
+
+    with pytest.raises(EmbeddingUnavailableError):
+        asyncio.run(cb.create_embedding("q"))
+    assert inner.calls == 2
+
+
+def test_half_open_probe_closes_or_reopens():
+    inner = FakeEmbedder()
+    cb = breaker(inner)
+    trip(cb, inner)
+
+    assert asyncio.run(cb.create_embedding("q")) == [1.0]
+    assert cb.state == "closed"
+
+    trip(cb, inner)
+    inner.fail = True
+    with pytest.raises(InfrastructureError):
+        asyncio.run(cb.create_embedding("q"))
+    assert cb.state == "open"
+
+
+def test_only_one_probe_at_a_time():
+    inner = FakeEmbedder()
+    cb = breaker(inner)
+    trip(cb, inner)
+    inner.delay = 0.05
+
+    async def two_calls():
+        return await asyncio.gather(cb.create_embedding("a"), cb.create_embedding("b"), return_exceptions=True)
+
+    first, second = asyncio.run(two_calls())
+    assert first == [1.0]
+    assert isinstance(second, EmbeddingUnavailableError)
+    assert cb.state == "closed"
+
+
+def test_cancelled_probe_frees_the_probe_slot():
+    inner = FakeEmbedder()
+    cb = breaker(inner)
+    trip(cb, inner)
+    inner.delay = 10
+
+    async def cancel_probe():
+        task = asyncio.create_task(cb.create_embedding("q"))
+        await asyncio.sleep(0.01)
+        assert cb.state == "half_open"
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_probe())
+    assert cb.state == "half_open"
+    assert cb._probe_in_flight is False
+
+    inner.delay = 0
+    assert asyncio.run(cb.create_embedding("q")) == [1.0]
+    assert cb.state == "closed"
+
+
+def test_calls_cut_short_by_the_deadline_are_not_recorded():
+    from app.shared.deadline import Deadline
+    from app.shared.exceptions import DeadlineExceededError
+
+    inner = FakeEmbedder()
+    inner.delay = 0.2
+    cb = breaker(inner, call_timeout_s=5)
+    for _ in range(3):
+        with pytest.raises(DeadlineExceededError):
+            asyncio.run(cb.create_embedding("q", deadline=Deadline(20)))
+    assert cb.state == "closed"
+    assert list(cb._outcomes) == []
+
+    inner.delay = 0.05
+    with pytest.raises(InfrastructureError):
+        asyncio.run(breaker(inner, call_timeout_s=0.01).create_embedding("q", deadline=Deadline(5_000)))
@@ -0,0 +1,86 @@
+import asyncio
+import gzip
+
+import pytest
+
+from app.interfaces.compression import CompressionMiddleware, negotiate, parse_accept_encoding
+from app.shared import dependencies
+
+BODY = b'{"results": [' + b'{"productName": "Milk"},' * 200 + b"]}"
+
+
+def test_parse_accept_encoding():
+    assert parse_accept_encoding("gzip, BR;q=0.8, *;q=0, zstd;q=x") == {"gzip": 1.0, "br": 0.8, "*": 0.0, "zstd": 0.0}
+
+
+def test_negotiate_honours_q_zero_wildcard_and_server_preference():
+    available = ["zstd", "br", "gzip"]
+    assert negotiate("gzip, br", available) == "br"               # tie → server preference
+    assert negotiate("gzip;q=1, br;q=0.5", available) == "gzip"   # higher q wins
+    assert negotiate("*", available) == "zstd"
+    assert negotiate("*, zstd;q=0", available) == "br"
+    assert negotiate("gzip;q=0", available) is None
+    assert negotiate("identity", available) is None
+    assert negotiate("", available) is None
+
+
+@pytest.fixture(autouse=True)
+def _enabled(monkeypatch):
+    monkeypatch.setattr(dependencies, "response_compression_enabled", True)
+    monkeypatch.setattr(dependencies, "response_compression_min_bytes", 1_024)
+
+
+def run(messages, accept=b"gzip", status=200, headers=None):
+    """Send *messages* through the middleware; returns what reached the server."""
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": status, "headers": list(headers or [])})
+        for message in messages:
+            await send(message)
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    middleware = CompressionMiddleware(app)
+    middleware.codecs = {"gzip": middleware.codecs["gzip"]}  # independent of the optional codecs
+    scope = {"type": "http", "headers": [(b"accept-encoding", accept)]}
+    asyncio.run(middleware(scope, None, send))
+    return sent
+
+
+def test_large_body_is_compressed_with_etag_suffix_and_vary():
+    start, body = run(
+        [{"type": "http.response.body", "body": BODY}],
+        headers=[(b"content-length", b"9"), (b"etag", b'"abc"'), (b"vary", b"Origin")],
+    )
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"etag"] == b'"abc-gzip"'
+    assert headers[b"vary"] == b"Origin, Accept-Encoding"
+    assert headers[b"content-length"] == str(len(body["body"])).encode()
+    assert gzip.decompress(body["body"]) == BODY
+
+
+def test_weak_etag_is_left_alone():
+    start, _ = run([{"type": "http.response.body", "body": BODY}], headers=[(b"etag", b'W/"abc"')])
+    assert dict(start["headers"])[b"etag"] == b'W/"abc"'
+
+
+@pytest.mark.parametrize("messages, status, headers", [
+    ([{"type": "http.response.body", "body": b"data: 1\n\n", "more_body": True},
+      {"type": "http.response.body", "body": BODY}], 200, []),          # streaming (SSE)
+    ([{"type": "http.response.body", "body": b""}], 304, []),
+    ([{"type": "http.response.body", "body": b"{}"}], 200, []),           # below the threshold
+    ([{"type": "http.response.body", "body": BODY}], 200, [(b"content-encoding", b"br")]),
+])
+def test_pass_through(messages, status, headers):
+    sent = run(messages, status=status, headers=headers)
+    assert sent[0]["headers"] == headers
+    assert sent[1:] == messages
+
+
+def test_client_without_accepted_coding_gets_identity():
+    sent = run([{"type": "http.response.body", "body": BODY}], accept=b"identity")
+    assert sent[1]["body"] == BODY
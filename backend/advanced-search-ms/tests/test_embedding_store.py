@@ -0,0 +1,96 @@
+import fcntl
+import os
+import threading
+
+from app.infrastructure.voyage_ai.embedding_store import EmbeddingStore
+
+MODEL = "voyage-test"
+DIM = 4
+
+
+def vec(i):
+    return [float(i), i + 0.5, -float(i), 1.0]
+
+
+def test_put_get_roundtrip_and_normalised_keys(tmp_path):
+    store = EmbeddingStore(str(tmp_path))
+    store.put(MODEL, "Organic  Milk", vec(1))
+
+    assert store.get(MODEL, "organic milk") == vec(1)
+    assert store.get("other-model", "organic milk") is None
+    assert len(EmbeddingStore(str(tmp_path))) == 1  # survives a restart
+
+
+def test_sibling_writes_are_seen_after_the_refresh_interval(tmp_path):
+    reader = EmbeddingStore(str(tmp_path), refresh_interval_s=3600)
+    writer = EmbeddingStore(str(tmp_path))
+    writer.put(MODEL, "bread", vec(2))
+
+    assert reader.get(MODEL, "bread") is None      # index cached between misses
+    reader.refresh_interval_s = 0
+    assert reader.get(MODEL, "bread") == vec(2)
+
+
+def test_concurrent_writers_share_one_store(tmp_path):
+    stores = [EmbeddingStore(str(tmp_path)) for _ in range(2)]
+
+    def write(store, start):
+        for i in range(start, start + 100):
+            store.put(MODEL, f"text {i}", vec(i))
+
+    threads = [threading.Thread(target=write, args=(stores[n % 2], n * 100)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    fresh = EmbeddingStore(str(tmp_path))
+    assert len(fresh) == 400
+    assert all(fresh.get(MODEL, f"text {i}") == vec(i) for i in range(400))
+
+
+def test_put_over_the_cap_compacts_in_the_background(tmp_path):
+    store = EmbeddingStore(str(tmp_path), max_entries=10)
+    for i in range(11):
+        store.put(MODEL, f"q{i}", vec(i))
+    store._compactor.join(timeout=5)
+
+    assert (tmp_path / "CURRENT").read_text() == "gen-000002"
+    assert not (tmp_path / "gen-000001").exists()
+    assert len(store) == 8                          # newest 80 % of the cap
+    assert store.get(MODEL, "q0") is None
+    assert all(store.get(MODEL, f"q{i}") == vec(i) for i in range(3, 11))
+
+
+def test_rows_appended_during_the_copy_are_carried_over(tmp_path, monkeypatch):
+    store = EmbeddingStore(str(tmp_path), max_entries=10)
+    sibling = EmbeddingStore(str(tmp_path))
+    for i in range(10):
+        store.put(MODEL, f"q{i}", vec(i))
+
+    real_pread = os.pread
+    calls = []
+
+    def pread(fd, n, offset):
+        if not calls:  # a sibling appends while the bulk copy runs (writer lock not held)
+            sibling.put(MODEL, "late", vec(99))
+        calls.append(offset)
+        return real_pread(fd, n, offset)
+
+    monkeypatch.setattr(os, "pread", pread)
+    assert store.compact() is True
+    monkeypatch.undo()
+
+    sibling.refresh_interval_s = 0
+    assert sibling.get(MODEL, "late") == vec(99)
+    assert store.get(MODEL, "late") == vec(99)
+    assert len(store) == 9
+
+
+def test_only_one_compactor_runs_at_a_time(tmp_path):
+    store = EmbeddingStore(str(tmp_path))
+    store.put(MODEL, "x", vec(1))
+    with open(tmp_path / "compact.lock", "a+b") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        assert store.compact() is False
+    assert store.compact() is True
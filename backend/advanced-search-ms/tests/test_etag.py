@@ -0,0 +1,24 @@
+from app.interfaces.etag import match, strong_etag
+
+
+def test_strong_etag_is_stable_and_content_addressed():
+    assert strong_etag(b"a") == strong_etag(b"a") != strong_etag(b"b")
+    assert strong_etag(b"a").startswith('"') and strong_etag(b"a").endswith('"')
+
+
+def test_match_ignores_weak_prefix_and_coding_suffix():
+    tag = strong_etag(b"page")
+    opaque = tag.strip('"')
+    assert match(tag, tag) == tag
+    assert match(f'"{opaque}-gzip"', tag) == f'"{opaque}-gzip"'   # echoes what the client holds
+    assert match(f'W/"{opaque}-br"', tag) == f'W/"{opaque}-br"'
+    assert match(f'"other", "{opaque}-zstd"', tag) == f'"{opaque}-zstd"'
+
+
+def test_match_wildcard_and_misses():
+    tag = strong_etag(b"page")
+    assert match("*", tag) == tag
+    assert match(None, tag) is None
+    assert match("", tag) is None
+    assert match('"other-gzip"', tag) is None
+    assert match(f'"{tag.strip(chr(34))}-deflate"', tag) is None
@@ -0,0 +1,43 @@
+from app.infrastructure.memory.heavy_hitters import SpaceSaving
+
+
+def test_counts_are_exact_below_capacity():
+    sketch = SpaceSaving(4)
+    for key in "aabacb":
+        sketch.offer(key)
+    assert sketch.top(3)[None] == [("a", 3.0, 0.0), ("b", 2.0, 0.0), ("c", 1.0, 0.0)]
+    assert "a" in sketch and "z" not in sketch
+
+
+def test_new_key_takes_over_the_smallest_counter():
+    sketch = SpaceSaving(2)
+    for key in "aaab":
+        sketch.offer(key)
+    assert sketch.offer("c") == 2.0  # evicts b (count 1): count = 1 + 1, error = 1
+    assert "b" not in sketch
+    assert sketch.top(2)[None] == [("a", 3.0, 0.0), ("c", 2.0, 1.0)]
+
+
+def test_heavy_hitter_survives_a_stream_of_rare_keys():
+    sketch = SpaceSaving(8)
+    for i in range(2_000):
+        sketch.offer("milk" if i % 3 == 0 else f"rare-{i}")
+    (key, count, error), = sketch.top(1)[None]
+    assert key == "milk"
+    assert count - error <= 667 <= count  # true frequency lies within the reported bounds
+    assert len(sketch) == 8
+    assert len(sketch._heap) <= 4 * sketch.capacity + 1
+
+
+def test_top_per_group_with_min_count_and_decay():
+    sketch = SpaceSaving(16)
+    for store, query, n in [("s1", "milk", 5), ("s1", "eggs", 3), ("s1", "tea", 1), ("s2", "bread", 4)]:
+        for _ in range(n):
+            sketch.offer((store, query))
+    top = sketch.top(1, group=lambda k: k[0], min_count=2)
+    assert top == {"s1": [(("s1", "milk"), 5.0, 0.0)], "s2": [(("s2", "bread"), 4.0, 0.0)]}
+
+    sketch.decay(0.5)
+    assert sketch.top(5, min_count=2)[None] == [(("s1", "milk"), 2.5, 0.0), (("s2", "bread"), 2.0, 0.0)]
+    sketch.offer(("s2", "new"), weight=3)
+    assert sketch.top(1)[None][0] == (("s2", "new"), 3.0, 0.0)
@@ -0,0 +1,67 @@
+import asyncio
+
+from app.infrastructure.cache.ttl_cache import TTLCache
+from app.infrastructure.mongodb.inventory_repository import CachedInventoryRepository
+from app.shared.metrics import metrics
+
+
+class SlowInventory:
+    """Loads a split; `during_load` runs while the query is "in flight"."""
+
+    def __init__(self):
+        self.during_load = None
+        self.calls = 0
+
+    async def find_store_split(self, product_ids, store_object_id, *, deadline=None):
+        self.calls += 1
+        if self.during_load is not None:
+            self.during_load()
+        return {pid: {"store": store_object_id, "load": self.calls} for pid in product_ids}
+
+
+def fetch(repo, pid, store):
+    return asyncio.run(repo.find_store_split([pid], store))[pid]
+
+
+def test_second_store_is_merged_into_a_copy_of_the_cached_entry():
+    cache = TTLCache(name="test_inv_merge", ttl_s=60)
+    inner = SlowInventory()
+    repo = CachedInventoryRepository(inner, cache)
+
+    fetch(repo, "p1", "a")
+    first = cache.peek("p1")
+    fetch(repo, "p1", "b")
+
+    assert first == {"a": {"store": "a", "load": 1}}      # the old cached dict was not mutated
+    assert set(cache.peek("p1")) == {"a", "b"}
+    assert fetch(repo, "p1", "b") == {"store": "b", "load": 2}
+    assert inner.calls == 2
+
+
+def test_load_overtaken_by_an_invalidation_leaves_the_cache_untouched():
+    cache = TTLCache(name="test_inv_stale", ttl_s=60)
+    inner = SlowInventory()
+    repo = CachedInventoryRepository(inner, cache)
+    fresh = {"a": {"store": "a", "load": "fresh"}}
+
+    def change_then_fresh_load():
+        cache.invalidate("p1")                              # change event while "b" is loading
+        cache.set("p1", fresh, stamp=cache.stamp())         # a newer request caches store "a"
+
+    inner.during_load = change_then_fresh_load
+    assert fetch(repo, "p1", "b") == {"store": "b", "load": 1}  # the caller still gets its result
+
+    assert cache.peek("p1") is fresh
+    assert fresh == {"a": {"store": "a", "load": "fresh"}}      # the stale "b" was not merged in place
+
+
+def test_merge_reads_do_not_count_as_hits_or_misses():
+    cache = TTLCache(name="test_inv_metrics", ttl_s=60)
+    repo = CachedInventoryRepository(SlowInventory(), cache)
+
+    fetch(repo, "p1", "a")   # lookup misses; the merge after the load is not counted
+    fetch(repo, "p1", "b")   # lookup finds the entry (store missing) → load
+    fetch(repo, "p1", "b")   # lookup finds the store
+
+    assert metrics.counter("test_inv_metrics.misses") == 1
+    assert metrics.counter("test_inv_metrics.hits") == 2
@@ -0,0 +1,18 @@
+from app.domain.inventory import build_inventory_summary, in_stock_store_ids
+
+
+def test_summary_copies_only_present_summary_fields():
+    rows = [
+        {"storeObjectId": "a", "storeId": "S1", "inStock": True, "qty": 4, "predictedStockDepletion": "2026-01-01"},
+        {"storeObjectId": "b", "aisleId": None, "inStock": False},
+    ]
+    assert build_inventory_summary(rows) == [
+        {"storeObjectId": "a", "storeId": "S1", "inStock": True},
+        {"storeObjectId": "b", "aisleId": None, "inStock": False},  # a stored null is kept
+    ]
+    assert build_inventory_summary(None) == []
+
+
+def test_in_stock_store_ids_skips_rows_without_a_store():
+    summary = build_inventory_summary([{"storeObjectId": "a", "inStock": True}, {"inStock": True}, {"storeObjectId": "c"}])
+    assert in_stock_store_ids(summary) == ["a"]
@@ -0,0 +1,87 @@
+import asyncio
+import io
+from datetime import date, datetime, timezone
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from bson import ObjectId  # noqa: E402
+
+from app.infrastructure.mongodb.inventory_export import (  # noqa: E402
+    INVENTORY_EXPORT_SCHEMA,
+    MongoInventoryExporter,
+    flatten,
+    to_record_batch,
+)
+
+STORE = ObjectId()
+UPDATED = datetime(2026, 3, 1, 12, 30, tzinfo=timezone.utc)
+
+
+def result(i, **row):
+    return {
+        "productId": f"p{i}",
+        "updatedAt": UPDATED,
+        "row": {"storeObjectId": STORE, "storeId": "S1", "shelfQuantity": 4.0, "inStock": True,
+                "predictedStockDepletion": "2026-03-05T00:00:00Z", "lastRestock": datetime(2026, 2, 27), **row},
+        "product": {"productName": f"Item {i}", "brand": "B", "price": {"amount": 2, "currency": "USD"}},
+    }
+
+
+def test_flatten_matches_the_export_schema():
+    row = flatten(result(1, backroomQuantity=True, nextRestock="not a date"))
+    assert list(row) == INVENTORY_EXPORT_SCHEMA.names
+    assert row["priceAmount"] == 2.0 and row["shelfQuantity"] == 4
+    assert row["storeObjectId"] == str(STORE)
+    assert row["backroomQuantity"] is None and row["nextRestock"] is None  # wrong types become nulls
+    assert row["predictedStockDepletion"] == date(2026, 3, 5)
+    assert row["lastRestock"] == date(2026, 2, 27)
+
+    batch = to_record_batch([row, flatten({"productId": "p2"})])
+    assert batch.schema == INVENTORY_EXPORT_SCHEMA
+    assert batch.num_rows == 2
+    assert batch.column("productName").to_pylist() == ["Item 1", None]
+    assert batch.column("updatedAt").to_pylist()[0] == UPDATED
+
+
+class _Inventory:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def aggregate(self, pipeline, **_):
+        return self._gen()
+
+    async def _gen(self):
+        for doc in self.docs:
+            yield doc
+
+
+def export(fmt, n=5):
+    exporter = MongoInventoryExporter(_Inventory([result(i) for i in range(n)]),
+                                      products_collection="products", batch_rows=2)
+
+    async def collect():
+        return [chunk async for chunk in exporter.stream(str(STORE), fmt)]
+
+    return b"".join(asyncio.run(collect()))
+
+
+def test_arrow_and_parquet_round_trip():
+    table = pa.ipc.open_stream(export("arrow")).read_all()
+    assert table.schema.equals(INVENTORY_EXPORT_SCHEMA)
+    assert table.column("productId").to_pylist() == ["p0", "p1", "p2", "p3", "p4"]
+
+    parquet = pq.ParquetFile(io.BytesIO(export("parquet")))
+    assert parquet.metadata.num_rows == 5
+    assert parquet.metadata.num_row_groups == 3  # one per batch
+    assert parquet.schema_arrow.equals(INVENTORY_EXPORT_SCHEMA)
+
+
+def test_invalid_arguments_fail_before_streaming():
+    exporter = MongoInventoryExporter(_Inventory([]), products_collection="products")
+    with pytest.raises(ValueError):
+        exporter.stream("not-an-id", "arrow")
+    with pytest.raises(ValueError):
+        exporter.stream(str(STORE), "csv")
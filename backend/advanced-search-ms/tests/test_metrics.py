@@ -0,0 +1,23 @@
+import threading
+
+from app.shared.metrics import MetricsRegistry
+
+
+def test_concurrent_increments_and_snapshots():
+    registry = MetricsRegistry()
+
+    def writer(n):
+        for i in range(2_000):
+            registry.inc("hits", shard=n * 2_000 + i)  # new label keys grow the series dict
+            registry.inc("total")
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    while any(t.is_alive() for t in threads):
+        registry.snapshot()  # must never see a dict changing size mid-iteration
+    for t in threads:
+        t.join()
+
+    assert registry.counter("total") == 8_000
+    assert len(registry.snapshot()["counters"]["hits"]) == 8_000
@@ -0,0 +1,60 @@
+import asyncio
+
+from app.infrastructure.cache.popular_searches import PopularQuery, PopularSearchCache, PopularSearchWarmer
+
+
+def test_key_is_normalised_but_the_warmer_runs_the_original_text():
+    cache = PopularSearchCache(top_k=5, min_count=2)
+    key = PopularQuery.of("S1", 3, "  Organic   MILK ", 10, False)
+    assert key == PopularQuery.of("s1", 3, "organic milk", 10, False)
+    cache.record(key, "  Organic   MILK ")
+    cache.record(key, "Organic Milk")
+
+    seen = []
+
+    async def compute(k, query):
+        seen.append((k, query))
+        return {"results": [query]}
+
+    assert asyncio.run(PopularSearchWarmer(cache, compute).refresh()) == 1
+    assert seen == [(key, "Organic Milk")]
+    assert cache.record(key, "organic milk") == {"results": ["Organic Milk"]}
+
+
+def test_texts_follow_the_keys_tracked_by_the_sketch():
+    cache = PopularSearchCache(sketch_capacity=2)
+    keys = [PopularQuery.of("s1", 1, q, 10, False) for q in ("a", "b", "c", "d", "e")]
+    for key in keys:
+        cache.record(key, key.query.upper())
+    assert len(cache.texts) <= 4
+    assert cache.text_of(keys[-1]) == "E"
+
+    cache.refresh_hot_set()
+    assert set(cache.texts) == {k for k in keys if k in cache.sketch}
+    assert cache.text_of(keys[0]) == "a"  # evicted: normalised fallback
+
+
+def test_warmer_survives_a_failing_cycle(monkeypatch):
+    cache = PopularSearchCache()
+    calls = []
+
+    def refresh_hot_set():
+        calls.append(True)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        return set()
+
+    monkeypatch.setattr(cache, "refresh_hot_set", refresh_hot_set)
+
+    async def compute(k, query):
+        return {}
+
+    async def run():
+        warmer = PopularSearchWarmer(cache, compute, refresh_s=0.001)
+        warmer.start()
+        while len(calls) < 3:
+            await asyncio.sleep(0.001)
+        assert not warmer._task.done()
+        await warmer.stop()
+
+    asyncio.run(asyncio.wait_for(run(), timeout=2))
@@ -0,0 +1,134 @@
+import asyncio
+
+from app.infrastructure.memory.prefix_index import PrefixIndex
+from app.infrastructure.mongodb.change_streams import load_view
+
+STORE = "s1"
+
+
+def product(pid, name, popularity, *, brand=None, stores=(STORE,)):
+    return {
+        "_id": pid,
+        "productName": name,
+        "brand": brand,
+        "category": "Produce",
+        "popularity": popularity,
+        "inventorySummary": [{"storeObjectId": s, "inStock": True} for s in stores],
+    }
+
+
+def names(index, prefix, limit=5, store=STORE):
+    return [s["productName"] for s in index.suggest(prefix, store, limit)]
+
+
+def built(docs):
+    index = PrefixIndex()
+    index.begin_reload()
+    index.finish_reload(docs)
+    return index
+
+
+def test_bulk_build_matches_incremental_upserts():
+    docs = [product(i, f"Apple {i}", i % 7) for i in range(50)] + [product("x", "Red Apple Juice", 99)]
+    incremental = PrefixIndex()
+    for doc in docs:
+        incremental.upsert(doc)
+    bulk = built(docs)
+
+    assert bulk._keys == incremental._keys
+    assert bulk._ranked == incremental._ranked
+    for prefix in ("a", "ap", "apple", "apple 4", "juice", "produce"):
+        assert names(bulk, prefix, 10) == names(incremental, prefix, 10)
+
+
+def test_most_popular_match_wins_however_many_keys_precede_it():
+    # Thousands of low-popularity keys sort before the popular one
+    docs = [product(i, f"Aardvark Snack {i:05d}", 1) for i in range(6_000)]
+    docs.append(product("top", "Azure Tea", 50))
+    index = built(docs)
+
+    assert names(index, "a", 1) == ["Azure Tea"]   # ranked list
+    assert names(index, "aa", 1) == ["Aardvark Snack 00000"]
+    assert names(index, "a", 1, store="elsewhere") == []
+
+
+def test_long_prefix_scans_the_whole_range():
+    docs = [product(i, f"Onion Ring {i:05d}", 1) for i in range(6_000)]
+    docs.append(product("top", "Onion Zest", 50))
+    index = built(docs)
+
+    assert names(index, "onion", 1) == ["Onion Zest"]
+
+
+def test_store_availability_and_removal_update_ranked_lists():
+    index = built([product(1, "Banana", 5), product(2, "Bagel", 9, stores=("s2",))])
+    assert names(index, "ba") == ["Banana"]
+    assert names(index, "ba", store="s2") == ["Bagel"]
+
+    index.upsert(product(1, "Banana", 10, stores=("s2",)))
+    assert names(index, "ba") == []
+    assert names(index, "ba", store="s2") == ["Banana", "Bagel"]
+
+    index.remove(1)
+    assert names(index, "b", store="s2") == ["Bagel"]
+    assert "ba" in index._ranked and len(index._ranked["ba"]) == 1
+
+
+def test_events_during_reload_are_replayed_over_the_scan():
+    index = PrefixIndex()
+    index.begin_reload()
+    index.upsert(product(1, "Cherry", 70))      # newer than the scanned copy
+    index.remove(2)                              # deleted after the scan read it
+    index.finish_reload([product(1, "Cherry", 1), product(2, "Cheese", 5)])
+
+    assert index.suggest("ch", STORE, 5) == [
+        {"id": "1", "productName": "Cherry", "brand": None, "category": "Produce", "popularity": 70.0}
+    ]
+    assert index._pending is None
+
+
+class _Watcher:
+    def __init__(self, index):
+        self.index = index
+        self.started = False
+
+    def start(self):
+        self.started = True
+
+    async def wait_open(self):
+        self.index.upsert(product(3, "Date", 8))  # a change arriving as the stream opens
+        return True
+
+
+class _Cursor:
+    def __init__(self, docs, fail=False):
+        self.docs, self.fail = docs, fail
+
+    def __aiter__(self):
+        return self._gen()
+
+    async def _gen(self):
+        for doc in self.docs:
+            yield doc
+        if self.fail:
+            raise RuntimeError("cursor died")
+
+
+def test_load_view_queues_from_before_the_stream_opens():
+    index = PrefixIndex()
+    watcher = _Watcher(index)
+    asyncio.run(load_view(index, watcher, _Cursor([product(3, "Date", 1), product(4, "Dill", 2)])))
+
+    assert watcher.started
+    assert names(index, "d") == ["Date", "Dill"]
+
+
+def test_load_view_keeps_live_index_when_scan_fails():
+    index = built([product(5, "Elderberry", 1)])
+    try:
+        asyncio.run(load_view(index, _Watcher(index), _Cursor([product(6, "Endive", 1)], fail=True)))
+    except RuntimeError:
+        pass
+    assert index._pending is None
+    assert names(index, "e") == ["Elderberry"]
+    assert names(index, "d") == ["Date"]  # applied live while queued
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+from pymongo.read_preferences import Nearest, Primary, SecondaryPreferred
+
+from app.infrastructure.mongodb.read_routing import hedge_preference_for, hedged, read_preference_for
+from app.shared.config import ReadRouting, Settings
+
+TAGS = [{"nodeType": "ANALYTICS"}]
+
+
+def test_hedge_stays_on_secondaries_with_the_same_tags():
+    for mode in ("primary", "secondary", "secondaryPreferred", "primaryPreferred"):
+        pref = hedge_preference_for(ReadRouting(mode=mode, tag_sets=TAGS, max_staleness_s=90))
+        assert isinstance(pref, SecondaryPreferred)
+        assert pref.tag_sets == TAGS
+        assert pref.max_staleness == 90
+
+
+def test_nearest_hedges_to_nearest_and_primary_only_when_explicit():
+    assert isinstance(hedge_preference_for(ReadRouting(mode="nearest", tag_sets=TAGS)), Nearest)
+    assert isinstance(hedge_preference_for(ReadRouting(mode="secondary", hedge_mode="primary")), Primary)
+    assert isinstance(read_preference_for(ReadRouting()), Primary)
+
+
+def _settings(**overrides):
+    return Settings(
+        MONGODB_URI="mongodb://localhost",
+        MONGODB_DATABASE="db",
+        PRODUCTS_COLLECTION="products",
+        SEARCH_TEXT_INDEX="text",
+        SEARCH_VECTOR_INDEX="vector",
+        EMBEDDING_FIELD_NAME="embedding",
+        VOYAGE_API_URL="https://voyage.invalid",
+        VOYAGE_API_KEY="key",
+        VOYAGE_MODEL="voyage-test",
+        **overrides,
+    )
+
+
+@pytest.mark.parametrize("routing", [
+    {"vectr": {"mode": "nearest"}},                          # unknown option
+    {"vector": {"mode": "nearest", "hedge_afer_ms": 150}},   # unknown key
+    {"vector": {"mode": "secondaries"}},                     # unknown mode
+])
+def test_routing_config_typos_fail_at_startup(routing):
+    with pytest.raises(ValidationError, match="SEARCH_READ_ROUTING"):
+        _settings(SEARCH_READ_ROUTING=routing)
+
+
+def test_routing_config_accepts_known_options():
+    settings = _settings(SEARCH_READ_ROUTING={"vector": {"mode": "nearest", "hedge_after_ms": 150}})
+    assert settings.SEARCH_READ_ROUTING["vector"].hedge_after_ms == 150
+
+
+def test_hedged_keeps_the_first_success():
+    async def slow():
+        await asyncio.sleep(1)
+        return "first"
+
+    async def fast():
+        return "second"
+
+    assert asyncio.run(hedged(slow, fast, hedge_after_ms=10, label="t")) == "second"
+    assert asyncio.run(hedged(fast, slow, hedge_after_ms=10, label="t")) == "second"
+
+
+def test_hedged_cancels_the_first_read_when_cancelled_before_hedging():
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def main():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(hedged(slow, slow, hedge_after_ms=500, label="t"), timeout=0.01)
+        await asyncio.sleep(0.01)
+        assert cancelled == [True]  # before asyncio.run() tears the loop down
+
+    asyncio.run(main())
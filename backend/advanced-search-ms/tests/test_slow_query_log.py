@@ -0,0 +1,107 @@
+import asyncio
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+from app.infrastructure.mongodb.search_repository import MongoSearchRepository
+from app.infrastructure.mongodb.slow_query_log import ACTIVE, PREVIOUS, SlowQueryLog
+from app.shared.config import ReadRouting
+
+COLLECTION = SimpleNamespace(name="products", database=SimpleNamespace(name="db"))
+
+
+def record(log, n, elapsed_ms=600.0):
+    return log.record(
+        option="text",
+        collection=COLLECTION,
+        pipeline=[{"$match": {"n": n}}],
+        params={"query": f"q{n}"},
+        elapsed_ms=elapsed_ms,
+        max_time_ms=5_000,
+    )
+
+
+def test_ring_keeps_the_newest_entries_within_max_bytes(tmp_path):
+    log = SlowQueryLog(str(tmp_path), max_bytes=4_000)
+    for n in range(40):
+        assert record(log, n)
+    log.flush()
+
+    sizes = [os.path.getsize(tmp_path / name) for name in (PREVIOUS, ACTIVE)]
+    assert all(size <= 2_000 for size in sizes)
+    seen = [e["params"]["query"] for e in log.entries()]
+    assert seen == [f"q{n}" for n in range(40 - len(seen), 40)]  # contiguous, oldest first, newest last
+    assert 10 < len(seen) < 40
+
+
+def test_fast_queries_are_not_recorded(tmp_path):
+    log = SlowQueryLog(str(tmp_path), threshold_ms=500)
+    assert not record(log, 1, elapsed_ms=499)
+    log.flush()
+    assert list(log.entries()) == []
+
+
+def test_write_happens_on_the_writer_thread(tmp_path, monkeypatch):
+    log = SlowQueryLog(str(tmp_path), queue_size=1)
+    writers = []
+    release = threading.Event()
+    append = log._append
+
+    def blocking_append(line):
+        writers.append(threading.current_thread().name)
+        release.wait(5)
+        append(line)
+
+    monkeypatch.setattr(log, "_append", blocking_append)
+    assert record(log, 1)                  # returns while the write is still blocked
+    while not writers:
+        time.sleep(0.001)
+    assert record(log, 2)                  # fills the queue
+    assert not record(log, 3)              # backlog full: dropped, not waited for
+    release.set()
+    log.flush()
+
+    assert writers == ["slow-query-log", "slow-query-log"]
+    assert [e["params"]["query"] for e in log.entries()] == ["q1", "q2"]
+
+
+class _Collection:
+    def __init__(self, name, delays):
+        self.name, self.delays = name, delays
+        self.database = SimpleNamespace(name="db")
+
+    def with_options(self, read_preference):
+        return _Collection(f"{self.name}:{type(read_preference).__name__}", self.delays)
+
+    def aggregate(self, pipeline, maxTimeMS):
+        delay = self.delays[self.name]
+        return SimpleNamespace(to_list=lambda length: _rows(delay))
+
+
+async def _rows(delay):
+    await asyncio.sleep(delay)
+    return [{"docs": [], "total": 0}]
+
+
+class _Recorder:
+    def __init__(self):
+        self.calls = []
+
+    def record(self, **kwargs):
+        self.calls.append(kwargs)
+
+
+def test_hedge_win_records_the_read_that_served_it():
+    delays = {"products:Primary": 0.5, "products:SecondaryPreferred": 0.02}
+    recorder = _Recorder()
+    repo = MongoSearchRepository(
+        _Collection("products", delays), "text", "vector", "embedding",
+        read_routing={"text": ReadRouting(hedge_after_ms=100)},
+        slow_query_log=recorder,
+    )
+    assert asyncio.run(repo._run_pipeline([{"$match": {}}], "s1", "text")) == ([], 0)
+
+    (call,) = recorder.calls
+    assert call["collection"].name == "products:SecondaryPreferred"
+    assert call["elapsed_ms"] < 90  # the hedge's own read, not the time since the first attempt started
@@ -0,0 +1,159 @@
+import asyncio
+import json
+
+from app.infrastructure.memory.stock_alerts import StockAlertHub
+from app.interfaces.sse import alert_stream
+
+
+def inv(pid, *rows):
+    return {"_id": pid, "productId": f"p{pid}", "storeInventory": [
+        {"storeObjectId": store, "storeId": store.upper(), "inStock": in_stock, "nearToReplenishmentInShelf": near}
+        for store, in_stock, near in rows
+    ]}
+
+
+def change(doc, op="update"):
+    return {"operationType": op, "documentKey": {"_id": doc["_id"]}, "fullDocument": doc}
+
+
+async def feed(hub, *docs):
+    for doc in docs:
+        await hub.on_change(change(doc))
+
+
+def apply(hub, *docs):
+    asyncio.run(feed(hub, *docs))
+
+
+def events(alerts):
+    return [(a.event, a.store, a.data["productId"]) for a in alerts]
+
+
+def test_transitions_are_detected_per_store():
+    hub = StockAlertHub()
+    hub.seed([inv(1, ("a", True, False), ("b", True, False))])
+    sub = hub.subscribe("a")
+    apply(
+        hub,
+        inv(1, ("a", False, True), ("b", True, False)),   # a: stock-out + replenishment-needed
+        inv(1, ("a", False, True), ("b", True, False)),   # no change
+        inv(1, ("a", True, None), ("b", False, False)),   # a: back-in-stock (None is not a transition)
+        inv(2, ("a", False, False)),                      # first sighting: nothing to compare
+    )
+    alerts = [sub.queue.get_nowait() for _ in range(sub.queue.qsize())]
+    assert events(alerts) == [("stock-out", "a", "p1"), ("replenishment-needed", "a", "p1"), ("back-in-stock", "a", "p1")]
+    assert events(hub._recent["b"]) == [("stock-out", "b", "p1")]
+
+    asyncio.run(hub.on_change({"operationType": "delete", "documentKey": {"_id": 1}}))
+    assert "1" not in hub._flags
+
+
+def flips(hub, store, pid, times):
+    """Seeds product *pid* out of stock; returns *times* updates toggling inStock."""
+    docs = [inv(pid, (store, i % 2 == 1, None)) for i in range(times + 1)]
+    hub.seed(docs[:1])
+    return docs[1:]
+
+
+def flip(hub, store, pid, times):
+    apply(hub, *flips(hub, store, pid, times))
+
+
+def test_resume_replays_what_was_missed():
+    hub = StockAlertHub(replay_size=10)
+    flip(hub, "a", 1, 3)
+    first = hub._recent["a"][0].id
+    sub = hub.subscribe("a", last_event_id=first)
+    assert [a.id for a in sub.replay] == [a.id for a in list(hub._recent["a"])[1:]]
+    assert sub.reset_id is None
+
+
+def test_interleaved_stores_do_not_report_a_false_gap():
+    hub = StockAlertHub(replay_size=2)
+    hub.seed([inv(1, ("a", True, None)), inv(2, ("b", True, None))])
+    apply(hub, inv(1, ("a", False, None)), inv(2, ("b", False, None)),   # seq 1 → a, seq 2 → b
+          inv(1, ("a", True, None)), inv(1, ("a", False, None)))        # seq 3, 4 → a
+    sub = hub.subscribe("a", last_event_id=f"{hub.epoch}-1")
+    assert [a.id for a in sub.replay] == [f"{hub.epoch}-3", f"{hub.epoch}-4"]
+    assert sub.reset_id is None
+
+    apply(hub, inv(1, ("a", True, None)))                               # seq 5 evicts seq 3
+    sub = hub.subscribe("a", last_event_id=f"{hub.epoch}-2")
+    assert sub.reset_id == f"{hub.epoch}-0"
+    assert [a.id for a in sub.replay] == [f"{hub.epoch}-4", f"{hub.epoch}-5"]
+
+
+def test_unknown_epoch_resets_and_client_limit_rejects():
+    hub = StockAlertHub(max_clients=1)
+    flip(hub, "a", 1, 1)
+    sub = hub.subscribe("a", last_event_id="0-7")
+    assert sub.reset_id == f"{hub.epoch}-0" and len(sub.replay) == 1
+    assert hub.subscribe("a") is None
+    hub.unsubscribe(sub)
+    assert hub.client_count == 0
+
+
+def test_slow_client_overflows_without_blocking_others():
+    hub = StockAlertHub(client_buffer=2)
+    slow, fast = hub.subscribe("a"), hub.subscribe("a")
+    flip(hub, "a", 1, 2)
+    fast_alerts = [fast.queue.get_nowait(), fast.queue.get_nowait()]
+    flip(hub, "a", 2, 1)
+    assert slow.overflowed and not fast.overflowed
+    assert slow.queue.qsize() == 2
+    assert len(fast_alerts) + fast.queue.qsize() == 3
+
+
+def frames(chunks):
+    out = []
+    for chunk in chunks:
+        text = chunk.decode()
+        if text.startswith("id:"):
+            lines = dict(line.split(": ", 1) for line in text.strip().split("\n"))
+            out.append((lines["event"], lines["id"], json.loads(lines["data"])))
+        else:
+            out.append(text)
+    return out
+
+
+def test_stream_sends_reset_replay_and_closes_on_overflow():
+    hub = StockAlertHub(client_buffer=1)
+    flip(hub, "a", 1, 1)
+
+    async def run():
+        sub = hub.subscribe("a", last_event_id="stale-1")
+        stream = alert_stream(hub, sub, heartbeat_s=0.01)
+        chunks = [await stream.__anext__() for _ in range(4)]   # retry, reset, replay, ping
+        await feed(hub, *flips(hub, "a", 2, 2))                  # 2 alerts into a buffer of 1
+        chunks += [chunk async for chunk in stream]
+        return chunks
+
+    out = frames(asyncio.run(run()))
+    assert out[0] == "retry: 3000\n\n"
+    assert out[1][0] == "reset"
+    assert out[2][:2] == ("back-in-stock", f"{hub.epoch}-1")
+    assert out[3] == ": ping\n\n"
+    assert out[4:] == []  # overflowed: the stream ends so the client reconnects
+    assert hub.client_count == 0
+
+
+def test_cancelled_stream_unsubscribes():
+    hub = StockAlertHub()
+
+    async def run():
+        sub = hub.subscribe("a")
+        stream = alert_stream(hub, sub, heartbeat_s=10)
+
+        async def consume():
+            async for _ in stream:
+                pass
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.01)
+        assert hub.client_count == 1
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await stream.aclose()
+
+    asyncio.run(run())
+    assert hub.client_count == 0
@@ -0,0 +1,59 @@
+import math
+import random
+
+from app.infrastructure.memory.store_index import EARTH_RADIUS_KM, StoreIndex
+
+
+def store(sid, lng, lat):
+    return {"_id": sid, "storeId": f"S{sid}", "storeName": f"Store {sid}", "location": {"coordinates": [lng, lat]}}
+
+
+def haversine(lng1, lat1, lng2, lat2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lng2 - lng1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def loaded(docs):
+    index = StoreIndex()
+    index.begin_reload()
+    index.finish_reload(docs)
+    return index
+
+
+def test_nearest_matches_brute_force_including_the_antimeridian():
+    rng = random.Random(7)
+    docs = [store(i, rng.uniform(-180, 180), rng.uniform(-85, 85)) for i in range(300)]
+    index = loaded(docs)
+
+    for lng, lat in [(179.9, 0.0), (-3.7, 40.4), (0.0, 89.0)]:
+        expected = sorted(docs, key=lambda d: haversine(lng, lat, *d["location"]["coordinates"]))[:5]
+        hits = index.nearest(lng, lat, k=5)
+        assert [e.id for _, e in hits] == [str(d["_id"]) for d in expected]
+        assert math.isclose(hits[0][0], haversine(lng, lat, *expected[0]["location"]["coordinates"]), rel_tol=1e-6)
+
+
+def test_radius_bounds_the_result():
+    index = loaded([store(1, 0.0, 0.0), store(2, 0.0, 1.0), store(3, 0.0, 5.0)])
+    assert [e.id for _, e in index.nearest(0.0, 0.0, k=10, radius_km=200)] == ["1", "2"]
+
+
+def test_events_during_reload_are_replayed_over_the_scan():
+    index = StoreIndex()
+    index.begin_reload()
+    index.upsert(store(1, 10.0, 10.0))                # moved after the scan read it
+    index.remove(2)                                    # closed after the scan read it
+    index.upsert({"_id": 3, "storeId": "S3"})          # lost its location
+    index.finish_reload([store(1, 0.0, 0.0), store(2, 1.0, 1.0), store(3, 2.0, 2.0)])
+
+    assert len(index) == 1
+    assert (index.get("1").lng, index.get("1").lat) == (10.0, 10.0)
+    assert index._pending is None
+
+
+def test_co_located_stores_tie_without_comparing_entries():
+    index = loaded([store("b", 1.0, 1.0), store("a", 1.0, 1.0), store("c", 1.0, 2.0)])
+    hits = index.nearest(1.0, 1.0, k=3)
+    assert [e.id for _, e in hits] == ["a", "b", "c"]
+    assert hits[0][0] == hits[1][0] == 0.0
@@ -0,0 +1,111 @@
+import asyncio
+from datetime import date
+
+from app.infrastructure.memory.store_kpis import StoreKpiView
+from app.infrastructure.mongodb.store_kpis import StoreKpiMaterializer
+
+TODAY = date(2026, 1, 10)
+
+
+def inv(pid, *rows):
+    return {"_id": pid, "storeInventory": [
+        {"storeObjectId": store, "storeId": store.upper(), "inStock": in_stock,
+         "nearToReplenishmentInShelf": near, "predictedStockDepletion": depletes}
+        for store, in_stock, near, depletes in rows
+    ]}
+
+
+def kpi(store, products, in_stock, near=0, depletion=None):
+    return {"_id": store, "productCount": products, "inStockCount": in_stock,
+            "nearReplenishmentCount": near, "depletionByDate": depletion or {}}
+
+
+class FakeInventory:
+    def __init__(self, computed, during=None):
+        self.computed, self.during = computed, during
+        self.scans = 0
+
+    def aggregate(self, pipeline):
+        async def gen():
+            if self.during is not None:
+                self.during()  # change events applied while the aggregation runs
+            for doc in self.computed:
+                yield doc
+        return gen()
+
+    def find(self, query, projection):
+        inventory = self
+
+        class Cursor:
+            async def to_list(self, length=None):
+                inventory.scans += 1
+                return []
+        return Cursor()
+
+
+class FakeKpis:
+    name = "store_kpis"
+
+    def __init__(self):
+        self.ops = []
+
+    async def bulk_write(self, ops, ordered):
+        self.ops.extend(ops)
+
+
+def test_view_counts_incrementally_and_tracks_changed_stores():
+    view = StoreKpiView()
+    view.upsert(inv(1, ("a", True, False, "2026-01-12"), ("b", False, True, None)))
+    mark = view.mark()
+    view.upsert(inv(2, ("a", False, True, "2026-01-30")))
+
+    got = view.get("a", depletion_horizons=[3, 30], today=TODAY)
+    assert (got["productCount"], got["inStockCount"], got["outOfStockCount"], got["nearReplenishmentCount"]) == (2, 1, 1, 1)
+    assert got["depletingWithin"] == {"3": 1, "30": 2}
+    assert view.changed_since(mark) == {"a"}
+
+    view.remove(1)
+    assert view.get("b") is None and view.stores() == ["a"]
+
+
+def reconcile(view, inventory):
+    kpis = FakeKpis()
+    materializer = StoreKpiMaterializer(view, inventory, kpis)
+    return asyncio.run(materializer.reconcile()), kpis.ops
+
+
+def test_reconcile_replaces_matching_stores_and_deletes_orphans():
+    view = StoreKpiView()
+    view.upsert(inv(1, ("a", True, False, None)))
+    inventory = FakeInventory([kpi("a", 1, 1)])
+
+    drift, ops = reconcile(view, inventory)
+
+    assert drift == 0 and inventory.scans == 0
+    assert [op._doc["_id"] for op in ops[:-1]] == ["a"]
+    assert ops[-1]._filter == {"_id": {"$nin": ["a"]}}  # e.g. a store whose last product left
+
+
+def test_changes_during_the_aggregation_are_not_drift():
+    view = StoreKpiView()
+    view.upsert(inv(1, ("a", True, False, None)))
+    view.upsert(inv(2, ("b", True, False, None)))
+    # The aggregation saw product 3 in store "a" before the view got its event
+    inventory = FakeInventory([kpi("a", 2, 2), kpi("b", 1, 1)],
+                              during=lambda: view.upsert(inv(3, ("a", True, False, None))))
+
+    drift, ops = reconcile(view, inventory)
+
+    assert drift == 0 and inventory.scans == 0
+    assert [op._doc["_id"] for op in ops[:-1]] == ["b"]  # "a" is left to its own flush
+    assert ops[-1]._filter == {"_id": {"$nin": ["a", "b"]}}
+
+
+def test_real_drift_rebuilds_the_view():
+    view = StoreKpiView()
+    view.upsert(inv(1, ("a", True, False, None)))
+    inventory = FakeInventory([kpi("a", 1, 0)])  # a missed event flipped inStock
+
+    drift, _ = reconcile(view, inventory)
+
+    assert drift == 1 and inventory.scans == 1
@@ -0,0 +1,152 @@
+import asyncio
+import math
+
+from app.domain.inventory import IN_STOCK_STORES_FIELD
+from app.domain.search_filters import SearchFilters
+from app.infrastructure.memory.text_index import B, K1, BM25TextIndex
+from app.infrastructure.mongodb.change_streams import load_view
+
+STORE = "s1"
+
+
+def product(pid, name, *, brand=None, category=None, price=1.0, stores=(STORE,), in_stock=(STORE,)):
+    return {
+        "_id": pid,
+        "productName": name,
+        "brand": brand,
+        "category": category,
+        "price": {"amount": price},
+        "inventorySummary": [{"storeObjectId": s} for s in stores],
+        IN_STOCK_STORES_FIELD: list(in_stock),
+    }
+
+
+def built(docs):
+    index = BM25TextIndex()
+    index.begin_reload()
+    index.finish_reload(docs)
+    return index
+
+
+def ids(index, hits):
+    return [index.document(o)["_id"] for o, _ in hits]
+
+
+def test_bm25_score_matches_the_formula():
+    index = built([product(1, "Green Apple"), product(2, "Apple Juice"), product(3, "Banana")])
+    hits, total = index.text("juice", STORE, 0, 10)
+
+    idf = math.log(1 + (3 - 1 + 0.5) / (1 + 0.5))
+    norm = K1 * (1 - B + B * 2 / (5 / 3))
+    assert total == 1
+    assert ids(index, hits) == [2]
+    assert math.isclose(hits[0][1], 0.8 * idf * 1 / (1 + norm))
+
+
+def test_shorter_name_and_boosted_field_rank_first():
+    index = built([
+        product(1, "Apple Juice Drink"),
+        product(2, "Apple"),
+        product(3, "Orange", brand="Apple"),
+    ])
+    hits, total = index.text("apple", STORE, 0, 10)
+    assert total == 3
+    assert ids(index, hits) == [2, 1, 3]
+
+    page, _ = index.text("apple", STORE, 1, 1)
+    assert ids(index, page) == [1]
+
+
+def test_fuzzy_product_name_uses_lucene_boost():
+    index = built([product(1, "Apple"), product(2, "Maple Syrup")])
+    exact, _ = index.text("apple", STORE, 0, 10)
+    typo, _ = index.text("aple", STORE, 0, 10)
+    assert ids(index, typo)[0] == 1
+    assert dict(index._expand("aple"))["apple"] == 1 - 1 / 4
+    assert typo[0][1] < exact[0][1]
+
+
+def test_keyword_prefix_and_filters():
+    index = built([
+        product(1, "Banana Bread", category="Bakery", price=4.0),
+        product(2, "banana", category="Produce", price=0.5, in_stock=()),
+        product(3, "Bagel", category="Bakery", price=2.0),
+        product(4, "Banana Chips", stores=("s2",), in_stock=("s2",)),
+    ])
+    hits, total = index.keyword("BANANA", STORE, 0, 10)
+    assert (ids(index, hits), total) == ([1, 2], 2)
+
+    assert ids(index, index.keyword("ba", STORE, 0, 10, filters=SearchFilters(in_stock=True))[0]) == [1, 3]
+    assert ids(index, index.keyword("ba", STORE, 0, 10, filters=SearchFilters(categories=("Bakery",), max_price=3))[0]) == [3]
+    assert ids(index, index.keyword("ba", "s2", 0, 10)[0]) == [4]
+
+
+def test_bulk_build_matches_incremental_upserts():
+    docs = [product(i, f"Item {i % 5} Crunchy Snack {i}", brand=f"B{i % 3}") for i in range(40)]
+    incremental = BM25TextIndex()
+    for doc in docs:
+        incremental.upsert(doc)
+    bulk = built(docs)
+
+    assert bulk._names == incremental._names
+    for name, field in bulk._fields.items():
+        other = incremental._fields[name]
+        assert {t: (list(p.docs), list(p.tfs)) for t, p in field.postings.items()} == \
+               {t: (list(p.docs), list(p.tfs)) for t, p in other.postings.items()}
+        assert (field.lengths, field.total_length, field.doc_count) == \
+               (other.lengths, other.total_length, other.doc_count)
+    assert bulk.text("crunchy snak", STORE, 0, 10) == incremental.text("crunchy snak", STORE, 0, 10)
+
+
+def test_upsert_with_unchanged_text_only_refreshes_stores():
+    index = built([product(1, "Kiwi"), product(2, "Kiwi Jam")])
+    postings = index._fields["productName"].postings["kiwi"]
+
+    index.upsert(product(1, "Kiwi", price=9.0, stores=("s2",), in_stock=()))
+    assert index._fields["productName"].postings["kiwi"] is postings
+    assert list(postings.docs) == [0, 1]
+    assert ids(index, index.keyword("kiwi", STORE, 0, 10)[0]) == [2]
+    assert ids(index, index.keyword("kiwi", "s2", 0, 10)[0]) == [1]
+    assert index.document(0)["price"] == {"amount": 9.0}
+
+    index.upsert(product(1, "Kiwi Fruit", stores=("s2",)))
+    assert ids(index, index.text("fruit", "s2", 0, 10)[0]) == [1]
+
+
+def test_events_during_reload_are_replayed_over_the_scan():
+    index = BM25TextIndex()
+    index.begin_reload()
+    index.upsert(product(1, "Lemon Curd"))   # newer than the scanned copy
+    index.remove(2)                           # deleted after the scan read it
+    index.finish_reload([product(1, "Lemon"), product(2, "Lime"), product(3, "Lemonade")])
+
+    assert index._pending is None
+    assert len(index) == 2
+    assert ids(index, index.keyword("l", STORE, 0, 10)[0]) == [1, 3]
+    assert ids(index, index.text("curd", STORE, 0, 10)[0]) == [1]
+
+
+class _Watcher:
+    def start(self):
+        pass
+
+    async def wait_open(self):
+        return True
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def __aiter__(self):
+        return self._gen()
+
+    async def _gen(self):
+        for doc in self.docs:
+            yield doc
+
+
+def test_load_view_builds_the_index():
+    index = BM25TextIndex()
+    asyncio.run(load_view(index, _Watcher(), _Cursor([product(1, "Mango"), product(2, "Melon")])))
+    assert ids(index, index.keyword("m", STORE, 0, 10)[0]) == [1, 2]
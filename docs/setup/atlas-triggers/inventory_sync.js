@@ -55,12 +55,17 @@ exports = async function (changeEvent) {
     nearToReplenishmentInShelf: si.nearToReplenishmentInShelf
   }));
 
+  // Stores with stock – lets the search indexes filter "in stock in store X"
+  const inStockStoreObjectIds = inventorySummary
+    .filter((si) => si.inStock)
+    .map((si) => si.storeObjectId);
+
   // Write back to the product (same DB namespace as source event)
   const svc = context.services.get("mongodb-atlas");;// ← use your Linked-Data-Source name
   await svc
     .db(changeEvent.ns.db)
     .collection(PRODUCTS_COLL)
-    .updateOne({ _id: doc.productId }, { $set: { inventorySummary } });
+    .updateOne({ _id: doc.productId }, { $set: { inventorySummary, inStockStoreObjectIds } });
 
   console.log(`✔ inventorySummary synced → product ${doc.productId}`);
 };